@@ -1,13 +1,30 @@
-from sqlalchemy import create_engine
+import time
+
+from sqlalchemy import create_engine, event
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from config.settings import DATABASE_URL
+from app.services.metrics import DB_QUERY_SECONDS
+from config.settings import DATABASE_URL, DB_RESET_ON_STARTUP
 
 SQLALCHEMY_DATABASE_URL = DATABASE_URL
 
 engine = create_engine(
     SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False}
 )
+
+# 쿼리 실행 시간 메트릭 (SELECT/INSERT/UPDATE/DELETE 등 문장 종류별)
+@event.listens_for(engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+@event.listens_for(engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    started = conn.info['query_start_time'].pop()
+    verb = statement.split(None, 1)[0].upper() if statement else 'UNKNOWN'
+    DB_QUERY_SECONDS.labels(statement=verb).observe(time.perf_counter() - started)
+
+
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
@@ -20,12 +37,18 @@ def get_db():
         db.close()
 
 def init_db():
-    # 기존 테이블 삭제 (옵션)
-    Base.metadata.drop_all(bind=engine)
+    # 기존 테이블 삭제 (옵션) - 예약 작업/설정이 유지되도록 기본값은 삭제하지 않음
+    if DB_RESET_ON_STARTUP:
+        Base.metadata.drop_all(bind=engine)
+        print("Database tables dropped (DB_RESET_ON_STARTUP)")
     
     # 모델 import 및 테이블 생성
     from app.models.trading_history import TradingHistory
     from app.models.trading_settings import TradingSettings
+    from app.models.analysis_cache import AIResponseCache
+    from app.models.prompt_profile import PromptProfile
+    from app.models.scheduled_job import ScheduledJobRecord
+    from app.models.pipeline_trace import PipelineTrace
     Base.metadata.create_all(bind=engine)
     print("Database tables created successfully")
     
@@ -1,32 +1,39 @@
 import os
-import sys
 import json
-import time
 import uuid
 import asyncio
+import functools
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional, List, Union
-from io import StringIO
-import threading
+
+# 로깅 초기화 (서비스 모듈의 import 시점 출력부터 큐 기반 로거로 처리)
+from app.services.structured_logging import setup_logging
+setup_logging()
 
 from fastapi import FastAPI, HTTPException, Depends, BackgroundTasks, Query, Request, WebSocket, WebSocketDisconnect
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, Response
 from fastapi.middleware.cors import CORSMiddleware
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.date import DateTrigger
-from apscheduler.triggers.interval import IntervalTrigger
-from apscheduler.jobstores.base import JobLookupError
+from fastapi.middleware.gzip import GZipMiddleware
 from app.services.bitget_service import BitgetService
-from app.services.trading_assistant import TradingAssistant, websocket_manager
+from app.services.trading_assistant import TradingAssistant, JobType, JOB_PRIORITY
+from app.services.websocket_manager import websocket_manager
 from app.database.db import get_db, init_db
 from app.models.trading_history import TradingHistory
+from app.services.ticker_stream import TickerStream
+from app.services.serialization import FastJSONResponse
+from app.services.metrics import render_latest
 from .routers import trading
+from config.settings import (
+    STATUS_REFRESH_SECONDS, TICKER_STREAM_RATE_HZ, TICKER_STREAM_POSITION_REFRESH_SECONDS,
+    TICKER_STREAM_REST_FALLBACK_SECONDS, RESPONSE_GZIP_MIN_SIZE
+)
 
 # FastAPI 앱 생성
 app = FastAPI(
     title="Bitcoin Trading API",
     description="API for Bitcoin trading bot",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=FastJSONResponse
 )
 
 # CORS 설정
@@ -38,15 +45,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답 압축 (analyze-only의 market_data 등 큰 JSON 응답)
+app.add_middleware(GZipMiddleware, minimum_size=RESPONSE_GZIP_MIN_SIZE)
+
 # 라우터 등록
 app.include_router(trading.router, prefix="/api")
 
+# DB 초기화 (TradingAssistant가 시작 시 저장된 예약 작업을 복구하므로 먼저 실행)
+init_db()
+
 # 서비스 인스턴스 생성
 bitget_service = BitgetService()
 trading_assistant = TradingAssistant(websocket_manager=websocket_manager)
 
-# DB 초기화
-init_db()
+# 대시보드 실시간 시세/손익 스트림 (ticker 토픽)
+ticker_stream = TickerStream(
+    websocket_manager,
+    trading_assistant.bitget,
+    rate_hz=TICKER_STREAM_RATE_HZ,
+    position_refresh_seconds=TICKER_STREAM_POSITION_REFRESH_SECONDS,
+    rest_fallback_seconds=TICKER_STREAM_REST_FALLBACK_SECONDS,
+)
 
 # 다음 분석 시간 저장
 next_analysis_time = None
@@ -85,8 +104,58 @@ async def get_ticker():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+async def fetch_kline_rows(granularity, limit, end_time=None):
+    """거래소에서 캔들을 조회해 캔들 캐시에 병합"""
+    loop = asyncio.get_running_loop()
+    result = await loop.run_in_executor(None, functools.partial(
+        bitget_service.get_kline,
+        granularity=granularity,
+        limit=str(limit),
+        endTime=str(end_time) if end_time else None
+    ))
+    if result is None:
+        raise HTTPException(status_code=500, detail="Failed to fetch kline data")
+    trading_assistant.candle_cache.update(granularity, result.get('data') or [])
+    return result
+
+async def get_kline_page(granularity, limit, cursor):
+    """캔들 캐시에서 커서 이전 limit개 조회 (캐시에 없거나 빈 구간만 거래소에서 받아 병합)
+
+    최신 페이지(cursor 없음)는 진행 중인 캔들만 다시 받고, 캐시가 오래됐으면 limit개를 받습니다.
+    next_cursor는 페이지의 가장 오래된 캔들 timestamp이며, 더 과거 데이터가 없으면 None입니다.
+    """
+    cache = trading_assistant.candle_cache
+    before = int(cursor) if cursor else None
+    source = "cache"
+
+    if before is None:
+        await fetch_kline_rows(granularity, 2 if cache.is_fresh(granularity) else limit)
+
+    rows = cache.page(granularity, limit, before)
+    exhausted = False
+    if len(rows) < limit or not cache.is_contiguous(granularity, rows):
+        result = await fetch_kline_rows(granularity, limit, end_time=before - 1 if before else None)
+        source = "exchange"
+        rows = cache.page(granularity, limit, before)
+        if len(rows) < limit:
+            # 캐시 보관 한도를 넘는 과거 구간은 거래소 응답을 그대로 사용
+            fetched = sorted(
+                (row for row in result.get('data') or [] if before is None or int(row[0]) < before),
+                key=lambda row: int(row[0])
+            )
+            rows = fetched[-limit:]
+            exhausted = len(rows) < limit
+
+    return {
+        "code": "00000",
+        "msg": "success",
+        "data": rows,
+        "next_cursor": rows[0][0] if rows and not exhausted else None,
+        "source": source
+    }
+
 @app.get("/api/market/kline")
-async def get_kline(granularity: str = "1m", limit: int = 100, startTime: str = None, endTime: str = None):
+async def get_kline(granularity: str = "1m", limit: int = 100, startTime: str = None, endTime: str = None, cursor: str = None):
     """
     캔들스틱 차트 데이터 조회 API
     Args:
@@ -94,11 +163,16 @@ async def get_kline(granularity: str = "1m", limit: int = 100, startTime: str =
         limit (int): 조회할 캔들 개수 (기본값: 100)
         startTime (str): 시작 시간 (밀리초)
         endTime (str): 종료 시간 (밀리초)
+        cursor (str): 이전 응답의 next_cursor. startTime/endTime 없이 조회하면 캔들 캐시에서
+            최신 구간부터 과거 방향으로 limit개씩 페이지 조회
     Returns:
-        JSON: 캔들스틱 데이터 목록
+        JSON: 캔들스틱 데이터 목록 (페이지 조회 시 next_cursor 포함)
     """
     try:
-        print(f"Received kline request - granularity: {granularity}, limit: {limit}, startTime: {startTime}, endTime: {endTime}")
+        print(f"Received kline request - granularity: {granularity}, limit: {limit}, startTime: {startTime}, endTime: {endTime}, cursor: {cursor}")
+        
+        if not startTime and not endTime:
+            return await get_kline_page(granularity, limit, cursor)
         
         result = bitget_service.get_kline(
             granularity=granularity, 
@@ -112,6 +186,8 @@ async def get_kline(granularity: str = "1m", limit: int = 100, startTime: str =
             
         return result
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_kline: {str(e)}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -189,9 +265,6 @@ async def execute_trade():
 async def close_trade(request: Request):
     """포지션 청산 API"""
     try:
-        # 원래 stdout 저장
-        original_stdout = sys.stdout
-        
         print("\n=== 수동 청산 프로세스 시작 ===")
         
         # 기존 예약된 작업 취소
@@ -231,14 +304,15 @@ async def close_trade(request: Request):
                 trading_assistant._manual_liquidation = True
                 print("수동 청산 플래그가 설정되었습니다.")
             
-            # 스케줄러에 작업 추가 - _schedule_next_analysis 메서드 호출
+            # 스케줄러에 본분석 작업 추가
             trading_assistant.scheduler.add_job(
-                trading_assistant._schedule_next_analysis,
+                trading_assistant._run_analysis_job,
                 'date',
                 run_date=next_analysis_time,
                 id=new_job_id,
                 args=[new_job_id],
-                replace_existing=True
+                replace_existing=True,
+                priority=JOB_PRIORITY[JobType.ANALYSIS]
             )
             
             # 청산 정보 구성
@@ -249,7 +323,7 @@ async def close_trade(request: Request):
             
             # active_jobs에 추가
             trading_assistant.active_jobs[new_job_id] = {
-                'type': 'analysis',
+                'type': JobType.ANALYSIS,
                 'scheduled_time': next_analysis_time.isoformat(),
                 'reason': '수동 청산 후 재분석',
                 'liquidation_info': liquidation_info
@@ -258,6 +332,7 @@ async def close_trade(request: Request):
             print(f"다음 분석 예약됨: {next_analysis_time.strftime('%Y-%m-%d %H:%M:%S')}")
             print(f"스케줄러에 있는 작업 ID 목록: {[job.id for job in trading_assistant.scheduler.get_jobs()]}")
             print(f"현재 active_jobs 목록: {list(trading_assistant.active_jobs.keys())}")
+            request_status_refresh()
             
             # 청산 메시지 웹소켓으로 전송
             await websocket_manager.broadcast({
@@ -318,12 +393,45 @@ async def execute_long_trade():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+# analyze-only 응답의 market_data 섹션 (?include=indicators,summaries)
+MARKET_DATA_SECTIONS = {
+    "candles": ["candlesticks"],
+    "indicators": ["technical_indicators"],
+    "summaries": ["candle_summaries", "indicator_summaries"],
+    "context": ["market_context"],
+    "diagonal": ["diagonal_settings"],
+}
+
+def parse_include(include):
+    """include 파라미터 → 섹션 이름 목록 (없으면 None, 알 수 없는 섹션이면 400)"""
+    if include is None:
+        return None
+    sections = [name.strip() for name in include.split(",") if name.strip()]
+    unknown = [name for name in sections if name not in MARKET_DATA_SECTIONS]
+    if unknown:
+        raise HTTPException(
+            status_code=400,
+            detail=f"알 수 없는 include 섹션: {unknown} (사용 가능: {list(MARKET_DATA_SECTIONS)})"
+        )
+    return sections
+
+def select_market_data(market_data, sections):
+    """지정한 섹션만 남긴 market_data (current_market은 항상 포함, sections가 None이면 전체)"""
+    if sections is None or not isinstance(market_data, dict):
+        return market_data
+    selected = {"current_market": market_data.get("current_market")}
+    for name in sections:
+        for key in MARKET_DATA_SECTIONS[name]:
+            if key in market_data:
+                selected[key] = market_data[key]
+    return selected
+
 @app.post("/api/trading/analyze-only")
-async def analyze_only():
+async def analyze_only(include: Optional[str] = Query(None, description="market_data 섹션 선택 (candles,indicators,summaries,context,diagonal)")):
     """AI 분석만 수행 (거래 없음)"""
+    # 거래소/AI 호출 전에 include 검증 (잘못된 요청으로 유료 분석이 실행되지 않도록)
+    sections = parse_include(include)
     try:
-        import numpy as np
-        import copy
         print("\n=== AI 분석만 수행 (거래 없음) ===")
         
         # 시장 데이터 수집 (비동기 메서드 호출)
@@ -331,34 +439,6 @@ async def analyze_only():
         if not market_data:
             raise HTTPException(status_code=500, detail="Failed to collect market data")
         
-        # numpy 타입을 Python 기본 타입으로 변환하는 함수
-        def convert_numpy_types(obj):
-            # numpy bool 타입 처리
-            if hasattr(np, 'bool_') and isinstance(obj, np.bool_):
-                return bool(obj)
-            elif hasattr(np, 'bool') and isinstance(obj, np.bool):
-                return bool(obj)
-            # numpy 정수 타입 처리
-            elif isinstance(obj, (np.integer, np.int8, np.int16, np.int32, np.int64, 
-                                np.uint8, np.uint16, np.uint32, np.uint64)):
-                return int(obj)
-            # numpy 부동소수점 타입 처리
-            elif isinstance(obj, (np.floating, np.float16, np.float32, np.float64)):
-                return float(obj)
-            # numpy 배열 처리
-            elif isinstance(obj, np.ndarray):
-                return obj.tolist()
-            # 딕셔너리 재귀 처리
-            elif isinstance(obj, dict):
-                return {key: convert_numpy_types(value) for key, value in obj.items()}
-            # 리스트 재귀 처리
-            elif isinstance(obj, list):
-                return [convert_numpy_types(item) for item in obj]
-            return obj
-        
-        # market_data를 변환
-        market_data = convert_numpy_types(market_data)
-        
         # 현재 포지션 정보 가져오기
         positions = trading_assistant.bitget.get_positions()
         current_position = None
@@ -368,8 +448,8 @@ async def analyze_only():
             if active_positions:
                 current_position = active_positions[0]
         
-        # 분석용 market_data 깊은 복사본 생성 (포지션 정보 제거)
-        analysis_market_data = copy.deepcopy(market_data) if isinstance(market_data, dict) else market_data
+        # 분석용 market_data 복사본 생성 (포지션 정보 제거 - 최상위 키만 바꾸므로 얕은 복사로 충분)
+        analysis_market_data = dict(market_data) if isinstance(market_data, dict) else market_data
         
         # 포지션 정보를 완전히 제거 (포지션이 없는 것처럼)
         if isinstance(analysis_market_data, dict):
@@ -432,19 +512,20 @@ async def analyze_only():
                 "timestamp": datetime.now().isoformat()
             })
             
-            # 전체 response를 numpy 타입 변환
+            # numpy 타입은 FastJSONResponse가 직렬화 시 한 번에 처리
             response = {
                 "success": True,
                 "model": trading_assistant.get_current_ai_model(),
                 "analysis": analysis_result,
                 "current_position": current_position,
-                "market_data": market_data,
+                "market_data": select_market_data(market_data, sections),
                 "message": "분석이 완료되었습니다. (거래는 실행되지 않았습니다)"
             }
             
-            # 최종 response도 numpy 타입 변환
-            return convert_numpy_types(response)
+            return FastJSONResponse(response)
             
+        except HTTPException:
+            raise
         except Exception as e:
             print(f"AI 분석 중 오류 발생: {str(e)}")
             import traceback
@@ -517,58 +598,19 @@ async def start_trading():
                     new_job_id = str(uuid.uuid4())
                     
                     # 비동기 함수를 실행하기 위한 래퍼 함수 정의
-                    def async_job_wrapper(job_id):
-                        """비동기 함수를 실행하기 위한 래퍼 함수"""
+                    async def async_job_wrapper(job_id):
+                        """청산 후 자동 재시작 분석 작업 (캔들 수집 로그 생략)"""
                         print(f"\n=== 청산 후 자동 재시작 작업 실행 (ID: {job_id}) ===")
                         
-                        # 원래 stdout 저장
-                        original_stdout = sys.stdout
-                        
                         # 분석 시작 메시지 출력
                         print("\n=== 시장 분석 시작 ===")
                         print("캔들스틱 데이터 로딩 중... (상세 출력은 생략됩니다)")
                         
-                        # 임시 stdout으로 리디렉션 - 캔들스틱 데이터 수집 단계만 리디렉션
-                        temp_stdout = StringIO()
-                        
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        result = None
-                        
                         try:
-                            # 시장 데이터 수집 단계에서만 stdout 리디렉션
-                            trading_assistant._collecting_market_data = True
-                            
-                            # 모니터링 함수 정의
-                            def monitor_collection_status():
-                                """시장 데이터 수집 상태를 모니터링하는 함수"""
-                                nonlocal original_stdout
-                                
-                                # 시장 데이터 수집 중에는 출력 리디렉션
-                                while trading_assistant._collecting_market_data:
-                                    sys.stdout = temp_stdout
-                                    time.sleep(0.1)
-                                
-                                # 데이터 수집이 완료되면 원래 stdout으로 복원
-                                sys.stdout = original_stdout
-                                current_model = trading_assistant.get_current_ai_model().upper()
-                                print(f"시장 데이터 수집 완료, {current_model} 분석 시작...")
-                            
-                            # 모니터링 스레드 시작
-                            monitor_thread = threading.Thread(target=monitor_collection_status)
-                            monitor_thread.daemon = True
-                            monitor_thread.start()
-                            
-                            # 비동기 함수 실행 시작 - analyze_and_execute 직접 호출
-                            result = loop.run_until_complete(trading_assistant.analyze_and_execute(job_id, schedule_next=False))
-                            
-                            # 원래 stdout으로 복원
-                            sys.stdout = original_stdout
-                            
-                            # 모니터링 스레드 종료 대기
-                            if monitor_thread.is_alive():
-                                trading_assistant._collecting_market_data = False
-                                monitor_thread.join(timeout=1.0)
+                            # 시장 데이터 수집 단계 출력은 이 작업의 컨텍스트에서만 생략 (quiet_collection)
+                            result = await trading_assistant.analyze_and_execute(
+                                job_id, schedule_next=False, quiet_collection=True
+                            )
                             
                             # 분석 결과 요약 출력
                             if isinstance(result, dict) and result.get('success'):
@@ -585,30 +627,23 @@ async def start_trading():
                             
                             return result
                         except Exception as e:
-                            # 원래 stdout으로 복원
-                            sys.stdout = original_stdout
-                            
                             print(f"자동 재시작 작업 실행 중 에러: {str(e)}")
                             import traceback
                             traceback.print_exc()
                             return None
-                        finally:
-                            # 혹시 모를 경우를 대비해 stdout 복원 확인
-                            sys.stdout = original_stdout
-                            if hasattr(trading_assistant, '_collecting_market_data'):
-                                trading_assistant._collecting_market_data = False
-                            loop.close()
                     
                     # 1분 후 새로운 분석 스케줄링
                     try:
                         trading_assistant.scheduler.add_job(
                             async_job_wrapper,
-                            trigger=DateTrigger(run_date=next_analysis_time),
+                            'date',
+                            run_date=next_analysis_time,
                             id=new_job_id,
-                            args=[new_job_id]
+                            args=[new_job_id],
+                            priority=JOB_PRIORITY[JobType.ANALYSIS]
                         )
                         trading_assistant.active_jobs[new_job_id] = {
-                            "type": "analysis",  # 분석 작업임을 명시 (취소 시 필터링용)
+                            "type": JobType.ANALYSIS,  # 분석 작업임을 명시 (취소 시 필터링용)
                             "scheduled_time": next_analysis_time.isoformat(),
                             "analysis_result": None
                         }
@@ -674,9 +709,11 @@ async def start_trading():
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
-@app.get("/api/trading/status")
-async def get_trading_status():
-    """트레이딩 상태 조회 및 포지션 청산 감지"""
+def compute_trading_status():
+    """트레이딩 상태 계산 및 포지션 청산 감지
+
+    거래소를 호출하는 블로킹 함수이므로 상태 갱신 루프(status_refresh_loop)에서만 스레드 풀로 실행합니다.
+    """
     global next_analysis_time
     global trading_assistant
     
@@ -698,15 +735,17 @@ async def get_trading_status():
             "last_position_side": trading_assistant._last_position_side,
         }
     
-    # 현재 가격 정보 가져오기
-    try:
-        ticker = trading_assistant.bitget.get_ticker()
-        current_price = 0
-        if ticker and 'data' in ticker:
-            current_price = float(ticker['data'][0]['lastPr']) if isinstance(ticker['data'], list) else float(ticker['data'].get('lastPr', 0))
-    except Exception as e:
-        print(f"가격 정보 가져오기 실패: {str(e)}")
-        current_price = 0
+    # 현재 가격 정보 가져오기 (시세 스트림 값이 최신이면 REST 조회 생략)
+    current_price = ticker_stream.fresh_price()
+    if current_price is None:
+        try:
+            ticker = trading_assistant.bitget.get_ticker()
+            current_price = 0
+            if ticker and 'data' in ticker:
+                current_price = float(ticker['data'][0]['lastPr']) if isinstance(ticker['data'], list) else float(ticker['data'].get('lastPr', 0))
+        except Exception as e:
+            print(f"가격 정보 가져오기 실패: {str(e)}")
+            current_price = 0
     
     # 포지션 청산 감지 로직
     liquidation_detected = False
@@ -773,40 +812,23 @@ async def get_trading_status():
         # 새로운 작업 ID 생성
         new_job_id = str(uuid.uuid4())
         
-        # 비동기 함수를 실행하기 위한 래퍼 함수 정의
-        def async_job_wrapper(job_id):
-            """비동기 함수를 실행하기 위한 래퍼 함수"""
-            print(f"\n=== 포지션 청산 후 자동 재시작 작업 실행 (ID: {job_id}) ===")
-            print(f"실행 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            print(f"포지션 청산 정보: {liquidation_info}")
-            
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            try:
-                # 비동기 함수 실행
-                print("\n=== 시장 분석 및 거래 실행 시작 (포지션 청산 후 자동 재시작) ===")
-                result = loop.run_until_complete(trading_assistant.analyze_and_execute(job_id, schedule_next=True))
-                print(f"자동 재시작 작업 결과: {result['success'] if isinstance(result, dict) and 'success' in result else '알 수 없음'}")
-            except Exception as e:
-                print(f"자동 재시작 작업 실행 중 오류: {str(e)}")
-            finally:
-                loop.close()
-        
         # 스케줄러에 작업 등록
         trading_assistant.scheduler.add_job(
-            async_job_wrapper,
+            trading_assistant._run_analysis_job,
             'date',
             run_date=next_analysis_time,
             args=[new_job_id],
             id=new_job_id,
-            replace_existing=True
+            replace_existing=True,
+            priority=JOB_PRIORITY[JobType.ANALYSIS]
         )
         
         # 활성 작업 목록에 추가
         trading_assistant.active_jobs[new_job_id] = {
-            "type": "analysis",
+            "type": JobType.ANALYSIS,
             "scheduled_time": next_analysis_time.isoformat(),
-            "reason": "포지션 청산 후 자동 재시작"
+            "reason": "포지션 청산 후 자동 재시작",
+            "liquidation_info": liquidation_info
         }
         
         # 실제 응답 반환
@@ -816,6 +838,7 @@ async def get_trading_status():
             "liquidation_detected": True,
             "liquidation_reason": liquidation_reason,
             "liquidation_price": liquidation_price,
+            "liquidation_info": liquidation_info,
             "next_analysis": next_analysis_time if isinstance(next_analysis_time, str) else (next_analysis_time.isoformat() if next_analysis_time else None),
             "next_analysis_job_id": new_job_id
         }
@@ -895,6 +918,60 @@ async def get_trading_status():
     
     return response
 
+# 트레이딩 상태 스냅샷 (status_refresh_loop가 갱신, 요청 경로에서는 거래소 호출 없이 반환)
+status_snapshot = {"data": None, "updated_at": None}
+status_refresh_event = None  # startup에서 서버 이벤트 루프에 생성
+
+async def refresh_trading_status():
+    """상태 스냅샷 갱신 후 position 토픽에 변경분 발행
+
+    시세(current_price)는 ticker 토픽에서 실시간으로 전송하므로 position 토픽에서는 제외합니다.
+    """
+    loop = asyncio.get_running_loop()
+    data = await loop.run_in_executor(None, compute_trading_status)
+    status_snapshot["data"] = data
+    status_snapshot["updated_at"] = datetime.now()
+    position_state = dict(data)
+    position_state.pop("current_price", None)
+    websocket_manager.publish_state("position", position_state)
+    return data
+
+def request_status_refresh():
+    """다음 갱신 주기를 기다리지 않고 상태 스냅샷 갱신 요청 (상태를 바꾸는 엔드포인트에서 호출)"""
+    if status_refresh_event is not None:
+        status_refresh_event.set()
+
+async def status_refresh_loop():
+    """STATUS_REFRESH_SECONDS마다 (또는 갱신 요청 시) 상태 스냅샷 갱신"""
+    while True:
+        try:
+            await asyncio.wait_for(status_refresh_event.wait(), timeout=STATUS_REFRESH_SECONDS)
+        except asyncio.TimeoutError:
+            pass
+        status_refresh_event.clear()
+        try:
+            await refresh_trading_status()
+        except Exception as e:
+            print(f"트레이딩 상태 갱신 중 오류: {str(e)}")
+
+@app.get("/api/trading/status")
+async def get_trading_status():
+    """트레이딩 상태 조회 (백그라운드에서 갱신한 스냅샷과 갱신 시각 반환)"""
+    data = status_snapshot["data"]
+    updated_at = status_snapshot["updated_at"]
+    if data is None:
+        return {
+            "status": "initializing",
+            "message": "트레이딩 상태를 준비 중입니다.",
+            "as_of": None,
+            "age_seconds": None
+        }
+    return {
+        **data,
+        "as_of": updated_at.isoformat(),
+        "age_seconds": round((datetime.now() - updated_at).total_seconds(), 1)
+    }
+
 @app.post("/api/trading/stop")
 async def stop_trading():
     """자동 트레이딩 중지"""
@@ -913,6 +990,7 @@ async def stop_trading():
         
         # 예약된 작업 취소
         trading_assistant.cancel_all_jobs()
+        request_status_refresh()
         
         return {
             "success": True,
@@ -1025,6 +1103,43 @@ async def cancel_scheduled_jobs():
             "error": str(e)
         }
 
+async def refresh_topic_states(topics):
+    """처음 구독하는 토픽의 상태가 아직 없으면 채움 (거래소 호출 없이 캐시/메모리에서)"""
+    if "position" in topics and not websocket_manager.has_state("position") and status_snapshot["data"]:
+        position_state = dict(status_snapshot["data"])
+        position_state.pop("current_price", None)
+        websocket_manager.publish_state("position", position_state)
+    if "ticker" in topics and not websocket_manager.has_state("ticker"):
+        await ticker_stream.publish_once()
+    if "jobs" in topics and not websocket_manager.has_state("jobs"):
+        websocket_manager.publish_state("jobs", trading_assistant.get_active_jobs())
+
+
+@app.on_event("startup")
+async def start_state_stream():
+    global status_refresh_event
+    status_refresh_event = asyncio.Event()
+    try:
+        await refresh_trading_status()
+    except Exception as e:
+        print(f"초기 트레이딩 상태 조회 실패: {str(e)}")
+    asyncio.create_task(status_refresh_loop())
+    asyncio.create_task(ticker_stream.run())
+
+
+@app.get("/api/market/ticker-stream")
+async def get_ticker_stream_stats():
+    """실시간 시세 스트림 상태 (피드 연결, 마지막 수신 경과 시간, 발행 횟수)"""
+    return {"success": True, "ticker_stream": ticker_stream.get_stats()}
+
+
+@app.get("/metrics", include_in_schema=False)
+async def metrics():
+    """Prometheus 스크레이프용 메트릭 (Bitget 지연/429, 지표 계산, 프롬프트/LLM, 스케줄러 지연, WebSocket, DB)"""
+    body, content_type = render_latest()
+    return Response(content=body, media_type=content_type)
+
+
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     await websocket_manager.connect(websocket)
@@ -1040,7 +1155,7 @@ async def websocket_endpoint(websocket: WebSocket):
             },
             "timestamp": datetime.now().isoformat()
         }
-        await websocket.send_json(welcome_message)
+        await websocket_manager.send_personal(websocket, welcome_message)
         print(f"새 WebSocket 클라이언트에 환영 메시지 전송됨: {id(websocket)}")
         
         # 현재 트레이딩 상태 전송
@@ -1052,7 +1167,7 @@ async def websocket_endpoint(websocket: WebSocket):
                 "data": trading_status,
                 "timestamp": datetime.now().isoformat()
             }
-            await websocket.send_json(status_message)
+            await websocket_manager.send_personal(websocket, status_message)
             print(f"새 WebSocket 클라이언트에 현재 트레이딩 상태 전송됨: {id(websocket)}")
             
             # 현재 예약된 작업 정보 전송
@@ -1064,7 +1179,7 @@ async def websocket_endpoint(websocket: WebSocket):
                     "data": scheduled_jobs,
                     "timestamp": datetime.now().isoformat()
                 }
-                await websocket.send_json(jobs_message)
+                await websocket_manager.send_personal(websocket, jobs_message)
                 print(f"새 WebSocket 클라이언트에 예약된 작업 정보 전송됨: {id(websocket)}")
             except Exception as e:
                 print(f"예약된 작업 정보 전송 중 오류: {str(e)}")
@@ -1089,8 +1204,14 @@ async def websocket_endpoint(websocket: WebSocket):
                         },
                         "timestamp": datetime.now().isoformat()
                     }
-                    await websocket.send_json(pong_message)
+                    await websocket_manager.send_personal(websocket, pong_message)
                     print(f"클라이언트 {id(websocket)}에 pong 메시지 전송됨")
+                elif message_data.get("type") == "subscribe":
+                    topics = message_data.get("topics") or []
+                    await refresh_topic_states(topics)
+                    await websocket_manager.subscribe(websocket, topics)
+                elif message_data.get("type") == "unsubscribe":
+                    await websocket_manager.unsubscribe(websocket, message_data.get("topics") or [])
             except json.JSONDecodeError:
                 print(f"잘못된 JSON 형식의 메시지 수신됨: {data[:50]}...")
             except Exception as e:
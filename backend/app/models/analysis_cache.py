@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime, Text
+from app.database.db import Base
+import datetime
+
+class AIResponseCache(Base):
+    """AI 분석 응답 캐시 테이블 (시장 스냅샷 지문 기준)"""
+    __tablename__ = "ai_response_cache"
+
+    id = Column(Integer, primary_key=True, index=True)
+    fingerprint = Column(String, unique=True, index=True, nullable=False)  # 시장 스냅샷 해시 (sha256)
+    model_id = Column(String, nullable=False)  # 분석에 사용한 모델 ID
+    prompt_version = Column(String, nullable=False)  # 프롬프트 버전
+    response_json = Column(Text, nullable=False)  # AI 분석 결과 (JSON 문자열)
+    created_at = Column(DateTime, default=datetime.datetime.now)
+    expires_at = Column(DateTime, nullable=False, index=True)  # 다음 15분봉 마감 시각
@@ -0,0 +1,16 @@
+from sqlalchemy import Column, String, Float, Integer, DateTime, JSON
+from app.database.db import Base
+import datetime
+
+class PipelineTrace(Base):
+    """분석 사이클 1회의 단계별 span 기록 (수집 → 지표 → 프롬프트 → LLM → 파싱 → 주문 → 알림)"""
+    __tablename__ = "pipeline_traces"
+
+    trace_id = Column(String, primary_key=True)
+    name = Column(String, nullable=False, index=True)  # analysis_cycle / monitoring_cycle / speculative_analysis
+    status = Column(String, nullable=False)  # ok / error
+    started_at = Column(DateTime, default=datetime.datetime.now, index=True)
+    duration_ms = Column(Float)
+    span_count = Column(Integer)
+    attributes = Column(JSON, nullable=True)  # 루트 span 속성 (job_id, action 등)
+    spans = Column(JSON, nullable=False)  # [{span_id, parent_id, name, start_ms, duration_ms, status, attributes, thread}]
@@ -0,0 +1,23 @@
+from sqlalchemy import Column, Integer, String, Float, DateTime, JSON
+from app.database.db import Base
+import datetime
+
+class PromptProfile(Base):
+    """분석별 프롬프트 섹션 토큰 근사치와 공급자 보고 사용량"""
+    __tablename__ = "prompt_profiles"
+
+    id = Column(Integer, primary_key=True, index=True)
+    created_at = Column(DateTime, default=datetime.datetime.now, index=True)
+    model_id = Column(String, nullable=False)  # 요청 모델 ID
+    served_by = Column(String, nullable=True)  # 실제 응답한 모델 (폴백 시)
+    fingerprint = Column(String, nullable=True)  # 시장 스냅샷 지문
+    mode = Column(String, nullable=False)  # full / delta
+    action = Column(String, nullable=True)
+    estimated_tokens = Column(Integer)  # 섹션 합계 근사 토큰
+    input_tokens = Column(Integer, nullable=True)  # 공급자 보고 입력 토큰
+    output_tokens = Column(Integer, nullable=True)  # 공급자 보고 출력 토큰
+    latency_seconds = Column(Float)
+    build_ms = Column(Float, nullable=True)  # 프롬프트 생성 시간
+    sections = Column(JSON)  # 섹션별 근사 토큰
+    section_build_ms = Column(JSON, nullable=True)  # IR 섹션별 생성 시간
+    usage = Column(JSON, nullable=True)  # 공급자 원본 usage
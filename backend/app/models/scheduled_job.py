@@ -0,0 +1,14 @@
+from sqlalchemy import Column, String, DateTime, JSON
+from app.database.db import Base
+import datetime
+
+class ScheduledJobRecord(Base):
+    """예약 작업 영속 저장소 (재시작 시 분석/모니터링/강제청산 일정 복구용)"""
+    __tablename__ = "scheduled_jobs"
+
+    job_id = Column(String, primary_key=True)
+    job_type = Column(String, nullable=False, index=True)  # ANALYSIS / MONITORING / FORCE_CLOSE
+    run_at = Column(DateTime, nullable=True, index=True)  # 예약 실행 시간 (local)
+    job_info = Column(JSON, nullable=False)  # active_jobs 항목 전체 (position_side, expected_minutes, metadata 등)
+    created_at = Column(DateTime, default=datetime.datetime.now)
+    updated_at = Column(DateTime, default=datetime.datetime.now, onupdate=datetime.datetime.now)
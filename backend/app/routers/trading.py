@@ -232,6 +232,9 @@ async def update_diagonal_settings(setting_update: DiagonalSettingUpdate, db: Se
         db.commit()
         db.refresh(diagonal_setting)
         
+        # TradingAssistant의 빗각 설정 캐시 무효화
+        TradingAssistant().invalidate_diagonal_settings()
+        
         return {
             "success": True,
             "message": "빗각 설정이 업데이트되었습니다",
@@ -250,3 +253,143 @@ async def update_diagonal_settings(setting_update: DiagonalSettingUpdate, db: Se
     except Exception as e:
         db.rollback()
         return {"success": False, "error": str(e)}
+
+@router.get("/diagonal-settings/auto")
+async def get_auto_diagonal_settings():
+    """자동 탐지된 빗각 기준점 조회"""
+    try:
+        detector = TradingAssistant().diagonal_anchor_detector
+        return {
+            "success": True,
+            "settings": detector.get_settings(),
+            "updated_at": detector.updated_at.isoformat() if detector.updated_at else None
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+@router.get("/monitoring-stats")
+async def get_monitoring_stats():
+    """모니터링 사이클별 프롬프트 크기, 토큰 사용량, 지연 시간 조회"""
+    try:
+        trading_assistant = TradingAssistant()
+        return {
+            "success": True,
+            "stats": trading_assistant.monitoring_context.get_stats()
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/thinking-budget")
+async def get_thinking_budget_stats():
+    """Claude thinking 예산 정책과 티어별 지연 시간 조회"""
+    try:
+        trading_assistant = TradingAssistant()
+        return {
+            "success": True,
+            "stats": trading_assistant.ai_service.claude_service.budget_controller.get_stats()
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/scheduler")
+async def get_scheduler_status():
+    """예약 작업 대기열, 실행 중인 작업, 실행/실패 통계 조회"""
+    try:
+        trading_assistant = TradingAssistant()
+        return {
+            "success": True,
+            "scheduler": trading_assistant.scheduler.get_status()
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/websocket/stats")
+async def get_websocket_stats():
+    """WebSocket 클라이언트별 대기열 길이, 지연, 압축/연결 해제 통계 조회"""
+    try:
+        trading_assistant = TradingAssistant()
+        return {
+            "success": True,
+            "websocket": trading_assistant.websocket_manager.get_stats()
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/speculative-analysis")
+async def get_speculative_analysis_stats():
+    """투기적 사전 분석 설정과 재사용/재분석 통계 조회"""
+    try:
+        trading_assistant = TradingAssistant()
+        return {
+            "success": True,
+            "stats": trading_assistant.speculative_analysis.get_stats()
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/model-router")
+async def get_model_router_stats():
+    """모델별 지연 시간(p50/p95), 오류율, 폴백 체인 조회"""
+    try:
+        trading_assistant = TradingAssistant()
+        return {
+            "success": True,
+            "stats": trading_assistant.ai_service.model_router.get_stats()
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/prompt-profile/summary")
+async def get_prompt_profile_summary(limit: int = 50, mode: Optional[str] = None):
+    """최근 분석의 프롬프트 섹션별 토큰 근사치, 생성 시간, 공급자 보고 사용량 요약"""
+    try:
+        from app.services.prompt_profiler import get_profile_summary
+        return {
+            "success": True,
+            "summary": get_profile_summary(limit=limit, mode=mode)
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/traces")
+async def list_pipeline_traces(limit: int = 20, name: Optional[str] = None):
+    """최근 분석 사이클 트레이스 목록 (이름, 상태, 총 소요 시간, span 수)"""
+    try:
+        from app.services.tracer import pipeline_tracer
+        return {
+            "success": True,
+            "traces": pipeline_tracer.list_traces(limit=limit, name=name),
+            "stats": pipeline_tracer.get_stats()
+        }
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/traces/{trace_id}")
+async def get_pipeline_trace(trace_id: str):
+    """분석 사이클 1회의 단계별 워터폴 (시작 오프셋, 소요 시간, 자체 시간, 깊이, 막대)"""
+    try:
+        from app.services.tracer import pipeline_tracer
+        trace = pipeline_tracer.get_trace(trace_id)
+        if trace is None:
+            return {"success": False, "error": f"트레이스를 찾을 수 없습니다: {trace_id}"}
+        return {"success": True, "trace": trace}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
+
+
+@router.get("/logging/stats")
+async def get_logging_stats():
+    """로깅 레벨, 모듈별 레벨, 대기열 깊이, 버려진/반복 제한된 로그 수 조회"""
+    try:
+        from app.services.structured_logging import logging_subsystem
+        return {"success": True, "logging": logging_subsystem.get_stats()}
+    except Exception as e:
+        return {"success": False, "error": str(e)}
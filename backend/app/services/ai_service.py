@@ -1,6 +1,20 @@
 from .openai_service import OpenAIService
 from .claude_service import ClaudeService
 from .deepseek_service import DeepSeekService
+from .analysis_cache import AnalysisCache
+from .model_router import ModelRouter
+from .prompt_profiler import save_profile
+from .metrics import LLM_CACHE_HITS_TOTAL, record_llm_call
+from .tracer import pipeline_tracer
+import asyncio
+import time
+from config.settings import (
+    ANALYSIS_CACHE_ENABLED, AI_PROMPT_VERSION, MODEL_ROUTER_ENABLED, MODEL_FALLBACK_CHAIN,
+    MODEL_DEADLINE_SECONDS, MODEL_MAX_ERROR_RATE, MODEL_MIN_ATTEMPT_SECONDS
+)
+
+CLAUDE_MODELS = ["claude", "claude-opus", "claude-opus-4.1", "claude-sonnet-4.5"]
+DEEPSEEK_MODELS = ["deepseek-chat", "deepseek-reasoner"]
 
 class AIService:
     def __init__(self):
@@ -8,6 +22,15 @@ class AIService:
         self.claude_service = ClaudeService()
         self.deepseek_service = DeepSeekService()
         self.current_model = "gpt"  # 기본값은 GPT
+        self.analysis_cache = AnalysisCache(enabled=ANALYSIS_CACHE_ENABLED)
+        self.prompt_version = AI_PROMPT_VERSION
+        self.model_router = ModelRouter(
+            MODEL_FALLBACK_CHAIN,
+            deadline_seconds=MODEL_DEADLINE_SECONDS,
+            max_error_rate=MODEL_MAX_ERROR_RATE,
+            min_attempt_seconds=MODEL_MIN_ATTEMPT_SECONDS,
+            enabled=MODEL_ROUTER_ENABLED
+        )
     
     def set_model(self, model_type):
         """AI 모델 설정
@@ -15,7 +38,7 @@ class AIService:
             model_type (str): 모델 타입 ('openai', 'claude', 'claude-opus', 'claude-opus-4.1', 'claude-sonnet-4.5', 'deepseek-chat', 'deepseek-reasoner')
         """
         if model_type in ['openai', 'gpt']:
-            self.current_model = 'openai'
+            self.current_model = 'gpt'
         elif model_type in ['claude', 'claude-sonnet']:
             self.current_model = 'claude'
             # Claude 서비스에 모델 타입 설정
@@ -51,25 +74,182 @@ class AIService:
         """현재 설정된 AI 모델 반환"""
         return self.current_model
     
+    def get_model_id(self):
+        """캐시 키 등에 사용할 실제 모델 ID 반환"""
+        return self._model_id(self.current_model)
+
+    def _model_id(self, model):
+        """모델 타입 → 캐시/메트릭용 모델 ID (폴백 모델은 공급자의 현재 설정이 아닌 해당 모델 기준)"""
+        if model == "gpt":
+            return f"openai:{self.openai_service.assistant_id}"
+        elif model in CLAUDE_MODELS:
+            return f"claude:{self._provider_model(model)}"
+        elif model in DEEPSEEK_MODELS:
+            return f"deepseek:{self._provider_model(model)}"
+        return model
+
+    def _get_provider(self, model):
+        """모델 타입 → 공급자 서비스"""
+        if model == "gpt":
+            return self.openai_service
+        elif model in CLAUDE_MODELS:
+            return self.claude_service
+        elif model in DEEPSEEK_MODELS:
+            return self.deepseek_service
+        raise ValueError(f"알 수 없는 모델 타입: {model}")
+
+    def _provider_model(self, model):
+        """호출에 넘길 공급자 모델 ID (선택된 모델이면 공급자에 설정된 값)"""
+        if model == self.current_model:
+            return getattr(self._get_provider(model), 'model', None)
+        if model in CLAUDE_MODELS:
+            return self.claude_service.MODEL_IDS[model]
+        if model in DEEPSEEK_MODELS:
+            return model
+        return None
+
+    def _budget_tier(self, model, market_data, position_open):
+        """캐시 키에 포함할 예산 티어 (Claude만 해당, 호출 시 선택될 티어와 같은 규칙)"""
+        if model in CLAUDE_MODELS:
+            return self.claude_service.budget_controller.decide(market_data, position_open=position_open)['tier']
+        return None
+
+    def _is_available(self, model):
+        """API 키가 설정된 공급자인지 확인 (폴백 후보 필터)"""
+        try:
+            service = self._get_provider(model)
+        except ValueError:
+            return False
+        return bool(getattr(service, 'api_key', None))
+
+    async def _call_provider(self, model, market_data, prompt, position_open):
+        """공급자 호출 (모델은 호출 인자로만 넘기고 공유 서비스 인스턴스는 변경하지 않음)"""
+        service = self._get_provider(model)
+        if service is self.openai_service:
+            return await service.analyze_market_data(market_data, prompt, position_open=position_open)
+        if service is self.deepseek_service:
+            return await service.analyze_market_data(market_data, prompt, model=self._provider_model(model))
+        return await service.analyze_market_data(
+            market_data, prompt, position_open=position_open, model=self._provider_model(model)
+        )
+
     def reset_thread(self):
         """AI 스레드 초기화 (OpenAI만 해당)"""
         if self.current_model == "gpt":
             self.openai_service.reset_thread()
         # Claude는 스레드 개념이 없으므로 아무것도 하지 않음
     
-    async def analyze_market_data(self, market_data):
-        """선택된 AI 모델로 시장 데이터 분석"""
-        print(f"\n=== AI 서비스: {self.current_model.upper()} 모델 사용 중 ===")
+    @pipeline_tracer.traced('ai_analysis')
+    async def analyze_market_data(self, market_data, prompt=None, position_open=False, deadline_seconds=None):
+        """선택된 AI 모델로 시장 데이터 분석 (동일 스냅샷은 캐시 결과 반환)
+        
+        Args:
+            market_data: 수집된 시장 데이터
+            prompt: 지정 시 전체 분석 프롬프트 대신 사용 (모니터링 델타 컨텍스트)
+            position_open: 포지션 보유 중 여부 (Claude thinking 예산, OpenAI 스레드 정책)
+            deadline_seconds: 호출 마감 시간 (초, 기본값은 MODEL_DEADLINE_SECONDS)
+        """
+        model_type = self.current_model
+        print(f"\n=== AI 서비스: {model_type.upper()} 모델 사용 중 ===")
 
-        if self.current_model == "gpt":
-            return await self.openai_service.analyze_market_data(market_data)
-        elif self.current_model in ["claude", "claude-opus", "claude-opus-4.1", "claude-sonnet-4.5"]:
-            return await self.claude_service.analyze_market_data(market_data)
-        elif self.current_model in ["deepseek-chat", "deepseek-reasoner"]:
-            return await self.deepseek_service.analyze_market_data(market_data)
-        else:
-            raise ValueError(f"알 수 없는 모델 타입: {self.current_model}")
+        model_id = self._model_id(model_type)
+        fingerprint = None
+        try:
+            fingerprint = AnalysisCache.compute_fingerprint(
+                market_data, model_id, self.prompt_version, prompt,
+                position_open=position_open, budget_tier=self._budget_tier(model_type, market_data, position_open)
+            )
+            cached_result = self.analysis_cache.get(fingerprint)
+            if cached_result:
+                print(f"✅ AI 응답 캐시 적중 (fingerprint: {fingerprint[:12]}...) - 모델 호출 생략")
+                cached_result['cache_hit'] = True
+                cached_result['fingerprint'] = fingerprint
+                LLM_CACHE_HITS_TOTAL.labels(model=model_id).inc()
+                pipeline_tracer.set_attribute('cache_hit', True)
+                return cached_result
+        except Exception as e:
+            print(f"AI 응답 캐시 확인 중 오류 (모델 호출로 진행): {str(e)}")
+
+        call_start = time.time()
+        result = await self._analyze_with_fallback(model_type, market_data, prompt, position_open, deadline_seconds)
+        latency_seconds = time.time() - call_start
+
+        # 폴백 모델이 응답했으면 메트릭/프로파일은 실제 응답한 모델 기준으로 기록
+        served_by = (result or {}).get('served_by', model_type)
+        served_model_id = self._model_id(served_by) if served_by != model_type else model_id
+        record_llm_call(served_model_id, result, latency_seconds)
+
+        # 오류 응답과 폴백 모델의 응답은 캐시하지 않음 (캐시 키는 선택된 모델 기준)
+        if result and fingerprint and 'error_info' not in result and served_by == model_type:
+            self.analysis_cache.set(fingerprint, model_id, self.prompt_version, result)
+
+        if result is not None:
+            result['cache_hit'] = False
+            if fingerprint:
+                result['fingerprint'] = fingerprint
+
+        # 프롬프트 섹션별 토큰 근사치와 실제 사용량 기록 (SQLite 쓰기는 스레드에서 실행)
+        if result and 'error_info' not in result:
+            await asyncio.to_thread(save_profile, served_model_id, result, latency_seconds)
+        return result
     
+    async def _analyze_with_fallback(self, model_type, market_data, prompt, position_open, deadline_seconds=None):
+        """마감 시간 안에 응답할 모델을 순서대로 시도 (실패/타임아웃 시 다음 모델)
+
+        모든 시도는 남은 마감 시간 안으로 제한되며, 시간을 넘긴 시도는 취소합니다.
+        """
+        self._get_provider(model_type)  # 알 수 없는 모델이면 ValueError
+
+        deadline_seconds = deadline_seconds or self.model_router.deadline_seconds
+        plan = self.model_router.plan(model_type, deadline_seconds, available=self._is_available)
+        started = time.time()
+        result = None
+
+        for position, model in enumerate(plan):
+            remaining = deadline_seconds - (time.time() - started)
+            if remaining <= 0:
+                print(f"모델 라우터: 마감 시간 {deadline_seconds}초 초과 - 폴백 중단")
+                break
+
+            # 다음 모델 몫의 시간을 남기되 남은 마감 시간은 넘기지 않음 (마지막 시도는 남은 시간 전부)
+            next_model = plan[position + 1] if position + 1 < len(plan) else None
+            timeout = remaining
+            if next_model:
+                timeout = min(self.model_router.attempt_timeout(remaining, next_model), remaining)
+            if position > 0:
+                print(f"\n=== 모델 폴백: {model} 시도 (남은 시간 {remaining:.0f}초) ===")
+
+            call_start = time.time()
+            try:
+                with pipeline_tracer.span('llm_call', model=model, attempt=position + 1):
+                    # 시간 초과 시 wait_for가 호출 태스크를 취소하고 정리될 때까지 기다림
+                    result = await asyncio.wait_for(
+                        self._call_provider(model, market_data, prompt, position_open), timeout=timeout
+                    )
+                    pipeline_tracer.set_attribute('ok', bool(result) and 'error_info' not in result)
+            except asyncio.TimeoutError:
+                print(f"모델 라우터: {model} 응답이 {timeout:.0f}초 안에 오지 않아 호출 취소")
+                self.model_router.record(model, time.time() - call_start, False)
+                result = None
+                continue
+            except Exception as e:
+                print(f"모델 라우터: {model} 호출 중 오류: {str(e)}")
+                import traceback
+                traceback.print_exc()
+                self.model_router.record(model, time.time() - call_start, False)
+                result = None
+                continue
+
+            ok = bool(result) and 'error_info' not in result
+            self.model_router.record(model, time.time() - call_start, ok)
+            if ok:
+                result['served_by'] = model
+                return result
+            print(f"모델 라우터: {model} 분석 실패 → 다음 모델 시도")
+
+        # 모든 모델 실패 시 마지막 오류 응답 반환 (기존 오류 처리 흐름 유지)
+        return result
+
     async def monitor_position(self, market_data, position_info, entry_analysis_reason=""):
         """선택된 AI 모델로 포지션 모니터링"""
         if self.current_model == "gpt":
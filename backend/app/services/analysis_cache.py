@@ -0,0 +1,137 @@
+from datetime import datetime, timedelta
+import hashlib
+import json
+import threading
+
+from app.database.db import SessionLocal
+from app.models.analysis_cache import AIResponseCache
+from .serialization import dumps_str
+
+
+class AnalysisCache:
+    """시장 스냅샷 지문(fingerprint) 기반 AI 응답 캐시
+
+    마감된 캔들, 빗각 설정, 모델 ID, 프롬프트 버전을 정규화하여 해시하고,
+    같은 지문의 분석 결과를 다음 15분봉 마감 시각까지 재사용합니다.
+    메모리에 먼저 조회하고, 없으면 SQLite(ai_response_cache)에서 조회합니다.
+    """
+
+    CANDLE_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+    DIAGONAL_FIELDS = ('point_a_time', 'point_second_time', 'point_b_time', 'source')
+    CANDLE_INTERVAL_MINUTES = 15
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self._memory = {}  # fingerprint -> (expires_at, 직렬화된 result)
+        self._lock = threading.Lock()
+
+    @classmethod
+    def compute_fingerprint(cls, market_data, model_id, prompt_version, prompt=None, position_open=False,
+                            budget_tier=None):
+        """정규화된 입력의 sha256 해시
+
+        진행 중인(마지막) 캔들은 매 호출마다 값이 바뀌므로 제외하고,
+        마감된 캔들만 지문에 포함합니다.
+        별도 프롬프트(델타 컨텍스트 등)를 사용하는 경우 프롬프트 내용도 포함합니다.
+        포지션 보유 여부와 예산 티어(Claude thinking)에 따라 요청 자체가 달라지므로 둘 다 포함합니다.
+        """
+        hasher = hashlib.sha256()
+        hasher.update(
+            f"model={model_id}|prompt={prompt_version}|position_open={bool(position_open)}|budget={budget_tier}".encode()
+        )
+        if prompt:
+            hasher.update(prompt.encode())
+
+        candlesticks = market_data.get('candlesticks', {})
+        for timeframe in sorted(candlesticks):
+            closed = candlesticks[timeframe][:-1]
+            rows = [[candle.get(field) for field in cls.CANDLE_FIELDS] for candle in closed]
+            hasher.update(f"|{timeframe}|".encode())
+            hasher.update(json.dumps(rows, separators=(',', ':')).encode())
+
+        diagonal_settings = market_data.get('diagonal_settings', {})
+        diagonal = {
+            direction: {field: (diagonal_settings.get(direction) or {}).get(field) for field in cls.DIAGONAL_FIELDS}
+            for direction in ('uptrend', 'downtrend')
+        }
+        hasher.update(json.dumps(diagonal, sort_keys=True).encode())
+
+        return hasher.hexdigest()
+
+    @classmethod
+    def next_candle_close(cls, now=None):
+        """다음 15분봉 마감 시각"""
+        now = now or datetime.now()
+        floored = now.replace(minute=now.minute - now.minute % cls.CANDLE_INTERVAL_MINUTES, second=0, microsecond=0)
+        return floored + timedelta(minutes=cls.CANDLE_INTERVAL_MINUTES)
+
+    def get(self, fingerprint):
+        """캐시된 분석 결과 조회 (만료 시 None)"""
+        if not self.enabled:
+            return None
+
+        now = datetime.now()
+        with self._lock:
+            cached = self._memory.get(fingerprint)
+            if cached:
+                expires_at, payload = cached
+                if expires_at > now:
+                    return json.loads(payload)
+                del self._memory[fingerprint]
+
+        db = SessionLocal()
+        try:
+            entry = db.query(AIResponseCache).filter(
+                AIResponseCache.fingerprint == fingerprint,
+                AIResponseCache.expires_at > now
+            ).first()
+            if not entry:
+                return None
+            with self._lock:
+                self._memory[fingerprint] = (entry.expires_at, entry.response_json)
+            return json.loads(entry.response_json)
+        except Exception as e:
+            print(f"AI 응답 캐시 조회 실패: {str(e)}")
+            return None
+        finally:
+            db.close()
+
+    def set(self, fingerprint, model_id, prompt_version, result):
+        """분석 결과 저장 (다음 15분봉 마감 시각까지 유효)"""
+        if not self.enabled:
+            return
+
+        # 호출자가 이후 result를 수정해도 캐시가 바뀌지 않도록 직렬화한 형태로 저장 (조회 시 새 객체로 복원)
+        expires_at = self.next_candle_close()
+        try:
+            payload = dumps_str(result)
+        except Exception as e:
+            print(f"AI 응답 캐시 직렬화 실패: {str(e)}")
+            return
+        with self._lock:
+            self._memory[fingerprint] = (expires_at, payload)
+
+        db = SessionLocal()
+        try:
+            # 만료된 항목 정리
+            db.query(AIResponseCache).filter(AIResponseCache.expires_at <= datetime.now()).delete()
+
+            entry = db.query(AIResponseCache).filter(AIResponseCache.fingerprint == fingerprint).first()
+            if not entry:
+                entry = AIResponseCache(fingerprint=fingerprint)
+                db.add(entry)
+            entry.model_id = model_id
+            entry.prompt_version = prompt_version
+            entry.response_json = payload
+            entry.expires_at = expires_at
+            db.commit()
+        except Exception as e:
+            print(f"AI 응답 캐시 저장 실패: {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
+        with self._lock:
+            expired = [key for key, (expires, _) in self._memory.items() if expires <= datetime.now()]
+            for key in expired:
+                del self._memory[key]
@@ -0,0 +1,110 @@
+from collections import deque
+from datetime import datetime
+
+
+class AssistantThreadManager:
+    """OpenAI Assistants 스레드 수명 정책
+
+    - per_analysis: 분석마다 새 스레드 (기존 동작)
+    - per_position: 진입 분석에서 만든 스레드를 해당 포지션의 모니터링 분석에 재사용.
+      포지션이 없는 상태의 분석이 오면 새 스레드 시작
+    - rolling: 스레드를 계속 재사용하되 메시지가 max_messages를 넘으면 최근 결정 요약만 담은
+      새 스레드로 교체하여 컨텍스트 크기를 제한
+
+    per_position도 포지션 보유 시간이 길어지면 rolling과 같은 방식으로 요약 후 교체합니다.
+    """
+
+    POLICIES = ('per_analysis', 'per_position', 'rolling')
+    SUMMARY_REASON_CHARS = 600
+    HISTORY_SIZE = 20
+
+    def __init__(self, policy='per_analysis', max_messages=6):
+        """
+        Args:
+            policy: 스레드 수명 정책 (POLICIES 중 하나)
+            max_messages: 한 스레드에 허용할 최대 메시지 수 (user + assistant)
+        """
+        if policy not in self.POLICIES:
+            print(f"알 수 없는 스레드 정책: {policy}, per_analysis 사용")
+            policy = 'per_analysis'
+        self.policy = policy
+        self.max_messages = max(int(max_messages), 2)
+        self.thread_id = None
+        self.message_count = 0
+        self.decisions = deque(maxlen=self.HISTORY_SIZE)
+
+    def reset(self):
+        """현재 스레드 폐기 (다음 분석에서 새 스레드 생성)"""
+        self.thread_id = None
+        self.message_count = 0
+        self.decisions.clear()
+
+    def _build_summary(self):
+        """이전 스레드의 결정 이력 요약 (새 스레드의 첫 메시지)"""
+        lines = ["### 이전 분석 요약 (컨텍스트 크기 제한을 위해 이전 대화는 요약본으로 대체됨):"]
+        for decision in self.decisions:
+            reason = (decision['reason'] or '').strip().replace("\n", " ")
+            if len(reason) > self.SUMMARY_REASON_CHARS:
+                reason = reason[:self.SUMMARY_REASON_CHARS] + "..."
+            lines.append(f"- [{decision['time']}] {decision['action']}: {reason}")
+        return "\n".join(lines)
+
+    async def acquire(self, client, position_open=False):
+        """이번 분석에 사용할 스레드 ID 반환
+
+        Args:
+            client: AsyncOpenAI 클라이언트 (호출별 이벤트 루프에서 생성)
+            position_open: 포지션 보유 중 여부 (per_position 정책)
+        """
+        reuse = (
+            self.thread_id is not None
+            and (self.policy == 'rolling' or (self.policy == 'per_position' and position_open))
+        )
+
+        if reuse and self.message_count + 2 <= self.max_messages:
+            print(f"기존 스레드 재사용: {self.thread_id} (메시지 {self.message_count}개, 정책: {self.policy})")
+            return self.thread_id
+
+        summary = self._build_summary() if reuse and self.decisions else None
+        if not reuse:
+            self.decisions.clear()
+
+        thread = await client.beta.threads.create()
+        self.thread_id = thread.id
+        self.message_count = 0
+        print(f"새 스레드 생성됨: {self.thread_id} (정책: {self.policy})")
+
+        if summary:
+            await client.beta.threads.messages.create(
+                thread_id=self.thread_id,
+                role="user",
+                content=summary
+            )
+            self.message_count += 1
+            print(f"이전 결정 {len(self.decisions)}건 요약을 새 스레드에 추가")
+
+        return self.thread_id
+
+    def record(self, thread_id, analysis):
+        """분석 완료 후 메시지 수와 결정 이력 갱신"""
+        if thread_id != self.thread_id:
+            return
+        self.message_count += 2  # user 메시지 + assistant 응답
+        if analysis:
+            self.decisions.append({
+                'time': datetime.now().strftime('%Y-%m-%d %H:%M'),
+                'action': analysis.get('action'),
+                'reason': analysis.get('reason'),
+            })
+        if self.policy == 'per_analysis':
+            self.thread_id = None
+            self.message_count = 0
+
+    def get_status(self):
+        return {
+            'policy': self.policy,
+            'max_messages': self.max_messages,
+            'thread_id': self.thread_id,
+            'message_count': self.message_count,
+            'decisions': len(self.decisions),
+        }
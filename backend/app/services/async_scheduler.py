@@ -0,0 +1,266 @@
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import asyncio
+import contextvars
+import functools
+import heapq
+import itertools
+import threading
+import time
+import traceback
+
+from .metrics import SCHEDULER_JOB_SECONDS, SCHEDULER_LAG_SECONDS
+
+
+class JobLookupError(KeyError):
+    """존재하지 않는 작업 ID"""
+
+
+class ScheduledJob:
+    """1회성(date) 예약 작업"""
+
+    def __init__(self, scheduler, job_id, func, run_date, args=None, kwargs=None,
+                 priority=100, misfire_grace_time=None):
+        self._scheduler = scheduler
+        self.id = job_id
+        self.func = func
+        self.args = tuple(args or ())
+        self.kwargs = dict(kwargs or {})
+        self.next_run_time = run_date
+        self.priority = priority
+        self.misfire_grace_time = misfire_grace_time
+
+    @property
+    def name(self):
+        return getattr(self.func, '__name__', repr(self.func))
+
+    def remove(self):
+        self._scheduler.remove_job(self.id)
+
+    def __repr__(self):
+        return f"<ScheduledJob id={self.id} func={self.name} run_date={self.next_run_time} priority={self.priority}>"
+
+
+class AsyncJobScheduler:
+    """단일 이벤트 루프에서 코루틴 작업을 실행하는 우선순위 스케줄러
+
+    BackgroundScheduler는 작업마다 스레드에서 새 이벤트 루프를 만들어야 했지만, 이 스케줄러는
+    전용 스레드의 장수 이벤트 루프 하나에서 모든 작업을 코루틴으로 실행하므로 HTTP 세션과 같은
+    연결 자원을 작업 간에 공유할 수 있습니다. 같은 시점에 실행 대기 중인 작업은 priority가 낮은
+    값부터 시작하고(FORCE_CLOSE > MONITORING > ANALYSIS), 동시에 실행되는 작업 수는
+    max_concurrent_jobs로 제한됩니다.
+
+    거래소 REST 호출처럼 블로킹되는 함수는 run_blocking()으로 제한된 스레드 풀에서 실행하여
+    이벤트 루프를 막지 않도록 합니다. 동기 함수를 작업으로 등록하면 자동으로 스레드 풀에서 실행됩니다.
+
+    APScheduler의 add_job/get_job/get_jobs/remove_job/remove_all_jobs 중 이 프로젝트에서 쓰는
+    1회성 'date' 트리거만 지원합니다.
+    """
+
+    def __init__(self, max_concurrent_jobs=4, blocking_workers=8):
+        """
+        Args:
+            max_concurrent_jobs: 동시에 실행할 최대 작업 수
+            blocking_workers: 블로킹 호출용 스레드 풀 크기
+        """
+        self.max_concurrent_jobs = max_concurrent_jobs
+        self.executor = ThreadPoolExecutor(max_workers=blocking_workers, thread_name_prefix="blocking")
+        self.loop = None
+        self._thread = None
+        self._jobs = {}
+        self._ready = []  # (priority, run_date, seq, job) 힙
+        self._running = {}  # job_id -> asyncio.Task
+        self._lock = threading.Lock()
+        self._seq = itertools.count()
+        self._wakeup = None
+        self._started = threading.Event()
+        self._listeners = []
+        self.stats = {'executed': 0, 'failed': 0, 'misfired': 0}
+
+    # ---- 수명 주기 ----
+
+    def start(self):
+        """전용 스레드에서 이벤트 루프와 디스패처 시작"""
+        if self._thread and self._thread.is_alive():
+            return
+        self._started.clear()
+        self._thread = threading.Thread(target=self._run_loop, name="async-scheduler", daemon=True)
+        self._thread.start()
+        self._started.wait()
+        print(f"비동기 스케줄러 시작됨 (동시 작업 {self.max_concurrent_jobs}개, 블로킹 스레드 {self.executor._max_workers}개)")
+
+    def _run_loop(self):
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+        self.loop.set_default_executor(self.executor)
+        self._wakeup = asyncio.Event()
+        self.loop.create_task(self._dispatch())
+        self._started.set()
+        try:
+            self.loop.run_forever()
+        finally:
+            self.loop.close()
+
+    def shutdown(self, wait=False):
+        if self.loop and self.loop.is_running():
+            self.loop.call_soon_threadsafe(self.loop.stop)
+        self.executor.shutdown(wait=wait)
+
+    def add_listener(self, callback):
+        """작업 종료 시 callback(job, event) 호출 (event: 'executed' / 'failed' / 'misfired')"""
+        self._listeners.append(callback)
+
+    def _emit(self, job, event):
+        for callback in self._listeners:
+            try:
+                callback(job, event)
+            except Exception as e:
+                print(f"스케줄러 리스너 오류 ({job.id}, {event}): {str(e)}")
+
+    # ---- 작업 등록/조회 ----
+
+    def add_job(self, func, trigger='date', run_date=None, id=None, args=None, kwargs=None,
+                priority=100, misfire_grace_time=None, replace_existing=False, **_ignored):
+        """작업 예약 (코루틴 함수 또는 동기 함수)
+
+        Args:
+            trigger: 'date'만 지원 (APScheduler DateTrigger 객체도 허용)
+            run_date: 실행 시간 (naive local datetime, None이면 즉시)
+            priority: 낮을수록 먼저 실행
+            misfire_grace_time: 예약 시간보다 이 초 이상 늦으면 실행하지 않음
+        """
+        if trigger is not None and not isinstance(trigger, str):
+            run_date = run_date or getattr(trigger, 'run_date', None)
+        elif trigger not in (None, 'date'):
+            raise ValueError(f"지원하지 않는 트리거: {trigger}")
+
+        run_date = run_date or datetime.now()
+        if run_date.tzinfo is not None:
+            run_date = run_date.astimezone().replace(tzinfo=None)
+
+        job_id = id or f"job_{next(self._seq)}"
+        job = ScheduledJob(self, job_id, func, run_date, args, kwargs, priority, misfire_grace_time)
+        with self._lock:
+            if job_id in self._jobs and not replace_existing:
+                raise ValueError(f"이미 존재하는 작업 ID: {job_id}")
+            self._jobs[job_id] = job
+        self._notify()
+        return job
+
+    def get_job(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def get_jobs(self):
+        """대기 중인 작업 목록 (실행 시간순)"""
+        with self._lock:
+            return sorted(self._jobs.values(), key=lambda job: job.next_run_time)
+
+    def remove_job(self, job_id):
+        with self._lock:
+            if job_id not in self._jobs:
+                raise JobLookupError(job_id)
+            del self._jobs[job_id]
+            self._ready = [entry for entry in self._ready if entry[3].id != job_id]
+            heapq.heapify(self._ready)
+        self._notify()
+
+    def remove_all_jobs(self):
+        with self._lock:
+            self._jobs.clear()
+            self._ready = []
+        self._notify()
+
+    # ---- 블로킹 호출 / 외부 스레드 연동 ----
+
+    async def run_blocking(self, func, *args, **kwargs):
+        """블로킹 함수를 제한된 스레드 풀에서 실행 (현재 실행 중인 이벤트 루프 기준)
+
+        run_in_executor는 contextvars를 복사하지 않으므로 호출 시점 컨텍스트(파이프라인 트레이스의 현재 span)를
+        복사하여 스레드에서 실행합니다.
+        """
+        loop = asyncio.get_running_loop()
+        context = contextvars.copy_context()
+        return await loop.run_in_executor(self.executor, functools.partial(context.run, func, *args, **kwargs))
+
+    def submit(self, coro):
+        """다른 스레드에서 스케줄러 이벤트 루프로 코루틴 제출 (concurrent.futures.Future 반환)"""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run_sync(self, coro, timeout=None):
+        """다른 스레드에서 코루틴을 스케줄러 루프에 제출하고 결과를 기다림"""
+        return self.submit(coro).result(timeout=timeout)
+
+    # ---- 디스패처 ----
+
+    def _notify(self):
+        if self.loop and self._wakeup is not None:
+            self.loop.call_soon_threadsafe(self._wakeup.set)
+
+    async def _dispatch(self):
+        while True:
+            now = datetime.now()
+            with self._lock:
+                due = [job for job in self._jobs.values() if job.next_run_time <= now]
+                for job in due:
+                    del self._jobs[job.id]
+                    heapq.heappush(self._ready, (job.priority, job.next_run_time, next(self._seq), job))
+
+                while self._ready and len(self._running) < self.max_concurrent_jobs:
+                    _, run_date, _, job = heapq.heappop(self._ready)
+                    lateness = (now - run_date).total_seconds()
+                    if job.misfire_grace_time is not None and lateness > job.misfire_grace_time:
+                        print(f"작업 {job.id} 실행 시간 초과로 건너뜀 ({lateness:.0f}초 지연)")
+                        self.stats['misfired'] += 1
+                        self.loop.call_soon(self._emit, job, 'misfired')
+                        continue
+                    task = asyncio.create_task(self._execute(job))
+                    self._running[job.id] = task
+
+                next_run = min((job.next_run_time for job in self._jobs.values()), default=None)
+
+            timeout = 1.0 if next_run is None else min(max((next_run - datetime.now()).total_seconds(), 0), 1.0)
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _execute(self, job):
+        event = 'executed'
+        SCHEDULER_LAG_SECONDS.labels(job=job.name).observe(
+            max((datetime.now() - job.next_run_time).total_seconds(), 0)
+        )
+        started = time.perf_counter()
+        try:
+            if asyncio.iscoroutinefunction(job.func):
+                await job.func(*job.args, **job.kwargs)
+            else:
+                result = await self.run_blocking(job.func, *job.args, **job.kwargs)
+                if asyncio.iscoroutine(result):
+                    await result
+            self.stats['executed'] += 1
+        except Exception as e:
+            event = 'failed'
+            self.stats['failed'] += 1
+            print(f"예약 작업 {job.id} 실행 중 오류: {str(e)}")
+            traceback.print_exc()
+        finally:
+            SCHEDULER_JOB_SECONDS.labels(job=job.name, event=event).observe(time.perf_counter() - started)
+            with self._lock:
+                self._running.pop(job.id, None)
+            self._emit(job, event)
+            self._notify()
+
+    def get_status(self):
+        with self._lock:
+            return {
+                'scheduled': [
+                    {'id': job.id, 'func': job.name, 'run_date': job.next_run_time.isoformat(), 'priority': job.priority}
+                    for job in sorted(self._jobs.values(), key=lambda job: job.next_run_time)
+                ],
+                'ready': len(self._ready),
+                'running': sorted(self._running),
+                'max_concurrent_jobs': self.max_concurrent_jobs,
+                **self.stats,
+            }
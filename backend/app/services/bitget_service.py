@@ -1,13 +1,19 @@
 import base64
 import hmac
 import json
+import logging
 import time
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime, timedelta
-from config.settings import BITGET_API_KEY, BITGET_SECRET_KEY, BITGET_API_PASSPHRASE, BITGET_API_URL
+from .structured_logging import LazyJSON
+from .metrics import BITGET_RATE_LIMITED_TOTAL, BITGET_REQUEST_SECONDS, BITGET_THROTTLE_WAIT_SECONDS
+from config.settings import BITGET_API_KEY, BITGET_SECRET_KEY, BITGET_API_PASSPHRASE, BITGET_API_URL, SCHEDULER_BLOCKING_WORKERS
 import os
 from typing import Dict, Any, Optional, List, Union
 
+logger = logging.getLogger(__name__)
+
 class BitgetService:
     """
     Bitget 거래소 API 연동을 위한 서비스 클래스
@@ -22,6 +28,12 @@ class BitgetService:
         self.base_url = BITGET_API_URL
         self.passphrase = BITGET_API_PASSPHRASE
         self.symbol = "BTCUSDT"  # V2 API용 심볼
+        
+        # HTTP 연결 풀 (스케줄러의 블로킹 스레드 풀이 같은 keep-alive 연결을 공유)
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=SCHEDULER_BLOCKING_WORKERS)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.expected_close_time = None  # expected_close_time 추가
         
         # API 요청 제한 관리를 위한 변수
@@ -106,6 +118,7 @@ class BitgetService:
                 if should_log:
                     print(f"API 요청 간격 제한: {sleep_time:.2f}초 대기")
                 time.sleep(sleep_time)
+                BITGET_THROTTLE_WAIT_SECONDS.observe(sleep_time)
             
             # API 호출 시간 업데이트
             self.last_request_time = time.time()
@@ -117,19 +130,24 @@ class BitgetService:
             
             # 재시도 로직
             for attempt in range(self.retry_count):
+                attempt_start = time.perf_counter()
                 try:
                     if method == "GET":
-                        response = requests.get(url, headers=headers, params=params, timeout=timeout)
+                        response = self.session.get(url, headers=headers, params=params, timeout=timeout)
                     elif method == "POST":
-                        response = requests.post(url, headers=headers, json=body, timeout=timeout)
+                        response = self.session.post(url, headers=headers, json=body, timeout=timeout)
                     else:
                         raise ValueError(f"지원하지 않는 HTTP 메서드: {method}")
                     
                     # 요청 시간 업데이트
                     self.last_request_time = time.time()
+                    BITGET_REQUEST_SECONDS.labels(method=method, endpoint=endpoint, status=str(response.status_code)).observe(
+                        time.perf_counter() - attempt_start
+                    )
                     
                     # 응답 확인
                     if response.status_code == 429:
+                        BITGET_RATE_LIMITED_TOTAL.labels(endpoint=endpoint).inc()
                         # Rate Limit 에러 시 exponential backoff 적용
                         wait_time = self.retry_delay * (2 ** attempt)  # 2초 -> 4초 -> 8초
                         print(f"API 요청 제한 초과 (429 에러). 재시도 {attempt+1}/{self.retry_count}")
@@ -141,9 +159,17 @@ class BitgetService:
                     return response.json()
                     
                 except requests.exceptions.Timeout:
+                    BITGET_REQUEST_SECONDS.labels(method=method, endpoint=endpoint, status='timeout').observe(
+                        time.perf_counter() - attempt_start
+                    )
                     print(f"Request timed out after {timeout} seconds")
                     return {"code": "TIMEOUT", "data": None, "msg": "Request timed out"}
                 except requests.exceptions.RequestException as e:
+                    if getattr(e, 'response', None) is None:
+                        # 연결 오류 (HTTP 오류 응답은 위에서 상태 코드와 함께 기록됨)
+                        BITGET_REQUEST_SECONDS.labels(method=method, endpoint=endpoint, status='error').observe(
+                            time.perf_counter() - attempt_start
+                        )
                     # 에러 응답 본문 상세 출력
                     error_detail = str(e)
                     if hasattr(e, 'response') and e.response is not None:
@@ -399,14 +425,14 @@ class BitgetService:
             }
             
             print(f"\n=== 주문 생성 요청 (TPSL 포함) ===")
-            print(f"Body: {json.dumps(body, indent=2)}")
+            logger.debug("Body: %s", LazyJSON(body))
             print(f"Take Profit 가격: {take_profit_price}")
             print(f"Stop Loss 가격: {stop_loss_price}")
             
             order_result = self._make_request("POST", endpoint, body=body)
             
             print(f"\n=== 주문 생성 결과 ===")
-            print(f"결과: {json.dumps(order_result, indent=2) if order_result else 'None'}")
+            logger.debug("결과: %s", LazyJSON(order_result))
             
             if not order_result:
                 raise Exception("No response from order API")
@@ -798,7 +824,7 @@ class BitgetService:
                     "unrealized_pnl": float(account_data.get('unrealizedPL', 0))
                 }
                 
-                print(f"Formatted result: {result}")
+                logger.debug("Formatted result: %s", result)
                 return result
             else:
                 print("Account data is not in expected format")
@@ -1082,7 +1108,7 @@ class BitgetService:
             
             print(f"\n📋 Plan Order 조회 결과:")
             print(f"  응답 코드: {all_orders.get('code') if all_orders else 'None'}")
-            print(f"  전체 응답: {json.dumps(all_orders, indent=2) if all_orders else 'None'}")
+            logger.debug("  전체 응답: %s", LazyJSON(all_orders))
             
             existing_tp_order = None
             existing_sl_order = None
@@ -1132,7 +1158,7 @@ class BitgetService:
                     "size": ""  # ⚠️ 포지션 익절/손절의 경우 빈 문자열
                 }
                 
-                print(f"수정 요청 Body: {json.dumps(tp_modify_body, indent=2)}")
+                logger.debug("수정 요청 Body: %s", LazyJSON(tp_modify_body))
                 tp_result = self._make_request("POST", endpoint_modify, body=tp_modify_body)
             else:
                 # 새 TP Order 생성 (place API 사용)
@@ -1151,7 +1177,7 @@ class BitgetService:
                     "size": ""  # ⚠️ 포지션 익절/손절의 경우 빈 문자열
                 }
                 
-                print(f"생성 요청 Body: {json.dumps(tp_place_body, indent=2)}")
+                logger.debug("생성 요청 Body: %s", LazyJSON(tp_place_body))
                 tp_result = self._make_request("POST", endpoint_place, body=tp_place_body)
             
             # Stop Loss 처리
@@ -1171,7 +1197,7 @@ class BitgetService:
                     "size": ""  # ⚠️ 포지션 익절/손절의 경우 빈 문자열
                 }
                 
-                print(f"수정 요청 Body: {json.dumps(sl_modify_body, indent=2)}")
+                logger.debug("수정 요청 Body: %s", LazyJSON(sl_modify_body))
                 sl_result = self._make_request("POST", endpoint_modify, body=sl_modify_body)
             else:
                 # 새 SL Order 생성 (place API 사용)
@@ -1190,7 +1216,7 @@ class BitgetService:
                     "size": ""  # ⚠️ 포지션 익절/손절의 경우 빈 문자열
                 }
                 
-                print(f"생성 요청 Body: {json.dumps(sl_place_body, indent=2)}")
+                logger.debug("생성 요청 Body: %s", LazyJSON(sl_place_body))
                 sl_result = self._make_request("POST", endpoint_place, body=sl_place_body)
             
             print(f"\nTake Profit 설정 결과: {tp_result}")
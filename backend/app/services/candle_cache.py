@@ -0,0 +1,88 @@
+from bisect import bisect_left, insort
+import threading
+import time
+
+
+# 시간봉별 캔들 1개 길이 (밀리초)
+GRANULARITY_MS = {
+    '1m': 60 * 1000,
+    '3m': 3 * 60 * 1000,
+    '5m': 5 * 60 * 1000,
+    '15m': 15 * 60 * 1000,
+    '30m': 30 * 60 * 1000,
+    '1H': 60 * 60 * 1000,
+    '4H': 4 * 60 * 60 * 1000,
+    '6H': 6 * 60 * 60 * 1000,
+    '12H': 12 * 60 * 60 * 1000,
+    '1D': 24 * 60 * 60 * 1000,
+    '1W': 7 * 24 * 60 * 60 * 1000,
+}
+
+
+class CandleCache:
+    """시간봉별 Bitget 캔들 원본 행 메모리 캐시
+
+    시장 데이터 수집과 /api/market/kline 조회에서 받은 행([timestamp, open, high, low, close, volume, ...])을
+    timestamp 기준으로 병합해 두고, 커서(timestamp) 이전 구간을 페이지 단위로 돌려줍니다.
+    시간봉별로 최근 max_candles개만 유지합니다.
+    """
+
+    def __init__(self, max_candles=5000):
+        self.max_candles = max_candles
+        self._rows = {}  # granularity -> {timestamp: row}
+        self._keys = {}  # granularity -> 정렬된 timestamp 목록
+        self._lock = threading.Lock()
+
+    def update(self, granularity, rows):
+        """캔들 행 병합 (같은 timestamp는 최신 값으로 교체 - 진행 중인 캔들 갱신)"""
+        if not rows:
+            return
+        with self._lock:
+            cached = self._rows.setdefault(granularity, {})
+            keys = self._keys.setdefault(granularity, [])
+            for row in rows:
+                timestamp = int(row[0])
+                if timestamp not in cached:
+                    insort(keys, timestamp)
+                cached[timestamp] = list(row)
+            while len(keys) > self.max_candles:
+                del cached[keys.pop(0)]
+
+    def page(self, granularity, limit, before=None):
+        """before(ms) 이전 캔들 중 가장 최근 limit개 (오름차순, before가 None이면 최신 구간)"""
+        with self._lock:
+            keys = self._keys.get(granularity, [])
+            cached = self._rows.get(granularity, {})
+            end = bisect_left(keys, before) if before is not None else len(keys)
+            return [cached[timestamp] for timestamp in keys[max(end - limit, 0):end]]
+
+    @staticmethod
+    def is_contiguous(granularity, rows):
+        """페이지 안에 빠진 캔들이 없는지 (수집 시점 사이의 공백 확인)"""
+        period = GRANULARITY_MS.get(granularity)
+        if period is None:
+            return True
+        timestamps = [int(row[0]) for row in rows]
+        return all(later - earlier == period for earlier, later in zip(timestamps, timestamps[1:]))
+
+    def is_fresh(self, granularity, now_ms=None):
+        """가장 최근 캔들이 현재 진행 중인 캔들인지 (아니면 최신 구간은 거래소에서 다시 조회)"""
+        period = GRANULARITY_MS.get(granularity)
+        with self._lock:
+            keys = self._keys.get(granularity)
+            latest = keys[-1] if keys else None
+        if latest is None or period is None:
+            return False
+        now_ms = now_ms or int(time.time() * 1000)
+        return now_ms - latest < period
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                granularity: {
+                    'count': len(keys),
+                    'oldest': keys[0] if keys else None,
+                    'latest': keys[-1] if keys else None,
+                }
+                for granularity, keys in self._keys.items()
+            }
@@ -0,0 +1,114 @@
+import numpy as np
+
+
+class CandleDownsampler:
+    """형태 보존 캔들 다운샘플링 (LTTB + 극값 보존)
+
+    프롬프트용 캔들을 최근 N개로 자르는 대신 전체 구간에서 목표 개수만큼 고릅니다.
+    - 최근 캔들(recent_full개)은 전부 유지 (진입 타이밍 판단)
+    - 스윙 고점/저점, 빗각 기준점, 거래량 상위 캔들은 항상 유지
+    - 나머지 구간은 종가 기준 Largest-Triangle-Three-Buckets로 솎아냄
+
+    반환값은 원본 리스트의 index이므로 빗각 계산(index 차이 = 경과 시간)이 그대로 유지됩니다.
+    """
+
+    def __init__(self, swing_window=3, volume_top_ratio=0.02):
+        """
+        Args:
+            swing_window: 스윙 고점/저점 판단 시 좌우로 비교할 캔들 수
+            volume_top_ratio: 항상 유지할 거래량 상위 비율
+        """
+        self.swing_window = swing_window
+        self.volume_top_ratio = volume_top_ratio
+
+    def _swing_points(self, highs, lows):
+        """좌우 swing_window개 캔들 중 최고 high / 최저 low인 캔들"""
+        k = self.swing_window
+        if len(highs) < 2 * k + 1:
+            return np.array([], dtype=int)
+        windows_high = np.lib.stride_tricks.sliding_window_view(highs, 2 * k + 1)
+        windows_low = np.lib.stride_tricks.sliding_window_view(lows, 2 * k + 1)
+        centers = np.arange(k, len(highs) - k)
+        swing_high = centers[highs[k:len(highs) - k] >= windows_high.max(axis=1)]
+        swing_low = centers[lows[k:len(lows) - k] <= windows_low.min(axis=1)]
+        return np.union1d(swing_high, swing_low)
+
+    def _high_volume(self, volumes):
+        count = max(int(len(volumes) * self.volume_top_ratio), 1)
+        return np.argsort(volumes)[-count:]
+
+    @staticmethod
+    def _lttb(values, threshold):
+        """Largest-Triangle-Three-Buckets: 선택된 index 배열 반환"""
+        n = len(values)
+        if threshold >= n or threshold < 3:
+            return np.arange(n) if threshold >= n else np.array([0, n - 1])
+
+        x = np.arange(n, dtype=np.float64)
+        selected = [0]
+        bucket_size = (n - 2) / (threshold - 2)
+        a = 0
+        for i in range(threshold - 2):
+            start = int(np.floor(i * bucket_size)) + 1
+            end = min(int(np.floor((i + 1) * bucket_size)) + 1, n - 1)
+            next_start = end
+            next_end = min(int(np.floor((i + 2) * bucket_size)) + 1, n)
+            avg_x = x[next_start:next_end].mean()
+            avg_y = values[next_start:next_end].mean()
+
+            bucket_x = x[start:end]
+            bucket_y = values[start:end]
+            areas = np.abs((x[a] - avg_x) * (bucket_y - values[a]) - (x[a] - bucket_x) * (avg_y - values[a]))
+            a = start + int(np.argmax(areas))
+            selected.append(a)
+        selected.append(n - 1)
+        return np.array(selected)
+
+    def select(self, candles, target, recent_full=0, anchor_indices=None):
+        """유지할 캔들 index 선택
+
+        Args:
+            candles: 시간순 캔들 리스트 ({open, high, low, close, volume, ...})
+            target: 목표 캔들 개수
+            recent_full: 전부 유지할 최근 캔들 수
+            anchor_indices: 항상 유지할 index (빗각 기준점 등)
+
+        Returns:
+            list[int]: 정렬된 원본 index
+        """
+        n = len(candles)
+        if n <= target:
+            return list(range(n))
+
+        highs = np.array([c['high'] for c in candles], dtype=np.float64)
+        lows = np.array([c['low'] for c in candles], dtype=np.float64)
+        closes = np.array([c['close'] for c in candles], dtype=np.float64)
+        volumes = np.array([c['volume'] for c in candles], dtype=np.float64)
+
+        # 1순위: 최근 캔들과 빗각 기준점
+        recent_full = min(recent_full, target)
+        required = set(range(n - recent_full, n))
+        required.update(int(i) for i in (anchor_indices or []) if 0 <= i < n)
+
+        # 2순위: 스윙 고점/저점, 거래량 상위 (범위가 큰 캔들부터)
+        optional = set(self._swing_points(highs, lows).tolist()) | set(self._high_volume(volumes).tolist())
+        optional -= required
+        slots = target - len(required)
+        if slots <= 0:
+            return sorted(required)
+
+        ranges = highs - lows
+        optional = sorted(optional, key=lambda i: -ranges[i])
+        keep = required | set(optional[:slots])
+
+        # 나머지: 최근 구간을 제외한 앞부분에 LTTB 적용
+        slots = target - len(keep)
+        history_end = n - recent_full
+        if slots > 0 and history_end > 2:
+            lttb = self._lttb(closes[:history_end], min(slots + 2, history_end))
+            for i in lttb.tolist():
+                if len(keep) >= target:
+                    break
+                keep.add(int(i))
+
+        return sorted(keep)
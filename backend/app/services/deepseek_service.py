@@ -1,21 +1,32 @@
-import json
+import asyncio
+import logging
 import time
-from datetime import datetime, date, timedelta
-from config.settings import DEEPSEEK_API_KEY
+from datetime import datetime, timedelta
+from config.settings import DEEPSEEK_API_KEY, STRUCTURED_OUTPUT_ENABLED, DECISION_RATIONALE_MAX_CHARS, MODEL_DEADLINE_SECONDS
+from .structured_decision import build_json_instructions, parse_structured_decision
+from .prompt_profiler import profile_prompt
+from .tracer import pipeline_tracer
+from .structured_logging import LazyJSON
+from .prompt_compiler import compile_prompt_ir, render_current_market, render_candlestick_section, render_diagonal_section
 import re
 from openai import OpenAI
 
+logger = logging.getLogger(__name__)
+
 class DeepSeekService:
     def __init__(self):
         self.api_key = DEEPSEEK_API_KEY
         self.base_url = "https://api.deepseek.com"
         self.model = "deepseek-chat"  # 기본값: non-thinking mode
         self.monitoring_interval = 240  # 기본 모니터링 주기 (4시간)
+        self.structured_output = STRUCTURED_OUTPUT_ENABLED  # JSON 모드로 결정 수신
+        self.rationale_max_chars = DECISION_RATIONALE_MAX_CHARS
         
         # OpenAI 호환 클라이언트 초기화
         self.client = OpenAI(
             api_key=self.api_key,
-            base_url=self.base_url
+            base_url=self.base_url,
+            timeout=MODEL_DEADLINE_SECONDS  # 마감 후 취소된 호출의 요청 스레드가 남지 않도록 제한
         )
 
     def set_model_type(self, model_type):
@@ -29,124 +40,28 @@ class DeepSeekService:
         else:
             print(f"알 수 없는 DeepSeek 모델 타입: {model_type}, 기본값 유지")
 
-    def _format_all_candlestick_data(self, market_data):
-        """모든 시간봉의 캔들스틱 데이터를 DeepSeek가 이해하기 쉬운 구조로 포맷팅"""
-        # 시간봉 순서 정의 (짧은 것부터 긴 것 순서) - 12H, 1D 제외하여 토큰 절약
-        timeframe_order = ['15m', '1H', '4H']
-        timeframe_descriptions = {
-            '15m': '15분봉',
-            '1H': '1시간봉',
-            '4H': '4시간봉'
-        }
-        
-        # 토큰 절약을 위한 시간봉별 최대 캔들 개수 제한
-        max_candles_limit = {
-            '15m': 400,  # 최근 400개 (약 100시간 = 4일)
-            '1H': 200,   # 최근 200개 (약 200시간 = 8일)
-            '4H': 100    # 최근 100개 (약 400시간 = 16일)
-        }
-        
-        # 현재 시간 (한국 시간 KST = UTC+9)
-        import copy
-        current_time_utc = datetime.utcnow()  # 명확하게 UTC 시간 가져오기
-        current_time_kst = current_time_utc + timedelta(hours=9)
+    async def analyze_market_data(self, market_data, prompt=None, model=None):
+        """시장 데이터 분석 및 트레이딩 판단
         
-        # 모든 시간봉 데이터를 구조화하여 문자열로 생성
-        candlestick_sections = []
-        candlestick_sections.append("[캔들스틱 원본 데이터 - 모든 시간봉]")
-        candlestick_sections.append("")
-        candlestick_sections.append("⚠️ 데이터 구조 설명:")
-        candlestick_sections.append("- 각 캔들: {index, timestamp, open, high, low, close, volume}")
-        candlestick_sections.append("  * index: 캔들의 순서 번호 (0부터 시작, 0이 가장 오래된 데이터)")
-        candlestick_sections.append("  * timestamp: KST(한국 시간) 문자열 (YYYY-MM-DD HH:MM:SS 형식)")
-        candlestick_sections.append("  * open: 시가 (USDT)")
-        candlestick_sections.append("  * high: 고가 (USDT)")
-        candlestick_sections.append("  * low: 저가 (USDT)")
-        candlestick_sections.append("  * close: 종가 (USDT)")
-        candlestick_sections.append("  * volume: 거래량 (BTC)")
-        candlestick_sections.append("")
-        candlestick_sections.append(f"- 현재 시간: {current_time_kst.strftime('%Y-%m-%d %H:%M:%S')} (KST)")
-        candlestick_sections.append("- 최신 데이터가 배열의 마지막에 위치 (가장 큰 index 번호)")
-        candlestick_sections.append("")
-        
-        for timeframe in timeframe_order:
-            if timeframe in market_data.get('candlesticks', {}):
-                candles = market_data['candlesticks'][timeframe]
-                if candles and len(candles) > 0:
-                    # 토큰 절약을 위해 최근 캔들만 선택
-                    max_limit = max_candles_limit.get(timeframe, len(candles))
-                    if len(candles) > max_limit:
-                        candles = candles[-max_limit:]  # 최근 N개만 선택
-                        print(f"[토큰 절약] {timeframe} 캔들을 {len(market_data['candlesticks'][timeframe])}개에서 {max_limit}개로 축소")
-                    
-                    description = timeframe_descriptions.get(timeframe, timeframe)
-                    candle_count = len(candles)
-                    
-                    # 원본 데이터를 복사하여 timestamp를 KST 문자열로 변환하고 인덱스 추가
-                    candles_converted = []
-                    # 축소된 캔들의 경우 원본 인덱스를 유지하기 위해 시작 인덱스 계산
-                    original_candle_count = len(market_data['candlesticks'][timeframe])
-                    start_index = original_candle_count - len(candles)  # 축소로 인한 시작 인덱스 오프셋
-                    
-                    for idx, candle in enumerate(candles):
-                        candle_copy = copy.deepcopy(candle)
-                        timestamp_ms = candle_copy.get('timestamp', 0)
-                        if timestamp_ms > 0:
-                            dt_utc = datetime.utcfromtimestamp(timestamp_ms / 1000)
-                            dt_kst = dt_utc + timedelta(hours=9)
-                            candle_copy['timestamp'] = dt_kst.strftime('%Y-%m-%d %H:%M:%S')
-                        # 원본 인덱스를 유지하여 빗각 계산에 문제가 없도록 함
-                        candle_copy['index'] = start_index + idx
-                        candles_converted.append(candle_copy)
-                    
-                    # 시간 범위 계산
-                    if candle_count >= 2:
-                        first_time_str = candles_converted[0].get('timestamp', 'N/A')
-                        last_time_str = candles_converted[-1].get('timestamp', 'N/A')
-                        
-                        # 시간 범위 계산 (원본 timestamp 사용)
-                        first_timestamp = candles[0].get('timestamp', 0)
-                        last_timestamp = candles[-1].get('timestamp', 0)
-                        time_range_hours = (last_timestamp - first_timestamp) / (1000 * 60 * 60)
-                        time_range_days = time_range_hours / 24
-                        
-                        if time_range_days >= 1:
-                            time_range_str = f"약 {time_range_days:.1f}일"
-                        else:
-                            time_range_str = f"약 {time_range_hours:.1f}시간"
-                    else:
-                        time_range_str = "N/A"
-                        first_time_str = "N/A"
-                        last_time_str = "N/A"
-                    
-                    # 최신 5개 캔들 미리보기 (변환된 데이터)
-                    recent_preview = candles_converted[-5:] if len(candles_converted) >= 5 else candles_converted
-                    
-                    candlestick_sections.append(f"{'='*80}")
-                    candlestick_sections.append(f"📊 {description} ({timeframe})")
-                    candlestick_sections.append(f"{'='*80}")
-                    candlestick_sections.append(f"총 데이터 개수: {candle_count}개")
-                    candlestick_sections.append(f"시간 범위: {time_range_str}")
-                    candlestick_sections.append(f"첫 캔들 시간: {first_time_str} (KST)")
-                    candlestick_sections.append(f"마지막 캔들 시간: {last_time_str} (KST)")
-                    candlestick_sections.append(f"최신 5개 캔들 미리보기:")
-                    candlestick_sections.append(json.dumps(recent_preview, ensure_ascii=False))
-                    candlestick_sections.append(f"")
-                    candlestick_sections.append(f"전체 데이터 ({candle_count}개):")
-                    candlestick_sections.append(json.dumps(candles_converted, ensure_ascii=False))
-                    candlestick_sections.append("")
-        
-        return "\n".join(candlestick_sections)
-
-
-    async def analyze_market_data(self, market_data):
-        """시장 데이터 분석 및 트레이딩 판단"""
+        Args:
+            market_data: 수집된 시장 데이터
+            prompt: 지정 시 전체 분석 프롬프트 대신 사용 (모니터링 델타 컨텍스트 등)
+            model: 이번 호출에만 사용할 모델 (기본값은 self.model, 폴백 시 공유 인스턴스를 바꾸지 않음)
+        """
+        model = model or self.model
         try:
-            print(f"\n=== DeepSeek API 분석 시작 (모델: {self.model}) ===")
+            print(f"\n=== DeepSeek API 분석 시작 (모델: {model}) ===")
             start_time = time.time()
             
             # 분석용 프롬프트 생성
-            message_content = self._create_analysis_prompt(market_data)
+            build_start = time.perf_counter()
+            message_content = prompt if prompt else self._create_analysis_prompt(market_data)
+            prompt_build_ms = (time.perf_counter() - build_start) * 1000
+            
+            # JSON 모드는 deepseek-chat만 사용 (deepseek-reasoner는 텍스트 응답 파싱)
+            use_json_mode = self.structured_output and model == "deepseek-chat"
+            output_instructions = build_json_instructions(self.rationale_max_chars) if use_json_mode else ""
+            message_content += output_instructions
 
             # 시스템 프롬프트 (Claude와 동일한 프롬프트 사용)
             system_prompt = """당신은 비트코인 선물 시장에서 양방향 트레이딩 전문가입니다. 당신의 전략은 ENTER_LONG 또는 ENTER_SHORT 진입 포인트를 식별하여 **1440분(24시간) 이내** 완료되는 거래에 중점을 둡니다. 시장 방향성에 따라 롱과 숏 모두 동등하게 고려해서 데이터에 기반하여 결정할 것. 반드시 비트코인 선물 트레이딩 성공률을 높이고 수익을 극대화할 수 있는 결정을 할 것.
@@ -208,14 +123,16 @@ class DeepSeekService:
 **계산 공식 (index 활용):**
 1. **시간당 가격 변화율 계산**:
    - 변화율 = (Point B 가격 - Point A 가격) / (Point B index - Point A index)
-   - 예: Point A index=813, Point B index=869
-   - 변화율 = (108,300 - 101,668) / (869 - 813) = 6,632 / 56 = 118.4 USDT/시간
+   - 예: Point A index=365, Point A low=101,668 USDT
+   - 예: Point B index=518, Point B low=106,588 USDT
+   - 변화율 = (106,588 - 101,668) / (518 - 365) = 4,920 / 153 = 32.15 USDT/시간
 
 2. **현재 시점의 빗각 선 위치 계산**:
-   - 현재 빗각 선 위치 = Point B 가격 + (변화율 × 경과 시간)
-   - 경과 시간 = 현재 캔들 index - Point B 캔들 index (시간 단위)
-   - 예: Point B index=869, 현재 index=897 → 28시간 경과
-   - 현재 빗각 선 = 108,300 + (118.4 × 28) = 111,615 USDT
+   - ⚠️ **중요: 반드시 Point A를 기준점으로 사용!**
+   - 현재 빗각 선 위치 = **Point A 가격** + (변화율 × 경과 시간)
+   - 경과 시간 = 현재 캔들 index - **Point A 캔들 index** (시간 단위)
+   - 예: 현재 index=949 → 경과 시간 = 949 - 365 = 584시간
+   - 현재 빗각 선 = **101,668** + (32.15 × 584) = 120,444 USDT
 
 3. **현재 가격과 빗각 선 비교**:
    - 현재 가격 > 빗각 선 → 빗각 위에 위치 (돌파 상태)
@@ -225,7 +142,8 @@ class DeepSeekService:
 ⚠️ **주의사항**:
 - 각 캔들에는 index 필드가 있으며, 0부터 시작합니다
 - index 차이 = 경과 시간(시간 단위)
-- Point B에서 멈추지 않고 직선으로 연장해서 계산해야 합니다!
+- **Point A를 시작점으로 사용하여 직선을 연장해서 계산해야 합니다!**
+- Point B는 기울기 계산에만 사용하고, 현재 위치 계산은 Point A 기준입니다!
 
 **빗각 기반 진입 전략 (15분봉으로 진입 타이밍 결정):**
 
@@ -469,75 +387,21 @@ EXPECTED_MINUTES: [120-960] (HOLD 시 생략)
 
 **Step 1: 빗각 및 채널 분석 (1시간봉 기준 - 상승/하락 빗각 모두 양방향 활용)**
 
-**⚠️ 중요: 백엔드에서 이미 추출된 캔들 정보를 사용하세요! 직접 캔들을 검색하지 마세요!**
+**⚠️ 중요: 빗각/채널 값은 백엔드에서 이미 계산되어 제공됩니다 (📐 백엔드 계산 빗각/채널 값). 직접 캔들을 검색하거나 재계산하지 마세요!**
 
-- 상승 빗각 및 채널 분석 (사용자가 설정한 경우):
-  * **제공된 Point A 정보 확인**: index, 시간, **low 값**, volume
-  * **제공된 두 번째 저점 정보 확인**: index, 시간, **low 값**, volume  
-  * **제공된 Point B 정보 확인**: index, 시간, **low 값**, volume
-  
-  * **빗각 1 (기준 상승 빗각) 계산**: Point A의 low와 Point B의 low를 연결한 직선
-    → 시간당 변화율 (slope) = (Point B low - Point A low) / (Point B index - Point A index)
-    → 경과 시간 = 현재 캔들 index - Point A index
-    → **현재 빗각 1 위치 = Point A low + (변화율 × 경과 시간)** ⚠️ Point A 가격 사용!
-  
-  * **채널 간격 D 계산**: 
-    → 두 번째 저점 시점에서 빗각 1과의 수직 거리
-    → D = |빗각 1의 두 번째 저점 시점 가격 - 두 번째 저점 low|
-  
-  * **평행 채널 빗각들 현재 위치 계산**:
-    → 빗각 2 현재 위치 = 빗각 1 현재 위치 - D
-    → 빗각 3 현재 위치 = 빗각 1 현재 위치 - 2D
-    → 빗각 4 현재 위치 = 빗각 1 현재 위치 - 3D
-    → 빗각 5 현재 위치 = 빗각 1 현재 위치 - 4D
-    → 빗각 6 현재 위치 = 빗각 1 현재 위치 - 5D
-    → 빗각 7 현재 위치 = 빗각 1 현재 위치 - 6D
-    → 빗각 8 현재 위치 = 빗각 1 현재 위치 - 7D
-    → 빗각 9 현재 위치 = 빗각 1 현재 위치 - 8D
-    → 빗각 10 현재 위치 = 빗각 1 현재 위치 - 9D
+- 상승 빗각 채널 (사용자가 설정한 경우):
+  * 빗각 1 = Point A low와 Point B low를 연결한 직선
+  * 채널 간격 D = 두 번째 저점 시점에서 빗각 1과 두 번째 저점 low의 수직 거리
+  * 빗각 2~10 = 빗각 1에서 아래 방향으로 D씩 떨어진 평행선
   
-  * **현재 가격이 어느 채널에 위치하는지 파악**:
-    → 현재 가격이 빗각 1과 2 사이? 2와 3 사이? 3과 4 사이? 4와 5 사이? 5와 6 사이? 6과 7 사이? 7과 8 사이? 8과 9 사이? 9와 10 사이? 10 아래?
-    → 가장 가까운 위/아래 빗각 선 식별
+- 하락 빗각 채널 (사용자가 설정한 경우):
+  * 빗각 1 = Point A high와 Point B high를 연결한 직선
+  * 채널 간격 D = 두 번째 고점 시점에서 빗각 1과 두 번째 고점 high의 수직 거리
+  * 빗각 2~10 = 빗각 1에서 위 방향으로 D씩 떨어진 평행선
   
-  * **가장 가까운 빗각까지 거리 계산 및 지지/저항 분석** (매우 중요!):
-    → 거리 = |현재 가격 - 가장 가까운 빗각 위치| / 현재 가격 × 100
-    → **각 빗각(1, 2, 3, 4, 5, 6, 7, 8, 9, 10) 모두 지지선/저항선으로 작용**
-    → 현재 가격 > 해당 빗각 → 빗각이 지지선 역할 → 지지 확인 시 롱, 지지 붕괴 시 숏
-    → 현재 가격 < 해당 빗각 → 빗각이 저항선 역할 → 저항 확인 시 숏, 저항 돌파 시 롱
-    → **거리 임계값 이내일 때만 진입 신호로 판단** (ATR% < 3% → 1.0%, ATR% 3-5% → 1.5%, ATR% > 5% → 2.0%)
-  
-- 하락 빗각 및 채널 분석 (사용자가 설정한 경우):
-  * **제공된 Point A 정보 확인**: index, 시간, **high 값**, volume
-  * **제공된 두 번째 고점 정보 확인**: index, 시간, **high 값**, volume
-  * **제공된 Point B 정보 확인**: index, 시간, **high 값**, volume
-  
-  * **빗각 1 (기준 하락 빗각) 계산**: Point A의 high와 Point B의 high를 연결한 직선
-    → 시간당 변화율 (slope) = (Point B high - Point A high) / (Point B index - Point A index)
-    → 경과 시간 = 현재 캔들 index - Point A index
-    → **현재 빗각 1 위치 = Point A high + (변화율 × 경과 시간)** ⚠️ Point A 가격 사용!
+- **제공된 계산 값 사용**: 기울기, D, 현재 빗각 1~10 위치, 바로 위/아래 빗각, 가장 가까운 빗각과 거리(%), ATR 기반 거리 임계값 및 이내 여부, 최근 터치/돌파/리테스트 이벤트
   
-  * **채널 간격 D 계산**: 
-    → 두 번째 고점 시점에서 빗각 1과의 수직 거리
-    → D = |빗각 1의 두 번째 고점 시점 가격 - 두 번째 고점 high|
-  
-  * **평행 채널 빗각들 현재 위치 계산**:
-    → 빗각 2 현재 위치 = 빗각 1 현재 위치 + D
-    → 빗각 3 현재 위치 = 빗각 1 현재 위치 + 2D
-    → 빗각 4 현재 위치 = 빗각 1 현재 위치 + 3D
-    → 빗각 5 현재 위치 = 빗각 1 현재 위치 + 4D
-    → 빗각 6 현재 위치 = 빗각 1 현재 위치 + 5D
-    → 빗각 7 현재 위치 = 빗각 1 현재 위치 + 6D
-    → 빗각 8 현재 위치 = 빗각 1 현재 위치 + 7D
-    → 빗각 9 현재 위치 = 빗각 1 현재 위치 + 8D
-    → 빗각 10 현재 위치 = 빗각 1 현재 위치 + 9D
-  
-  * **현재 가격이 어느 채널에 위치하는지 파악**:
-    → 현재 가격이 빗각 1과 2 사이? 2와 3 사이? 3과 4 사이? 4와 5 사이? 5와 6 사이? 6과 7 사이? 7과 8 사이? 8과 9 사이? 9와 10 사이? 10 위?
-    → 가장 가까운 위/아래 빗각 선 식별
-  
-  * **가장 가까운 빗각까지 거리 계산 및 지지/저항 분석** (매우 중요!):
-    → 거리 = |현재 가격 - 가장 가까운 빗각 위치| / 현재 가격 × 100
+- **지지/저항 분석** (매우 중요!):
     → **각 빗각(1, 2, 3, 4, 5, 6, 7, 8, 9, 10) 모두 지지선/저항선으로 작용**
     → 현재 가격 > 해당 빗각 → 빗각이 지지선 역할 → 지지 확인 시 롱, 지지 붕괴 시 숏
     → 현재 가격 < 해당 빗각 → 빗각이 저항선 역할 → 저항 확인 시 숏, 저항 돌파 시 롱
@@ -601,29 +465,37 @@ EXPECTED_MINUTES: [120-960] (HOLD 시 생략)
 **최종 결론:**
 [Step 0 횡보 체크, 빗각-추세 일치 여부, 가중치 점수, 과매도/과매수 해석, 볼륨 방향성 모두 종합한 최종 판단]"""
 
-            print(f"DeepSeek API 요청 시작 (모델: {self.model})")
+            print(f"DeepSeek API 요청 시작 (모델: {model})")
             
             # OpenAI 호환 API 호출
-            response = self.client.chat.completions.create(
-                model=self.model,
-                messages=[
+            request_params = {
+                "model": model,
+                "messages": [
                     {"role": "system", "content": system_prompt},
                     {"role": "user", "content": message_content}
                 ],
-                stream=False
-            )
+                "stream": False
+            }
+            if use_json_mode:
+                request_params["response_format"] = {"type": "json_object"}
+            # 동기 클라이언트 호출은 작업 스레드에서 실행 (이벤트 루프를 막지 않고 마감 시 호출을 취소할 수 있도록)
+            response = await asyncio.to_thread(self.client.chat.completions.create, **request_params)
             
             print(f"DeepSeek API 응답 수신됨")
             
             # 응답에서 텍스트 추출
             response_text = response.choices[0].message.content
             
-            # 응답 파싱
-            analysis = self._parse_ai_response(response_text)
+            # 응답 파싱 (JSON 모드 우선, 실패 시 텍스트 파싱)
+            analysis = None
+            if use_json_mode:
+                analysis = parse_structured_decision(response_text, self.rationale_max_chars)
+            if analysis is None:
+                analysis = self._parse_ai_response(response_text)
             
             # 응답 출력 추가
-            print("\n=== 파싱 시작: 원본 응답 ===")
-            print(response_text)
+            print(f"\n=== 파싱 시작: 원본 응답 ({len(response_text or '')}자) ===")
+            logger.debug("%s", response_text)
 
             # expected_minutes가 10분 미만인 경우 30분으로 설정
             if analysis and analysis.get('action') in ['ENTER_LONG', 'ENTER_SHORT']:
@@ -658,6 +530,14 @@ EXPECTED_MINUTES: [120-960] (HOLD 시 생략)
             # 총 소요 시간 계산 및 로깅
             elapsed_time = time.time() - start_time
             print(f"분석 완료: 총 소요 시간 {elapsed_time:.2f}초")
+            
+            # 프롬프트 크기 및 토큰 사용량 기록
+            analysis['prompt_chars'] = len(message_content)
+            analysis['usage'] = response.usage.model_dump() if getattr(response, 'usage', None) else None
+            analysis['prompt_profile'] = profile_prompt(
+                market_data, message_content, prompt_build_ms, delta=bool(prompt),
+                system_prompt=system_prompt, output_instructions=output_instructions
+            )
 
             return analysis
 
@@ -691,122 +571,16 @@ EXPECTED_MINUTES: [120-960] (HOLD 시 생략)
                 }
             }
 
+    @pipeline_tracer.traced('build_prompt')
     def _create_analysis_prompt(self, market_data):
         """분석을 위한 프롬프트 생성 (Claude와 동일한 프롬프트 사용)"""
-        # JSON 직렬화 헬퍼 함수 추가
-        def json_serializer(obj):
-            if isinstance(obj, bool) or str(type(obj)) == "<class 'numpy.bool_'>":
-                return str(obj)  # True/False를 "True"/"False" 문자열로 변환
-            if isinstance(obj, (datetime, date)):
-                return obj.isoformat()
-            if str(type(obj)).startswith("<class 'numpy"):
-                return obj.item() if hasattr(obj, 'item') else str(obj)
-            raise TypeError(f"Type {type(obj)} not serializable")
-            
-        # 원본 캔들스틱 데이터 (모든 시간봉)
-        candlestick_raw_data = self._format_all_candlestick_data(market_data)
-
-        # 기술적 지표에서 핵심 시간대만 포함
-        all_timeframes = ['15m', '1H', '4H']
-        
-        # 필요한 지표만 필터링 (토큰 절약)
-        essential_indicators = [
-            'rsi', 'macd', 'macd_signal', 'macd_histogram',
-            'ema_21', 'ema_55', 'adx', 'atr', 'atr_percent',
-            'current_volume', 'avg_volume_20', 'volume_ratio',
-            'bb_upper', 'bb_middle', 'bb_lower', 'bb_width',
-            'volume_profile'
-        ]
-        
-        technical_indicators = {}
-        for timeframe, indicators in market_data['technical_indicators'].items():
-            if timeframe in all_timeframes:
-                # 필수 지표만 필터링
-                filtered_indicators = {}
-                for key, value in indicators.items():
-                    # 지표 이름이 essential_indicators에 포함되거나 시작하는 경우
-                    if any(key.startswith(essential) or key == essential for essential in essential_indicators):
-                        filtered_indicators[key] = value
-                
-                if filtered_indicators:  # 필터링된 결과가 있을 때만 추가
-                    technical_indicators[timeframe] = filtered_indicators
-        
-        # 빗각 설정 정보
-        diagonal_settings = market_data.get('diagonal_settings', {})
-        extracted_candles = diagonal_settings.get('extracted_candles', {})
-        
-        # 추출된 캔들 정보를 문자열로 포맷팅
-        def format_candle_info(candle_data, label):
-            """캔들 정보를 읽기 쉽게 포맷팅"""
-            if not candle_data:
-                return f"{label}: 캔들을 찾지 못했습니다."
-            
-            return f"""{label}:
-  - 인덱스: {candle_data.get('index')}
-  - 시간: {candle_data.get('timestamp')} (KST)
-  - Open: {candle_data.get('open')} USDT
-  - High: {candle_data.get('high')} USDT
-  - Low: {candle_data.get('low')} USDT
-  - Close: {candle_data.get('close')} USDT
-  - Volume: {candle_data.get('volume')} BTC"""
-        
-        # 추출된 캔들 정보 포맷팅 - 상승/하락 빗각 모두
-        diagonal_candles_info = ""
-        
-        # 상승 빗각 정보
-        uptrend_data = extracted_candles.get('uptrend')
-        downtrend_data = extracted_candles.get('downtrend')
-        
-        has_uptrend = uptrend_data and uptrend_data.get('point_a')
-        has_downtrend = downtrend_data and downtrend_data.get('point_a')
-        
-        if has_uptrend or has_downtrend:
-            diagonal_candles_info = "**🎯 백엔드에서 추출된 빗각 캔들 정보:**\n\n"
-            
-            # 상승 빗각 추가
-            if has_uptrend:
-                diagonal_candles_info += f"""
-**[상승 빗각 - 저점 연결]**
-사용할 가격 필드: **low** (빗각 계산에 이 필드의 값을 사용하세요!)
-
-{format_candle_info(uptrend_data.get('point_a'), 'Point A (역사적 저점)')}
-
-{format_candle_info(uptrend_data.get('point_second'), '두 번째 저점')}
-
-{format_candle_info(uptrend_data.get('point_b'), 'Point B (변곡점)')}
-
-"""
-            
-            # 하락 빗각 추가
-            if has_downtrend:
-                diagonal_candles_info += f"""
-**[하락 빗각 - 고점 연결]**
-사용할 가격 필드: **high** (빗각 계산에 이 필드의 값을 사용하세요!)
-
-{format_candle_info(downtrend_data.get('point_a'), 'Point A (역사적 고점)')}
-
-{format_candle_info(downtrend_data.get('point_second'), '두 번째 고점')}
-
-{format_candle_info(downtrend_data.get('point_b'), 'Point B (변곡점)')}
-
-"""
-            
-            diagonal_candles_info += """
-✅ **위 캔들 정보는 이미 백엔드에서 정확하게 추출되었습니다.**
-✅ **추가 검색 없이 위 정보를 바로 사용하여 빗각 계산을 시작하세요!**
-"""
-        else:
-            diagonal_candles_info = """
-**⚠️ 빗각 설정 없음:**
-사용자가 빗각 포인트를 설정하지 않았습니다. 빗각 분석을 건너뛰고 추세 추종 분석으로 진행하세요.
-"""
+        # 공유 프롬프트 컴파일러의 IR 사용 (스냅샷별 메모이즈)
+        ir = compile_prompt_ir(market_data)
+        candlestick_raw_data = render_candlestick_section(ir)
+        diagonal_candles_info = render_diagonal_section(ir)
 
         prompt = f"""### 현재 시장 상태:
-- 현재가: {market_data['current_market']['price']} USDT
-- 24시간 고가: {market_data['current_market']['24h_high']} USDT
-- 24시간 저가: {market_data['current_market']['24h_low']} USDT
-- 24시간 거래량: {market_data['current_market']['24h_volume']} BTC
-- 24시간 변동성: {round(((market_data['current_market']['24h_high'] - market_data['current_market']['24h_low']) / market_data['current_market']['24h_low']) * 100, 2)}%
+{render_current_market(ir)}
 
 ### 시스템 동작원리:
 - 한번 포지션 진입하면 부분 청산, 추가 진입 불가능
@@ -821,7 +595,7 @@ EXPECTED_MINUTES: [120-960] (HOLD 시 생략)
 {candlestick_raw_data}
 
 기술적 지표 원본 (15분, 1시간, 4시간 - 핵심 지표만):
-{json.dumps(technical_indicators, default=json_serializer)}
+{ir['technical_indicators_json']}
 
 위 데이터를 바탕으로 Extended Thinking을 활용하여 분석을 수행하고 수익을 극대화할 수 있는 최적의 거래 결정을 내려주세요. 
 
@@ -880,165 +654,25 @@ EXPECTED_MINUTES: [120-960] (HOLD 시 생략)
 
 **1-A. 상승 빗각 채널 분석 ([상승 빗각] 정보가 제공된 경우):**
    
-   **Step 1-A-1: 제공된 캔들 정보 확인**
-   - Point A (역사적 저점): 제공된 index, 시간, **low 값**, volume 확인
-   - 두 번째 저점: 제공된 index, 시간, **low 값**, volume 확인
-   - Point B (변곡점): 제공된 index, 시간, **low 값**, volume 확인
-   
-   **Step 1-A-2: 빗각 1 (주 빗각) 그리기**
-   - Point A의 low와 Point B의 low를 연결 → **빗각 1 (주 상승 빗각)**
-   - 기울기 계산: slope = (Point B low - Point A low) / (Point B index - Point A index)
-   - 보고: 빗각 1의 기울기 값 (USDT/시간)
-   
-   **Step 1-A-3: 빗각 2 (첫 번째 평행 빗각) 그리기**
-   - 두 번째 저점의 low에서 시작하는 빗각 1과 **평행한 직선** → **빗각 2**
-   - 빗각 2의 기울기는 빗각 1과 동일
-   
-   **Step 1-A-4: 채널 간격(D) 계산**
-   - 두 번째 저점 시점에서 빗각 1과 빗각 2의 **수직 거리(가격 차이)** 계산
-   - 빗각 1의 두 번째 저점 시점 가격 = Point A low + slope × (두 번째 저점 index - Point A index)
-   - 채널 간격 D = |빗각 1의 해당 시점 가격 - 두 번째 저점 low|
-   - 보고: 채널 간격 D (USDT)
-   
-   **Step 1-A-5: 추가 상승 채널 빗각 그리기 (빗각 3, 4, 5, 6, 7, 8, 9, 10)**
-   - **빗각 3**: 빗각 2에서 **아래 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 3 = 빗각 2 - D (수직 거리)
-   - **빗각 4**: 빗각 3에서 **아래 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 4 = 빗각 3 - D
-   - **빗각 5**: 빗각 4에서 **아래 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 5 = 빗각 4 - D
-   - **빗각 6**: 빗각 5에서 **아래 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 6 = 빗각 5 - D
-   - **빗각 7**: 빗각 6에서 **아래 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 7 = 빗각 6 - D
-   - **빗각 8**: 빗각 7에서 **아래 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 8 = 빗각 7 - D
-   - **빗각 9**: 빗각 8에서 **아래 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 9 = 빗각 8 - D
-   - **빗각 10**: 빗각 9에서 **아래 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 10 = 빗각 9 - D
-   - ⚠️ 비트코인 가격은 이 빗각들을 기준으로 움직이며, 한 빗각을 뚫으면 다음 빗각까지 이동하는 경향
-   
-   **Step 1-A-6: 현재 시점의 각 상승 빗각 위치 계산**
-   
-   ⚠️ **중요: 반드시 Point A를 기준점으로 사용하세요!**
-   
-   - **경과 시간 계산** = 현재 캔들 index - **Point A index** (Point B 아님!)
-   - **빗각 1 현재 위치** = **Point A low** + (slope × 경과 시간)
-     * Point A를 시작점으로 하여 직선이 연장된 현재 위치
-     * Point B 가격을 사용하지 마세요!
-   
-   - **빗각 2 현재 위치** = 빗각 1 현재 위치 - D
-   - **빗각 3 현재 위치** = 빗각 2 현재 위치 - D (= 빗각 1 - 2D)
-   - **빗각 4 현재 위치** = 빗각 3 현재 위치 - D (= 빗각 1 - 3D)
-   - **빗각 5 현재 위치** = 빗각 4 현재 위치 - D (= 빗각 1 - 4D)
-   - **빗각 6 현재 위치** = 빗각 5 현재 위치 - D (= 빗각 1 - 5D)
-   - **빗각 7 현재 위치** = 빗각 6 현재 위치 - D (= 빗각 1 - 6D)
-   - **빗각 8 현재 위치** = 빗각 7 현재 위치 - D (= 빗각 1 - 7D)
-   - **빗각 9 현재 위치** = 빗각 8 현재 위치 - D (= 빗각 1 - 8D)
-   - **빗각 10 현재 위치** = 빗각 9 현재 위치 - D (= 빗각 1 - 9D)
-   
-   **계산 예시:**
-   - Point A index=383, Point A low=101668.1
-   - slope=32.15 USDT/시간
-   - 현재 캔들 index=949
-   - 경과 시간 = 949 - 383 = 566시간
-   - 빗각 1 위치 = 101668.1 + (32.15 × 566) = 101668.1 + 18196.9 = 119865.0 USDT ✅
-   
-   - 보고: 각 빗각(1~10)의 현재 위치 가격을 모두 계산하여 반드시 보고
-   
-   **Step 1-A-7: 현재 가격이 어느 채널에 위치하는지 파악**
-   - 현재 가격이 빗각 1과 2 사이? 2와 3 사이? 3과 4 사이? 4와 5 사이? 5와 6 사이? 6과 7 사이? 7과 8 사이? 8과 9 사이? 9와 10 사이? 10 아래?
-   - 가장 가까운 위/아래 빗각 선 식별
+   - 빗각 1 = Point A low와 Point B low를 연결한 직선, 빗각 2~10 = 빗각 1에서 **아래 방향**으로 채널 간격 D씩 떨어진 평행선
+   - 기울기, D, 현재 빗각 1~10 위치, 가장 가까운 빗각과 거리, 거리 임계값은 **📐 백엔드 계산 빗각/채널 값**을 그대로 사용 (재계산 금지)
+   - 보고: 기울기, D, 빗각 1~10 현재 위치
    - 보고: 현재 가격의 채널 내 위치 ("빗각 3과 4 사이, 빗각 3에 가까움" 등)
-   
-   **Step 1-A-8: 🚨 빗각까지의 거리 계산 (매우 중요!)**
-   - 가장 가까운 빗각까지의 거리 계산: |현재 가격 - 가장 가까운 빗각 위치| / 현재 가격 × 100
-   - **ATR 기반 임계값 확인**: ATR% < 3% → 1.0%, ATR% 3-5% → 1.5%, ATR% > 5% → 2.0%
-   - **거리가 임계값 이내인 경우**: 빗각 분석을 우선 적용
+   - **거리가 임계값 이내인 경우**: 빗각 분석을 우선 적용, 최근 1시간봉/15분봉 이벤트(터치/돌파/리테스트)로 지지/저항 확인
    - **거리가 임계값 초과인 경우**: 빗각이 너무 멀어서 당장 영향 없음 → 추세 분석으로 전환
    - 보고: "가장 가까운 빗각까지 거리 X.XX%, ATR% Y.YY%, 임계값 Z.Z%, 빗각 분석 적용 여부: O/X"
    
-   **1-B. 하락 빗각 채널 그리기 (diagonal_type = 'downtrend'인 경우):**
-   
-   **Step 1-B-1: 제공된 캔들 정보 확인 및 사용**
-   - Point A: 제공된 index, 시간, **high 값**, volume 확인
-   - 두 번째 고점: 제공된 index, 시간, **high 값**, volume 확인
-   - Point B (변곡점): 제공된 index, 시간, **high 값**, volume 확인
-   - 보고: 각 포인트의 정보를 그대로 사용한다고 명시
-   
-   **Step 1-B-2: 빗각 1 (주 빗각) 그리기**
-   - Point A의 high와 Point B의 high를 연결 → **빗각 1 (주 하락 빗각)**
-   - 기울기 계산: slope = (Point B high - Point A high) / (Point B index - Point A index)
-   - 보고: 빗각 1의 기울기 값 (USDT/시간)
-   
-   **Step 1-B-3: 빗각 2 (첫 번째 평행 빗각) 그리기**
-   - 두 번째 고점의 high에서 시작하는 빗각 1과 **평행한 직선** → **빗각 2**
-   - 빗각 2의 기울기는 빗각 1과 동일
-   
-   **Step 1-B-4: 채널 간격(D) 계산**
-   - 두 번째 고점 시점에서 빗각 1과 빗각 2의 **수직 거리(가격 차이)** 계산
-   - 빗각 1의 두 번째 고점 시점 가격 = Point A high + slope × (두 번째 고점 index - Point A index)
-   - 채널 간격 D = |빗각 1의 해당 시점 가격 - 두 번째 고점 high|
-   - 보고: 채널 간격 D (USDT)
+**1-B. 하락 빗각 채널 분석 ([하락 빗각] 정보가 제공된 경우):**
    
-   **Step 1-B-5: 추가 하락 채널 빗각 그리기 (빗각 3, 4, 5, 6, 7, 8, 9, 10)**
-   - **빗각 3**: 빗각 2에서 **위 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 3 = 빗각 2 + D (수직 거리)
-   - **빗각 4**: 빗각 3에서 **위 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 4 = 빗각 3 + D
-   - **빗각 5**: 빗각 4에서 **위 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 5 = 빗각 4 + D
-   - **빗각 6**: 빗각 5에서 **위 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 6 = 빗각 5 + D
-   - **빗각 7**: 빗각 6에서 **위 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 7 = 빗각 6 + D
-   - **빗각 8**: 빗각 7에서 **위 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 8 = 빗각 7 + D
-   - **빗각 9**: 빗각 8에서 **위 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 9 = 빗각 8 + D
-   - **빗각 10**: 빗각 9에서 **위 방향**으로 간격 D만큼 떨어진 평행선
-     * 빗각 10 = 빗각 9 + D
-   - ⚠️ 비트코인 가격은 이 빗각들을 기준으로 움직이며, 한 빗각을 뚫으면 다음 빗각까지 이동하는 경향
-   
-   **Step 1-B-6: 현재 시점의 각 하락 빗각 위치 계산**
-   
-   ⚠️ **중요: 반드시 Point A를 기준점으로 사용하세요!**
-   
-   - **경과 시간 계산** = 현재 캔들 index - **Point A index** (Point B 아님!)
-   - **빗각 1 현재 위치** = **Point A high** + (slope × 경과 시간)
-     * Point A를 시작점으로 하여 직선이 연장된 현재 위치
-     * Point B 가격을 사용하지 마세요!
-   
-   - **빗각 2 현재 위치** = 빗각 1 현재 위치 + D
-   - **빗각 3 현재 위치** = 빗각 2 현재 위치 + D (= 빗각 1 + 2D)
-   - **빗각 4 현재 위치** = 빗각 3 현재 위치 + D (= 빗각 1 + 3D)
-   - **빗각 5 현재 위치** = 빗각 4 현재 위치 + D (= 빗각 1 + 4D)
-   - **빗각 6 현재 위치** = 빗각 5 현재 위치 + D (= 빗각 1 + 5D)
-   - **빗각 7 현재 위치** = 빗각 6 현재 위치 + D (= 빗각 1 + 6D)
-   - **빗각 8 현재 위치** = 빗각 7 현재 위치 + D (= 빗각 1 + 7D)
-   - **빗각 9 현재 위치** = 빗각 8 현재 위치 + D (= 빗각 1 + 8D)
-   - **빗각 10 현재 위치** = 빗각 9 현재 위치 + D (= 빗각 1 + 9D)
-   
-   **계산 예시:**
-   - Point A index=450, Point A high=112000.0
-   - slope=-25.5 USDT/시간 (하락)
-   - 현재 캔들 index=900
-   - 경과 시간 = 900 - 450 = 450시간
-   - 빗각 1 위치 = 112000.0 + (-25.5 × 450) = 112000.0 - 11475.0 = 100525.0 USDT ✅
-   
-   - 보고: 각 빗각의 현재 위치 가격 (반드시 위 공식대로 계산)
-   
-   **Step 1-B-7: 현재 가격이 어느 채널에 위치하는지 파악**
-   - 현재 가격이 빗각 1과 2 사이? 2와 3 사이? 3과 4 사이? 4와 5 사이? 5와 6 사이? 6과 7 사이? 7과 8 사이? 8 위?
-   - 가장 가까운 위/아래 빗각 선 식별
+   - 빗각 1 = Point A high와 Point B high를 연결한 직선, 빗각 2~10 = 빗각 1에서 **위 방향**으로 채널 간격 D씩 떨어진 평행선
+   - 기울기, D, 현재 빗각 1~10 위치, 가장 가까운 빗각과 거리, 거리 임계값은 **📐 백엔드 계산 빗각/채널 값**을 그대로 사용 (재계산 금지)
+   - 보고: 기울기, D, 빗각 1~10 현재 위치
    - 보고: 현재 가격의 채널 내 위치 ("빗각 2와 3 사이, 빗각 2에 가까움" 등)
+   - **거리가 임계값 이내인 경우**: 빗각 분석을 우선 적용, 최근 1시간봉/15분봉 이벤트(터치/돌파/리테스트)로 지지/저항 확인
+   - **거리가 임계값 초과인 경우**: 빗각이 너무 멀어서 당장 영향 없음 → 추세 분석으로 전환
+   - 보고: "가장 가까운 빗각까지 거리 X.XX%, ATR% Y.YY%, 임계값 Z.Z%, 빗각 분석 적용 여부: O/X"
    
-   **Step 1-B-8: 🚨 빗각까지의 거리 계산 (매우 중요!)**
-   - 가장 가까운 빗각까지의 거리 계산: |현재 가격 - 가장 가까운 빗각 위치| / 현재 가격 × 100
-   - **거리가 1% 이내인 경우**: 빗각 분석을 우선 적용
-   - **거리가 1% 초과인 경우**: 빗각이 너무 멀어서 당장 영향 없음 → 추세 분석으로 전환
-   - 보고: "가장 가까운 빗각까지 거리 X.XX%, 빗각 분석 적용 여부: O/X"
+   ⚠️ 비트코인 가격은 이 빗각들을 기준으로 움직이며, 한 빗각을 뚫으면 다음 빗각까지 이동하는 경향
    
 **1-C. 두 빗각 종합 분석 및 진입 신호 판단:**
 
@@ -1454,75 +1088,21 @@ EXPECTED_MINUTES: [120-960] (HOLD 시 생략)
 
 **Step 1: 빗각 및 채널 분석 (1시간봉 기준 - 상승/하락 빗각 모두 양방향 활용)**
 
-**⚠️ 중요: 백엔드에서 이미 추출된 캔들 정보를 사용하세요! 직접 캔들을 검색하지 마세요!**
+**⚠️ 중요: 빗각/채널 값은 백엔드에서 이미 계산되어 제공됩니다 (📐 백엔드 계산 빗각/채널 값). 직접 캔들을 검색하거나 재계산하지 마세요!**
 
-- 상승 빗각 및 채널 분석 (사용자가 설정한 경우):
-  * **제공된 Point A 정보 확인**: index, 시간, **low 값**, volume
-  * **제공된 두 번째 저점 정보 확인**: index, 시간, **low 값**, volume  
-  * **제공된 Point B 정보 확인**: index, 시간, **low 값**, volume
-  
-  * **빗각 1 (기준 상승 빗각) 계산**: Point A의 low와 Point B의 low를 연결한 직선
-    → 시간당 변화율 (slope) = (Point B low - Point A low) / (Point B index - Point A index)
-    → 경과 시간 = 현재 캔들 index - Point A index
-    → **현재 빗각 1 위치 = Point A low + (변화율 × 경과 시간)** ⚠️ Point A 가격 사용!
-  
-  * **채널 간격 D 계산**: 
-    → 두 번째 저점 시점에서 빗각 1과의 수직 거리
-    → D = |빗각 1의 두 번째 저점 시점 가격 - 두 번째 저점 low|
-  
-  * **평행 채널 빗각들 현재 위치 계산**:
-    → 빗각 2 현재 위치 = 빗각 1 현재 위치 - D
-    → 빗각 3 현재 위치 = 빗각 1 현재 위치 - 2D
-    → 빗각 4 현재 위치 = 빗각 1 현재 위치 - 3D
-    → 빗각 5 현재 위치 = 빗각 1 현재 위치 - 4D
-    → 빗각 6 현재 위치 = 빗각 1 현재 위치 - 5D
-    → 빗각 7 현재 위치 = 빗각 1 현재 위치 - 6D
-    → 빗각 8 현재 위치 = 빗각 1 현재 위치 - 7D
-    → 빗각 9 현재 위치 = 빗각 1 현재 위치 - 8D
-    → 빗각 10 현재 위치 = 빗각 1 현재 위치 - 9D
-  
-  * **현재 가격이 어느 채널에 위치하는지 파악**:
-    → 현재 가격이 빗각 1과 2 사이? 2와 3 사이? 3과 4 사이? 4와 5 사이? 5와 6 사이? 6과 7 사이? 7과 8 사이? 8과 9 사이? 9와 10 사이? 10 아래?
-    → 가장 가까운 위/아래 빗각 선 식별
-  
-  * **가장 가까운 빗각까지 거리 계산 및 지지/저항 분석** (매우 중요!):
-    → 거리 = |현재 가격 - 가장 가까운 빗각 위치| / 현재 가격 × 100
-    → **각 빗각(1, 2, 3, 4, 5, 6, 7, 8, 9, 10) 모두 지지선/저항선으로 작용**
-    → 현재 가격 > 해당 빗각 → 빗각이 지지선 역할 → 지지 확인 시 롱, 지지 붕괴 시 숏
-    → 현재 가격 < 해당 빗각 → 빗각이 저항선 역할 → 저항 확인 시 숏, 저항 돌파 시 롱
-    → **거리 임계값 이내일 때만 진입 신호로 판단** (ATR% < 3% → 1.0%, ATR% 3-5% → 1.5%, ATR% > 5% → 2.0%)
-  
-- 하락 빗각 및 채널 분석 (사용자가 설정한 경우):
-  * **제공된 Point A 정보 확인**: index, 시간, **high 값**, volume
-  * **제공된 두 번째 고점 정보 확인**: index, 시간, **high 값**, volume
-  * **제공된 Point B 정보 확인**: index, 시간, **high 값**, volume
-  
-  * **빗각 1 (기준 하락 빗각) 계산**: Point A의 high와 Point B의 high를 연결한 직선
-    → 시간당 변화율 (slope) = (Point B high - Point A high) / (Point B index - Point A index)
-    → 경과 시간 = 현재 캔들 index - Point A index
-    → **현재 빗각 1 위치 = Point A high + (변화율 × 경과 시간)** ⚠️ Point A 가격 사용!
-  
-  * **채널 간격 D 계산**: 
-    → 두 번째 고점 시점에서 빗각 1과의 수직 거리
-    → D = |빗각 1의 두 번째 고점 시점 가격 - 두 번째 고점 high|
+- 상승 빗각 채널 (사용자가 설정한 경우):
+  * 빗각 1 = Point A low와 Point B low를 연결한 직선
+  * 채널 간격 D = 두 번째 저점 시점에서 빗각 1과 두 번째 저점 low의 수직 거리
+  * 빗각 2~10 = 빗각 1에서 아래 방향으로 D씩 떨어진 평행선
   
-  * **평행 채널 빗각들 현재 위치 계산**:
-    → 빗각 2 현재 위치 = 빗각 1 현재 위치 + D
-    → 빗각 3 현재 위치 = 빗각 1 현재 위치 + 2D
-    → 빗각 4 현재 위치 = 빗각 1 현재 위치 + 3D
-    → 빗각 5 현재 위치 = 빗각 1 현재 위치 + 4D
-    → 빗각 6 현재 위치 = 빗각 1 현재 위치 + 5D
-    → 빗각 7 현재 위치 = 빗각 1 현재 위치 + 6D
-    → 빗각 8 현재 위치 = 빗각 1 현재 위치 + 7D
-    → 빗각 9 현재 위치 = 빗각 1 현재 위치 + 8D
-    → 빗각 10 현재 위치 = 빗각 1 현재 위치 + 9D
+- 하락 빗각 채널 (사용자가 설정한 경우):
+  * 빗각 1 = Point A high와 Point B high를 연결한 직선
+  * 채널 간격 D = 두 번째 고점 시점에서 빗각 1과 두 번째 고점 high의 수직 거리
+  * 빗각 2~10 = 빗각 1에서 위 방향으로 D씩 떨어진 평행선
   
-  * **현재 가격이 어느 채널에 위치하는지 파악**:
-    → 현재 가격이 빗각 1과 2 사이? 2와 3 사이? 3과 4 사이? 4와 5 사이? 5와 6 사이? 6과 7 사이? 7과 8 사이? 8과 9 사이? 9와 10 사이? 10 위?
-    → 가장 가까운 위/아래 빗각 선 식별
+- **제공된 계산 값 사용**: 기울기, D, 현재 빗각 1~10 위치, 바로 위/아래 빗각, 가장 가까운 빗각과 거리(%), ATR 기반 거리 임계값 및 이내 여부, 최근 터치/돌파/리테스트 이벤트
   
-  * **가장 가까운 빗각까지 거리 계산 및 지지/저항 분석** (매우 중요!):
-    → 거리 = |현재 가격 - 가장 가까운 빗각 위치| / 현재 가격 × 100
+- **지지/저항 분석** (매우 중요!):
     → **각 빗각(1, 2, 3, 4, 5, 6, 7, 8, 9, 10) 모두 지지선/저항선으로 작용**
     → 현재 가격 > 해당 빗각 → 빗각이 지지선 역할 → 지지 확인 시 롱, 지지 붕괴 시 숏
     → 현재 가격 < 해당 빗각 → 빗각이 저항선 역할 → 저항 확인 시 숏, 저항 돌파 시 롱
@@ -1564,11 +1144,12 @@ EXPECTED_MINUTES: [120-960] (HOLD 시 생략)
 
         return prompt
 
+    @pipeline_tracer.traced('parse_response')
     def _parse_ai_response(self, response_text):
         """AI 응답 파싱 (Claude와 동일한 파싱 로직 사용)"""
         try:
-            print("\n=== 파싱 시작: 원본 응답 ===")
-            print(response_text)
+            print(f"\n=== 파싱 시작: 원본 응답 ({len(response_text or '')}자) ===")
+            logger.debug("%s", response_text)
             
             # 정규표현식 패턴
             action_pattern = re.compile(r'\*{0,2}\s*ACTION\s*\*{0,2}\s*:\s*\*{0,2}\s*([A-Z_]+)', re.IGNORECASE)
@@ -1694,8 +1275,7 @@ EXPECTED_MINUTES: [120-960] (HOLD 시 생략)
                 "next_analysis_time": (datetime.now() + timedelta(minutes=expected_minutes)).isoformat()
             }
             
-            print("\n=== 파싱 결과 ===")
-            print(json.dumps(result, indent=2, default=str))
+            logger.debug("\n=== 파싱 결과 ===\n%s", LazyJSON(result))
             
             return result
 
@@ -0,0 +1,287 @@
+import numpy as np
+
+
+class DiagonalAnalytics:
+    """빗각(diagonal) 및 평행 채널 계산
+
+    _extract_diagonal_candles가 찾은 Point A / 두 번째 저점(고점) / Point B로부터
+    빗각 1~10의 값을 1시간봉과 15분봉의 모든 인덱스에서 벡터 연산으로 계산하고,
+    현재 거리, 터치/돌파/리테스트 이벤트, ATR 기반 근접 여부를 요약합니다.
+    프롬프트에는 계산된 사실(fact)만 전달합니다.
+    """
+
+    CHANNEL_COUNT = 10
+    HOUR_MS = 60 * 60 * 1000
+
+    # ATR% 구간별 빗각 거리 임계값
+    PROXIMITY_THRESHOLDS = [
+        (3.0, 1.0),   # ATR% < 3% → 1.0%
+        (5.0, 1.5),   # ATR% 3-5% → 1.5%
+    ]
+    PROXIMITY_THRESHOLD_HIGH = 2.0  # ATR% > 5% → 2.0%
+
+    # 이벤트 탐색 구간 (최근 캔들 수)
+    EVENT_LOOKBACK = {'1H': 24, '15m': 16}
+    MAX_EVENTS = 5
+
+    def get_proximity_threshold(self, atr_percent):
+        """ATR%에 따른 빗각 거리 임계값"""
+        if atr_percent is None:
+            return self.PROXIMITY_THRESHOLDS[0][1]
+        for upper, threshold in self.PROXIMITY_THRESHOLDS:
+            if atr_percent < upper:
+                return threshold
+        return self.PROXIMITY_THRESHOLD_HIGH
+
+    @staticmethod
+    def _candle_arrays(candles):
+        """캔들 리스트를 numpy 배열로 변환"""
+        return {
+            'timestamp': np.array([c['timestamp'] for c in candles], dtype=np.int64),
+            'high': np.array([c['high'] for c in candles], dtype=np.float64),
+            'low': np.array([c['low'] for c in candles], dtype=np.float64),
+            'close': np.array([c['close'] for c in candles], dtype=np.float64),
+        }
+
+    def _line_params(self, diagonal):
+        """빗각 1의 기울기와 채널 간격 D 계산"""
+        field = diagonal['price_field']
+        point_a = diagonal['point_a']
+        point_second = diagonal['point_second']
+        point_b = diagonal['point_b']
+
+        a_idx, a_price = point_a['index'], float(point_a[field])
+        b_idx, b_price = point_b['index'], float(point_b[field])
+        s_idx, s_price = point_second['index'], float(point_second[field])
+
+        if b_idx == a_idx:
+            return None
+
+        slope = (b_price - a_price) / (b_idx - a_idx)
+        line1_at_second = a_price + slope * (s_idx - a_idx)
+        spacing = abs(line1_at_second - s_price)
+
+        # 상승 빗각 채널은 빗각 1 아래로(-D), 하락 빗각 채널은 위로(+D) 확장
+        direction = -1.0 if diagonal['diagonal_type'] == 'uptrend' else 1.0
+        offsets = direction * spacing * np.arange(self.CHANNEL_COUNT)
+
+        return {
+            'a_idx': a_idx,
+            'a_price': a_price,
+            'a_timestamp_ms': point_a.get('timestamp_ms'),
+            'slope': slope,
+            'spacing': spacing,
+            'offsets': offsets,
+        }
+
+    def line_values(self, params, x):
+        """인덱스 배열 x에서 빗각 1~10 값 계산 (shape: CHANNEL_COUNT x len(x))"""
+        line1 = params['a_price'] + params['slope'] * (np.asarray(x, dtype=np.float64) - params['a_idx'])
+        return line1[np.newaxis, :] + params['offsets'][:, np.newaxis]
+
+    def compute_series(self, diagonal, candles_1h, candles_15m=None):
+        """1시간봉/15분봉 모든 인덱스에서의 빗각 값 계산"""
+        params = self._line_params(diagonal)
+        if params is None:
+            return None
+
+        series = {'params': params}
+
+        if candles_1h:
+            arrays_1h = self._candle_arrays(candles_1h)
+            x_1h = np.arange(len(candles_1h), dtype=np.float64)
+            series['1H'] = {'x': x_1h, 'lines': self.line_values(params, x_1h), **arrays_1h}
+
+        # 15분봉은 Point A 시점 기준 경과 시간(1시간 단위)으로 1시간봉 인덱스에 매핑
+        if candles_15m and params['a_timestamp_ms']:
+            arrays_15m = self._candle_arrays(candles_15m)
+            x_15m = params['a_idx'] + (arrays_15m['timestamp'] - params['a_timestamp_ms']) / self.HOUR_MS
+            series['15m'] = {'x': x_15m, 'lines': self.line_values(params, x_15m), **arrays_15m}
+
+        return series
+
+    def _detect_events(self, tf_series, lookback):
+        """최근 구간의 터치/돌파/리테스트 이벤트 탐지"""
+        lines = tf_series['lines'][:, -lookback:]
+        high = tf_series['high'][-lookback:]
+        low = tf_series['low'][-lookback:]
+        close = tf_series['close'][-lookback:]
+        timestamps = tf_series['timestamp'][-lookback:]
+        offset = len(tf_series['close']) - len(close)
+
+        # 터치: 캔들 범위 안에 빗각이 위치
+        touched = (low[np.newaxis, :] <= lines) & (lines <= high[np.newaxis, :])
+
+        # 돌파: 연속한 두 캔들의 종가가 빗각 반대편에 위치
+        side = np.sign(close[np.newaxis, :] - lines)
+        crossed = np.zeros_like(touched)
+        crossed[:, 1:] = (side[:, 1:] != side[:, :-1]) & (side[:, 1:] != 0) & (side[:, :-1] != 0)
+
+        events = []
+        for line_no, col in zip(*np.nonzero(crossed)):
+            events.append({
+                'type': 'break_up' if side[line_no, col] > 0 else 'break_down',
+                'line': int(line_no) + 1,
+                'index': int(col) + offset,
+                'timestamp_ms': int(timestamps[col]),
+                'line_value': float(lines[line_no, col]),
+                'close': float(close[col]),
+            })
+
+            # 리테스트: 돌파 이후 빗각을 터치하고 돌파 방향으로 종가 유지
+            later = np.nonzero(touched[line_no, col + 1:] & (side[line_no, col + 1:] == side[line_no, col]))[0]
+            if later.size:
+                retest_col = int(col) + 1 + int(later[0])
+                events.append({
+                    'type': 'retest_hold',
+                    'line': int(line_no) + 1,
+                    'index': retest_col + offset,
+                    'timestamp_ms': int(timestamps[retest_col]),
+                    'line_value': float(lines[line_no, retest_col]),
+                    'close': float(close[retest_col]),
+                })
+
+        # 마지막 캔들 터치 (돌파 여부와 무관)
+        for line_no in np.nonzero(touched[:, -1])[0]:
+            events.append({
+                'type': 'touch',
+                'line': int(line_no) + 1,
+                'index': len(close) - 1 + offset,
+                'timestamp_ms': int(timestamps[-1]),
+                'line_value': float(lines[line_no, -1]),
+                'close': float(close[-1]),
+            })
+
+        events.sort(key=lambda e: e['index'], reverse=True)
+        return events[:self.MAX_EVENTS]
+
+    def _summarize(self, diagonal, series, current_price, atr_percent):
+        """현재 채널 위치, 거리 및 이벤트 요약"""
+        params = series['params']
+        threshold = self.get_proximity_threshold(atr_percent)
+
+        summary = {
+            'diagonal_type': diagonal['diagonal_type'],
+            'price_field': diagonal['price_field'],
+            'slope_per_hour': float(params['slope']),
+            'channel_spacing': float(params['spacing']),
+            'atr_percent': atr_percent,
+            'proximity_threshold': threshold,
+        }
+
+        if '1H' in series:
+            current_lines = series['1H']['lines'][:, -1]
+            summary['current_index'] = int(series['1H']['x'][-1])
+            summary['current_lines'] = {str(i + 1): float(v) for i, v in enumerate(current_lines)}
+
+            distances = (current_price - current_lines) / current_price * 100
+            nearest = int(np.argmin(np.abs(distances)))
+            above = current_lines[current_lines > current_price]
+            below = current_lines[current_lines <= current_price]
+
+            summary['nearest_line'] = nearest + 1
+            summary['nearest_line_value'] = float(current_lines[nearest])
+            summary['nearest_distance_percent'] = float(abs(distances[nearest]))
+            summary['nearest_role'] = 'support' if current_price > current_lines[nearest] else 'resistance'
+            summary['within_threshold'] = bool(abs(distances[nearest]) <= threshold)
+            summary['line_above'] = float(above.min()) if above.size else None
+            summary['line_below'] = float(below.max()) if below.size else None
+            summary['events_1h'] = self._detect_events(series['1H'], self.EVENT_LOOKBACK['1H'])
+
+        if '15m' in series:
+            summary['events_15m'] = self._detect_events(series['15m'], self.EVENT_LOOKBACK['15m'])
+
+        return summary
+
+    def compute(self, extracted_candles, candlesticks, technical_indicators, current_price):
+        """상승/하락 빗각 분석 결과 계산
+
+        Returns:
+            dict: {'uptrend': 요약 또는 None, 'downtrend': 요약 또는 None}
+        """
+        result = {'uptrend': None, 'downtrend': None}
+
+        try:
+            candles_1h = candlesticks.get('1H') or []
+            candles_15m = candlesticks.get('15m') or []
+            if not candles_1h or not current_price:
+                return result
+
+            atr_info = (technical_indicators.get('1H') or {}).get('atr') or {}
+            atr_percent = atr_info.get('percent')
+            atr_percent = float(atr_percent) if atr_percent is not None else None
+
+            for key in ('uptrend', 'downtrend'):
+                diagonal = (extracted_candles or {}).get(key)
+                if not diagonal:
+                    continue
+                series = self.compute_series(diagonal, candles_1h, candles_15m)
+                if series is None:
+                    print(f"[{key}] Point A와 Point B 인덱스가 같아 빗각을 계산할 수 없습니다.")
+                    continue
+                result[key] = self._summarize(diagonal, series, float(current_price), atr_percent)
+
+            return result
+
+        except Exception as e:
+            print(f"빗각 분석 계산 중 오류: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return {'uptrend': None, 'downtrend': None}
+
+
+EVENT_LABELS = {
+    'break_up': '상향 돌파',
+    'break_down': '하향 돌파',
+    'retest_hold': '리테스트 성공',
+    'touch': '터치',
+}
+
+
+def format_diagonal_analytics(analytics):
+    """빗각 분석 결과를 프롬프트용 텍스트로 포맷팅"""
+    if not analytics or not (analytics.get('uptrend') or analytics.get('downtrend')):
+        return ""
+
+    from datetime import datetime, timedelta
+
+    def format_time(timestamp_ms):
+        return (datetime.utcfromtimestamp(timestamp_ms / 1000) + timedelta(hours=9)).strftime('%Y-%m-%d %H:%M')
+
+    def format_events(events):
+        if not events:
+            return "  - 없음"
+        return "\n".join(
+            f"  - {format_time(e['timestamp_ms'])} 빗각 {e['line']} {EVENT_LABELS.get(e['type'], e['type'])} "
+            f"(빗각 {e['line_value']:.2f}, 종가 {e['close']:.2f})"
+            for e in events
+        )
+
+    text = "**📐 백엔드 계산 빗각/채널 값 (재계산 불필요 - 이 값을 그대로 사용하세요):**\n"
+    labels = {'uptrend': '상승 빗각', 'downtrend': '하락 빗각'}
+
+    for key in ('uptrend', 'downtrend'):
+        data = analytics.get(key)
+        if not data or 'current_lines' not in data:
+            continue
+
+        lines_text = ", ".join(f"빗각 {no}: {value:.2f}" for no, value in data['current_lines'].items())
+        role = '지지선' if data['nearest_role'] == 'support' else '저항선'
+        atr_text = f"{data['atr_percent']:.2f}%" if data['atr_percent'] is not None else 'N/A'
+        line_above = f"{data['line_above']:.2f}" if data['line_above'] is not None else '없음'
+        line_below = f"{data['line_below']:.2f}" if data['line_below'] is not None else '없음'
+
+        text += f"""
+**[{labels[key]}]** (가격 필드: {data['price_field']})
+- 기울기: {data['slope_per_hour']:.4f} USDT/시간, 채널 간격 D: {data['channel_spacing']:.2f} USDT
+- 현재 인덱스 {data['current_index']} 기준 빗각 값: {lines_text}
+- 바로 위 빗각: {line_above}, 바로 아래 빗각: {line_below}
+- 가장 가까운 빗각: 빗각 {data['nearest_line']} ({data['nearest_line_value']:.2f}, {role}), 거리 {data['nearest_distance_percent']:.2f}%
+- 거리 임계값: {data['proximity_threshold']}% (1시간 ATR% {atr_text}) → {'✅ 임계값 이내' if data['within_threshold'] else '❌ 임계값 초과'}
+- 최근 1시간봉 이벤트:
+{format_events(data.get('events_1h'))}
+- 최근 15분봉 이벤트:
+{format_events(data.get('events_15m'))}
+"""
+
+    return text
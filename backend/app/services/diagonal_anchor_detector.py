@@ -0,0 +1,198 @@
+from datetime import datetime, timedelta
+import numpy as np
+
+
+class DiagonalAnchorDetector:
+    """빗각 기준점 자동 탐지 (1시간봉)
+
+    프롬프트의 빗각 포인트 규칙을 그대로 적용합니다.
+    - Point A: 전체 데이터에서 역사적 저점(상승) / 고점(하락)
+    - 두 번째 저점/고점: Point A 이후 100개 캔들 뒤 구간의 최저 low / 최고 high
+    - Point B (변곡점): Point A 이후 거래량 최대 캔들
+
+    기준점은 timestamp(ms)로 메모리에 보관하며, 새 캔들이 마감되면
+    새로 마감된 캔들만으로 증분 갱신합니다. Point A가 바뀌거나 조회 구간을
+    벗어난 경우에만 전체 재계산합니다.
+    """
+
+    HOUR_MS = 60 * 60 * 1000
+    SECOND_POINT_MIN_GAP = 100  # Point A 이후 최소 캔들 수
+
+    DIRECTIONS = {
+        'uptrend': {'price_field': 'low', 'extreme': 'min'},
+        'downtrend': {'price_field': 'high', 'extreme': 'max'},
+    }
+
+    def __init__(self):
+        self.anchors = {'uptrend': None, 'downtrend': None}
+        self.last_closed_timestamp = None
+        self.updated_at = None
+
+    @staticmethod
+    def format_time(timestamp_ms):
+        """timestamp(ms)를 빗각 설정과 같은 KST 문자열로 변환"""
+        return (datetime.utcfromtimestamp(timestamp_ms / 1000) + timedelta(hours=9)).strftime('%Y-%m-%d %H:%M')
+
+    @staticmethod
+    def _is_better(value, current, extreme):
+        return value < current if extreme == 'min' else value > current
+
+    def _detect(self, direction, timestamps, prices, volumes):
+        """전체 구간에서 기준점 탐지 (벡터 연산)"""
+        config = self.DIRECTIONS[direction]
+        extreme = config['extreme']
+
+        a_pos = int(np.argmin(prices)) if extreme == 'min' else int(np.argmax(prices))
+        a_ts = int(timestamps[a_pos])
+
+        anchor = {
+            'point_a': {'timestamp_ms': a_ts, 'price': float(prices[a_pos])},
+            'point_second': None,
+            'point_b': None,
+        }
+
+        # 변곡점: Point A 이후 거래량 최대 캔들
+        if a_pos + 1 < len(prices):
+            b_pos = a_pos + 1 + int(np.argmax(volumes[a_pos + 1:]))
+            anchor['point_b'] = {'timestamp_ms': int(timestamps[b_pos]), 'volume': float(volumes[b_pos])}
+
+        # 두 번째 저점/고점: Point A 이후 100개 캔들 뒤 구간의 극값
+        second_start = int(np.searchsorted(timestamps, a_ts + self.SECOND_POINT_MIN_GAP * self.HOUR_MS))
+        if second_start < len(prices):
+            window = prices[second_start:]
+            s_pos = second_start + (int(np.argmin(window)) if extreme == 'min' else int(np.argmax(window)))
+            anchor['point_second'] = {'timestamp_ms': int(timestamps[s_pos]), 'price': float(prices[s_pos])}
+
+        return anchor
+
+    def _update_incremental(self, direction, anchor, timestamps, prices, volumes):
+        """새로 마감된 캔들만으로 기준점 갱신
+
+        Returns:
+            bool: 증분 갱신 성공 여부 (False면 전체 재계산 필요)
+        """
+        extreme = self.DIRECTIONS[direction]['extreme']
+        a_ts = anchor['point_a']['timestamp_ms']
+
+        # Point A가 조회 구간을 벗어났거나 새 극값이 나오면 전체 재계산
+        if timestamps.size == 0:
+            return True
+        new_extreme = prices.min() if extreme == 'min' else prices.max()
+        if self._is_better(float(new_extreme), anchor['point_a']['price'], extreme):
+            return False
+
+        # 변곡점 갱신
+        b_pos = int(np.argmax(volumes))
+        if anchor['point_b'] is None or float(volumes[b_pos]) > anchor['point_b']['volume']:
+            anchor['point_b'] = {'timestamp_ms': int(timestamps[b_pos]), 'volume': float(volumes[b_pos])}
+
+        # 두 번째 저점/고점 갱신
+        eligible = timestamps >= a_ts + self.SECOND_POINT_MIN_GAP * self.HOUR_MS
+        if eligible.any():
+            eligible_prices = prices[eligible]
+            eligible_ts = timestamps[eligible]
+            s_pos = int(np.argmin(eligible_prices)) if extreme == 'min' else int(np.argmax(eligible_prices))
+            candidate = float(eligible_prices[s_pos])
+            if anchor['point_second'] is None or self._is_better(candidate, anchor['point_second']['price'], extreme):
+                anchor['point_second'] = {'timestamp_ms': int(eligible_ts[s_pos]), 'price': candidate}
+
+        return True
+
+    def update(self, candles_1h):
+        """1시간봉으로 기준점 갱신 (마감된 캔들만 사용)"""
+        try:
+            # 마지막 캔들은 진행 중인 캔들이므로 제외
+            closed = candles_1h[:-1] if candles_1h else []
+            if len(closed) < 2:
+                return self.anchors
+
+            last_ts = int(closed[-1]['timestamp'])
+            if self.last_closed_timestamp == last_ts:
+                return self.anchors
+
+            timestamps = np.array([c['timestamp'] for c in closed], dtype=np.int64)
+            first_ts = int(timestamps[0])
+            volumes = np.array([c['volume'] for c in closed], dtype=np.float64)
+
+            if self.last_closed_timestamp is not None:
+                new_mask = timestamps > self.last_closed_timestamp
+            else:
+                new_mask = None
+
+            for direction, config in self.DIRECTIONS.items():
+                prices = np.array([c[config['price_field']] for c in closed], dtype=np.float64)
+                anchor = self.anchors[direction]
+
+                incremental_ok = (
+                    anchor is not None
+                    and new_mask is not None
+                    and anchor['point_a']['timestamp_ms'] >= first_ts
+                    and self._update_incremental(
+                        direction, anchor, timestamps[new_mask], prices[new_mask], volumes[new_mask]
+                    )
+                )
+
+                if not incremental_ok:
+                    self.anchors[direction] = self._detect(direction, timestamps, prices, volumes)
+                    print(f"[{direction}] 빗각 기준점 전체 재계산: {self.get_settings()[direction]}")
+
+            self.last_closed_timestamp = last_ts
+            self.updated_at = datetime.now()
+            return self.anchors
+
+        except Exception as e:
+            print(f"빗각 기준점 자동 탐지 중 오류: {str(e)}")
+            import traceback
+            traceback.print_exc()
+            return self.anchors
+
+    def get_settings(self):
+        """_get_diagonal_settings와 같은 형식의 자동 탐지 결과"""
+        result = {}
+        for direction in self.DIRECTIONS:
+            anchor = self.anchors.get(direction)
+            result[direction] = {
+                'point_a_time': None,
+                'point_second_time': None,
+                'point_b_time': None,
+            }
+            if anchor:
+                for key in ('point_a', 'point_second', 'point_b'):
+                    if anchor.get(key):
+                        result[direction][f'{key}_time'] = self.format_time(anchor[key]['timestamp_ms'])
+        return result
+
+    def extract(self, candles_1h, direction):
+        """자동 탐지된 기준점 캔들 추출 (_extract_diagonal_candles와 같은 형식)"""
+        anchor = self.anchors.get(direction)
+        if not anchor or not anchor.get('point_second') or not anchor.get('point_b'):
+            return None
+
+        index_by_ts = {c['timestamp']: idx for idx, c in enumerate(candles_1h)}
+
+        def candle_info(point):
+            idx = index_by_ts.get(point['timestamp_ms'])
+            if idx is None:
+                return None
+            candle = candles_1h[idx]
+            return {
+                'index': idx,
+                'timestamp': self.format_time(candle['timestamp']),
+                'timestamp_ms': candle['timestamp'],
+                'open': candle.get('open'),
+                'high': candle.get('high'),
+                'low': candle.get('low'),
+                'close': candle.get('close'),
+                'volume': candle.get('volume')
+            }
+
+        points = {key: candle_info(anchor[key]) for key in ('point_a', 'point_second', 'point_b')}
+        if not all(points.values()):
+            return None
+
+        return {
+            'diagonal_type': direction,
+            'price_field': self.DIRECTIONS[direction]['price_field'],
+            'source': 'auto',
+            **points
+        }
@@ -0,0 +1,124 @@
+from datetime import datetime
+
+from app.database.db import SessionLocal
+from app.models.scheduled_job import ScheduledJobRecord
+from .serialization import to_jsonable
+
+
+def _parse_run_at(scheduled_time):
+    if isinstance(scheduled_time, datetime):
+        return scheduled_time.replace(tzinfo=None)
+    if isinstance(scheduled_time, str):
+        try:
+            return datetime.fromisoformat(scheduled_time).replace(tzinfo=None)
+        except ValueError:
+            return None
+    return None
+
+
+class PersistentJobRegistry(dict):
+    """active_jobs의 write-through 저장소
+
+    기존 코드가 사용하는 dict 인터페이스(항목 대입, del, pop, clear)를 그대로 유지하면서
+    변경될 때마다 SQLite scheduled_jobs 테이블에 반영합니다. 항목의 type과 scheduled_time으로
+    재시작 시 작업을 복구하므로, 모니터링 작업의 position_side/expected_minutes처럼 실행에 필요한
+    값은 항목에 함께 저장되어 있어야 합니다.
+
+    DB 오류는 출력만 하고 메모리 상태는 그대로 유지합니다 (스케줄링을 막지 않음).
+    on_change가 주어지면 항목이 바뀔 때마다 호출합니다 (WebSocket jobs 토픽 갱신).
+    """
+
+    def __init__(self, on_change=None):
+        super().__init__()
+        self.on_change = on_change
+
+    def __setitem__(self, job_id, job_info):
+        super().__setitem__(job_id, job_info)
+        self._save(job_id, job_info)
+        self._changed()
+
+    def __delitem__(self, job_id):
+        super().__delitem__(job_id)
+        self._delete([job_id])
+        self._changed()
+
+    def pop(self, job_id, *default):
+        existed = job_id in self
+        value = super().pop(job_id, *default)
+        if existed:
+            self._delete([job_id])
+            self._changed()
+        return value
+
+    def clear(self):
+        job_ids = list(self.keys())
+        super().clear()
+        self._delete(job_ids)
+        self._changed()
+
+    def _changed(self):
+        if self.on_change is None:
+            return
+        try:
+            self.on_change()
+        except Exception as e:
+            print(f"예약 작업 변경 알림 실패: {str(e)}")
+
+    def _save(self, job_id, job_info):
+        db = SessionLocal()
+        try:
+            db.merge(ScheduledJobRecord(
+                job_id=job_id,
+                job_type=str(job_info.get('type')),
+                run_at=_parse_run_at(job_info.get('scheduled_time')),
+                # datetime 등은 문자열로 변환하여 JSON 컬럼에 저장
+                job_info=to_jsonable(job_info),
+            ))
+            db.commit()
+        except Exception as e:
+            print(f"예약 작업 저장 실패 ({job_id}): {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
+    def _delete(self, job_ids):
+        if not job_ids:
+            return
+        db = SessionLocal()
+        try:
+            db.query(ScheduledJobRecord).filter(
+                ScheduledJobRecord.job_id.in_(job_ids)
+            ).delete(synchronize_session=False)
+            db.commit()
+        except Exception as e:
+            print(f"예약 작업 삭제 실패 ({job_ids}): {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
+    @staticmethod
+    def load_records():
+        """저장된 예약 작업 목록 (실행 시간순)"""
+        db = SessionLocal()
+        try:
+            records = db.query(ScheduledJobRecord).order_by(ScheduledJobRecord.run_at).all()
+            return [
+                {
+                    'job_id': record.job_id,
+                    'job_type': record.job_type,
+                    'run_at': record.run_at,
+                    'job_info': record.job_info or {},
+                }
+                for record in records
+            ]
+        finally:
+            db.close()
+
+    def discard_records(self, job_ids):
+        """복구하지 않는 저장 기록 삭제 (메모리 항목은 없음)"""
+        self._delete(list(job_ids))
+
+    def restore(self, job_id, job_info):
+        """저장 기록에서 메모리 항목만 복원 (DB 재기록 없음)"""
+        super().__setitem__(job_id, job_info)
+        self._changed()
@@ -0,0 +1,111 @@
+from contextlib import contextmanager
+import time
+
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+
+# 트레이딩 엔진 주요 경로의 Prometheus 메트릭 (GET /metrics)
+# 모든 메트릭은 프로세스 전역 기본 레지스트리에 등록됩니다. 라벨 값은 엔드포인트 경로, 시간봉,
+# 모델 ID, 작업 함수 이름처럼 종류가 제한된 값만 사용합니다 (쿼리 문자열, 작업 ID 등은 사용하지 않음).
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+LLM_LATENCY_BUCKETS = (1, 2.5, 5, 10, 20, 30, 45, 60, 90, 120, 180, 300)
+LAG_BUCKETS = (0.01, 0.05, 0.1, 0.5, 1, 2, 5, 10, 30, 60, 300)
+
+# ---- Bitget REST ----
+BITGET_REQUEST_SECONDS = Histogram(
+    'bitget_request_seconds', 'Bitget REST 요청 시간 (재시도 1회 단위)',
+    ['method', 'endpoint', 'status'], buckets=LATENCY_BUCKETS,
+)
+BITGET_RATE_LIMITED_TOTAL = Counter(
+    'bitget_rate_limited_total', 'Bitget 429 응답 수', ['endpoint'],
+)
+BITGET_THROTTLE_WAIT_SECONDS = Histogram(
+    'bitget_throttle_wait_seconds', '요청 간격 제한으로 대기한 시간', buckets=LATENCY_BUCKETS,
+)
+
+# ---- 시장 데이터 ----
+CANDLE_FETCH_SIZE = Histogram(
+    'candle_fetch_size', '시장 데이터 수집 시 받은 캔들 수', ['granularity'],
+    buckets=(10, 50, 100, 200, 400, 600, 800, 1000),
+)
+INDICATOR_COMPUTE_SECONDS = Histogram(
+    'indicator_compute_seconds', '시간봉별 기술적 지표 계산 시간', ['timeframe'], buckets=LATENCY_BUCKETS,
+)
+
+# ---- 프롬프트 / LLM ----
+PROMPT_BUILD_SECONDS = Histogram(
+    'prompt_build_seconds', '프롬프트 생성 시간', ['mode'], buckets=LATENCY_BUCKETS,
+)
+PROMPT_ESTIMATED_TOKENS = Histogram(
+    'prompt_estimated_tokens', '프롬프트 근사 토큰 수', ['mode'],
+    buckets=(1000, 2500, 5000, 10000, 20000, 30000, 50000, 80000, 120000),
+)
+LLM_REQUEST_SECONDS = Histogram(
+    'llm_request_seconds', 'AI 분석 호출 시간 (폴백 포함)', ['model', 'outcome'], buckets=LLM_LATENCY_BUCKETS,
+)
+LLM_TOKENS_TOTAL = Counter(
+    'llm_tokens_total', '공급자가 보고한 토큰 사용량', ['model', 'direction'],
+)
+LLM_CACHE_HITS_TOTAL = Counter(
+    'llm_cache_hits_total', 'AI 응답 캐시 적중 수', ['model'],
+)
+
+# ---- 스케줄러 ----
+SCHEDULER_LAG_SECONDS = Histogram(
+    'scheduler_lag_seconds', '예약 시간 대비 작업 시작 지연', ['job'], buckets=LAG_BUCKETS,
+)
+SCHEDULER_JOB_SECONDS = Histogram(
+    'scheduler_job_seconds', '예약 작업 실행 시간', ['job', 'event'], buckets=LLM_LATENCY_BUCKETS,
+)
+
+# ---- WebSocket ----
+WS_CLIENTS = Gauge('ws_clients', '연결된 WebSocket 클라이언트 수')
+WS_SEND_LAG_SECONDS = Histogram(
+    'ws_send_lag_seconds', '메시지가 송신 대기열에서 기다린 시간', buckets=LAG_BUCKETS,
+)
+WS_EVICTIONS_TOTAL = Counter('ws_evictions_total', '느린 소비자 처리 수', ['policy'])
+
+# ---- DB ----
+DB_QUERY_SECONDS = Histogram(
+    'db_query_seconds', 'SQLite 쿼리 실행 시간', ['statement'], buckets=LATENCY_BUCKETS,
+)
+
+
+@contextmanager
+def timed(histogram, **labels):
+    """with 블록 실행 시간을 histogram에 기록"""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        (histogram.labels(**labels) if labels else histogram).observe(time.perf_counter() - started)
+
+
+def record_llm_call(model, result, latency_seconds):
+    """AI 분석 1회의 지연 시간, 토큰 사용량, 프롬프트 크기 기록 (model은 실제 응답한 모델 ID)"""
+    outcome = 'error' if not result or 'error_info' in result else 'ok'
+    LLM_REQUEST_SECONDS.labels(model=model, outcome=outcome).observe(latency_seconds)
+    if outcome != 'ok':
+        return
+
+    from .prompt_profiler import _input_tokens, _output_tokens
+
+    usage = result.get('usage')
+    input_tokens = _input_tokens(usage)
+    output_tokens = _output_tokens(usage)
+    if input_tokens:
+        LLM_TOKENS_TOTAL.labels(model=model, direction='input').inc(input_tokens)
+    if output_tokens:
+        LLM_TOKENS_TOTAL.labels(model=model, direction='output').inc(output_tokens)
+
+    profile = result.get('prompt_profile')
+    if profile:
+        if profile.get('build_ms') is not None:
+            PROMPT_BUILD_SECONDS.labels(mode=profile['mode']).observe(profile['build_ms'] / 1000)
+        PROMPT_ESTIMATED_TOKENS.labels(mode=profile['mode']).observe(profile['estimated_total_tokens'])
+
+
+def render_latest():
+    """Prometheus 텍스트 노출 형식 (본문, content-type)"""
+    return generate_latest(), CONTENT_TYPE_LATEST
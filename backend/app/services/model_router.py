@@ -0,0 +1,108 @@
+from collections import deque
+from datetime import datetime
+import math
+import threading
+
+
+class ModelRouter:
+    """지연 시간 SLO 기반 모델 선택 및 폴백 체인
+
+    모델별 최근 호출의 지연 시간(p50/p95)과 오류율을 기록하고,
+    호출별 마감 시간(deadline) 안에 끝날 것으로 예상되는 모델을 우선 선택합니다.
+    선택된 모델이 마감 직전까지 응답하지 않거나 실패하면 설정된 체인의 다음 모델로 넘어갑니다.
+    """
+
+    HISTORY_SIZE = 50
+    MIN_SAMPLES = 3  # 이 개수 미만이면 지연 시간 추정 없이 후보로 허용
+
+    def __init__(self, chain, deadline_seconds=600, max_error_rate=0.5, min_attempt_seconds=60, enabled=True):
+        """
+        Args:
+            chain: 폴백 순서의 모델 타입 목록 (AIService.set_model에 사용하는 이름)
+            deadline_seconds: 기본 호출 마감 시간 (초)
+            max_error_rate: 이 오류율 이상인 모델은 뒤로 미룸
+            min_attempt_seconds: 한 모델에 최소로 허용하는 시간 (초)
+        """
+        self.chain = list(chain)
+        self.deadline_seconds = deadline_seconds
+        self.max_error_rate = max_error_rate
+        self.min_attempt_seconds = min_attempt_seconds
+        self.enabled = enabled
+        self._history = {}  # model -> deque[(latency_seconds, ok, time)]
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _percentile(values, percent):
+        if not values:
+            return None
+        ordered = sorted(values)
+        rank = max(int(math.ceil(percent / 100 * len(ordered))) - 1, 0)
+        return ordered[rank]
+
+    def record(self, model, latency_seconds, ok):
+        """호출 결과 기록 (타임아웃은 ok=False, latency=허용 시간)"""
+        with self._lock:
+            history = self._history.setdefault(model, deque(maxlen=self.HISTORY_SIZE))
+            history.append((latency_seconds, ok, datetime.now()))
+
+    def get_model_stats(self, model):
+        with self._lock:
+            history = list(self._history.get(model, []))
+        latencies = [latency for latency, ok, _ in history if ok]
+        return {
+            'samples': len(history),
+            'p50_seconds': self._percentile(latencies, 50),
+            'p95_seconds': self._percentile(latencies, 95),
+            'error_rate': (sum(1 for _, ok, _ in history if not ok) / len(history)) if history else 0.0,
+            'last_call': history[-1][2].isoformat() if history else None,
+        }
+
+    def _expected_in_time(self, stats, deadline_seconds):
+        if stats['samples'] < self.MIN_SAMPLES or stats['p95_seconds'] is None:
+            return True
+        return stats['p95_seconds'] <= deadline_seconds
+
+    def plan(self, preferred, deadline_seconds=None, available=None):
+        """시도할 모델 순서 결정
+
+        마감 안에 끝날 것으로 예상되고 오류율이 낮은 모델을 먼저 두고 (선택 모델 우선, 이후 체인 순서),
+        나머지는 뒤에 둡니다. 라우터가 꺼져 있으면 선택 모델만 반환합니다.
+        """
+        if not self.enabled:
+            return [preferred]
+
+        deadline_seconds = deadline_seconds or self.deadline_seconds
+        candidates = [preferred] + [model for model in self.chain if model != preferred]
+        if available is not None:
+            candidates = [model for model in candidates if model == preferred or available(model)]
+
+        healthy, degraded = [], []
+        for model in candidates:
+            stats = self.get_model_stats(model)
+            if self._expected_in_time(stats, deadline_seconds) and stats['error_rate'] < self.max_error_rate:
+                healthy.append(model)
+            else:
+                degraded.append(model)
+
+        plan = healthy + degraded
+        if plan[0] != preferred:
+            print(f"모델 라우터: {preferred} 대신 {plan[0]} 우선 사용 (마감 {deadline_seconds}초)")
+        return plan
+
+    def attempt_timeout(self, remaining_seconds, next_model=None):
+        """현재 모델에 허용할 시간 (다음 모델의 p50만큼 여유를 남김, 기록이 없으면 최소 시도 시간)"""
+        reserve = 0
+        if next_model:
+            reserve = self.get_model_stats(next_model)['p50_seconds'] or self.min_attempt_seconds
+        return max(remaining_seconds - reserve, self.min_attempt_seconds)
+
+    def get_stats(self):
+        with self._lock:
+            models = list(dict.fromkeys(self.chain + list(self._history.keys())))
+        return {
+            'enabled': self.enabled,
+            'chain': self.chain,
+            'deadline_seconds': self.deadline_seconds,
+            'max_error_rate': self.max_error_rate,
+            'models': {model: self.get_model_stats(model) for model in models},
+        }
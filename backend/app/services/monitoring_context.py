@@ -0,0 +1,244 @@
+from collections import deque
+from datetime import datetime, timedelta
+import json
+
+from .diagonal_analytics import format_diagonal_analytics
+
+
+class MonitoringContext:
+    """모니터링용 델타 컨텍스트 프롬프트 생성
+
+    진입 시점(또는 직전 모니터링 시점)의 스냅샷을 기준으로, 이후 새로 생성된
+    캔들, 주요 지표 변화, 빗각 이벤트만 모니터링 프롬프트에 담습니다.
+    델타가 너무 커지면 None을 반환하여 전체 프롬프트로 대체합니다.
+    """
+
+    DELTA_TIMEFRAMES = ('15m', '1H')
+    MAX_DELTA_CANDLES = {'15m': 48, '1H': 12}  # 초과 시 전체 프롬프트 사용
+    MAX_PROMPT_CHARS = 40000
+    MAX_ENTRY_REASON_CHARS = 3000
+    CYCLE_HISTORY_SIZE = 50
+
+    # 변화량을 보고할 지표 (표시 이름, 경로)
+    TRACKED_INDICATORS = [
+        ('RSI(14)', ('rsi', 'rsi14')),
+        ('MACD 히스토그램', ('macd', 'standard', 'histogram')),
+        ('ADX', ('dmi', 'adx')),
+        ('+DI', ('dmi', 'plus_di')),
+        ('-DI', ('dmi', 'minus_di')),
+        ('EMA21', ('moving_averages', 'exponential', 'ema21')),
+        ('EMA55', ('moving_averages', 'exponential', 'ema55')),
+        ('ATR%', ('atr', 'percent')),
+    ]
+
+    def __init__(self):
+        self.baseline = None
+        self.entry_summary = None
+        self.cycles = deque(maxlen=self.CYCLE_HISTORY_SIZE)
+
+    @staticmethod
+    def _get_path(data, path):
+        for key in path:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+        try:
+            return float(data) if data is not None else None
+        except (TypeError, ValueError):
+            return None
+
+    @staticmethod
+    def _format_time(timestamp_ms):
+        return (datetime.utcfromtimestamp(timestamp_ms / 1000) + timedelta(hours=9)).strftime('%Y-%m-%d %H:%M')
+
+    def _snapshot(self, market_data):
+        """기준 스냅샷 (마감 캔들 timestamp와 주요 지표 값)"""
+        candlesticks = market_data.get('candlesticks', {})
+        indicators = market_data.get('technical_indicators', {})
+
+        last_closed = {}
+        for timeframe in self.DELTA_TIMEFRAMES:
+            candles = candlesticks.get(timeframe) or []
+            if len(candles) >= 2:
+                last_closed[timeframe] = candles[-2]['timestamp']
+
+        indicator_values = {
+            timeframe: {name: self._get_path(indicators.get(timeframe, {}), path) for name, path in self.TRACKED_INDICATORS}
+            for timeframe in self.DELTA_TIMEFRAMES
+        }
+
+        return {
+            'time': datetime.now(),
+            'price': market_data.get('current_market', {}).get('price'),
+            'last_closed': last_closed,
+            'indicators': indicator_values,
+        }
+
+    def start(self, market_data, entry_result):
+        """포지션 진입 시 기준 스냅샷과 진입 판단 요약 저장"""
+        self.baseline = self._snapshot(market_data)
+        reason = entry_result.get('reason', '') or ''
+        if len(reason) > self.MAX_ENTRY_REASON_CHARS:
+            reason = reason[:self.MAX_ENTRY_REASON_CHARS] + "\n...(이하 생략)"
+        self.entry_summary = {
+            'time': self.baseline['time'],
+            'price': self.baseline['price'],
+            'action': entry_result.get('action'),
+            'leverage': entry_result.get('leverage'),
+            'stop_loss_roe': entry_result.get('stop_loss_roe'),
+            'take_profit_roe': entry_result.get('take_profit_roe'),
+            'expected_minutes': entry_result.get('expected_minutes'),
+            'reason': reason,
+        }
+
+    def advance(self, market_data):
+        """모니터링 실행 후 기준 스냅샷을 현재 시점으로 갱신"""
+        if self.baseline is not None:
+            self.baseline = self._snapshot(market_data)
+
+    def clear(self):
+        """포지션 종료 시 기준 정보 초기화"""
+        self.baseline = None
+        self.entry_summary = None
+
+    def _new_candles(self, market_data, timeframe):
+        """기준 시점 이후 캔들 (마감 캔들 + 진행 중인 캔들)"""
+        candles = market_data.get('candlesticks', {}).get(timeframe) or []
+        since = self.baseline['last_closed'].get(timeframe)
+        if since is None:
+            return None
+        return [
+            {
+                'time': self._format_time(c['timestamp']),
+                'open': c['open'],
+                'high': c['high'],
+                'low': c['low'],
+                'close': c['close'],
+                'volume': c['volume'],
+            }
+            for c in candles if c['timestamp'] > since
+        ]
+
+    def _indicator_changes(self, market_data):
+        indicators = market_data.get('technical_indicators', {})
+        lines = []
+        for timeframe in self.DELTA_TIMEFRAMES:
+            previous = self.baseline['indicators'].get(timeframe, {})
+            changes = []
+            for name, path in self.TRACKED_INDICATORS:
+                before = previous.get(name)
+                after = self._get_path(indicators.get(timeframe, {}), path)
+                if before is None or after is None:
+                    continue
+                changes.append(f"{name} {before:.2f} → {after:.2f} ({after - before:+.2f})")
+            if changes:
+                lines.append(f"- {timeframe}: " + ", ".join(changes))
+        return "\n".join(lines) if lines else "- 변화 정보 없음"
+
+    def build_delta_prompt(self, market_data, position_info=None):
+        """델타 컨텍스트 모니터링 프롬프트 생성
+
+        Returns:
+            str 또는 None: 기준 정보가 없거나 델타가 너무 크면 None (전체 프롬프트 사용)
+        """
+        if not self.baseline or not self.entry_summary:
+            print("델타 컨텍스트: 기준 스냅샷 없음 → 전체 프롬프트 사용")
+            return None
+
+        new_candles = {}
+        for timeframe in self.DELTA_TIMEFRAMES:
+            candles = self._new_candles(market_data, timeframe)
+            if candles is None:
+                print(f"델타 컨텍스트: {timeframe} 기준 캔들 없음 → 전체 프롬프트 사용")
+                return None
+            if len(candles) > self.MAX_DELTA_CANDLES[timeframe]:
+                print(f"델타 컨텍스트: {timeframe} 신규 캔들 {len(candles)}개 > {self.MAX_DELTA_CANDLES[timeframe]}개 → 전체 프롬프트 사용")
+                return None
+            new_candles[timeframe] = candles
+
+        entry = self.entry_summary
+        current_market = market_data.get('current_market', {})
+        indicator_summaries = market_data.get('indicator_summaries', {})
+        diagonal_info = format_diagonal_analytics(market_data.get('diagonal_settings', {}).get('analytics'))
+
+        position_text = "- 포지션 정보 없음"
+        if position_info:
+            position_text = (
+                f"- 방향: {position_info.get('side')}\n"
+                f"- 진입가: {position_info.get('entry_price')} USDT\n"
+                f"- 레버리지: {position_info.get('leverage')}x\n"
+                f"- 미실현 손익: {position_info.get('unrealized_pnl')} USDT (ROE {position_info.get('roe')}%)"
+            )
+
+        candle_sections = []
+        for timeframe, candles in new_candles.items():
+            candle_sections.append(f"**{timeframe} ({len(candles)}개, 마지막은 진행 중인 캔들):**")
+            candle_sections.append(json.dumps(candles, ensure_ascii=False))
+
+        summary_sections = [indicator_summaries[tf] for tf in self.DELTA_TIMEFRAMES if tf in indicator_summaries]
+
+        prompt = f"""### 포지션 모니터링 (델타 컨텍스트)
+
+진입 시점의 전체 분석은 이미 완료되었습니다. 아래에는 진입 판단 요약과 **마지막 분석 이후 변경된 데이터만** 제공됩니다.
+진입 근거가 여전히 유효한지 판단하여 유지(HOLD), 같은 방향 재확인(TP/SL 갱신), 또는 반대 방향 전환을 결정하세요.
+
+### 진입 판단 요약:
+- 진입 시간: {entry['time'].strftime('%Y-%m-%d %H:%M')}
+- 진입 시 가격: {entry['price']} USDT
+- 결정: {entry['action']} (레버리지 {entry['leverage']}x, SL {entry['stop_loss_roe']}%, TP {entry['take_profit_roe']}%, 예상 {entry['expected_minutes']}분)
+- 진입 근거:
+{entry['reason']}
+
+### 현재 포지션:
+{position_text}
+
+### 현재 시장 상태:
+- 현재가: {current_market.get('price')} USDT
+- 24시간 고가/저가: {current_market.get('24h_high')} / {current_market.get('24h_low')} USDT
+- 마지막 분석 시점 가격: {self.baseline['price']} USDT ({self.baseline['time'].strftime('%Y-%m-%d %H:%M')})
+
+### 마지막 분석 이후 신규 캔들:
+{chr(10).join(candle_sections)}
+
+### 주요 지표 변화 (마지막 분석 → 현재):
+{self._indicator_changes(market_data)}
+
+### 현재 지표 요약:
+{chr(10).join(summary_sections) if summary_sections else '- 없음'}
+
+{diagonal_info if diagonal_info else '### 빗각 정보: 설정 없음'}
+
+Step 0 횡보 체크부터 동일한 기준으로 판단하고, 응답 형식은 기존 분석과 동일하게 작성하세요."""
+
+        if len(prompt) > self.MAX_PROMPT_CHARS:
+            print(f"델타 컨텍스트: 프롬프트 {len(prompt)}자 > {self.MAX_PROMPT_CHARS}자 → 전체 프롬프트 사용")
+            return None
+
+        return prompt
+
+    def record_cycle(self, mode, prompt_chars, latency_seconds, usage=None):
+        """모니터링 사이클별 토큰/지연 시간 기록"""
+        cycle = {
+            'time': datetime.now().isoformat(),
+            'mode': mode,  # 'delta' / 'full' / 'gate'
+            'prompt_chars': prompt_chars,
+            'latency_seconds': round(latency_seconds, 2),
+            'usage': usage,
+        }
+        self.cycles.append(cycle)
+        print(f"모니터링 사이클 기록: 모드={mode}, 프롬프트 {prompt_chars}자, 지연 {latency_seconds:.2f}초, 사용량={usage}")
+        return cycle
+
+    def get_stats(self):
+        """최근 모니터링 사이클 통계"""
+        cycles = list(self.cycles)
+        stats = {'cycles': cycles}
+        for mode in ('delta', 'full'):
+            mode_cycles = [c for c in cycles if c['mode'] == mode]
+            if mode_cycles:
+                stats[mode] = {
+                    'count': len(mode_cycles),
+                    'avg_prompt_chars': sum(c['prompt_chars'] for c in mode_cycles) / len(mode_cycles),
+                    'avg_latency_seconds': sum(c['latency_seconds'] for c in mode_cycles) / len(mode_cycles),
+                }
+        return stats
@@ -1,25 +1,52 @@
-from openai import OpenAI
+from openai import AsyncOpenAI, APIConnectionError, InternalServerError
+import asyncio
 import json
+import logging
 import time
 import numpy as np
 from datetime import datetime, date, timedelta
-from config.settings import OPENAI_API_KEY
+from config.settings import (
+    OPENAI_API_KEY, STRUCTURED_OUTPUT_ENABLED, DECISION_RATIONALE_MAX_CHARS,
+    OPENAI_THREAD_POLICY, OPENAI_THREAD_MAX_MESSAGES, OPENAI_RUN_TIMEOUT_SECONDS, OPENAI_RUN_MAX_RETRIES
+)
+from .assistant_threads import AssistantThreadManager
+from .prompt_profiler import profile_prompt
+from .tracer import pipeline_tracer
+from .structured_logging import LazyJSON
+from .structured_decision import build_json_instructions, parse_structured_decision
+from .prompt_compiler import compile_prompt_ir, render_current_market
 import re
 
+logger = logging.getLogger(__name__)
+
 class OpenAIService:
+    # 같은 스레드에 새 run을 열어 재시도해도 되는 일시적 전송 오류 (연결 끊김/타임아웃, 5xx)
+    RETRYABLE_ERRORS = (APIConnectionError, InternalServerError)
+    ACTIVE_RUN_STATUSES = ('queued', 'in_progress', 'requires_action', 'cancelling')
+
     def __init__(self):
-        self.client = OpenAI(api_key=OPENAI_API_KEY)
+        self.api_key = OPENAI_API_KEY
         self.assistant_id = "asst_uEs555PIWD31LYyoSNgt0nTf"
         self.monitoring_interval = 240  # 기본 모니터링 주기 (4시간)
+        self.structured_output = STRUCTURED_OUTPUT_ENABLED  # JSON 모드로 결정 수신
+        self.rationale_max_chars = DECISION_RATIONALE_MAX_CHARS
+        self.run_timeout = OPENAI_RUN_TIMEOUT_SECONDS
+        self.run_max_retries = OPENAI_RUN_MAX_RETRIES
+        self.thread_manager = AssistantThreadManager(OPENAI_THREAD_POLICY, OPENAI_THREAD_MAX_MESSAGES)
+
+    def _create_client(self):
+        """호출별 AsyncOpenAI 클라이언트 (분석은 스케줄러 루프와 API 서버 루프 양쪽에서 실행됨)"""
+        return AsyncOpenAI(api_key=self.api_key)
 
     def initialize_thread(self):
-        """이제 메서드마다 새 스레드가 생성되므로 이 메서드는 필요 없음"""
-        print("각 분석마다 새 스레드가 자동으로 생성됩니다.")
+        """스레드는 분석 시 스레드 정책에 따라 자동으로 생성됨"""
+        print(f"스레드는 분석 시 자동으로 생성됩니다. (정책: {self.thread_manager.policy})")
         return True
 
     def reset_thread(self):
-        """이제 메서드마다 새 스레드가 생성되므로 이 메서드는 필요 없음"""
-        print("각 분석마다 새 스레드가 자동으로 생성됩니다.")
+        """현재 스레드 폐기 (다음 분석에서 새 스레드 생성)"""
+        self.thread_manager.reset()
+        print("OpenAI 스레드가 초기화되었습니다.")
 
     def _create_monitoring_prompt(self, market_data, position_info):
         """모니터링용 프롬프트 생성"""
@@ -96,54 +123,56 @@ class OpenAIService:
                 formatted_data += json.dumps(data[-100:], indent=2)  # 최근 100개 캔들만 표시
         return formatted_data
 
-    async def analyze_market_data(self, market_data):
-        """시장 데이터 분석 및 트레이딩 판단"""
+    async def analyze_market_data(self, market_data, prompt=None, position_open=False):
+        """시장 데이터 분석 및 트레이딩 판단
+        
+        Args:
+            market_data: 수집된 시장 데이터
+            prompt: 지정 시 전체 분석 프롬프트 대신 사용 (모니터링 델타 컨텍스트 등)
+            position_open: 포지션 보유 중 여부 (per_position 스레드 정책)
+        """
         run = None
         thread_id = None
+        client = self._create_client()
         
         try:
             print("\n=== OpenAI API 분석 시작 ===")
             start_time = time.time()
             
-            # 매번 새로운 스레드 생성
-            thread = self.client.beta.threads.create()
-            thread_id = thread.id
-            print(f"새 스레드 생성됨: {thread_id}")
+            # 1. 스레드 정책에 따라 스레드 선택 (새로 생성 또는 재사용)
+            thread_id = await self.thread_manager.acquire(client, position_open=position_open)
 
             # 2. 메시지 생성 (데이터 포맷팅)
-            message_content = self._create_analysis_prompt(market_data)
+            build_start = time.perf_counter()
+            message_content = prompt if prompt else self._create_analysis_prompt(market_data)
+            prompt_build_ms = (time.perf_counter() - build_start) * 1000
+            output_instructions = build_json_instructions(self.rationale_max_chars) if self.structured_output else ""
+            message_content += output_instructions
 
             # 3. 스레드에 메시지 추가
-            message = self.client.beta.threads.messages.create(
+            message = await client.beta.threads.messages.create(
                 thread_id=thread_id,
                 role="user",
                 content=message_content
             )
             print(f"메시지 추가됨: {message.id}")
 
-            # 4. 분석 실행
-            run = self.client.beta.threads.runs.create(
-                thread_id=thread_id,
-                assistant_id=self.assistant_id
-            )
-            print(f"분석 실행 시작됨: {run.id}")
-
-            # 5. 실행 완료 대기
-            run = self._wait_for_run(thread_id, run.id)
+            # 4. 분석 실행 (스트리밍, 구조화 출력 시 JSON 모드)
+            run_params = {}
+            if self.structured_output:
+                run_params["response_format"] = {"type": "json_object"}
+            run, response_text = await self._stream_run(client, thread_id, **run_params)
 
-            # 6. 응답 받기
-            messages = self.client.beta.threads.messages.list(thread_id=thread_id)
-            
-            # 7. 응답 파싱
-            if not messages.data:
-                raise Exception("응답 메시지가 없습니다.")
-                
-            print(f"응답 메시지 수신됨: {messages.data[0].id}")
-            analysis = self._parse_ai_response(messages.data[0].content[0].text.value)
+            # 5. 응답 파싱
+            analysis = None
+            if self.structured_output:
+                analysis = parse_structured_decision(response_text, self.rationale_max_chars)
+            if analysis is None:
+                analysis = self._parse_ai_response(response_text)
             
             # 8. 응답 출력 추가
-            print("\n=== 파싱 시작: 원본 응답 ===")
-            print(messages.data[0].content[0].text.value)
+            print(f"\n=== 파싱 시작: 원본 응답 ({len(response_text or '')}자) ===")
+            logger.debug("%s", response_text)
 
             # 9. expected_minutes가 10분 미만인 경우 30분으로 설정
             if analysis and analysis.get('action') in ['ENTER_LONG', 'ENTER_SHORT']:
@@ -178,6 +207,15 @@ class OpenAIService:
             # 총 소요 시간 계산 및 로깅
             elapsed_time = time.time() - start_time
             print(f"분석 완료: 총 소요 시간 {elapsed_time:.2f}초")
+            
+            # 프롬프트 크기 및 토큰 사용량 기록
+            analysis['prompt_chars'] = len(message_content)
+            analysis['usage'] = run.usage.model_dump() if getattr(run, 'usage', None) else None
+            analysis['prompt_profile'] = profile_prompt(
+                market_data, message_content, prompt_build_ms, delta=bool(prompt),
+                system_prompt=None, output_instructions=output_instructions
+            )
+            self.thread_manager.record(thread_id, analysis)
 
             return analysis
 
@@ -198,6 +236,9 @@ class OpenAIService:
             thread_info = f"Thread ID: {thread_id if thread_id else 'None'}"
             run_info = f"Run ID: {run.id if run else 'None'}"
             print(f"API 호출 정보: {thread_info}, {run_info}")
+
+            # 실패한 스레드는 재사용하지 않음
+            self.thread_manager.reset()
             
             # 예외 발생 시 기본값 반환
             return {
@@ -217,67 +258,98 @@ class OpenAIService:
                     "run_id": run.id if run else None
                 }
             }
+        finally:
+            await client.close()
+
+    async def _stream_run(self, client, thread_id, **run_params):
+        """스트리밍 실행: run 이벤트를 수신하며 완료까지 대기 (이벤트 루프를 막지 않음)
 
-    def _wait_for_run(self, thread_id, run_id, max_retries=5, timeout=300):
-        """실행 완료 대기 (재시도 로직, 타임아웃, 로깅 개선)"""
+        실패/타임아웃/취소된 run이 아직 활성 상태면 먼저 취소하고, 전송 오류일 때만 같은 스레드에
+        새 run으로 재시도합니다 (활성 run이 남아 있으면 같은 스레드의 새 run이 거부됨).
+
+        Returns:
+            (run, response_text): 완료된 run 객체와 assistant 응답 텍스트
+        """
         retries = 0
-        start_time = time.time()
-        last_status = None
         backoff_factor = 1.5  # 지수 백오프를 위한 계수
-        
+
         while True:
-            # 타임아웃 체크
-            elapsed_time = time.time() - start_time
-            if elapsed_time > timeout:
-                print(f"타임아웃 발생: {elapsed_time:.2f}초 경과 (제한: {timeout}초)")
-                raise Exception(f"Assistant run timed out after {timeout} seconds")
-                
+            start_time = time.time()
+            state = {'run_id': None, 'status': None}
             try:
-                run = self.client.beta.threads.runs.retrieve(
-                    thread_id=thread_id,
-                    run_id=run_id
+                return await asyncio.wait_for(
+                    self._consume_run_stream(client, thread_id, start_time, state, **run_params),
+                    timeout=self.run_timeout
                 )
-                
-                # 상태 변경 로깅
-                if run.status != last_status:
-                    print(f"Assistant run 상태 변경: {last_status} -> {run.status} (경과 시간: {elapsed_time:.2f}초)")
-                    last_status = run.status
-                
-                if run.status == 'completed':
-                    print(f"Assistant run 완료됨: {run.id} (총 소요 시간: {elapsed_time:.2f}초)")
-                    return run
-                elif run.status == 'failed':
-                    if retries < max_retries:
-                        retries += 1
-                        wait_time = 2 * (backoff_factor ** retries)  # 지수 백오프 적용
-                        print(f"Assistant run failed, 재시도 중... ({retries}/{max_retries}) - {wait_time:.2f}초 후 재시도")
-                        time.sleep(wait_time)
-                        continue
-                    else:
-                        print(f"최대 재시도 횟수 초과: {max_retries}회")
-                        raise Exception(f"Assistant run failed after {max_retries} retries")
-                elif run.status == 'requires_action':
-                    print(f"Assistant run requires action: {run.id}")
-                    # 필요한 경우 여기에 action 처리 로직 추가
-                    time.sleep(1)
-                else:
-                    # 기타 상태 (in_progress, queued 등)
-                    # 30초마다 현재 상태 로깅
-                    if elapsed_time % 30 < 1:
-                        print(f"현재 상태: {run.status}, 경과 시간: {elapsed_time:.2f}초")
-                    time.sleep(1)
-                
+            except asyncio.TimeoutError:
+                print(f"타임아웃 발생: {time.time() - start_time:.2f}초 경과 (제한: {self.run_timeout}초)")
+                await self._cancel_active_run(client, thread_id, state)
+                raise Exception(f"Assistant run timed out after {self.run_timeout} seconds")
+            except asyncio.CancelledError:
+                # 호출자가 취소한 경우(모델 라우터 마감 등)에도 서버에서 계속 실행되지 않도록 run 취소
+                await self._cancel_active_run(client, thread_id, state)
+                raise
             except Exception as e:
-                if retries < max_retries:
+                retryable = isinstance(e, self.RETRYABLE_ERRORS)
+                await self._cancel_active_run(client, thread_id, state, wait=retryable)
+                if retryable and retries < self.run_max_retries:
                     retries += 1
                     wait_time = 2 * (backoff_factor ** retries)  # 지수 백오프 적용
-                    print(f"API 호출 중 오류 발생, 재시도 중... ({retries}/{max_retries}): {str(e)} - {wait_time:.2f}초 후 재시도")
-                    time.sleep(wait_time)
+                    print(f"Assistant run 실패, 재시도 중... ({retries}/{self.run_max_retries}): {str(e)} - {wait_time:.2f}초 후 재시도")
+                    await asyncio.sleep(wait_time)
                     continue
-                else:
-                    print(f"API 호출 최대 재시도 횟수 초과: {max_retries}회")
-                    raise Exception(f"API 호출 실패: {str(e)}")
+                if retryable:
+                    print(f"최대 재시도 횟수 초과: {self.run_max_retries}회")
+                raise
+
+    async def _cancel_active_run(self, client, thread_id, state, wait=False, wait_seconds=10):
+        """중단된 run이 아직 활성 상태면 취소 (wait=True면 종료 상태가 될 때까지 잠시 대기)"""
+        run_id = state.get('run_id')
+        if not run_id or state.get('status') not in self.ACTIVE_RUN_STATUSES:
+            return
+        try:
+            run = await client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run_id)
+            print(f"활성 Assistant run 취소 요청: {run_id}")
+            deadline = time.time() + wait_seconds
+            while wait and run.status in self.ACTIVE_RUN_STATUSES and time.time() < deadline:
+                await asyncio.sleep(1)
+                run = await client.beta.threads.runs.retrieve(thread_id=thread_id, run_id=run_id)
+        except Exception as e:
+            print(f"Assistant run 취소 실패 ({run_id}): {str(e)}")
 
+    async def _consume_run_stream(self, client, thread_id, start_time, state, **run_params):
+        last_status = None
+        async with client.beta.threads.runs.stream(
+            thread_id=thread_id,
+            assistant_id=self.assistant_id,
+            **run_params
+        ) as stream:
+            async for event in stream:
+                if event.event.startswith('thread.run.') and not event.event.startswith('thread.run.step'):
+                    status = event.data.status
+                    state['run_id'], state['status'] = event.data.id, status  # 실패 시 취소할 run
+                    if status != last_status:
+                        print(f"Assistant run 상태 변경: {last_status} -> {status} (경과 시간: {time.time() - start_time:.2f}초)")
+                        last_status = status
+                    if event.event in ('thread.run.failed', 'thread.run.cancelled', 'thread.run.expired', 'thread.run.incomplete'):
+                        raise Exception(f"Assistant run {status}: {event.data.last_error}")
+                    if event.event == 'thread.run.requires_action':
+                        raise Exception("Assistant run requires action (도구 호출은 지원하지 않음)")
+                elif event.event == 'error':
+                    raise Exception(f"Assistant stream error: {event.data}")
+
+            run = await stream.get_final_run()
+            messages = await stream.get_final_messages()
+
+        if not messages:
+            raise Exception("응답 메시지가 없습니다.")
+        response_text = "".join(
+            part.text.value for part in messages[-1].content if getattr(part, 'type', None) == 'text'
+        )
+        print(f"Assistant run 완료됨: {run.id} (총 소요 시간: {time.time() - start_time:.2f}초), 응답 메시지: {messages[-1].id}")
+        return run, response_text
+
+    @pipeline_tracer.traced('build_prompt')
     def _create_analysis_prompt(self, market_data):
         """분석을 위한 프롬프트 생성"""
         # JSON 직렬화 헬퍼 함수 추가
@@ -290,6 +362,9 @@ class OpenAIService:
                 return obj.item() if hasattr(obj, 'item') else str(obj)
             raise TypeError(f"Type {type(obj)} not serializable")
             
+        # 공유 프롬프트 컴파일러의 IR 사용 (스냅샷별 메모이즈)
+        ir = compile_prompt_ir(market_data)
+
         # 캔들스틱 데이터를 출력하지 않고 프롬프트에만 포함시키기 위해 별도 변수로 저장
         candlestick_data = f"""
 1분봉 데이터:
@@ -348,11 +423,7 @@ class OpenAIService:
 - expected minutes 동안 포지션 유지되면 강제 포지션 청산 후 30분 후 재분석 수행하여 다시 포지션 진입 결정
 
 **현재 시장 상태:**
-- 현재가: {market_data['current_market']['price']} USDT
-- 24시간 고가: {market_data['current_market']['24h_high']} USDT
-- 24시간 저가: {market_data['current_market']['24h_low']} USDT
-- 24시간 거래량: {market_data['current_market']['24h_volume']} BTC
-- 24시간 변동성: {round(((market_data['current_market']['24h_high'] - market_data['current_market']['24h_low']) / market_data['current_market']['24h_low']) * 100, 2)}%
+{render_current_market(ir)}
 
 **제공 데이터 (Scalping Priority Order):**
 1. Candlestick Data
@@ -421,11 +492,12 @@ EXPECTED_MINUTES: [정수] (HOLD 시 생략)
 
         return prompt
 
+    @pipeline_tracer.traced('parse_response')
     def _parse_ai_response(self, response_text):
         """AI 응답 파싱"""
         try:
-            print("\n=== 파싱 시작: 원본 응답 ===")
-            print(response_text)
+            print(f"\n=== 파싱 시작: 원본 응답 ({len(response_text or '')}자) ===")
+            logger.debug("%s", response_text)
             
             # 정규표현식 패턴 수정 (새로운 응답 형식 대응)
             action_pattern = re.compile(r'ACTION:\s*([A-Z_]+)', re.IGNORECASE)
@@ -591,8 +663,7 @@ EXPECTED_MINUTES: [정수] (HOLD 시 생략)
                 "next_analysis_time": (datetime.now() + timedelta(minutes=expected_minutes)).isoformat()
             }
             
-            print("\n=== 파싱 결과 ===")
-            print(json.dumps(result, indent=2, default=str))
+            logger.debug("\n=== 파싱 결과 ===\n%s", LazyJSON(result))
             
             return result
 
@@ -607,47 +678,35 @@ EXPECTED_MINUTES: [정수] (HOLD 시 생략)
         """포지션 모니터링 및 분석"""
         run = None
         thread_id = None
+        client = self._create_client()
         
         try:
             print("\n=== 포지션 모니터링 분석 시작 ===")
             start_time = time.time()
             
-            # 매번 새로운 스레드 생성
-            thread = self.client.beta.threads.create()
-            thread_id = thread.id
-            print(f"모니터링용 새 스레드 생성됨: {thread_id}")
+            # 스레드 정책에 따라 스레드 선택 (포지션 보유 중)
+            thread_id = await self.thread_manager.acquire(client, position_open=True)
             
             # 1. 모니터링용 프롬프트 생성
             message_content = self._create_monitoring_prompt(market_data, position_info)
 
             # 2. 스레드에 메시지 추가
-            message = self.client.beta.threads.messages.create(
+            message = await client.beta.threads.messages.create(
                 thread_id=thread_id,
                 role="user",
                 content=message_content
             )
             print(f"모니터링 메시지 추가됨: {message.id}")
 
-            # 3. 분석 실행
-            run = self.client.beta.threads.runs.create(
-                thread_id=thread_id,
-                assistant_id=self.assistant_id
-            )
-            print(f"모니터링 분석 시작됨: {run.id}")
-
-            # 4. 실행 완료 대기
-            run = self._wait_for_run(thread_id, run.id)
+            # 3. 분석 실행 (스트리밍)
+            run, response_text = await self._stream_run(client, thread_id)
+            print(f"모니터링 분석 완료됨: {run.id}")
 
-            # 5. 응답 받기
-            messages = self.client.beta.threads.messages.list(thread_id=thread_id)
-            
-            if not messages.data:
-                raise Exception("모니터링 응답 메시지가 없습니다.")
-                
-            # 6. 응답 파싱
-            monitoring_result = self._parse_monitoring_response(messages.data[0].content[0].text.value)
+            # 4. 응답 파싱
+            monitoring_result = self._parse_monitoring_response(response_text)
+            self.thread_manager.record(thread_id, monitoring_result)
             
-            # 7. 총 소요 시간 계산 및 로깅
+            # 5. 총 소요 시간 계산 및 로깅
             elapsed_time = time.time() - start_time
             print(f"모니터링 분석 완료: 총 소요 시간 {elapsed_time:.2f}초")
 
@@ -659,17 +718,20 @@ EXPECTED_MINUTES: [정수] (HOLD 시 생략)
             thread_info = f"Thread ID: {thread_id if thread_id else 'None'}"
             run_info = f"Run ID: {run.id if run else 'None'}"
             print(f"모니터링 API 호출 정보: {thread_info}, {run_info}")
+            self.thread_manager.reset()
             
             return {
                 "action": "HOLD",
                 "reason": f"모니터링 분석 중 오류 발생: {str(e)}"
             }
+        finally:
+            await client.close()
 
     def _parse_monitoring_response(self, response_text):
         """모니터링 응답 파싱"""
         try:
-            print("\n=== 모니터링 응답 파싱 시작 ===")
-            print(response_text)
+            print(f"\n=== 모니터링 응답 파싱 시작 ({len(response_text or '')}자) ===")
+            logger.debug("%s", response_text)
             
             # 정규표현식으로 ACTION 추출
             action_pattern = re.compile(r'ACTION:\s*\[?(HOLD|CLOSE_POSITION)\]?', re.IGNORECASE)
@@ -713,8 +775,7 @@ EXPECTED_MINUTES: [정수] (HOLD 시 생략)
                 "reason": analysis_details or "분석 상세 내용이 제공되지 않았습니다."
             }
         
-            print("\n=== 모니터링 파싱 결과 ===")
-            print(json.dumps(result, indent=2, ensure_ascii=False))
+            logger.debug("\n=== 모니터링 파싱 결과 ===\n%s", LazyJSON(result))
         
             return result
 
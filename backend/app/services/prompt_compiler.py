@@ -0,0 +1,454 @@
+from datetime import datetime, date, timedelta
+import json
+import re
+import threading
+import time
+
+from config.settings import PROMPT_CANDLE_DOWNSAMPLING_ENABLED, PROMPT_CANDLE_TOKEN_BUDGET, PROMPT_CANDLE_RECENT_FULL
+from .candle_downsampler import CandleDownsampler
+from .diagonal_analytics import format_diagonal_analytics
+
+# 토큰 수 근사 (오프라인): 영문/숫자/기호는 약 4자당 1토큰, 한글 등 비ASCII 문자는 약 1.5자당 1토큰
+_NON_ASCII_PATTERN = re.compile(r'[^\x00-\x7f]')
+ASCII_CHARS_PER_TOKEN = 4.0
+NON_ASCII_CHARS_PER_TOKEN = 1.5
+
+
+def estimate_tokens(text):
+    """토크나이저 없이 근사한 토큰 수"""
+    if not text:
+        return 0
+    non_ascii = len(_NON_ASCII_PATTERN.findall(text))
+    ascii_chars = len(text) - non_ascii
+    return int(round(ascii_chars / ASCII_CHARS_PER_TOKEN + non_ascii / NON_ASCII_CHARS_PER_TOKEN))
+
+
+def json_serializer(obj):
+    """프롬프트용 JSON 직렬화 헬퍼 (numpy/datetime 지원)"""
+    if isinstance(obj, bool) or str(type(obj)) == "<class 'numpy.bool_'>":
+        return str(obj)  # True/False를 "True"/"False" 문자열로 변환
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if str(type(obj)).startswith("<class 'numpy"):
+        return obj.item() if hasattr(obj, 'item') else str(obj)
+    raise TypeError(f"Type {type(obj)} not serializable")
+
+
+class PromptCompiler:
+    """시장 스냅샷을 공급자 중립 중간 표현(IR)으로 변환
+
+    캔들 변환(KST timestamp, 원본 index 유지), 지표 필터링, 빗각 캔들 정보 등
+    Claude/DeepSeek/OpenAI 프롬프트가 공통으로 사용하는 데이터를 한 번만 만들고
+    JSON 직렬화 결과까지 IR에 담아 둡니다. 공급자별 서비스는 아래 render_* 함수로
+    필요한 섹션만 렌더링합니다.
+
+    같은 market_data 객체에 대한 IR은 메모이즈되므로, 앙상블 호출이나 모델 전환 시
+    다시 만들지 않습니다.
+    """
+
+    CORE_TIMEFRAMES = ['15m', '1H', '4H']  # 12H, 1D 제외하여 토큰 절약
+    TIMEFRAME_DESCRIPTIONS = {
+        '15m': '15분봉',
+        '1H': '1시간봉',
+        '4H': '4시간봉'
+    }
+
+    # 다운샘플링 비활성화 시 시간봉별 최대 캔들 개수 제한 (최근 N개)
+    MAX_CANDLES_LIMIT = {
+        '15m': 400,  # 최근 400개 (약 100시간 = 4일)
+        '1H': 200,   # 최근 200개 (약 200시간 = 8일)
+        '4H': 100    # 최근 100개 (약 400시간 = 16일)
+    }
+
+    # 필요한 지표만 필터링 (토큰 절약)
+    ESSENTIAL_INDICATORS = [
+        'rsi', 'macd', 'macd_signal', 'macd_histogram',
+        'ema_21', 'ema_55', 'adx', 'atr', 'atr_percent',
+        'current_volume', 'avg_volume_20', 'volume_ratio',
+        'bb_upper', 'bb_middle', 'bb_lower', 'bb_width',
+        'volume_profile'
+    ]
+
+    CACHE_SIZE = 4
+
+    def __init__(self, downsampling=PROMPT_CANDLE_DOWNSAMPLING_ENABLED,
+                 token_budget=None, recent_full=None):
+        """
+        Args:
+            downsampling: True면 토큰 예산 내에서 전체 이력을 형태 보존 다운샘플링,
+                False면 MAX_CANDLES_LIMIT 기준 최근 N개로 자름
+            token_budget: 시간봉별 캔들 JSON 토큰 예산
+            recent_full: 시간봉별로 전부 유지할 최근 캔들 수
+        """
+        self.downsampling = downsampling
+        self.token_budget = token_budget or PROMPT_CANDLE_TOKEN_BUDGET
+        self.recent_full = recent_full or PROMPT_CANDLE_RECENT_FULL
+        self.downsampler = CandleDownsampler()
+        self._cache = []  # [(market_data, snapshot_key, ir)]
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def _snapshot_key(market_data):
+        """같은 객체가 이후 수정되었는지 확인하기 위한 가벼운 키"""
+        candlesticks = market_data.get('candlesticks', {})
+        last_candles = tuple(
+            (timeframe, len(candles), candles[-1].get('timestamp'), candles[-1].get('close'))
+            for timeframe, candles in sorted(candlesticks.items()) if candles
+        )
+        extracted = market_data.get('diagonal_settings', {}).get('extracted_candles', {})
+        diagonal_key = tuple(
+            ((extracted.get(direction) or {}).get(point) or {}).get('index')
+            for direction in ('uptrend', 'downtrend')
+            for point in ('point_a', 'point_second', 'point_b')
+        )
+        return (market_data.get('current_market', {}).get('price'), last_candles, diagonal_key)
+
+    def compile(self, market_data):
+        """market_data → IR (스냅샷별 메모이즈)"""
+        key = self._snapshot_key(market_data)
+        with self._lock:
+            for cached_data, cached_key, ir in self._cache:
+                if cached_data is market_data and cached_key == key:
+                    self.hits += 1
+                    return ir
+
+        ir = self._build(market_data)
+
+        with self._lock:
+            self.misses += 1
+            self._cache = [entry for entry in self._cache if entry[0] is not market_data]
+            self._cache.append((market_data, key, ir))
+            if len(self._cache) > self.CACHE_SIZE:
+                self._cache.pop(0)
+        return ir
+
+    def _build(self, market_data):
+        """IR 생성 (섹션별 생성 시간을 build_ms에 기록)"""
+        build_ms = {}
+
+        def timed(name, func, *args):
+            start = time.perf_counter()
+            value = func(*args)
+            build_ms[name] = round((time.perf_counter() - start) * 1000, 2)
+            return value
+
+        current_time_kst = datetime.utcnow() + timedelta(hours=9)
+        return {
+            'compiled_at': current_time_kst,
+            'current_market': timed('market_state', self._build_current_market, market_data.get('current_market', {})),
+            'candles': timed(
+                'candles', self._build_candles,
+                market_data.get('candlesticks', {}), market_data.get('diagonal_settings', {})
+            ),
+            'technical_indicators_json': timed(
+                'indicators',
+                lambda: json.dumps(
+                    self._filter_indicators(market_data.get('technical_indicators', {})),
+                    default=json_serializer
+                )
+            ),
+            'diagonal': timed('diagonal', self._build_diagonal, market_data.get('diagonal_settings', {})),
+            'build_ms': build_ms,
+        }
+
+    @staticmethod
+    def _build_current_market(current_market):
+        high = current_market.get('24h_high')
+        low = current_market.get('24h_low')
+        volatility = round(((high - low) / low) * 100, 2) if high is not None and low else None
+        return {
+            'price': current_market.get('price'),
+            '24h_high': high,
+            '24h_low': low,
+            '24h_volume': current_market.get('24h_volume'),
+            'volatility_24h': volatility,
+        }
+
+    @staticmethod
+    def _format_kst(timestamp_ms, fmt='%Y-%m-%d %H:%M:%S'):
+        return (datetime.utcfromtimestamp(timestamp_ms / 1000) + timedelta(hours=9)).strftime(fmt)
+
+    @staticmethod
+    def _anchor_indices(diagonal_settings):
+        """빗각 기준점 캔들의 1H index (다운샘플링 시 항상 유지)"""
+        extracted = (diagonal_settings or {}).get('extracted_candles', {})
+        indices = []
+        for direction in ('uptrend', 'downtrend'):
+            for point in ('point_a', 'point_second', 'point_b'):
+                index = ((extracted.get(direction) or {}).get(point) or {}).get('index')
+                if index is not None:
+                    indices.append(int(index))
+        return indices
+
+    def _select_indices(self, timeframe, original, anchor_indices):
+        """프롬프트에 포함할 캔들의 원본 index"""
+        if not self.downsampling:
+            max_limit = self.MAX_CANDLES_LIMIT.get(timeframe, len(original))
+            return list(range(max(len(original) - max_limit, 0), len(original)))
+
+        budget = self.token_budget.get(timeframe)
+        if not budget:
+            return list(range(len(original)))
+
+        # 변환된 캔들 1개의 토큰 수로 목표 개수 산정 (구분자 ", " 포함)
+        sample = self._convert_candle(original[-1], len(original) - 1)
+        tokens_per_candle = max(estimate_tokens(json.dumps(sample, ensure_ascii=False) + ", "), 1)
+        target = max(budget // tokens_per_candle, 3)
+        return self.downsampler.select(
+            original,
+            target,
+            recent_full=self.recent_full.get(timeframe, 0),
+            anchor_indices=anchor_indices if timeframe == '1H' else None,
+        )
+
+    def _convert_candle(self, candle, index):
+        candle_copy = dict(candle)
+        timestamp_ms = candle_copy.get('timestamp', 0)
+        if timestamp_ms > 0:
+            candle_copy['timestamp'] = self._format_kst(timestamp_ms)
+        candle_copy['index'] = index
+        return candle_copy
+
+    def _build_candles(self, candlesticks, diagonal_settings=None):
+        """핵심 시간봉 캔들 변환 (KST timestamp, 원본 index 유지)
+
+        토큰 예산 내에서 전체 이력을 다운샘플링하므로 오래된 구간의 index는 연속되지 않을 수 있지만,
+        원본 index를 그대로 유지하여 빗각 계산(index 차이 = 경과 시간)에 문제가 없도록 합니다.
+        """
+        anchor_indices = self._anchor_indices(diagonal_settings)
+        result = {}
+        for timeframe in self.CORE_TIMEFRAMES:
+            original = candlesticks.get(timeframe) or []
+            if not original:
+                continue
+
+            indices = self._select_indices(timeframe, original, anchor_indices)
+            candles = [original[i] for i in indices]
+            if len(candles) < len(original):
+                mode = "다운샘플링" if self.downsampling else "최근 구간만 사용"
+                print(f"[토큰 절약] {timeframe} 캔들을 {len(original)}개에서 {len(candles)}개로 축소 ({mode})")
+
+            converted = [self._convert_candle(candle, index) for candle, index in zip(candles, indices)]
+
+            if len(candles) >= 2:
+                time_range_hours = (candles[-1].get('timestamp', 0) - candles[0].get('timestamp', 0)) / (1000 * 60 * 60)
+                time_range_days = time_range_hours / 24
+                time_range = f"약 {time_range_days:.1f}일" if time_range_days >= 1 else f"약 {time_range_hours:.1f}시간"
+                first_time = converted[0].get('timestamp', 'N/A')
+                last_time = converted[-1].get('timestamp', 'N/A')
+            else:
+                time_range = first_time = last_time = "N/A"
+
+            result[timeframe] = {
+                'description': self.TIMEFRAME_DESCRIPTIONS.get(timeframe, timeframe),
+                'count': len(converted),
+                'source_count': len(original),
+                'contiguous': len(converted) == indices[-1] - indices[0] + 1,
+                'time_range': time_range,
+                'first_time': first_time,
+                'last_time': last_time,
+                'preview_json': json.dumps(converted[-5:], ensure_ascii=False),
+                'candles_json': json.dumps(converted, ensure_ascii=False),
+            }
+        return result
+
+    def _filter_indicators(self, technical_indicators):
+        """핵심 시간봉의 필수 지표만 추출"""
+        result = {}
+        for timeframe, indicators in technical_indicators.items():
+            if timeframe not in self.CORE_TIMEFRAMES:
+                continue
+            filtered = {
+                key: value for key, value in indicators.items()
+                if any(key.startswith(essential) for essential in self.ESSENTIAL_INDICATORS)
+            }
+            if filtered:
+                result[timeframe] = filtered
+        return result
+
+    @staticmethod
+    def _build_diagonal(diagonal_settings):
+        extracted = diagonal_settings.get('extracted_candles', {})
+        uptrend = extracted.get('uptrend')
+        downtrend = extracted.get('downtrend')
+        analytics = diagonal_settings.get('analytics') or {}
+        return {
+            'uptrend': uptrend if uptrend and uptrend.get('point_a') else None,
+            'downtrend': downtrend if downtrend and downtrend.get('point_a') else None,
+            'analytics_text': format_diagonal_analytics(analytics),
+            # 백엔드 계산 값이 있는 빗각 방향 (없는 방향은 계산 공식을 대신 전달)
+            'computed': [key for key in ('uptrend', 'downtrend') if (analytics.get(key) or {}).get('current_lines')],
+        }
+
+
+prompt_compiler = PromptCompiler()
+
+
+def compile_prompt_ir(market_data):
+    """공유 PromptCompiler로 IR 생성 (메모이즈)"""
+    return prompt_compiler.compile(market_data)
+
+
+def render_current_market(ir):
+    """현재 시장 상태 섹션 (제목 제외)"""
+    market = ir['current_market']
+    return f"""- 현재가: {market['price']} USDT
+- 24시간 고가: {market['24h_high']} USDT
+- 24시간 저가: {market['24h_low']} USDT
+- 24시간 거래량: {market['24h_volume']} BTC
+- 24시간 변동성: {market['volatility_24h']}%"""
+
+
+def render_candlestick_section(ir):
+    """모든 핵심 시간봉의 캔들스틱 데이터 섹션"""
+    candles = ir['candles']
+
+    def coverage(timeframe):
+        data = candles.get(timeframe)
+        return f"{data['count']}개 캔들, {data['time_range']}" if data else "데이터 없음"
+
+    sections = [
+        "[캔들스틱 원본 데이터 - 모든 시간봉]",
+        "",
+        "⚠️ 데이터 구조 설명:",
+        "- 각 캔들: {index, timestamp, open, high, low, close, volume}",
+        "  * index: 캔들의 순서 번호 (0부터 시작, 0이 가장 오래된 데이터)",
+        "  * timestamp: KST(한국 시간) 문자열 (YYYY-MM-DD HH:MM:SS 형식)",
+        "  * open: 시가 (USDT)",
+        "  * high: 고가 (USDT)",
+        "  * low: 저가 (USDT)",
+        "  * close: 종가 (USDT)",
+        "  * volume: 거래량 (BTC)",
+        "",
+        f"- 현재 시간: {ir['compiled_at'].strftime('%Y-%m-%d %H:%M:%S')} (KST)",
+        "- 최신 데이터가 배열의 마지막에 위치 (가장 큰 index 번호)",
+        "",
+        "⚠️ 빗각 분석 시 필드 사용 규칙:",
+        "- 상승 빗각 (저점 연결):",
+        "  * 역사적 저점: 전체 데이터에서 'low' 값이 가장 낮은 지점",
+        "  * 두 번째 저점: 역사적 저점 이후 100개 캔들 후 'low' 값이 가장 낮은 지점",
+        "  * 변곡점 가격: 거래량 최대 캔들의 'low' 값 사용",
+        "- 하락 빗각 (고점 연결):",
+        "  * 역사적 고점: 전체 데이터에서 'high' 값이 가장 높은 지점",
+        "  * 두 번째 고점: 역사적 고점 이후 100개 캔들 후 'high' 값이 가장 높은 지점",
+        "  * 변곡점 가격: 거래량 최대 캔들의 'high' 값 사용",
+        "",
+        f"- 1시간봉(1H) 데이터로 빗각 채널을 그릴 것 ({coverage('1H')})",
+        f"- 15분봉(15m) 데이터로 진입 타이밍을 포착할 것 ({coverage('15m')})",
+        "- 시간 계산: 경과 시간(시간) = (index_현재 - index_이전) × 해당 timeframe",
+        "",
+    ]
+
+    if any(not data.get('contiguous', True) for data in candles.values()):
+        sections.extend([
+            "⚠️ 캔들 샘플링 안내:",
+            "- 최근 구간은 모든 캔들을 포함하고, 오래된 구간은 스윙 고점/저점, 거래량 급증, 빗각 기준점을 보존하며 추려낸 캔들입니다.",
+            "- 따라서 오래된 구간의 index는 연속되지 않을 수 있습니다. 경과 시간은 항상 index 차이로 계산하세요.",
+            "",
+        ])
+
+    for timeframe, data in candles.items():
+        sections.extend([
+            '=' * 80,
+            f"📊 {data['description']} ({timeframe})",
+            '=' * 80,
+            f"총 데이터 개수: {data['count']}개 (원본 {data.get('source_count', data['count'])}개)",
+            f"시간 범위: {data['time_range']}",
+            f"첫 캔들 시간: {data['first_time']} (KST)",
+            f"마지막 캔들 시간: {data['last_time']} (KST)",
+            "최신 5개 캔들 미리보기:",
+            data['preview_json'],
+            "",
+            f"전체 데이터 ({data['count']}개):",
+            data['candles_json'],
+            "",
+        ])
+
+    return "\n".join(sections)
+
+
+def _format_candle_info(candle_data, label):
+    """캔들 정보를 읽기 쉽게 포맷팅"""
+    if not candle_data:
+        return f"{label}: 캔들을 찾지 못했습니다."
+
+    return f"""{label}:
+  - 인덱스: {candle_data.get('index')}
+  - 시간: {candle_data.get('timestamp')} (KST)
+  - Open: {candle_data.get('open')} USDT
+  - High: {candle_data.get('high')} USDT
+  - Low: {candle_data.get('low')} USDT
+  - Close: {candle_data.get('close')} USDT
+  - Volume: {candle_data.get('volume')} BTC"""
+
+
+# 백엔드 빗각 계산 값이 없을 때만 프롬프트에 붙이는 계산 공식
+DIAGONAL_FALLBACK_FORMULA = """
+**⚠️ [{label}] 백엔드 계산 값이 없어 직접 계산이 필요합니다:**
+- 기울기 = (Point B {field} - Point A {field}) / (Point B index - Point A index)
+- 빗각 1 현재 위치 = Point A {field} + 기울기 × (현재 캔들 index - Point A index) ⚠️ Point B 가격 사용 금지!
+- 채널 간격 D = |두 번째 {point} 시점의 빗각 1 가격 - 두 번째 {point} {field}|
+- 빗각 n 현재 위치 = 빗각 1 현재 위치 {sign} (n - 1) × D (n = 2~10)
+- 거리 = |현재 가격 - 가장 가까운 빗각 위치| / 현재 가격 × 100
+"""
+
+
+def render_diagonal_section(ir):
+    """백엔드에서 추출된 빗각 캔들 정보 섹션"""
+    diagonal = ir['diagonal']
+    uptrend_data = diagonal['uptrend']
+    downtrend_data = diagonal['downtrend']
+
+    if not uptrend_data and not downtrend_data:
+        return """
+**⚠️ 빗각 설정 없음:**
+사용자가 빗각 포인트를 설정하지 않았습니다. 빗각 분석을 건너뛰고 추세 추종 분석으로 진행하세요.
+"""
+
+    info = "**🎯 백엔드에서 추출된 빗각 캔들 정보:**\n\n"
+
+    if uptrend_data:
+        info += f"""
+**[상승 빗각 - 저점 연결]**
+사용할 가격 필드: **low** (빗각 계산에 이 필드의 값을 사용하세요!)
+
+{_format_candle_info(uptrend_data.get('point_a'), 'Point A (역사적 저점)')}
+
+{_format_candle_info(uptrend_data.get('point_second'), '두 번째 저점')}
+
+{_format_candle_info(uptrend_data.get('point_b'), 'Point B (변곡점)')}
+
+"""
+
+    if downtrend_data:
+        info += f"""
+**[하락 빗각 - 고점 연결]**
+사용할 가격 필드: **high** (빗각 계산에 이 필드의 값을 사용하세요!)
+
+{_format_candle_info(downtrend_data.get('point_a'), 'Point A (역사적 고점)')}
+
+{_format_candle_info(downtrend_data.get('point_second'), '두 번째 고점')}
+
+{_format_candle_info(downtrend_data.get('point_b'), 'Point B (변곡점)')}
+
+"""
+
+    info += "\n✅ **위 캔들 정보는 이미 백엔드에서 정확하게 추출되었습니다.**\n"
+    if diagonal['computed']:
+        info += "✅ **빗각/채널 값은 아래에 계산되어 있으니 추가 검색이나 재계산 없이 그대로 사용하세요!**\n"
+    else:
+        info += "✅ **추가 검색 없이 위 정보를 바로 사용하여 빗각 계산을 시작하세요!**\n"
+
+    # 백엔드에서 계산된 빗각/채널 값 추가 (Point A 기준)
+    if diagonal['analytics_text']:
+        info += "\n" + diagonal['analytics_text']
+
+    # 계산에 실패한 방향만 LLM이 직접 계산하도록 공식 전달
+    if uptrend_data and 'uptrend' not in diagonal['computed']:
+        info += DIAGONAL_FALLBACK_FORMULA.format(label='상승 빗각', field='low', point='저점', sign='-')
+    if downtrend_data and 'downtrend' not in diagonal['computed']:
+        info += DIAGONAL_FALLBACK_FORMULA.format(label='하락 빗각', field='high', point='고점', sign='+')
+
+    return info
@@ -0,0 +1,183 @@
+from app.database.db import SessionLocal
+from app.models.prompt_profile import PromptProfile
+from .prompt_compiler import (
+    compile_prompt_ir, estimate_tokens, render_candlestick_section, render_current_market, render_diagonal_section
+)
+
+def profile_prompt(market_data, prompt_text, build_ms=None, delta=False, system_prompt=None, output_instructions=None):
+    """프롬프트를 섹션별로 분해하여 토큰 근사치와 생성 시간 계산
+
+    전체 분석 프롬프트는 공유 IR(메모이즈됨)에서 데이터 섹션을 다시 렌더링하여 프롬프트 안에 포함된
+    섹션만 집계하고, 나머지는 전략/지침 텍스트(instructions)로 분류합니다.
+
+    Args:
+        market_data: 수집된 시장 데이터
+        prompt_text: 실제 전송한 user 메시지 (출력 지침 포함)
+        build_ms: 프롬프트 생성에 걸린 시간 (ms)
+        delta: 모니터링 델타 컨텍스트 프롬프트 여부
+        system_prompt: 시스템 프롬프트 텍스트 (있는 경우)
+        output_instructions: user 메시지 끝에 추가한 응답 형식 지침
+    """
+    try:
+        sections = {}
+        section_build_ms = {}
+        body = prompt_text or ''
+
+        if output_instructions and body.endswith(output_instructions):
+            sections['output_instructions'] = estimate_tokens(output_instructions)
+            body = body[:-len(output_instructions)]
+
+        if delta:
+            sections['delta_context'] = estimate_tokens(body)
+        else:
+            ir = compile_prompt_ir(market_data)
+            data_sections = {
+                'candles': render_candlestick_section(ir),
+                'indicators': ir['technical_indicators_json'],
+                'diagonal': render_diagonal_section(ir),
+                'market_state': render_current_market(ir),
+            }
+            remainder_tokens = estimate_tokens(body)
+            for name, text in data_sections.items():
+                if text and text in body:
+                    sections[name] = estimate_tokens(text)
+                    remainder_tokens -= sections[name]
+            sections['instructions'] = max(remainder_tokens, 0)
+            section_build_ms = dict(ir.get('build_ms', {}))
+
+        if system_prompt:
+            sections['system_prompt'] = estimate_tokens(system_prompt)
+
+        total = sum(sections.values())
+        return {
+            'mode': 'delta' if delta else 'full',
+            'sections': sections,
+            'shares': {name: round(tokens / total, 4) if total else 0 for name, tokens in sections.items()},
+            'estimated_total_tokens': total,
+            'prompt_chars': len(prompt_text or '') + len(system_prompt or ''),
+            'build_ms': round(build_ms, 2) if build_ms is not None else None,
+            'section_build_ms': section_build_ms,
+        }
+    except Exception as e:
+        print(f"프롬프트 프로파일 계산 중 오류: {str(e)}")
+        return None
+
+
+def _input_tokens(usage):
+    """공급자별 usage에서 입력 토큰 수 추출 (Claude: input + cache, OpenAI 호환: prompt_tokens)"""
+    if not usage:
+        return None
+    if 'input_tokens' in usage:
+        return (usage.get('input_tokens') or 0) + (usage.get('cache_read_input_tokens') or 0) + (usage.get('cache_creation_input_tokens') or 0)
+    return usage.get('prompt_tokens')
+
+
+def _output_tokens(usage):
+    if not usage:
+        return None
+    return usage.get('output_tokens', usage.get('completion_tokens'))
+
+
+def save_profile(model_id, analysis, latency_seconds):
+    """분석 1건의 프롬프트 프로파일과 공급자 보고 사용량 저장"""
+    profile = analysis.get('prompt_profile') if analysis else None
+    if not profile:
+        return
+
+    usage = analysis.get('usage')
+    db = SessionLocal()
+    try:
+        db.add(PromptProfile(
+            model_id=model_id,
+            served_by=analysis.get('served_by'),
+            fingerprint=analysis.get('fingerprint'),
+            mode=profile['mode'],
+            action=analysis.get('action'),
+            estimated_tokens=profile['estimated_total_tokens'],
+            input_tokens=_input_tokens(usage),
+            output_tokens=_output_tokens(usage),
+            latency_seconds=round(latency_seconds, 2),
+            build_ms=profile.get('build_ms'),
+            sections=profile['sections'],
+            section_build_ms=profile.get('section_build_ms'),
+            usage=usage,
+        ))
+        db.commit()
+    except Exception as e:
+        print(f"프롬프트 프로파일 저장 실패: {str(e)}")
+        db.rollback()
+    finally:
+        db.close()
+
+
+def get_profile_summary(limit=50, mode=None):
+    """최근 분석의 섹션별 평균 토큰, 비중, 생성 시간과 실제 사용량 요약"""
+    db = SessionLocal()
+    try:
+        query = db.query(PromptProfile)
+        if mode:
+            query = query.filter(PromptProfile.mode == mode)
+        profiles = query.order_by(PromptProfile.created_at.desc()).limit(limit).all()
+    finally:
+        db.close()
+
+    if not profiles:
+        return {'count': 0, 'sections': {}, 'recent': []}
+
+    count = len(profiles)
+    section_totals = {}
+    section_build_totals = {}
+    for profile in profiles:
+        for name, tokens in (profile.sections or {}).items():
+            section_totals[name] = section_totals.get(name, 0) + tokens
+        for name, ms in (profile.section_build_ms or {}).items():
+            section_build_totals.setdefault(name, []).append(ms)
+
+    grand_total = sum(section_totals.values())
+    sections = {
+        name: {
+            'avg_tokens': round(total / count, 1),
+            'share': round(total / grand_total, 4) if grand_total else 0,
+            'avg_build_ms': round(sum(section_build_totals[name]) / len(section_build_totals[name]), 2)
+            if name in section_build_totals else None,
+        }
+        for name, total in sorted(section_totals.items(), key=lambda item: -item[1])
+    }
+
+    # 근사치 보정 비율 (공급자 보고 입력 토큰 / 근사 토큰)
+    calibrated = [p for p in profiles if p.input_tokens and p.estimated_tokens]
+    calibration = (
+        round(sum(p.input_tokens for p in calibrated) / sum(p.estimated_tokens for p in calibrated), 3)
+        if calibrated else None
+    )
+
+    def average(values):
+        values = [v for v in values if v is not None]
+        return round(sum(values) / len(values), 2) if values else None
+
+    return {
+        'count': count,
+        'since': profiles[-1].created_at.isoformat(),
+        'avg_estimated_tokens': average([p.estimated_tokens for p in profiles]),
+        'avg_input_tokens': average([p.input_tokens for p in profiles]),
+        'avg_output_tokens': average([p.output_tokens for p in profiles]),
+        'avg_latency_seconds': average([p.latency_seconds for p in profiles]),
+        'avg_build_ms': average([p.build_ms for p in profiles]),
+        'estimate_calibration': calibration,
+        'sections': sections,
+        'recent': [
+            {
+                'time': p.created_at.isoformat(),
+                'model_id': p.model_id,
+                'served_by': p.served_by,
+                'mode': p.mode,
+                'action': p.action,
+                'estimated_tokens': p.estimated_tokens,
+                'input_tokens': p.input_tokens,
+                'output_tokens': p.output_tokens,
+                'latency_seconds': p.latency_seconds,
+                'sections': p.sections,
+            }
+            for p in profiles[:10]
+        ],
+    }
@@ -0,0 +1,47 @@
+from fastapi.responses import JSONResponse
+import numpy as np
+import orjson
+
+
+# numpy 스칼라/배열, datetime, int 키를 orjson이 한 번에 직렬화 (NaN/Inf는 null)
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+
+def _default(obj):
+    """orjson이 직접 처리하지 못하는 값 (기존 json.dumps(default=str)와 같은 폴백)"""
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if hasattr(obj, 'isoformat'):
+        return obj.isoformat()
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    return str(obj)
+
+
+def dumps(obj):
+    """JSON bytes로 직렬화"""
+    return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+
+
+def dumps_str(obj):
+    """JSON 문자열로 직렬화 (WebSocket 텍스트 프레임, DB 텍스트 컬럼용)"""
+    return dumps(obj).decode('utf-8')
+
+
+def to_jsonable(obj):
+    """numpy/datetime 등이 섞인 객체를 JSON 기본 타입으로 변환 (한 번의 직렬화 왕복)"""
+    return orjson.loads(dumps(obj))
+
+
+class FastJSONResponse(JSONResponse):
+    """numpy/datetime을 그대로 받는 응답 클래스
+
+    default_response_class로 쓰면 모든 응답이 orjson으로 렌더링됩니다. 엔드포인트가 이 클래스를
+    직접 반환하면 FastAPI의 jsonable_encoder 재귀 변환도 건너뛰므로, 큰 market_data를 반환하는
+    응답은 FastJSONResponse(content)로 반환합니다.
+    """
+
+    media_type = "application/json"
+
+    def render(self, content):
+        return dumps(content)
@@ -0,0 +1,183 @@
+from datetime import datetime, timedelta
+
+
+class SidewaysGate:
+    """Step 0 횡보 체크 규칙 엔진
+
+    프롬프트의 "Step 0 횡보 체크"를 market_data로부터 직접 계산합니다.
+    하나라도 충족되면 AI 호출 없이 HOLD로 판단할 수 있습니다.
+    """
+
+    # 기본 횡보 체크 (ATR% 구간별 10개 봉 범위 임계값)
+    ATR_RANGE_THRESHOLDS = [
+        (2.0, 0.8),   # ATR% < 2% → 0.8%
+        (4.0, 1.0),   # ATR% 2-4% → 1.0%
+    ]
+    ATR_RANGE_THRESHOLD_HIGH = 1.2  # ATR% > 4% → 1.2%
+    VOLUME_RATIO_THRESHOLD = 0.65
+
+    # 추가 1 - 횡보 시작 감지
+    RANGE_6_THRESHOLD = 0.7
+
+    # 추가 2 - 볼륨 프로파일 집중
+    VALUE_AREA_THRESHOLD = 4.0
+
+    # 추가 3 - 추세 강도 약화
+    ADX_15M_THRESHOLD = 18
+    ADX_1H_THRESHOLD = 22
+
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+
+    @staticmethod
+    def _to_float(value):
+        try:
+            if value is None:
+                return None
+            value = float(value)
+            if value != value:  # NaN
+                return None
+            return value
+        except (TypeError, ValueError):
+            return None
+
+    def _get_atr_range_threshold(self, atr_percent):
+        """ATR%에 따른 10개 봉 범위 임계값"""
+        if atr_percent is None:
+            return self.ATR_RANGE_THRESHOLDS[-1][1]
+        for upper, threshold in self.ATR_RANGE_THRESHOLDS:
+            if atr_percent < upper:
+                return threshold
+        return self.ATR_RANGE_THRESHOLD_HIGH
+
+    @staticmethod
+    def _price_range_percent(candles, current_price):
+        highs = [float(c['high']) for c in candles]
+        lows = [float(c['low']) for c in candles]
+        return (max(highs) - min(lows)) / current_price * 100
+
+    def evaluate(self, market_data):
+        """market_data로 Step 0 횡보 조건 평가
+
+        Returns:
+            dict: is_sideways, triggers(충족된 조건 목록), metrics, reason
+                  데이터가 부족한 조건은 평가하지 않습니다 (충족되지 않은 것으로 처리).
+        """
+        result = {
+            "is_sideways": False,
+            "triggers": [],
+            "metrics": {},
+            "reason": ""
+        }
+
+        if not self.enabled or not market_data:
+            return result
+
+        try:
+            current_price = self._to_float(market_data.get('current_market', {}).get('price'))
+            candles_15m = market_data.get('candlesticks', {}).get('15m') or []
+            indicators = market_data.get('technical_indicators', {})
+            indicators_15m = indicators.get('15m') or {}
+            indicators_1h = indicators.get('1H') or {}
+
+            if not current_price or current_price <= 0:
+                return result
+
+            metrics = result["metrics"]
+            triggers = result["triggers"]
+
+            # 0-A. 데이터 수집
+            atr_percent = self._to_float(indicators_15m.get('atr', {}).get('percent'))
+            metrics['atr_percent'] = atr_percent
+
+            if len(candles_15m) >= 10:
+                metrics['range_10'] = self._price_range_percent(candles_15m[-10:], current_price)
+            if len(candles_15m) >= 6:
+                metrics['range_6'] = self._price_range_percent(candles_15m[-6:], current_price)
+            if len(candles_15m) >= 30:
+                recent_volume = sum(float(c['volume']) for c in candles_15m[-10:]) / 10
+                prior_volume = sum(float(c['volume']) for c in candles_15m[-30:-10]) / 20
+                if prior_volume > 0:
+                    metrics['volume_ratio'] = recent_volume / prior_volume
+
+            volume_profile = indicators_15m.get('volume_profile') or {}
+            vah = self._to_float(volume_profile.get('vah'))
+            val = self._to_float(volume_profile.get('val'))
+            if vah is not None and val is not None:
+                metrics['value_area_percent'] = (vah - val) / current_price * 100
+
+            metrics['adx_15m'] = self._to_float(indicators_15m.get('dmi', {}).get('adx'))
+            metrics['adx_1h'] = self._to_float(indicators_1h.get('dmi', {}).get('adx'))
+
+            # 0-B. 기본 횡보 체크
+            range_threshold = self._get_atr_range_threshold(atr_percent)
+            metrics['range_10_threshold'] = range_threshold
+            if 'range_10' in metrics and 'volume_ratio' in metrics:
+                if metrics['range_10'] < range_threshold and metrics['volume_ratio'] < self.VOLUME_RATIO_THRESHOLD:
+                    triggers.append(
+                        f"10개 봉 범위 {metrics['range_10']:.2f}% < {range_threshold}% AND "
+                        f"볼륨 비율 {metrics['volume_ratio']:.2f} < {self.VOLUME_RATIO_THRESHOLD}"
+                    )
+
+            # 추가 1 - 횡보 시작 감지
+            if 'range_6' in metrics and metrics['range_6'] < self.RANGE_6_THRESHOLD:
+                triggers.append(f"6개 봉 범위 {metrics['range_6']:.2f}% < {self.RANGE_6_THRESHOLD}%")
+
+            # 추가 2 - 볼륨 프로파일 집중
+            if 'value_area_percent' in metrics and metrics['value_area_percent'] < self.VALUE_AREA_THRESHOLD:
+                triggers.append(
+                    f"볼륨 집중도 (VAH-VAL) {metrics['value_area_percent']:.2f}% < {self.VALUE_AREA_THRESHOLD}%"
+                )
+
+            # 추가 3 - 추세 강도 약화
+            adx_15m = metrics['adx_15m']
+            adx_1h = metrics['adx_1h']
+            if adx_15m is not None and adx_1h is not None:
+                if adx_15m < self.ADX_15M_THRESHOLD and adx_1h < self.ADX_1H_THRESHOLD:
+                    triggers.append(
+                        f"15분 ADX {adx_15m:.1f} < {self.ADX_15M_THRESHOLD} AND "
+                        f"1시간 ADX {adx_1h:.1f} < {self.ADX_1H_THRESHOLD}"
+                    )
+
+            # 0-C. 최종 판단 (OR 로직)
+            if triggers:
+                result["is_sideways"] = True
+                result["reason"] = "횡보 구간 감지 (" + " / ".join(triggers) + ") → 진입/전환 금지"
+
+            return result
+
+        except Exception as e:
+            print(f"횡보 체크 중 오류 (AI 분석으로 진행): {str(e)}")
+            return {
+                "is_sideways": False,
+                "triggers": [],
+                "metrics": {},
+                "reason": ""
+            }
+
+    def build_hold_decision(self, gate_result, expected_minutes=60):
+        """AI 분석 결과와 동일한 형식의 HOLD 결정 생성"""
+        metrics_lines = []
+        for key, value in gate_result.get("metrics", {}).items():
+            if isinstance(value, float):
+                metrics_lines.append(f"- {key}: {value:.4f}")
+            else:
+                metrics_lines.append(f"- {key}: {value}")
+
+        reason = (
+            "**Step 0: 횡보 체크 (로컬 규칙 엔진)**\n"
+            f"{gate_result.get('reason', '')}\n\n"
+            "**계산값:**\n" + "\n".join(metrics_lines)
+        )
+
+        return {
+            "action": "HOLD",
+            "reason": reason,
+            "expected_minutes": expected_minutes,
+            "next_analysis_time": (datetime.now() + timedelta(minutes=expected_minutes)).isoformat(),
+            "sideways_gate": {
+                "triggered": True,
+                "triggers": gate_result.get("triggers", []),
+                "metrics": gate_result.get("metrics", {})
+            }
+        }
@@ -0,0 +1,155 @@
+from datetime import datetime
+import threading
+import time
+
+
+class SpeculativeAnalysis:
+    """예약된 본분석보다 먼저 시장 스냅샷 수집과 AI 분석을 시작하는 투기적 실행
+
+    본분석은 예약 시간이 되어서야 데이터 수집과 AI 호출(30~120초)을 시작하므로 실제 주문은
+    예약 시간보다 수 분 늦게 나갑니다. lead_seconds 전에 미리 분석을 시작해 두고, 예약 시간에
+    가벼운 드리프트 지표(가격 변화율, 새로 마감된 캔들 수)를 확인하여 결과를 그대로 쓰거나
+    다시 분석합니다.
+    """
+
+    CANDLE_PERIOD_MS = {
+        '15m': 15 * 60 * 1000,
+        '1H': 60 * 60 * 1000,
+    }
+
+    def __init__(self, lead_seconds=150, max_price_drift_pct=0.3, max_new_15m_candles=1,
+                 wait_seconds=180, enabled=True):
+        """
+        Args:
+            lead_seconds: 예약 시간보다 몇 초 먼저 분석을 시작할지
+            max_price_drift_pct: 스냅샷 이후 허용할 최대 가격 변화율 (%)
+            max_new_15m_candles: 스냅샷 이후 허용할 새 15분봉 마감 수 (1시간봉 마감은 항상 재분석)
+            wait_seconds: 예약 시간에 아직 진행 중인 투기적 분석을 기다릴 최대 시간
+            enabled: False면 투기적 실행 없이 예약 시간에 분석
+        """
+        self.lead_seconds = lead_seconds
+        self.max_price_drift_pct = max_price_drift_pct
+        self.max_new_15m_candles = max_new_15m_candles
+        self.wait_seconds = wait_seconds
+        self.enabled = enabled
+        self._entries = {}  # job_id -> 투기적 실행 상태
+        self._lock = threading.Lock()
+        self.stats = {'started': 0, 'used': 0, 'rerun': 0, 'failed': 0, 'discarded': 0}
+
+    def due_jobs(self, scheduled_jobs, now=None):
+        """투기적 분석을 시작해야 할 작업 ID 목록
+
+        Args:
+            scheduled_jobs: {job_id: 예약 시간(datetime)} - 현재 예약된 본분석 작업
+        """
+        if not self.enabled:
+            return []
+        now = now or datetime.now()
+        with self._lock:
+            # 취소된 작업의 투기적 결과 폐기
+            for job_id in [job_id for job_id in self._entries if job_id not in scheduled_jobs]:
+                if self._entries[job_id]['done'].is_set():
+                    del self._entries[job_id]
+                    self.stats['discarded'] += 1
+            return [
+                job_id for job_id, run_time in scheduled_jobs.items()
+                if job_id not in self._entries and 0 < (run_time - now).total_seconds() <= self.lead_seconds
+            ]
+
+    def start(self, job_id, scheduled_time, runner):
+        """백그라운드 스레드에서 투기적 분석 시작
+
+        Args:
+            runner: 인자 없이 호출되어 (market_data, analysis_result)를 반환하는 함수.
+                포지션 보유 등으로 분석할 필요가 없으면 None 반환
+        """
+        entry = {
+            'job_id': job_id,
+            'scheduled_time': scheduled_time,
+            'started_at': time.time(),
+            'done': threading.Event(),
+            'market_data': None,
+            'analysis': None,
+            'snapshot_ms': None,
+        }
+        with self._lock:
+            if job_id in self._entries:
+                return
+            self._entries[job_id] = entry
+            self.stats['started'] += 1
+
+        def run():
+            try:
+                snapshot_ms = int(time.time() * 1000)
+                result = runner()
+                if result:
+                    entry['market_data'], entry['analysis'] = result
+                    entry['snapshot_ms'] = snapshot_ms
+                    print(f"투기적 분석 완료: {job_id} ({time.time() - entry['started_at']:.1f}초, 결과: {entry['analysis'].get('action')})")
+            except Exception as e:
+                print(f"투기적 분석 중 오류 ({job_id}): {str(e)}")
+                with self._lock:
+                    self.stats['failed'] += 1
+            finally:
+                entry['done'].set()
+
+        print(f"\n=== 투기적 분석 시작: {job_id} (예약 시간: {scheduled_time.strftime('%Y-%m-%d %H:%M:%S')}) ===")
+        threading.Thread(target=run, daemon=True).start()
+
+    def claim(self, job_id):
+        """예약 시간에 투기적 분석 결과 가져오기 (진행 중이면 wait_seconds까지 대기)"""
+        with self._lock:
+            entry = self._entries.pop(job_id, None)
+        if not entry:
+            return None
+        if not entry['done'].wait(timeout=self.wait_seconds):
+            print(f"투기적 분석이 {self.wait_seconds}초 내에 끝나지 않아 재분석합니다: {job_id}")
+            return None
+        return entry if entry['analysis'] else None
+
+    def check_drift(self, entry, current_price, now_ms=None):
+        """스냅샷 이후 가격 변화율과 새로 마감된 캔들 수로 결과 재사용 여부 판단"""
+        now_ms = now_ms or int(time.time() * 1000)
+        snapshot_price = entry['market_data'].get('current_market', {}).get('price')
+        price_drift_pct = (
+            abs(current_price - snapshot_price) / snapshot_price * 100
+            if snapshot_price and current_price else None
+        )
+        new_candles = {
+            timeframe: now_ms // period - entry['snapshot_ms'] // period
+            for timeframe, period in self.CANDLE_PERIOD_MS.items()
+        }
+
+        if price_drift_pct is None:
+            reason = "현재가 확인 불가"
+        elif price_drift_pct > self.max_price_drift_pct:
+            reason = f"가격 변화 {price_drift_pct:.3f}% > {self.max_price_drift_pct}%"
+        elif new_candles['1H'] > 0:
+            reason = "1시간봉 마감"
+        elif new_candles['15m'] > self.max_new_15m_candles:
+            reason = f"15분봉 {new_candles['15m']}개 마감"
+        else:
+            reason = None
+
+        return {
+            'reusable': reason is None,
+            'reason': reason,
+            'price_drift_pct': round(price_drift_pct, 4) if price_drift_pct is not None else None,
+            'new_candles': new_candles,
+            'age_seconds': round((now_ms - entry['snapshot_ms']) / 1000, 1),
+        }
+
+    def record(self, used):
+        with self._lock:
+            self.stats['used' if used else 'rerun'] += 1
+
+    def get_stats(self):
+        with self._lock:
+            return {
+                'enabled': self.enabled,
+                'lead_seconds': self.lead_seconds,
+                'max_price_drift_pct': self.max_price_drift_pct,
+                'max_new_15m_candles': self.max_new_15m_candles,
+                'pending': sorted(self._entries),
+                **self.stats,
+            }
@@ -0,0 +1,168 @@
+from datetime import datetime, timedelta
+import json
+import logging
+
+from .tracer import pipeline_tracer
+from .structured_logging import LazyJSON
+
+logger = logging.getLogger(__name__)
+
+
+# 트레이딩 결정 스키마 (Claude tool input_schema / JSON 모드 공통)
+DECISION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "action": {
+            "type": "string",
+            "enum": ["ENTER_LONG", "ENTER_SHORT", "CLOSE_POSITION", "HOLD"],
+            "description": "최종 결정"
+        },
+        "position_size": {
+            "type": "number",
+            "description": "자산 대비 포지션 비율 (0.3-0.9, HOLD 시 생략)"
+        },
+        "leverage": {
+            "type": "integer",
+            "description": "레버리지 (10-30 정수, HOLD 시 생략)"
+        },
+        "stop_loss_roe": {
+            "type": "number",
+            "description": "손절 가격 변동률 % (0.30-1.00, 레버리지 미적용, HOLD 시 생략)"
+        },
+        "take_profit_roe": {
+            "type": "number",
+            "description": "익절 가격 변동률 % (0.90-3.00, 레버리지 미적용, HOLD 시 생략)"
+        },
+        "expected_minutes": {
+            "type": "integer",
+            "description": "목표 도달 예상 시간 (분, 120-960)"
+        },
+        "rationale": {
+            "type": "string",
+            "description": "Step 0 ~ Step 6 분석 요약 및 최종 결론"
+        }
+    },
+    "required": ["action", "rationale"]
+}
+
+CLAUDE_DECISION_TOOL = {
+    "name": "submit_trading_decision",
+    "description": "분석을 마친 후 최종 트레이딩 결정을 제출합니다. 반드시 한 번 호출하세요.",
+    "input_schema": DECISION_SCHEMA
+}
+
+
+def build_tool_instructions(rationale_max_chars):
+    """Claude tool-use 모드 응답 지침"""
+    return f"""
+
+### 📤 응답 방식 (구조화 출력):
+- 위의 TRADING_DECISION / ANALYSIS_DETAILS 텍스트 형식 대신 **submit_trading_decision 도구를 호출**하여 결정을 제출하세요.
+- action, position_size, leverage, stop_loss_roe, take_profit_roe, expected_minutes는 숫자/값만 입력하세요.
+- rationale에는 Step 0 ~ Step 6 분석 요약과 최종 결론을 **{rationale_max_chars}자 이내**로 작성하세요.
+- 도구 호출 외의 추가 텍스트는 작성하지 마세요."""
+
+
+def build_json_instructions(rationale_max_chars):
+    """JSON 모드 응답 지침 (DeepSeek / OpenAI)"""
+    example = {
+        "action": "ENTER_LONG | ENTER_SHORT | HOLD",
+        "position_size": 0.5,
+        "leverage": 15,
+        "stop_loss_roe": 0.5,
+        "take_profit_roe": 1.5,
+        "expected_minutes": 240,
+        "rationale": "Step 0 ~ Step 6 분석 요약 및 최종 결론"
+    }
+    return f"""
+
+### 📤 응답 방식 (JSON 출력):
+- 위의 TRADING_DECISION / ANALYSIS_DETAILS 텍스트 형식 대신 **아래 형식의 JSON 객체 하나만** 출력하세요.
+- HOLD인 경우 position_size, leverage, stop_loss_roe, take_profit_roe는 생략할 수 있습니다.
+- rationale에는 Step 0 ~ Step 6 분석 요약과 최종 결론을 **{rationale_max_chars}자 이내**로 작성하세요.
+
+```json
+{json.dumps(example, ensure_ascii=False, indent=2)}
+```"""
+
+
+@pipeline_tracer.traced('parse_structured_decision')
+def parse_structured_decision(data, rationale_max_chars=None):
+    """구조화 출력(dict 또는 JSON 문자열)을 분석 결과로 변환
+
+    값 범위와 기본값은 _parse_ai_response와 동일하게 적용합니다.
+
+    Returns:
+        dict 또는 None: action이 유효하지 않으면 None (텍스트 파싱으로 대체)
+    """
+    try:
+        if isinstance(data, str):
+            data = json.loads(data)
+        if not isinstance(data, dict):
+            return None
+
+        action = str(data.get('action', '')).strip().upper()
+        if action not in ["ENTER_LONG", "ENTER_SHORT", "CLOSE_POSITION", "HOLD"]:
+            print(f"구조화 출력의 action 값이 유효하지 않음: {data.get('action')}")
+            return None
+
+        # 기본값 설정
+        position_size = 0.5
+        leverage = 5
+        expected_minutes = 15
+        stop_loss_roe = 1.5
+        take_profit_roe = 4.0
+
+        def to_number(key, cast=float):
+            try:
+                value = data.get(key)
+                return cast(value) if value is not None else None
+            except (TypeError, ValueError):
+                print(f"구조화 출력 {key} 변환 실패: {data.get(key)}")
+                return None
+
+        size = to_number('position_size')
+        if action != "HOLD" and size is not None and 0.1 <= size <= 0.95:
+            position_size = size
+
+        if action not in ["HOLD", "CLOSE_POSITION"]:
+            lev = to_number('leverage', int)
+            if lev is not None and 1 <= lev <= 100:
+                leverage = lev
+
+            sl_roe = to_number('stop_loss_roe')
+            if sl_roe is not None and abs(sl_roe) > 0:
+                stop_loss_roe = round(abs(sl_roe), 2)
+
+            tp_roe = to_number('take_profit_roe')
+            if tp_roe is not None and abs(tp_roe) > 0:
+                take_profit_roe = round(abs(tp_roe), 2)
+
+        minutes = to_number('expected_minutes', int)
+        if minutes is not None and minutes > 0:
+            expected_minutes = minutes
+
+        reason = str(data.get('rationale') or '').strip()
+        if rationale_max_chars and len(reason) > rationale_max_chars:
+            reason = reason[:rationale_max_chars] + "..."
+        if len(reason) < 5:
+            reason = "No analysis details provided"
+
+        result = {
+            "action": action,
+            "position_size": position_size,
+            "leverage": leverage,
+            "stop_loss_roe": stop_loss_roe,
+            "take_profit_roe": take_profit_roe,
+            "expected_minutes": expected_minutes,
+            "reason": reason,
+            "next_analysis_time": (datetime.now() + timedelta(minutes=expected_minutes)).isoformat(),
+            "structured_output": True
+        }
+
+        logger.debug("\n=== 구조화 출력 파싱 결과 ===\n%s", LazyJSON(result))
+        return result
+
+    except Exception as e:
+        print(f"구조화 출력 파싱 중 에러: {str(e)}")
+        return None
@@ -0,0 +1,330 @@
+from contextlib import contextmanager
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+import atexit
+import contextvars
+import json
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+
+import orjson
+
+from config.settings import (
+    LOG_LEVEL, LOG_MODULE_LEVELS, LOG_FILE, LOG_FILE_MAX_BYTES, LOG_FILE_BACKUP_COUNT,
+    LOG_QUEUE_SIZE, LOG_RATE_LIMIT_WINDOW_SECONDS, LOG_RATE_LIMIT_BURST, LOG_CAPTURE_PRINT
+)
+
+
+# 현재 컨텍스트에서 출력할 최소 레벨 (verbosity()로 설정, asyncio 태스크/run_blocking 스레드로 전파됨)
+_min_level = contextvars.ContextVar('log_min_level', default=None)
+
+# print 브리지를 거치지 않고 직접 쓰는 원래 스트림
+_stdout = sys.__stdout__
+_stderr = sys.__stderr__
+
+
+class LazyJSON:
+    """로그 인자로 넘기면 레코드가 실제로 출력될 때만 JSON으로 직렬화
+
+        logger.debug("분석 결과:\\n%s", LazyJSON(result))
+    """
+
+    __slots__ = ('obj', 'indent')
+
+    def __init__(self, obj, indent=2):
+        self.obj = obj
+        self.indent = indent
+
+    def __str__(self):
+        return json.dumps(self.obj, indent=self.indent, ensure_ascii=False, default=str)
+
+
+@contextmanager
+def verbosity(level):
+    """with 블록(과 그 안에서 시작한 태스크/블로킹 호출)에서 level 미만 로그 생략 (None이면 변경 없음)"""
+    if level is None:
+        yield
+        return
+    token = _min_level.set(level)
+    try:
+        yield
+    finally:
+        _min_level.reset(token)
+
+
+class _ContextFilter(logging.Filter):
+    """verbosity() 레벨 적용 및 파이프라인 트레이스 ID 부착 (호출 스레드에서 실행)"""
+
+    def filter(self, record):
+        min_level = _min_level.get()
+        if min_level is not None and record.levelno < min_level:
+            return False
+        # tracer는 DB 모듈을 import하므로 로깅 초기화 시점에 불러오지 않고, 로드된 경우에만 사용
+        tracer = sys.modules.get('app.services.tracer')
+        record.trace_id = tracer.pipeline_tracer.current_trace_id() if tracer else None
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """같은 위치(파일, 줄)에서 반복되는 로그를 window초당 burst건으로 제한
+
+    생략된 건수는 다음에 통과하는 같은 위치의 레코드에 덧붙입니다.
+    """
+
+    def __init__(self, window_seconds=10, burst=20):
+        super().__init__()
+        self.window_seconds = window_seconds
+        self.burst = burst
+        self._windows = {}  # (pathname, lineno) -> [window_start, count, suppressed]
+        self._lock = threading.Lock()
+        self.suppressed_total = 0
+
+    def filter(self, record):
+        if self.burst <= 0 or record.levelno >= logging.ERROR:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.window_seconds:
+                suppressed = window[2] if window else 0
+                self._windows[key] = [now, 1, 0]
+                if len(self._windows) > 10000:
+                    self._windows.clear()
+            elif window[1] < self.burst:
+                window[1] += 1
+                suppressed = 0
+            else:
+                window[2] += 1
+                self.suppressed_total += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class _BoundedQueueHandler(QueueHandler):
+    """대기열이 가득 차면 레코드를 버림 (로그 때문에 거래 로직이 막히지 않도록)"""
+
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class ConsoleFormatter(logging.Formatter):
+    """기존 print 출력과 같은 모양 (메시지만), 생략 건수가 있으면 덧붙임"""
+
+    def format(self, record):
+        message = super().format(record)
+        suppressed = getattr(record, 'suppressed', 0)
+        if suppressed:
+            message += f" (같은 위치 로그 {suppressed}건 생략)"
+        return message
+
+
+class JsonLinesFormatter(logging.Formatter):
+    """JSON-lines 파일 싱크용 포맷 (한 줄에 레코드 1개)"""
+
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'func': record.funcName,
+            'line': record.lineno,
+            'thread': record.threadName,
+        }
+        if getattr(record, 'trace_id', None):
+            entry['trace_id'] = record.trace_id
+        if getattr(record, 'suppressed', 0):
+            entry['suppressed'] = record.suppressed
+        if record.exc_info:
+            entry['exc'] = self.formatException(record.exc_info)
+        return orjson.dumps(entry, default=str).decode('utf-8')
+
+
+class PrintBridge:
+    """sys.stdout/stderr 대체 객체 - 기존 print() 출력을 호출 단위 로그 레코드로 변환
+
+    print가 호출된 모듈 이름을 로거 이름으로 사용하므로 모듈별 레벨 설정(LOG_MODULE_LEVELS)이
+    기존 print에도 적용됩니다. 스레드별로 줄을 모으므로 여러 스레드의 출력이 한 줄에 섞이지 않습니다.
+    """
+
+    # 호출 위치를 찾을 때 건너뛸 모듈 (traceback.print_exc 등)
+    SKIP_MODULES = ('traceback', 'logging', 'warnings')
+
+    def __init__(self, stream, level):
+        self.stream = stream
+        self.level = level
+        self.encoding = getattr(stream, 'encoding', 'utf-8')
+        self._local = threading.local()
+
+    def _caller(self):
+        """print를 호출한 프레임 (인터프리터가 C 코드에서 직접 쓰는 경우처럼 스택이 얕으면 None)"""
+        try:
+            frame = sys._getframe(2)
+        except ValueError:
+            return None
+        while frame is not None and frame.f_globals.get('__name__', '').split('.')[0] in self.SKIP_MODULES:
+            frame = frame.f_back
+        return frame
+
+    def write(self, text):
+        local = self._local
+        # 로깅 내부 오류 출력(handleError 등)은 원래 스트림으로 (재귀 방지)
+        if getattr(local, 'busy', False) or threading.current_thread().name == 'log-listener':
+            return self.stream.write(text)
+
+        # print()는 본문과 끝의 줄바꿈을 따로 쓰므로 줄바꿈으로 끝날 때까지 모아 print 1회 = 레코드 1개로 변환
+        # (여러 줄 print가 줄마다 같은 위치의 레코드가 되면 반복 제한에 걸려 뒷부분이 잘림)
+        buffer = getattr(local, 'buffer', '') + text
+        local.buffer = ''
+        if not buffer.endswith('\n'):
+            local.buffer = buffer
+            return len(text)
+        message = buffer[:-1]
+
+        frame = self._caller()
+        if frame is None:
+            # 최상위 미처리 예외의 traceback 등은 로깅을 거치지 않고 원래 스트림으로 바로 출력
+            self.stream.write(buffer)
+            return len(text)
+
+        module = frame.f_globals.get('__name__', 'print')
+        logger = logging.getLogger(module)
+        if not logger.isEnabledFor(self.level):
+            return len(text)
+
+        local.busy = True
+        try:
+            record = logger.makeRecord(
+                module, self.level,
+                frame.f_code.co_filename,
+                frame.f_lineno,
+                message, None, None,
+                func=frame.f_code.co_name,
+            )
+            logger.handle(record)
+        finally:
+            local.busy = False
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+    def fileno(self):
+        return self.stream.fileno()
+
+
+class LoggingSubsystem:
+    """큐 기반 비동기 로깅 설정
+
+    모든 레코드는 호출 스레드에서 레벨/컨텍스트/반복 제한 필터를 거친 뒤 (통과한 경우에만 메시지를
+    포맷) 제한된 크기의 대기열에 들어가고, 별도 리스너 스레드가 콘솔과 회전 JSON-lines 파일에 씁니다.
+    """
+
+    def __init__(self):
+        self.queue_handler = None
+        self.rate_limit = None
+        self.listener = None
+        self.module_levels = {}
+        self.log_file = None
+
+    def setup(self, level=LOG_LEVEL, module_levels=LOG_MODULE_LEVELS, log_file=LOG_FILE,
+              max_bytes=LOG_FILE_MAX_BYTES, backup_count=LOG_FILE_BACKUP_COUNT, queue_size=LOG_QUEUE_SIZE,
+              rate_window_seconds=LOG_RATE_LIMIT_WINDOW_SECONDS, rate_burst=LOG_RATE_LIMIT_BURST,
+              capture_print=LOG_CAPTURE_PRINT):
+        if self.listener is not None:
+            return
+
+        console = logging.StreamHandler(_stdout)
+        console.addFilter(lambda record: record.levelno < logging.ERROR)
+        console_errors = logging.StreamHandler(_stderr)
+        console_errors.setLevel(logging.ERROR)
+        handlers = [console, console_errors]
+        for handler in handlers:
+            handler.setFormatter(ConsoleFormatter('%(message)s'))
+        if log_file:
+            os.makedirs(os.path.dirname(os.path.abspath(log_file)), exist_ok=True)
+            file_handler = RotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+            file_handler.setFormatter(JsonLinesFormatter())
+            handlers.append(file_handler)
+            self.log_file = log_file
+
+        log_queue = queue.Queue(maxsize=queue_size)
+        self.queue_handler = _BoundedQueueHandler(log_queue)
+        self.queue_handler.addFilter(_ContextFilter())
+        self.rate_limit = RateLimitFilter(rate_window_seconds, rate_burst)
+        self.queue_handler.addFilter(self.rate_limit)
+
+        root = logging.getLogger()
+        for handler in list(root.handlers):
+            root.removeHandler(handler)
+        root.addHandler(self.queue_handler)
+        root.setLevel(level)
+        self.set_module_levels(module_levels)
+
+        self.listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+        self.listener.start()
+        self.listener._thread.name = 'log-listener'
+        atexit.register(self.shutdown)
+
+        if capture_print:
+            sys.stdout = PrintBridge(_stdout, logging.INFO)
+            sys.stderr = PrintBridge(_stderr, logging.ERROR)
+
+    def set_module_levels(self, module_levels):
+        """모듈별 레벨 설정 ("app.services.bitget_service=WARNING,app.services.claude_service=DEBUG" 또는 dict)"""
+        if isinstance(module_levels, str):
+            parsed = {}
+            for item in module_levels.split(','):
+                if '=' in item:
+                    name, level = item.split('=', 1)
+                    parsed[name.strip()] = level.strip().upper()
+            module_levels = parsed
+        for name, level in (module_levels or {}).items():
+            logging.getLogger(name).setLevel(level)
+            self.module_levels[name] = level
+
+    def shutdown(self):
+        if self.listener is None:
+            return
+        if isinstance(sys.stdout, PrintBridge):
+            sys.stdout = _stdout
+        if isinstance(sys.stderr, PrintBridge):
+            sys.stderr = _stderr
+        self.listener.stop()
+        self.listener = None
+
+    def get_stats(self):
+        return {
+            'level': logging.getLevelName(logging.getLogger().level),
+            'module_levels': self.module_levels,
+            'log_file': self.log_file,
+            'queue_depth': self.queue_handler.queue.qsize() if self.queue_handler else 0,
+            'dropped': self.queue_handler.dropped if self.queue_handler else 0,
+            'rate_limited': self.rate_limit.suppressed_total if self.rate_limit else 0,
+            'print_captured': isinstance(sys.stdout, PrintBridge),
+        }
+
+
+logging_subsystem = LoggingSubsystem()
+
+
+def setup_logging(**kwargs):
+    """애플리케이션 시작 시 1회 호출"""
+    logging_subsystem.setup(**kwargs)
@@ -0,0 +1,149 @@
+from collections import deque
+from datetime import datetime
+
+from .analysis_cache import AnalysisCache
+
+
+class ThinkingBudgetController:
+    """Claude thinking/max_tokens 예산 선택
+
+    로컬에서 바로 구할 수 있는 신호만 사용하여 호출별 예산 티어를 결정합니다.
+    - 변동성: 1시간봉 ATR%
+    - 빗각 근접: 백엔드 빗각 분석의 가장 가까운 선까지 거리
+    - 포지션 보유 여부 (모니터링 분석)
+    - 다음 15분봉 마감까지 남은 시간
+
+    조용한 시장은 fast 티어로 빠르고 저렴하게, 변곡 구간은 deep 티어로 깊게 분석합니다.
+    티어별 지연 시간은 기록하여 /api/trading/thinking-budget에서 조회할 수 있습니다.
+    """
+
+    TIERS = ('fast', 'standard', 'deep')
+    MIN_THINKING_BUDGET = 1024  # Claude API 최소 budget_tokens
+    LATENCY_HISTORY_SIZE = 50
+
+    def __init__(self, policy):
+        """
+        Args:
+            policy: config.settings.CLAUDE_BUDGET_POLICY 형식의 dict
+                enabled, default_tier, tiers{tier: {thinking_budget, max_tokens}},
+                calm_atr_percent, volatile_atr_percent, deadline_minutes
+        """
+        self.policy = policy
+        self.latencies = {tier: deque(maxlen=self.LATENCY_HISTORY_SIZE) for tier in self.TIERS}
+        self.last_decision = None
+
+    def _tier_budget(self, tier):
+        config = self.policy['tiers'][tier]
+        thinking_budget = max(int(config['thinking_budget']), self.MIN_THINKING_BUDGET)
+        # max_tokens는 thinking 예산보다 커야 함
+        max_tokens = max(int(config['max_tokens']), thinking_budget + 1024)
+        return thinking_budget, max_tokens
+
+    @staticmethod
+    def _get_atr_percent(market_data):
+        try:
+            value = market_data.get('technical_indicators', {}).get('1H', {}).get('atr', {}).get('percent')
+            return float(value) if value is not None else None
+        except (TypeError, ValueError, AttributeError):
+            return None
+
+    @staticmethod
+    def _diagonal_near(market_data):
+        analytics = market_data.get('diagonal_settings', {}).get('analytics') or {}
+        return any(
+            summary and summary.get('within_threshold')
+            for summary in analytics.values()
+            if isinstance(summary, dict)
+        )
+
+    def select(self, market_data, position_open=False, now=None):
+        """예산 티어 선택 (결정 기록 및 출력)
+
+        Returns:
+            dict: tier, thinking_budget, max_tokens, signals
+        """
+        decision = self.decide(market_data, position_open=position_open, now=now)
+        if self.policy.get('enabled', True):
+            self.last_decision = decision
+            print(f"Claude 예산 티어: {decision['tier']} (thinking {decision['thinking_budget']}, "
+                  f"max_tokens {decision['max_tokens']}, 신호 {decision['signals']})")
+        return decision
+
+    def decide(self, market_data, position_open=False, now=None):
+        """예산 티어 계산만 수행 (부수 효과 없음 - 분석 캐시 키 계산에도 사용)"""
+        if not self.policy.get('enabled', True):
+            tier = self.policy.get('default_tier', 'standard')
+            thinking_budget, max_tokens = self._tier_budget(tier)
+            return {'tier': tier, 'thinking_budget': thinking_budget, 'max_tokens': max_tokens, 'signals': {}}
+
+        now = now or datetime.now()
+        atr_percent = self._get_atr_percent(market_data)
+        diagonal_near = self._diagonal_near(market_data)
+        minutes_to_close = (AnalysisCache.next_candle_close(now) - now).total_seconds() / 60
+
+        score = 0
+        if atr_percent is not None:
+            if atr_percent >= self.policy['volatile_atr_percent']:
+                score += 1
+            elif atr_percent <= self.policy['calm_atr_percent']:
+                score -= 1
+        if diagonal_near:
+            score += 1
+        if position_open:
+            score += 1
+
+        if score >= 2:
+            tier = 'deep'
+        elif score <= -1:
+            tier = 'fast'
+        else:
+            tier = 'standard'
+
+        # 15분봉 마감 직전이면 결과가 곧 낡으므로 한 단계 낮춤
+        if minutes_to_close < self.policy['deadline_minutes'] and tier != 'fast':
+            tier = self.TIERS[self.TIERS.index(tier) - 1]
+
+        thinking_budget, max_tokens = self._tier_budget(tier)
+        return {
+            'tier': tier,
+            'thinking_budget': thinking_budget,
+            'max_tokens': max_tokens,
+            'signals': {
+                'atr_percent': atr_percent,
+                'diagonal_near': diagonal_near,
+                'position_open': position_open,
+                'minutes_to_close': round(minutes_to_close, 1),
+                'score': score,
+            }
+        }
+
+    def record(self, tier, latency_seconds, usage=None):
+        """티어별 호출 지연 시간 기록"""
+        if tier not in self.latencies:
+            return
+        self.latencies[tier].append({
+            'time': datetime.now().isoformat(),
+            'latency_seconds': round(latency_seconds, 2),
+            'output_tokens': (usage or {}).get('output_tokens'),
+        })
+
+    def get_stats(self):
+        """정책과 티어별 지연 시간 통계"""
+        stats = {}
+        for tier, records in self.latencies.items():
+            latencies = sorted(r['latency_seconds'] for r in records)
+            if not latencies:
+                stats[tier] = {'count': 0}
+                continue
+            stats[tier] = {
+                'count': len(latencies),
+                'avg_latency_seconds': round(sum(latencies) / len(latencies), 2),
+                'p50_latency_seconds': latencies[len(latencies) // 2],
+                'max_latency_seconds': latencies[-1],
+                'recent': list(records)[-5:],
+            }
+        return {
+            'policy': self.policy,
+            'last_decision': self.last_decision,
+            'tiers': stats,
+        }
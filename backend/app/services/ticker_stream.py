@@ -0,0 +1,235 @@
+import asyncio
+import json
+import time
+import traceback
+
+import websockets
+
+
+BITGET_PUBLIC_WS_URL = "wss://ws.bitget.com/v2/ws/public"
+
+
+class TickerStream:
+    """대시보드용 실시간 시세/포지션 손익 스트림 (서버 전체에서 피드 1개)
+
+    Bitget 공개 WebSocket ticker 채널을 하나만 구독하여 최신 시세를 덮어쓰고(conflation),
+    rate_hz 주기로 샘플링해 캐시된 포지션(진입가, 레버리지, 수량)으로 손익/ROE를 로컬 계산한 뒤
+    ticker 토픽 상태로 발행합니다. 구독자 수와 관계없이 거래소 부하는 피드 1개이며, 값이 바뀐
+    경우에만 patch가 전송됩니다.
+
+    REST 요청은 BitgetService의 요청 간격 제한(300ms)을 거래 로직과 공유하므로 고주기 시세는
+    WebSocket 피드로 받고, 피드가 끊긴 동안에만 rest_fallback_seconds 간격으로 REST 시세를 조회합니다.
+    ticker 토픽 구독자가 없으면 피드를 닫습니다.
+    """
+
+    def __init__(self, websocket_manager, bitget, rate_hz=4, position_refresh_seconds=5,
+                 rest_fallback_seconds=2, stale_seconds=5, symbol="BTCUSDT", url=BITGET_PUBLIC_WS_URL):
+        """
+        Args:
+            rate_hz: 구독자에게 발행하는 최대 주기 (초당 횟수)
+            position_refresh_seconds: 포지션(진입가/레버리지/수량) 캐시 갱신 주기
+            rest_fallback_seconds: 피드가 끊겼을 때 REST 시세 조회 간격
+            stale_seconds: 이 시간 동안 피드 수신이 없으면 끊긴 것으로 판단
+        """
+        self.websocket_manager = websocket_manager
+        self.bitget = bitget
+        self.interval = 1.0 / max(rate_hz, 0.1)
+        self.position_refresh_seconds = position_refresh_seconds
+        self.rest_fallback_seconds = rest_fallback_seconds
+        self.stale_seconds = stale_seconds
+        self.symbol = symbol
+        self.url = url
+        self.latest = None  # 최신 ticker 원본 (Bitget 필드명)
+        self.latest_at = 0
+        self.source = None
+        self.position = None
+        self.position_at = 0
+        self._feed_task = None
+        self._position_task = None
+        self._rest_at = 0
+        self.stats = {'feed_messages': 0, 'feed_reconnects': 0, 'rest_fallbacks': 0, 'published': 0}
+
+    # ---- 거래소 피드 ----
+
+    async def _feed(self):
+        """Bitget 공개 WebSocket ticker 구독 (끊기면 지수 백오프로 재연결)"""
+        subscribe = json.dumps({
+            "op": "subscribe",
+            "args": [{"instType": "USDT-FUTURES", "channel": "ticker", "instId": self.symbol}],
+        })
+        backoff = 1
+        while True:
+            try:
+                async with websockets.connect(self.url, ping_interval=None) as ws:
+                    await ws.send(subscribe)
+                    print(f"시세 피드 연결됨: {self.url} ({self.symbol})")
+                    backoff = 1
+                    last_ping = time.monotonic()
+                    while True:
+                        # Bitget은 30초마다 문자열 ping 필요
+                        if time.monotonic() - last_ping >= 25:
+                            await ws.send("ping")
+                            last_ping = time.monotonic()
+                        try:
+                            raw = await asyncio.wait_for(ws.recv(), timeout=5)
+                        except asyncio.TimeoutError:
+                            continue
+                        if raw == "pong":
+                            continue
+                        message = json.loads(raw)
+                        if message.get('event') == 'error':
+                            print(f"시세 피드 구독 오류: {message}")
+                            continue
+                        for item in message.get('data') or []:
+                            if item.get('instId', self.symbol) == self.symbol:
+                                self._update_ticker(item, 'websocket')
+                                self.stats['feed_messages'] += 1
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                self.stats['feed_reconnects'] += 1
+                print(f"시세 피드 연결 끊김, {backoff}초 후 재연결: {str(e)}")
+                await asyncio.sleep(backoff)
+                backoff = min(backoff * 2, 60)
+
+    def _update_ticker(self, item, source):
+        self.latest = item
+        self.latest_at = time.monotonic()
+        self.source = source
+
+    def fresh_price(self):
+        """피드로 받은 최신 가격 (stale_seconds 이내가 아니면 None)"""
+        if not self.latest or time.monotonic() - self.latest_at > self.stale_seconds:
+            return None
+        price = self.latest.get('lastPr')
+        return float(price) if price else None
+
+    async def _rest_fallback(self):
+        """피드가 끊긴 동안 REST로 시세 조회 (rest_fallback_seconds 간격)"""
+        now = time.monotonic()
+        if now - self._rest_at < self.rest_fallback_seconds:
+            return
+        self._rest_at = now
+        loop = asyncio.get_running_loop()
+        ticker = await loop.run_in_executor(None, self.bitget.get_ticker)
+        if ticker and ticker.get('data'):
+            self._update_ticker(ticker['data'][0], 'rest')
+            self.stats['rest_fallbacks'] += 1
+
+    async def _refresh_position(self):
+        loop = asyncio.get_running_loop()
+        positions = await loop.run_in_executor(None, self.bitget.get_positions)
+        if positions is None or 'data' not in positions:
+            return  # 조회 실패 시 이전 캐시 유지
+        self.position = next(
+            (pos for pos in positions['data'] or [] if float(pos.get('total', 0) or 0) > 0), None
+        )
+
+    # ---- 손익 계산 / 발행 ----
+
+    @staticmethod
+    def compute_pnl(position, mark_price):
+        """캐시된 포지션과 마크 가격으로 미실현 손익/ROE 계산 (_update_position_info와 같은 ROE 식)"""
+        if not position or not mark_price:
+            return None
+        size = float(position.get('total', 0) or 0)
+        entry_price = float(position.get('openPriceAvg', 0) or 0)
+        leverage = float(position.get('leverage', 1) or 1)
+        side = (position.get('holdSide') or '').lower()
+        if size <= 0 or entry_price <= 0:
+            return None
+
+        if side == 'long':
+            pnl = (mark_price - entry_price) * size
+            roe = ((mark_price / entry_price) - 1) * 100 * leverage
+        else:
+            pnl = (entry_price - mark_price) * size
+            roe = ((entry_price / mark_price) - 1) * 100 * leverage
+        return {
+            'side': side,
+            'size': size,
+            'entry_price': entry_price,
+            'leverage': leverage,
+            'unrealized_pnl': round(pnl, 2),
+            'roe': round(roe, 2),
+        }
+
+    def build_payload(self):
+        item = self.latest
+        if not item:
+            return None
+
+        def number(key):
+            value = item.get(key)
+            return float(value) if value not in (None, '') else None
+
+        price = number('lastPr')
+        mark_price = number('markPrice') or price
+        return {
+            'symbol': self.symbol,
+            'price': price,
+            'mark_price': mark_price,
+            'high_24h': number('high24h'),
+            'low_24h': number('low24h'),
+            'change_24h': number('change24h'),
+            'volume_24h': number('baseVolume'),
+            'source': self.source,
+            'position_pnl': self.compute_pnl(self.position, mark_price),
+        }
+
+    async def _tick(self, wait_position=False):
+        if time.monotonic() - self.latest_at > self.stale_seconds:
+            await self._rest_fallback()
+
+        # 포지션 캐시는 별도 태스크에서 갱신하여 시세 발행 주기를 지연시키지 않음
+        now = time.monotonic()
+        if now - self.position_at >= self.position_refresh_seconds and (
+            self._position_task is None or self._position_task.done()
+        ):
+            self.position_at = now
+            self._position_task = asyncio.create_task(self._refresh_position())
+        if wait_position and self._position_task is not None:
+            await self._position_task
+
+        payload = self.build_payload()
+        if payload:
+            self.websocket_manager.publish_state('ticker', payload)
+            self.stats['published'] += 1
+
+    async def publish_once(self):
+        """구독 직후 스냅샷용 1회 발행"""
+        try:
+            await self._tick(wait_position=True)
+        except Exception as e:
+            print(f"시세 스트림 발행 중 오류: {str(e)}")
+
+    async def run(self):
+        """서버 이벤트 루프에서 실행 - 구독자가 있는 동안 피드를 유지하고 rate_hz로 발행"""
+        print(f"시세 스트림 시작 ({1 / self.interval:.1f}Hz)")
+        while True:
+            started = time.monotonic()
+            try:
+                if self.websocket_manager.has_subscribers('ticker'):
+                    if self._feed_task is None or self._feed_task.done():
+                        self._feed_task = asyncio.create_task(self._feed())
+                    await self._tick()
+                elif self._feed_task is not None:
+                    self._feed_task.cancel()
+                    self._feed_task = None
+                    self.latest = None
+                    self.position_at = 0
+                    print("시세 스트림 구독자 없음 - 피드 종료")
+            except Exception as e:
+                print(f"시세 스트림 처리 중 오류: {str(e)}")
+                traceback.print_exc()
+            await asyncio.sleep(max(self.interval - (time.monotonic() - started), 0))
+
+    def get_stats(self):
+        return {
+            'rate_hz': round(1 / self.interval, 2),
+            'feed_running': self._feed_task is not None and not self._feed_task.done(),
+            'source': self.source,
+            'last_update_age_seconds': round(time.monotonic() - self.latest_at, 2) if self.latest else None,
+            'has_position': self.position is not None,
+            **self.stats,
+        }
@@ -0,0 +1,299 @@
+from contextlib import contextmanager
+from datetime import datetime
+import contextvars
+import functools
+import inspect
+import itertools
+import threading
+import time
+import uuid
+
+from app.database.db import SessionLocal
+from app.models.pipeline_trace import PipelineTrace
+from .serialization import to_jsonable
+from config.settings import PIPELINE_TRACE_ENABLED, PIPELINE_TRACE_RETENTION, PIPELINE_TRACE_MAX_SPANS
+
+
+# 현재 실행 중인 span (asyncio 태스크는 생성 시 컨텍스트를 복사하므로 gather/create_task 하위 작업에도 전파됨)
+_current_span = contextvars.ContextVar('pipeline_current_span', default=None)
+
+
+class Span:
+    """파이프라인 단계 1개 (시각은 perf_counter, 저장 시 트레이스 시작 기준 ms로 변환)"""
+
+    __slots__ = ('trace', 'span_id', 'parent_id', 'name', 'attributes', 'start', 'end', 'status', 'thread')
+
+    def __init__(self, trace, span_id, parent_id, name, attributes):
+        self.trace = trace
+        self.span_id = span_id
+        self.parent_id = parent_id
+        self.name = name
+        self.attributes = dict(attributes)
+        self.start = time.perf_counter()
+        self.end = None
+        self.status = 'ok'
+        self.thread = threading.current_thread().name
+
+    def set_attribute(self, key, value):
+        self.attributes[key] = value
+
+    def finish(self, error=None):
+        self.end = time.perf_counter()
+        if error is not None:
+            self.status = 'error'
+            self.attributes['error'] = f"{type(error).__name__}: {error}"[:500]
+
+    def to_dict(self):
+        end = self.end if self.end is not None else time.perf_counter()
+        return {
+            'span_id': self.span_id,
+            'parent_id': self.parent_id,
+            'name': self.name,
+            'start_ms': round((self.start - self.trace.start) * 1000, 2),
+            'duration_ms': round((end - self.start) * 1000, 2),
+            'status': self.status if self.end is not None else 'unfinished',
+            'attributes': self.attributes,
+            'thread': self.thread,
+        }
+
+
+class _Trace:
+    """분석 사이클 1회의 span 모음 (여러 스레드에서 span이 추가될 수 있음)"""
+
+    def __init__(self, name, max_spans):
+        self.trace_id = uuid.uuid4().hex[:16]
+        self.name = name
+        self.started_at = datetime.now()
+        self.start = time.perf_counter()
+        self.max_spans = max_spans
+        self.spans = []
+        self.dropped = 0
+        self.closed = False
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def new_span(self, name, parent, attributes):
+        with self._lock:
+            # 종료된 트레이스(예: 타임아웃 후에도 실행 중인 LLM 호출 스레드)나 상한 초과 span은 기록하지 않음
+            if self.closed or len(self.spans) >= self.max_spans:
+                self.dropped += 1
+                return None
+            span = Span(self, next(self._ids), parent.span_id if parent else None, name, attributes)
+            self.spans.append(span)
+            return span
+
+    def close(self):
+        with self._lock:
+            self.closed = True
+            return [span.to_dict() for span in self.spans]
+
+
+class PipelineTracer:
+    """분석 파이프라인 단계별 트레이서
+
+    trace()로 사이클을 시작하면 그 안에서 열린 span()/traced() 단계가 부모-자식 관계로 기록되고,
+    사이클이 끝나면 pipeline_traces 테이블에 저장됩니다. 진행 중인 트레이스가 없으면 span()은
+    아무것도 기록하지 않으므로 같은 함수를 사이클 밖(API 단건 조회 등)에서 호출해도 비용이 거의 없습니다.
+
+    현재 span은 contextvars로 전파됩니다. asyncio 태스크와 run_coroutine_threadsafe는 자동으로
+    전파되지만 run_in_executor는 그렇지 않으므로 스레드 풀에 넘기는 함수는 wrap()으로 감쌉니다.
+    """
+
+    def __init__(self, enabled=PIPELINE_TRACE_ENABLED, retention=PIPELINE_TRACE_RETENTION,
+                 max_spans=PIPELINE_TRACE_MAX_SPANS):
+        self.enabled = enabled
+        self.retention = retention
+        self.max_spans = max_spans
+        self.stats = {'traces': 0, 'spans_dropped': 0, 'save_failures': 0}
+
+    # ---- span 기록 ----
+
+    @contextmanager
+    def trace(self, name, **attributes):
+        """새 트레이스 시작 (이미 트레이스 안이면 하위 span으로 기록)"""
+        if not self.enabled or _current_span.get() is not None:
+            with self.span(name, **attributes) as span:
+                yield span
+            return
+
+        trace = _Trace(name, self.max_spans)
+        root = trace.new_span(name, None, attributes)
+        token = _current_span.set(root)
+        error = None
+        try:
+            yield root
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current_span.reset(token)
+            root.finish(error)
+            self._save(trace, root)
+
+    @contextmanager
+    def span(self, name, **attributes):
+        """현재 트레이스 안에 하위 단계 기록 (트레이스 밖이면 None을 넘기고 기록하지 않음)"""
+        parent = _current_span.get()
+        span = parent.trace.new_span(name, parent, attributes) if parent is not None else None
+        if span is None:
+            yield None
+            return
+
+        token = _current_span.set(span)
+        error = None
+        try:
+            yield span
+        except BaseException as e:
+            error = e
+            raise
+        finally:
+            _current_span.reset(token)
+            span.finish(error)
+
+    def traced(self, name=None, root=False):
+        """함수 실행을 span으로 기록하는 데코레이터 (root=True면 트레이스 시작점)"""
+        def decorator(func):
+            span_name = name or func.__name__
+            open_span = self.trace if root else self.span
+
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    if not root and _current_span.get() is None:
+                        return await func(*args, **kwargs)
+                    with open_span(span_name):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                if not root and _current_span.get() is None:
+                    return func(*args, **kwargs)
+                with open_span(span_name):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @staticmethod
+    def wrap(func):
+        """현재 컨텍스트(진행 중인 span)에서 func를 실행하는 호출 객체 (run_in_executor용)"""
+        return functools.partial(contextvars.copy_context().run, func)
+
+    @staticmethod
+    def set_attribute(key, value):
+        """현재 span에 속성 추가 (트레이스 밖이면 무시)"""
+        span = _current_span.get()
+        if span is not None:
+            span.set_attribute(key, value)
+
+    @staticmethod
+    def current_trace_id():
+        span = _current_span.get()
+        return span.trace.trace_id if span is not None else None
+
+    # ---- 저장 / 조회 ----
+
+    def _save(self, trace, root):
+        spans = trace.close()
+        self.stats['traces'] += 1
+        self.stats['spans_dropped'] += trace.dropped
+        db = SessionLocal()
+        try:
+            db.add(PipelineTrace(
+                trace_id=trace.trace_id,
+                name=trace.name,
+                status=root.status,
+                started_at=trace.started_at,
+                duration_ms=round((root.end - root.start) * 1000, 2),
+                span_count=len(spans),
+                attributes=to_jsonable(root.attributes),
+                spans=to_jsonable(spans),
+            ))
+            db.commit()
+
+            # 최근 retention개만 유지
+            cutoff = (
+                db.query(PipelineTrace.started_at)
+                .order_by(PipelineTrace.started_at.desc())
+                .offset(self.retention)
+                .limit(1)
+                .scalar()
+            )
+            if cutoff is not None:
+                db.query(PipelineTrace).filter(PipelineTrace.started_at <= cutoff).delete(synchronize_session=False)
+                db.commit()
+        except Exception as e:
+            self.stats['save_failures'] += 1
+            print(f"파이프라인 트레이스 저장 실패 ({trace.trace_id}): {str(e)}")
+            db.rollback()
+        finally:
+            db.close()
+
+    @staticmethod
+    def _summary(record):
+        return {
+            'trace_id': record.trace_id,
+            'name': record.name,
+            'status': record.status,
+            'started_at': record.started_at.isoformat() if record.started_at else None,
+            'duration_ms': record.duration_ms,
+            'span_count': record.span_count,
+            'attributes': record.attributes,
+        }
+
+    @staticmethod
+    def waterfall(spans, total_ms, width=60):
+        """span 목록을 시작 시각 순 트리로 정렬하고 깊이, 자체 시간(self_ms), 막대를 추가"""
+        children = {}
+        for span in spans:
+            children.setdefault(span['parent_id'], []).append(span)
+        for siblings in children.values():
+            siblings.sort(key=lambda span: span['start_ms'])
+
+        scale = width / total_ms if total_ms else 0
+        rows = []
+
+        def visit(span, depth):
+            child_ms = sum(child['duration_ms'] for child in children.get(span['span_id'], []))
+            offset = min(int(span['start_ms'] * scale), width - 1)
+            length = min(max(int(span['duration_ms'] * scale), 1), width - offset)
+            rows.append({
+                **span,
+                'depth': depth,
+                'self_ms': round(max(span['duration_ms'] - child_ms, 0), 2),
+                'bar': ' ' * offset + '█' * length,
+            })
+            for child in children.get(span['span_id'], []):
+                visit(child, depth + 1)
+
+        for root in children.get(None, []):
+            visit(root, 0)
+        return rows
+
+    def get_trace(self, trace_id):
+        """트레이스 1개를 워터폴 형태로 조회 (없으면 None)"""
+        db = SessionLocal()
+        try:
+            record = db.query(PipelineTrace).filter_by(trace_id=trace_id).first()
+            if record is None:
+                return None
+            return {**self._summary(record), 'spans': self.waterfall(record.spans or [], record.duration_ms)}
+        finally:
+            db.close()
+
+    def list_traces(self, limit=20, name=None):
+        db = SessionLocal()
+        try:
+            query = db.query(PipelineTrace)
+            if name:
+                query = query.filter_by(name=name)
+            records = query.order_by(PipelineTrace.started_at.desc()).limit(limit).all()
+            return [self._summary(record) for record in records]
+        finally:
+            db.close()
+
+    def get_stats(self):
+        return {'enabled': self.enabled, 'retention': self.retention, **self.stats}
+
+
+pipeline_tracer = PipelineTracer()
@@ -7,79 +7,33 @@ from .ai_service import AIService
 from app.models.trading_history import TradingHistory
 from app.models.trading_settings import EmailSettings
 from app.database.db import get_db
-from apscheduler.schedulers.background import BackgroundScheduler
-from apscheduler.triggers.date import DateTrigger
 import uuid
 import asyncio
 import threading
-import json
+import logging
 import sys
 import traceback
 from io import StringIO
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from .email_service import EmailService
+from .sideways_gate import SidewaysGate
+from .diagonal_analytics import DiagonalAnalytics
+from .diagonal_anchor_detector import DiagonalAnchorDetector
+from .monitoring_context import MonitoringContext
+from .speculative_analysis import SpeculativeAnalysis
+from .async_scheduler import AsyncJobScheduler
+from .job_store import PersistentJobRegistry
+from .candle_cache import CandleCache
+from .metrics import CANDLE_FETCH_SIZE, INDICATOR_COMPUTE_SECONDS, timed
+from .tracer import pipeline_tracer
+from .structured_logging import LazyJSON, verbosity
+from config.settings import (
+    SIDEWAYS_GATE_ENABLED, MONITORING_DELTA_PROMPT_ENABLED,
+    SPECULATIVE_ANALYSIS_ENABLED, SPECULATIVE_LEAD_SECONDS, SPECULATIVE_MAX_PRICE_DRIFT_PCT,
+    SPECULATIVE_MAX_NEW_15M_CANDLES, SPECULATIVE_WAIT_SECONDS,
+    SCHEDULER_MAX_CONCURRENT_JOBS, SCHEDULER_BLOCKING_WORKERS, CANDLE_CACHE_MAX_PER_GRANULARITY
+)
 
-# 웹소켓 연결 관리자 클래스 추가
-class WebSocketConnectionManager:
-    def __init__(self):
-        self.active_connections = set()
-        print("WebSocketConnectionManager 초기화됨")
-    
-    async def connect(self, websocket):
-        await websocket.accept()
-        self.active_connections.add(websocket)
-        print(f"새로운 WebSocket 연결 추가됨. 현재 연결 수: {len(self.active_connections)}")
-    
-    def disconnect(self, websocket):
-        self.active_connections.remove(websocket)
-        print(f"WebSocket 연결 해제됨. 현재 연결 수: {len(self.active_connections)}")
-    
-    async def broadcast(self, message):
-        """메시지를 모든 활성 연결에 브로드캐스트"""
-        if not self.active_connections:
-            print("활성화된 WebSocket 연결이 없습니다.")
-            return
-
-        print(f"\n=== WebSocket 브로드캐스트 시작 ===")
-        print(f"활성 연결 수: {len(self.active_connections)}")
-        
-        def convert_datetime_to_str(obj):
-            if isinstance(obj, datetime):
-                return obj.isoformat()
-            return obj
-        
-        try:
-            if isinstance(message, dict):
-                message = json.dumps(message, default=convert_datetime_to_str)
-                print(f"브로드캐스트할 메시지:\n{json.dumps(json.loads(message), indent=2)}")
-            
-            disconnected = set()
-            successful = 0
-            
-            for connection in self.active_connections:
-                try:
-                    await connection.send_text(message)
-                    successful += 1
-                except Exception as e:
-                    print(f"연결에 대한 브로드캐스트 실패: {str(e)}")
-                    disconnected.add(connection)
-            
-            # 끊어진 연결 제거
-            for connection in disconnected:
-                self.disconnect(connection)
-            
-            print(f"\n브로드캐스트 결과:")
-            print(f"- 성공: {successful}")
-            print(f"- 실패/연결 해제: {len(disconnected)}")
-            print(f"- 남은 연결 수: {len(self.active_connections)}")
-            
-        except Exception as e:
-            print(f"브로드캐스트 중 예외 발생: {str(e)}")
-            import traceback
-            traceback.print_exc()
-
-# 전역 웹소켓 연결 관리자 인스턴스 생성
-websocket_manager = WebSocketConnectionManager()
+logger = logging.getLogger(__name__)
 
 class JobType:
     """작업 유형 정의"""
@@ -87,6 +41,13 @@ class JobType:
     FORCE_CLOSE = "FORCE_CLOSE"  # 강제 청산 작업
     MONITORING = "MONITORING"  # 4시간마다 포지션 모니터링
 
+# 같은 시점에 실행 대기 중인 작업의 우선순위 (낮을수록 먼저 실행)
+JOB_PRIORITY = {
+    JobType.FORCE_CLOSE: 0,
+    JobType.MONITORING: 1,
+    JobType.ANALYSIS: 2,
+}
+
 class TradingAssistant:
     # 싱글톤 인스턴스
     _instance = None
@@ -122,12 +83,41 @@ class TradingAssistant:
         # 이메일 서비스 초기화
         self.email_service = EmailService()
         
-        # 스케줄러 초기화 (AsyncIOScheduler 대신 BackgroundScheduler 사용)
-        self.scheduler = BackgroundScheduler()
+        # Step 0 횡보 체크 규칙 엔진 (AI 호출 전 단락)
+        self.sideways_gate = SidewaysGate(enabled=SIDEWAYS_GATE_ENABLED)
+        
+        # 빗각/채널 계산기
+        self.diagonal_analytics = DiagonalAnalytics()
+        
+        # 빗각 기준점 자동 탐지기 및 수동 설정 캐시 (분석마다 DB 조회하지 않음)
+        self.diagonal_anchor_detector = DiagonalAnchorDetector()
+        self._diagonal_settings_cache = None
+        
+        # 모니터링 델타 컨텍스트 (진입 이후 변경분만 프롬프트로 전달)
+        self.monitoring_context = MonitoringContext()
+        
+        # 투기적 사전 분석 (예약 시간 전에 미리 분석 시작)
+        self.speculative_analysis = SpeculativeAnalysis(
+            lead_seconds=SPECULATIVE_LEAD_SECONDS,
+            max_price_drift_pct=SPECULATIVE_MAX_PRICE_DRIFT_PCT,
+            max_new_15m_candles=SPECULATIVE_MAX_NEW_15M_CANDLES,
+            wait_seconds=SPECULATIVE_WAIT_SECONDS,
+            enabled=SPECULATIVE_ANALYSIS_ENABLED,
+        )
+        
+        # 스케줄러 초기화 (모든 작업을 하나의 장수 이벤트 루프에서 코루틴으로 실행)
+        self.scheduler = AsyncJobScheduler(
+            max_concurrent_jobs=SCHEDULER_MAX_CONCURRENT_JOBS,
+            blocking_workers=SCHEDULER_BLOCKING_WORKERS,
+        )
         self.scheduler.start()
         
-        # 활성 작업 목록
-        self.active_jobs = {}
+        # 시간봉별 캔들 캐시 (시장 데이터 수집 결과 재사용 - /api/market/kline 페이지 조회)
+        self.candle_cache = CandleCache(max_candles=CANDLE_CACHE_MAX_PER_GRANULARITY)
+        
+        # 활성 작업 목록 (SQLite write-through, 재시작 시 복구)
+        self.active_jobs = PersistentJobRegistry(on_change=self._publish_jobs_state)
+        self.scheduler.add_listener(self._on_job_finished)
         
         # 모니터링 관련 변수
         self.monitoring_job = None
@@ -176,6 +166,13 @@ class TradingAssistant:
 
         # 포지션 모니터링 스레드 시작
         self._start_position_monitor_thread()
+        
+        # 투기적 사전 분석 감시 스레드 시작
+        if self.speculative_analysis.enabled:
+            self._start_speculative_watcher_thread()
+        
+        # 저장된 예약 작업 복구 (실제 포지션과 대조)
+        self._recover_jobs()
 
         print("TradingAssistant 초기화 완료")
 
@@ -211,6 +208,37 @@ class TradingAssistant:
             }
     
     def _get_diagonal_settings(self):
+        """빗각 설정 반환 - 수동 설정 우선, 없으면 자동 탐지 기준점 사용
+        
+        수동 설정은 최초 1회 DB에서 로드한 뒤 메모리에 캐시합니다.
+        (빗각 설정 변경 시 invalidate_diagonal_settings()로 캐시 무효화)
+        """
+        if self._diagonal_settings_cache is None:
+            self._diagonal_settings_cache = self._load_diagonal_settings()
+        
+        auto_settings = self.diagonal_anchor_detector.get_settings()
+        point_keys = ('point_a_time', 'point_second_time', 'point_b_time')
+        
+        result = {}
+        for direction in ('uptrend', 'downtrend'):
+            manual = self._diagonal_settings_cache.get(direction, {})
+            auto = auto_settings.get(direction, {})
+            
+            if all(manual.get(key) for key in point_keys):
+                result[direction] = {**manual, 'source': 'manual'}
+            elif all(auto.get(key) for key in point_keys):
+                result[direction] = {**auto, 'source': 'auto'}
+            else:
+                result[direction] = {**manual, 'source': None}
+        
+        print(f"빗각 설정: 상승={result['uptrend']['source']}, 하락={result['downtrend']['source']}")
+        return result
+    
+    def invalidate_diagonal_settings(self):
+        """빗각 수동 설정 캐시 무효화 (다음 분석 시 DB에서 다시 로드)"""
+        self._diagonal_settings_cache = None
+    
+    def _load_diagonal_settings(self):
         """데이터베이스에서 빗각 설정 로드 - 상승/하락 빗각 모두 (레거시 호환)"""
         try:
             from app.models.trading_settings import DiagonalSettings
@@ -301,6 +329,7 @@ class TradingAssistant:
                 }
             }
     
+    @pipeline_tracer.traced('extract_diagonal_candles')
     def _extract_diagonal_candles(self, diagonal_settings, candles_1h):
         """
         사용자가 지정한 시간의 캔들 데이터를 1시간봉에서 추출 - 상승/하락 빗각 모두
@@ -322,7 +351,10 @@ class TradingAssistant:
             
             # 상승 빗각 추출
             uptrend_settings = diagonal_settings.get('uptrend', {})
-            if uptrend_settings.get('point_a_time') and uptrend_settings.get('point_second_time') and uptrend_settings.get('point_b_time'):
+            if uptrend_settings.get('source') == 'auto':
+                result['uptrend'] = self.diagonal_anchor_detector.extract(candles_1h, 'uptrend')
+                print(f"[상승 빗각] 자동 탐지 기준점 사용: {'✅' if result['uptrend'] else '⚠️ 캔들 없음'}")
+            elif uptrend_settings.get('point_a_time') and uptrend_settings.get('point_second_time') and uptrend_settings.get('point_b_time'):
                 print(f"\n[상승 빗각] 캔들 추출 중...")
                 print(f"  Point A 시간: {uptrend_settings['point_a_time']}")
                 print(f"  두 번째 저점 시간: {uptrend_settings['point_second_time']}")
@@ -348,7 +380,10 @@ class TradingAssistant:
             
             # 하락 빗각 추출
             downtrend_settings = diagonal_settings.get('downtrend', {})
-            if downtrend_settings.get('point_a_time') and downtrend_settings.get('point_second_time') and downtrend_settings.get('point_b_time'):
+            if downtrend_settings.get('source') == 'auto':
+                result['downtrend'] = self.diagonal_anchor_detector.extract(candles_1h, 'downtrend')
+                print(f"[하락 빗각] 자동 탐지 기준점 사용: {'✅' if result['downtrend'] else '⚠️ 캔들 없음'}")
+            elif downtrend_settings.get('point_a_time') and downtrend_settings.get('point_second_time') and downtrend_settings.get('point_b_time'):
                 print(f"\n[하락 빗각] 캔들 추출 중...")
                 print(f"  Point A 시간: {downtrend_settings['point_a_time']}")
                 print(f"  두 번째 고점 시간: {downtrend_settings['point_second_time']}")
@@ -429,6 +464,208 @@ class TradingAssistant:
         except Exception as e:
             print(f"포지션 모니터링 스레드 시작 실패: {str(e)}")
 
+    def _publish_jobs_state(self):
+        """예약 작업 목록이 바뀌면 jobs 토픽 구독자에게 변경분 전송"""
+        if self.websocket_manager is not None:
+            self.websocket_manager.publish_state('jobs', self.get_active_jobs())
+
+    def _on_job_finished(self, job, event):
+        """실행이 끝난(성공/실패/누락) 작업을 active_jobs와 저장소에서 제거"""
+        if self.scheduler.get_job(job.id) is None and job.id in self.active_jobs:
+            self.active_jobs.pop(job.id, None)
+
+    def _job_runner(self, job_type, job_id, job_info):
+        """저장된 작업 유형별 실행 함수와 인자"""
+        if job_type == JobType.ANALYSIS:
+            return self._run_analysis_job, [job_id]
+        if job_type == JobType.FORCE_CLOSE:
+            return self._run_force_close_job, [job_id]
+        if job_type == JobType.MONITORING:
+            return self._execute_monitoring_job, [job_id, job_info.get('position_side'), job_info.get('expected_minutes')]
+        return None, None
+
+    def _recover_jobs(self):
+        """저장된 예약 작업을 Bitget 포지션과 한 번 대조하여 스케줄 복구 (시작 시 1회)
+
+        - 포지션 있음: FORCE_CLOSE(expected_minutes 마감)와 최신 MONITORING 복구, 본분석은 폐기
+          (청산 후 다시 예약됨)
+        - 포지션 없음: 최신 본분석만 복구, 모니터링/강제청산은 폐기
+        - 포지션 조회 실패: 저장된 작업을 그대로 복구 (각 작업이 실행 시 포지션을 다시 확인함)
+        예약 시간이 이미 지난 작업은 즉시 실행하여 강제청산 마감을 놓치지 않습니다.
+        """
+        start = time.perf_counter()
+        try:
+            records = PersistentJobRegistry.load_records()
+        except Exception as e:
+            print(f"저장된 예약 작업 조회 실패: {str(e)}")
+            return
+        if not records:
+            return
+
+        print(f"\n=== 저장된 예약 작업 복구 ({len(records)}건) ===")
+        has_position = None
+        position_side = None
+        try:
+            positions = self.bitget.get_positions()
+            if positions and 'data' in positions:
+                open_positions = [pos for pos in positions['data'] if float(pos.get('total', 0)) > 0]
+                has_position = bool(open_positions)
+                position_side = open_positions[0].get('holdSide') if open_positions else None
+        except Exception as e:
+            print(f"포지션 조회 실패 - 저장된 작업을 그대로 복구합니다: {str(e)}")
+
+        now = datetime.now()
+        restore = []
+        discard = []
+        latest = {}  # 본분석/모니터링은 유형별 가장 늦게 예약된 1건만 유효
+        for record in records:
+            job_type = (record['job_type'] or '').upper()
+            if has_position is True and job_type == JobType.ANALYSIS:
+                discard.append(record['job_id'])
+            elif has_position is False and job_type in (JobType.MONITORING, JobType.FORCE_CLOSE):
+                discard.append(record['job_id'])
+            elif job_type in (JobType.ANALYSIS, JobType.MONITORING):
+                previous = latest.get(job_type)
+                if previous:
+                    discard.append(previous['job_id'])
+                latest[job_type] = record
+            elif job_type == JobType.FORCE_CLOSE:
+                restore.append(record)
+            else:
+                discard.append(record['job_id'])
+        restore.extend(latest.values())
+
+        force_close_times = []
+        for record in restore:
+            job_type = record['job_type'].upper()
+            job_info = dict(record['job_info'], type=job_type)
+            func, args = self._job_runner(job_type, record['job_id'], job_info)
+            run_at = record['run_at'] or now
+            overdue = run_at <= now
+            self.scheduler.add_job(
+                func,
+                'date',
+                run_date=now if overdue else run_at,
+                id=record['job_id'],
+                args=args,
+                replace_existing=True,
+                priority=JOB_PRIORITY[job_type]
+            )
+            self.active_jobs.restore(record['job_id'], job_info)
+            if job_type == JobType.FORCE_CLOSE:
+                force_close_times.append(run_at)
+            print(f"- {job_type} {record['job_id']}: {run_at.strftime('%Y-%m-%d %H:%M:%S')}{' (지연됨, 즉시 실행)' if overdue else ''}")
+
+        # 모니터링 체인이 다음 모니터링 예약 여부를 판단할 수 있도록 종료 시간 복원
+        if force_close_times:
+            self._expected_close_time = max(force_close_times)
+            self.monitoring_end_time = self._expected_close_time
+        if position_side:
+            self._last_position_side = position_side.lower()
+
+        self.active_jobs.discard_records(discard)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        print(f"예약 작업 복구 완료: 복구 {len(restore)}건, 폐기 {len(discard)}건, 포지션 {'있음' if has_position else '없음' if has_position is False else '확인 불가'} ({elapsed_ms:.0f}ms)")
+
+    def _start_speculative_watcher_thread(self):
+        """예약된 본분석이 lead_seconds 이내로 다가오면 투기적 분석을 시작하는 스레드
+
+        본분석 작업은 여러 곳에서 예약되므로 active_jobs의 ANALYSIS 작업을 주기적으로 확인합니다.
+        (스케줄러 interval 작업으로 만들면 get_trading_status의 다음 분석 시간이 가려짐)
+        """
+        def watch_scheduled_analysis():
+            print("투기적 분석 감시 스레드 시작됨")
+            while True:
+                try:
+                    time.sleep(5)
+
+                    scheduled_jobs = {}
+                    for job_id, job_info in list(self.active_jobs.items()):
+                        if job_info.get('type') != JobType.ANALYSIS:
+                            continue
+                        job = self.scheduler.get_job(job_id)
+                        if job and job.next_run_time:
+                            scheduled_jobs[job_id] = job.next_run_time.replace(tzinfo=None)
+
+                    for job_id in self.speculative_analysis.due_jobs(scheduled_jobs):
+                        self.speculative_analysis.start(
+                            job_id, scheduled_jobs[job_id],
+                            lambda: self.scheduler.run_sync(self._run_speculative_analysis())
+                        )
+
+                except Exception as e:
+                    print(f"투기적 분석 감시 중 오류: {str(e)}")
+                    time.sleep(10)
+
+        try:
+            watcher_thread = threading.Thread(target=watch_scheduled_analysis)
+            watcher_thread.daemon = True
+            watcher_thread.start()
+        except Exception as e:
+            print(f"투기적 분석 감시 스레드 시작 실패: {str(e)}")
+
+    @pipeline_tracer.traced('speculative_analysis', root=True)
+    async def _run_speculative_analysis(self):
+        """투기적 분석 실행 (스케줄러 이벤트 루프) - 포지션이 있으면 본분석이 건너뛰므로 분석하지 않음
+
+        Returns:
+            (market_data, analysis_result) 또는 None
+        """
+        positions = await self.scheduler.run_blocking(self.bitget.get_positions)
+        if positions and 'data' in positions:
+            if any(float(pos.get('total', 0)) > 0 for pos in positions['data']):
+                print("포지션 보유 중 - 투기적 분석 생략")
+                return None
+
+        market_data = await self._collect_market_data()
+        if not market_data:
+            return None
+        analysis_result = await self._analyze_snapshot(market_data)
+        return market_data, analysis_result
+
+    @pipeline_tracer.traced('analyze_snapshot')
+    async def _analyze_snapshot(self, market_data):
+        """Step 0 횡보 체크 후 AI 분석 (횡보 시 AI 호출 없이 HOLD)"""
+        gate_result = self.sideways_gate.evaluate(market_data)
+        if gate_result['is_sideways']:
+            print(f"\n=== Step 0 횡보 감지: AI 분석 생략 ===\n{gate_result['reason']}")
+            return self.sideways_gate.build_hold_decision(
+                gate_result, self.settings.get('normal_reanalysis_minutes', 60)
+            )
+        return await self.ai_service.analyze_market_data(market_data)
+
+    @pipeline_tracer.traced('claim_speculative_analysis')
+    async def _claim_speculative_analysis(self, job_id):
+        """예약 시간에 투기적 분석 결과 재사용 여부 결정
+
+        Returns:
+            (market_data, analysis_result) 또는 None (재분석 필요)
+        """
+        if not job_id or not self.speculative_analysis.enabled:
+            return None
+        entry = await asyncio.to_thread(self.speculative_analysis.claim, job_id)
+        if not entry:
+            return None
+
+        current_price = None
+        ticker = await self.scheduler.run_blocking(self.bitget.get_ticker)
+        if ticker and ticker.get('data'):
+            ticker_data = ticker['data'][0] if isinstance(ticker['data'], list) else ticker['data']
+            current_price = float(ticker_data.get('lastPr', 0)) or None
+
+        drift = self.speculative_analysis.check_drift(entry, current_price)
+        self.speculative_analysis.record(drift['reusable'])
+        print(f"\n=== 투기적 분석 드리프트 확인 ===")
+        print(f"가격 변화: {drift['price_drift_pct']}%, 새 캔들: {drift['new_candles']}, 경과: {drift['age_seconds']}초")
+        if not drift['reusable']:
+            print(f"투기적 분석 폐기 ({drift['reason']}) - 재분석합니다.")
+            return None
+
+        print("✅ 투기적 분석 결과 사용")
+        analysis_result = dict(entry['analysis'])
+        analysis_result['speculative'] = drift
+        return entry['market_data'], analysis_result
+
     async def _force_close_position_with_reschedule(self, job_id, reason="모니터링 분석 결과"):
         """포지션 방향과 반대 신호 시 강제 청산 후 60분 후 재분석"""
         try:
@@ -436,7 +673,7 @@ class TradingAssistant:
             print(f"청산 사유: {reason}")
             
             # 현재 포지션 확인
-            positions = self.bitget.get_positions()
+            positions = await self.scheduler.run_blocking(self.bitget.get_positions)
             if not positions or 'data' not in positions:
                 print("포지션 정보를 가져올 수 없음")
                 return
@@ -461,14 +698,14 @@ class TradingAssistant:
                 return
             
             # Flash Close API를 사용하여 포지션 청산
-            close_result = self.bitget.close_positions(hold_side=position_side)
+            close_result = await self.scheduler.run_blocking(self.bitget.close_positions, hold_side=position_side)
             print(f"청산 결과: {close_result}")
             
             # 청산 성공 여부 확인
             is_success = close_result.get('success', False)
             
             # 청산 성공 확인을 위해 포지션 재확인
-            verification_positions = self.bitget.get_positions()
+            verification_positions = await self.scheduler.run_blocking(self.bitget.get_positions)
             current_position_size = 0
             if verification_positions and 'data' in verification_positions:
                 for pos in verification_positions['data']:
@@ -494,54 +731,15 @@ class TradingAssistant:
                 print(f"예약 시간: {next_analysis_time.strftime('%Y-%m-%d %H:%M:%S')}")
                 print(f"작업 ID: {new_job_id}")
                 
-                # 비동기 함수를 실행하기 위한 래퍼 함수
-                def analysis_wrapper(job_id, analysis_time):
-                    """비동기 분석 함수를 실행하기 위한 래퍼"""
-                    print(f"\n=== 분석 래퍼 실행 (ID: {job_id}) ===")
-                    print(f"실행 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                    
-                    # 새로운 이벤트 루프 생성 및 설정
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    
-                    try:
-                        # 비동기 함수를 동기적으로 실행
-                        loop.run_until_complete(self.analyze_and_execute(job_id, schedule_next=True))
-                    except Exception as e:
-                        print(f"분석 작업 실행 중 오류: {str(e)}")
-                        import traceback
-                        traceback.print_exc()
-                        
-                        # 오류 발생 시 60분 후 재분석 예약
-                        def schedule_retry():
-                            retry_loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(retry_loop)
-                            try:
-                                retry_loop.run_until_complete(
-                                    self._schedule_next_analysis_on_error(f"강제 청산 후 분석 작업 {job_id} 실행 중 오류: {str(e)}")
-                                )
-                            except Exception as retry_error:
-                                print(f"재시도 예약 중 오류: {str(retry_error)}")
-                            finally:
-                                retry_loop.close()
-                        
-                        # 별도 스레드에서 재시도 예약 실행
-                        import threading
-                        retry_thread = threading.Thread(target=schedule_retry)
-                        retry_thread.daemon = True
-                        retry_thread.start()
-                    finally:
-                        # 이벤트 루프 종료
-                        loop.close()
-                
                 # 스케줄러에 작업 추가
                 self.scheduler.add_job(
-                    analysis_wrapper,
+                    self._run_analysis_job,
                     'date',
                     run_date=next_analysis_time,
                     id=new_job_id,
-                    args=[new_job_id, next_analysis_time],
-                    misfire_grace_time=300  # 5분의 유예 시간
+                    args=[new_job_id],
+                    misfire_grace_time=300,  # 5분의 유예 시간
+                    priority=JOB_PRIORITY[JobType.ANALYSIS]
                 )
                 
                 # 활성 작업에 추가
@@ -599,7 +797,7 @@ class TradingAssistant:
             print(f"\n=== 강제 청산 작업 시작 (Job ID: {job_id}) ===")
             
             # 현재 포지션 확인
-            positions = self.bitget.get_positions()
+            positions = await self.scheduler.run_blocking(self.bitget.get_positions)
             if not positions or 'data' not in positions:
                 print("포지션 정보를 가져올 수 없음")
                 return
@@ -623,14 +821,14 @@ class TradingAssistant:
                 print("청산할 포지션이 없음")
             else:
                 # Flash Close API를 사용하여 포지션 청산
-                close_result = self.bitget.close_positions(hold_side=position_side)
+                close_result = await self.scheduler.run_blocking(self.bitget.close_positions, hold_side=position_side)
                 print(f"청산 결과: {close_result}")
                 
                 # 청산 성공 여부 확인
                 is_success = close_result.get('success', False)
                 
                 # 청산 성공 확인을 위해 포지션 재확인
-                verification_positions = self.bitget.get_positions()
+                verification_positions = await self.scheduler.run_blocking(self.bitget.get_positions)
                 current_position_size = 0
                 if verification_positions and 'data' in verification_positions:
                     for pos in verification_positions['data']:
@@ -658,54 +856,15 @@ class TradingAssistant:
                     print(f"재분석 대기 시간: {reanalysis_minutes}분")
                     print(f"작업 ID: {new_job_id}")
                     
-                    # 비동기 함수를 실행하기 위한 래퍼 함수
-                    def analysis_wrapper(job_id, analysis_time):
-                        """비동기 분석 함수를 실행하기 위한 래퍼"""
-                        print(f"\n=== 분석 래퍼 실행 (ID: {job_id}) ===")
-                        print(f"실행 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                        
-                        # 새로운 이벤트 루프 생성 및 설정
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        
-                        try:
-                            # 비동기 함수를 동기적으로 실행
-                            loop.run_until_complete(self.analyze_and_execute(job_id, schedule_next=True))
-                        except Exception as e:
-                            print(f"분석 작업 실행 중 오류: {str(e)}")
-                            import traceback
-                            traceback.print_exc()
-                            
-                            # 오류 발생 시 60분 후 재분석 예약
-                            def schedule_retry():
-                                retry_loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(retry_loop)
-                                try:
-                                    retry_loop.run_until_complete(
-                                        self._schedule_next_analysis_on_error(f"강제 청산 후 분석 작업 {job_id} 실행 중 오류: {str(e)}")
-                                    )
-                                except Exception as retry_error:
-                                    print(f"재시도 예약 중 오류: {str(retry_error)}")
-                                finally:
-                                    retry_loop.close()
-                            
-                            # 별도 스레드에서 재시도 예약 실행
-                            import threading
-                            retry_thread = threading.Thread(target=schedule_retry)
-                            retry_thread.daemon = True
-                            retry_thread.start()
-                        finally:
-                            # 이벤트 루프 종료
-                            loop.close()
-                    
                     # 스케줄러에 작업 추가
                     self.scheduler.add_job(
-                        analysis_wrapper,
+                        self._run_analysis_job,
                         'date',
                         run_date=next_analysis_time,
                         id=new_job_id,
-                        args=[new_job_id, next_analysis_time],
-                        misfire_grace_time=300  # 5분의 유예 시간
+                        args=[new_job_id],
+                        misfire_grace_time=300,  # 5분의 유예 시간
+                        priority=JOB_PRIORITY[JobType.ANALYSIS]
                     )
                     
                     # 활성 작업에 추가
@@ -759,54 +918,15 @@ class TradingAssistant:
                     print(f"재시도 시간: {next_close_time.strftime('%Y-%m-%d %H:%M:%S')}")
                     print(f"작업 ID: {retry_job_id}")
                     
-                    # 재시도용 래퍼 함수
-                    def retry_close_wrapper(job_id):
-                        """재시도 강제 청산 함수를 실행하기 위한 래퍼"""
-                        print(f"\n=== 재시도 강제 청산 래퍼 실행 (ID: {job_id}) ===")
-                        print(f"실행 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                        
-                        # 새로운 이벤트 루프 생성 및 설정
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        
-                        try:
-                            # 비동기 함수를 동기적으로 실행
-                            loop.run_until_complete(self._force_close_position(job_id))
-                        except Exception as e:
-                            print(f"재시도 강제 청산 실행 중 오류: {str(e)}")
-                            import traceback
-                            traceback.print_exc()
-                            
-                            # 오류 발생 시 30분 후 재분석 예약
-                            def schedule_retry():
-                                retry_loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(retry_loop)
-                                try:
-                                    retry_loop.run_until_complete(
-                                        self._schedule_next_analysis_on_error(f"재시도 강제 청산 작업 {job_id} 실행 중 오류: {str(e)}")
-                                    )
-                                except Exception as retry_error:
-                                    print(f"재시도 예약 중 오류: {str(retry_error)}")
-                                finally:
-                                    retry_loop.close()
-                            
-                            # 별도 스레드에서 재시도 예약 실행
-                            import threading
-                            retry_thread = threading.Thread(target=schedule_retry)
-                            retry_thread.daemon = True
-                            retry_thread.start()
-                        finally:
-                            # 이벤트 루프 종료
-                            loop.close()
-                    
                     # 스케줄러에 작업 추가
                     self.scheduler.add_job(
-                        retry_close_wrapper,
+                        self._run_force_close_job,
                         'date',
                         run_date=next_close_time,
                         id=retry_job_id,
                         args=[retry_job_id],
-                        misfire_grace_time=300  # 5분의 유예 시간
+                        misfire_grace_time=300,  # 5분의 유예 시간
+                        priority=JOB_PRIORITY[JobType.FORCE_CLOSE]
                     )
                     
                     # 활성 작업에 추가
@@ -843,6 +963,7 @@ class TradingAssistant:
         except Exception as e:
             print(f"FORCE_CLOSE 작업 취소 중 오류 발생: {str(e)}")
 
+    @pipeline_tracer.traced('indicator_summary')
     def _generate_indicator_summary(self, technical_indicators, current_price):
         """기술적 지표 요약 생성 (AI가 쉽게 읽을 수 있도록)"""
         try:
@@ -1018,6 +1139,7 @@ class TradingAssistant:
             traceback.print_exc()
             return {}
     
+    @pipeline_tracer.traced('candle_summary')
     def _generate_candle_summary(self, candlesticks, current_price):
         """캔들스틱 데이터 요약 생성 (AI가 쉽게 읽을 수 있도록)"""
         try:
@@ -1108,6 +1230,7 @@ class TradingAssistant:
             traceback.print_exc()
             return {}
     
+    @pipeline_tracer.traced('market_context')
     def _generate_market_context(self, candlesticks, technical_indicators, current_price):
         """시장 맥락 정보 생성"""
         try:
@@ -1229,6 +1352,7 @@ class TradingAssistant:
                 "multi_timeframe_consistency": {}
             }
 
+    @pipeline_tracer.traced('collect_market_data')
     async def _collect_market_data(self):
         """시장 데이터 수집"""
         try:
@@ -1243,7 +1367,7 @@ class TradingAssistant:
             
             try:
                 # 1. 현재 시장 데이터
-                ticker = self.bitget.get_ticker()
+                ticker = await self.scheduler.run_blocking(self.bitget.get_ticker)
                 if not ticker or 'data' not in ticker or not ticker['data']:
                     raise Exception("티커 데이터 가져오기 실패")
                 
@@ -1308,23 +1432,31 @@ class TradingAssistant:
                 for timeframe, time_info in timeframes.items():
                     try:
                         # 각 시간대별 API 요청
-                        kline_data = self.bitget.get_kline(
-                            symbol="BTCUSDT",
-                            productType="USDT-FUTURES",
-                            granularity=timeframe,
-                            startTime=str(time_info["start"]),
-                            endTime=str(current_time),
-                            limit=time_info["limit"]
-                        )
+                        with pipeline_tracer.span('fetch_kline', timeframe=timeframe):
+                            kline_data = await self.scheduler.run_blocking(
+                                self.bitget.get_kline,
+                                symbol="BTCUSDT",
+                                productType="USDT-FUTURES",
+                                granularity=timeframe,
+                                startTime=str(time_info["start"]),
+                                endTime=str(current_time),
+                                limit=time_info["limit"]
+                            )
                         
                         if kline_data and 'data' in kline_data and kline_data['data']:
                             candle_count = len(kline_data['data'])
                             print(f"{timeframe} 캔들 데이터 수집 성공: {candle_count}개")
+                            CANDLE_FETCH_SIZE.labels(granularity=timeframe).observe(candle_count)
+                            self.candle_cache.update(timeframe, kline_data['data'])
                             formatted_data['candlesticks'][timeframe] = self._format_kline_data(kline_data)
                             
-                            # 기술적 지표 계산 (모든 시간대에 대해 계산)
+                            # 기술적 지표 계산 (모든 시간대에 대해 계산, pandas 연산이 다른 작업을 막지 않도록 스레드에서 실행)
                             if formatted_data['candlesticks'][timeframe]:
-                                formatted_data['technical_indicators'][timeframe] = self.calculate_technical_indicators(formatted_data['candlesticks'][timeframe])
+                                with pipeline_tracer.span('calculate_technical_indicators', timeframe=timeframe), \
+                                        timed(INDICATOR_COMPUTE_SECONDS, timeframe=timeframe):
+                                    formatted_data['technical_indicators'][timeframe] = await self.scheduler.run_blocking(
+                                        self.calculate_technical_indicators, formatted_data['candlesticks'][timeframe]
+                                    )
                         else:
                             print(f"{timeframe} 캔들 데이터 수집 실패 또는 빈 데이터")
                             formatted_data['candlesticks'][timeframe] = []
@@ -1336,7 +1468,7 @@ class TradingAssistant:
                 
                 # 3. 포지션 데이터만 내부 관리용으로 수집 (AI에게는 전달 안 함)
                 print("\n포지션 데이터 수집 중 (내부 관리용)...")
-                positions = self.bitget.get_positions()
+                positions = await self.scheduler.run_blocking(self.bitget.get_positions)
                 # account, orderbook 데이터 수집 제거 - AI에게 전달하지 않음
                 
                 # 포지션 정보는 내부 관리용으로만 포맷팅 (formatted_data에 추가하지 않음)
@@ -1369,16 +1501,29 @@ class TradingAssistant:
                 
                 # 7. 빗각 설정 추가 및 캔들 데이터 추출 (사용자 지정 포인트)
                 print("\n빗각 설정 로드 중...")
+                candles_1h = formatted_data.get('candlesticks', {}).get('1H', [])
+                
+                # 새로 마감된 1시간봉으로 자동 기준점 갱신 (증분)
+                self.diagonal_anchor_detector.update(candles_1h)
                 diagonal_settings = self._get_diagonal_settings()
                 
-                # 1시간봉 데이터에서 사용자가 지정한 시간의 캔들 추출
-                candles_1h = formatted_data.get('candlesticks', {}).get('1H', [])
+                # 1시간봉 데이터에서 사용자가 지정한(또는 자동 탐지된) 시간의 캔들 추출
                 diagonal_candles = self._extract_diagonal_candles(diagonal_settings, candles_1h)
                 
+                # 빗각/채널 값, 거리, 이벤트 계산 (프롬프트에 사실로 전달)
+                with pipeline_tracer.span('diagonal_analytics'):
+                    diagonal_analytics = self.diagonal_analytics.compute(
+                        diagonal_candles,
+                        formatted_data['candlesticks'],
+                        formatted_data['technical_indicators'],
+                        current_price
+                    )
+                
                 # 원래 시간 정보와 추출된 캔들 정보를 함께 저장
                 formatted_data['diagonal_settings'] = {
                     **diagonal_settings,  # 원래 시간 정보 유지
-                    'extracted_candles': diagonal_candles  # 추출된 캔들 정보 추가
+                    'extracted_candles': diagonal_candles,  # 추출된 캔들 정보 추가
+                    'analytics': diagonal_analytics  # 계산된 빗각/채널 정보
                 }
                 print(f"빗각 설정 로드 및 캔들 추출 완료")
                 
@@ -1456,7 +1601,7 @@ class TradingAssistant:
         """포지션 데이터 포맷팅"""
         try:
             print("\n=== Format Position Data ===")
-            print(f"원본 포지션 데이터: {positions}")
+            logger.debug("원본 포지션 데이터: %s", positions)
             
             if not positions or not isinstance(positions, dict) or 'data' not in positions:
                 print("포지션 데이터가 없거나 올바른 형식이 아닙니다.")
@@ -2724,6 +2869,7 @@ class TradingAssistant:
             traceback.print_exc()
             return {}
 
+    @pipeline_tracer.traced('send_email')
     async def _send_analysis_email(self, analysis_type, analysis_result, market_data=None, position_info=None):
         """분석 결과를 이메일로 전송"""
         try:
@@ -2802,8 +2948,14 @@ class TradingAssistant:
             print(f"이메일 전송 중 오류 발생: {str(e)}")
             traceback.print_exc()
 
-    async def analyze_and_execute(self, job_id=None, schedule_next=True):
-        """기존 분석 및 실행 메서드 수정"""
+    @pipeline_tracer.traced('analysis_cycle', root=True)
+    async def analyze_and_execute(self, job_id=None, schedule_next=True, quiet_collection=False):
+        """기존 분석 및 실행 메서드 수정
+
+        Args:
+            quiet_collection: True면 시장 데이터 수집 단계의 INFO 출력 생략 (경고/오류는 출력)
+        """
+        pipeline_tracer.set_attribute('job_id', job_id)
         try:
             # 청산 플래그 초기화 (재분석 시작 시)
             if hasattr(self, '_liquidation_detected') and self._liquidation_detected:
@@ -2812,7 +2964,7 @@ class TradingAssistant:
             
             # 포지션 체크 - 이미 포지션이 있으면 본분석 중단
             print("\n=== 포지션 상태 체크 (본분석 시작 전) ===")
-            current_positions = self.bitget.get_positions()
+            current_positions = await self.scheduler.run_blocking(self.bitget.get_positions)
             if current_positions and 'data' in current_positions:
                 for pos in current_positions['data']:
                     if float(pos.get('total', 0)) > 0:
@@ -2835,17 +2987,28 @@ class TradingAssistant:
             
             print("✅ 포지션 없음 - 본분석 진행")
             
-            # 현재 시장 데이터 수집
-            market_data = await self._collect_market_data()
-            if not market_data:
-                raise Exception("시장 데이터 수집 실패")
+            # 예약 시간 전에 시작한 투기적 분석이 있으면 드리프트 확인 후 재사용
+            speculative = await self._claim_speculative_analysis(job_id)
+            if speculative:
+                market_data, analysis_result = speculative
+            else:
+                # 현재 시장 데이터 수집
+                with verbosity(logging.WARNING if quiet_collection else None):
+                    market_data = await self._collect_market_data()
+                if not market_data:
+                    raise Exception("시장 데이터 수집 실패")
+                if quiet_collection:
+                    print(f"시장 데이터 수집 완료, {self.get_current_ai_model().upper()} 분석 시작...")
 
-            # AI 분석 실행
-            analysis_result = await self.ai_service.analyze_market_data(market_data)
+                # Step 0 횡보 체크 후 AI 분석
+                analysis_result = await self._analyze_snapshot(market_data)
             
             # 분석 결과 저장
             self.last_analysis_result = analysis_result
-            print(f"\n=== 분석 결과 저장됨 ===\n{json.dumps(analysis_result, indent=2, default=str)}")
+            pipeline_tracer.set_attribute('action', analysis_result.get('action'))
+            pipeline_tracer.set_attribute('speculative', bool(speculative))
+            print(f"\n=== 분석 결과 저장됨: {analysis_result.get('action')} ===")
+            logger.debug("분석 결과 전체:\n%s", LazyJSON(analysis_result))
             
             # 분석 결과 브로드캐스트
             await self._broadcast_analysis_result(analysis_result)
@@ -2882,6 +3045,7 @@ class TradingAssistant:
                     # 진입 시점의 분석 결과 저장 (모니터링용)
                     self._entry_analysis_reason = analysis_result.get('reason', '')
                     self._entry_analysis_time = datetime.now()
+                    self.monitoring_context.start(market_data, analysis_result)
                     self._monitoring_alert_level = 0  # 경보 단계 초기화
                     self._consecutive_hold_count = 0  # 연속 HOLD 카운트 초기화
                     
@@ -2919,6 +3083,28 @@ class TradingAssistant:
                 "reason": str(e)
             }
 
+    async def _run_analysis_job(self, job_id):
+        """예약된 본분석 작업 실행 (오류 시 재분석 예약)"""
+        print(f"\n=== 분석 작업 실행 (ID: {job_id}) ===")
+        print(f"실행 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        try:
+            return await self.analyze_and_execute(job_id, schedule_next=True)
+        except Exception as e:
+            print(f"분석 작업 실행 중 오류: {str(e)}")
+            traceback.print_exc()
+            await self._schedule_next_analysis_on_error(f"분석 작업 {job_id} 실행 중 오류: {str(e)}")
+
+    async def _run_force_close_job(self, job_id):
+        """예약된 강제 청산 작업 실행 (오류 시 재분석 예약)"""
+        print(f"\n=== 강제 청산 작업 실행 (ID: {job_id}) ===")
+        print(f"실행 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
+        try:
+            await self._force_close_position(job_id)
+        except Exception as e:
+            print(f"강제 청산 실행 중 오류: {str(e)}")
+            traceback.print_exc()
+            await self._schedule_next_analysis_on_error(f"강제 청산 작업 {job_id} 실행 중 오류: {str(e)}")
+
     async def _schedule_next_analysis(self, next_time):
         """다음 분석 작업 스케줄링"""
         try:
@@ -2926,49 +3112,15 @@ class TradingAssistant:
             self._cancel_scheduled_analysis()
             
             # 새로운 분석 작업 스케줄링
-            def async_job_wrapper(job_id):
-                # 새로운 이벤트 루프 생성 및 설정
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-                
-                try:
-                    # 비동기 함수를 동기적으로 실행
-                    loop.run_until_complete(self.analyze_and_execute(job_id, schedule_next=True))
-                except Exception as e:
-                    print(f"분석 작업 실행 중 오류: {str(e)}")
-                    import traceback
-                    traceback.print_exc()
-                    
-                    # 오류 발생 시 다른 스레드에서 30분 후 재분석 예약
-                    def schedule_retry():
-                        retry_loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(retry_loop)
-                        try:
-                            retry_loop.run_until_complete(
-                                self._schedule_next_analysis_on_error(f"작업 {job_id} 실행 중 오류: {str(e)}")
-                            )
-                        except Exception as retry_error:
-                            print(f"재시도 예약 중 오류: {str(retry_error)}")
-                        finally:
-                            retry_loop.close()
-                    
-                    # 별도 스레드에서 재시도 예약 실행
-                    import threading
-                    retry_thread = threading.Thread(target=schedule_retry)
-                    retry_thread.daemon = True
-                    retry_thread.start()
-                finally:
-                    # 이벤트 루프 종료
-                    loop.close()
-            
             job_id = f'analysis_{int(time.time())}'
             self.scheduler.add_job(
-                async_job_wrapper,
+                self._run_analysis_job,
                 'date',
                 run_date=next_time,
                 id=job_id,
                 args=[job_id],
-                misfire_grace_time=300  # 5분의 유예 시간 추가
+                misfire_grace_time=300,  # 5분의 유예 시간 추가
+                priority=JOB_PRIORITY[JobType.ANALYSIS]
             )
             
             # active_jobs에 작업 추가 (취소 시 필터링용)
@@ -3017,11 +3169,12 @@ class TradingAssistant:
             import traceback
             traceback.print_exc()
 
+    @pipeline_tracer.traced('broadcast')
     async def _broadcast_analysis_result(self, result):
         """분석 결과를 웹소켓을 통해 브로드캐스트"""
         try:
             print("\n=== 분석 결과 브로드캐스트 시작 ===")
-            print(f"전달받은 결과: {json.dumps(result, indent=2, default=str)}")
+            logger.debug("전달받은 결과: %s", LazyJSON(result))
             
             # 웹소켓 매니저 확인
             if self.websocket_manager is None:
@@ -3050,7 +3203,7 @@ class TradingAssistant:
                 "timestamp": datetime.now().isoformat()
             }
             
-            print(f"브로드캐스트할 메시지 구성됨:\n{json.dumps(message, indent=2, default=str)}")
+            logger.debug("브로드캐스트할 메시지 구성됨:\n%s", LazyJSON(message))
             
             # 메시지 전송
             await self.websocket_manager.broadcast(message)
@@ -3118,6 +3271,7 @@ class TradingAssistant:
                 'entry_time': ''
             }
 
+    @pipeline_tracer.traced('broadcast')
     async def _broadcast_monitoring_result(self, result):
         """모니터링 결과를 웹소켓으로 전송"""
         try:
@@ -3142,8 +3296,9 @@ class TradingAssistant:
     def cancel_all_jobs(self):
         """모든 작업 취소 (STOP AUTO TRADING 시 호출)"""
         try:
-            # 기존 작업 취소
+            # 기존 작업 취소 (저장된 예약 작업 포함)
             self.scheduler.remove_all_jobs()
+            self.active_jobs.clear()
             
             # 모니터링 중지
             self._stop_monitoring()
@@ -3194,7 +3349,7 @@ class TradingAssistant:
         
         if should_log:
             print("\n=== 포지션 데이터 업데이트 ===")
-            print(f"원본 포지션 데이터: {position_data}")
+            logger.debug("원본 포지션 데이터: %s", position_data)
             # 로그 시간 업데이트
             self._last_position_log_time = current_time
         
@@ -3216,7 +3371,7 @@ class TradingAssistant:
                     # 재시도
                     position_data = self.bitget.get_positions()
                     if should_log:
-                        print(f"재시도 결과: {position_data}")
+                        logger.debug("재시도 결과: %s", position_data)
                 except Exception as e:
                     if should_log:
                         print(f"재시도 중 오류 발생: {str(e)}")
@@ -3550,33 +3705,15 @@ class TradingAssistant:
                     print(f"예약 시간: {next_analysis_time.strftime('%Y-%m-%d %H:%M:%S')}")
                     print(f"작업 ID: {new_job_id}")
                     
-                    # 비동기 함수를 실행하기 위한 래퍼 함수 정의
-                    def async_job_wrapper(job_id):
-                        """비동기 함수를 실행하기 위한 래퍼 함수"""
-                        print(f"\n=== 포지션 청산 후 자동 재시작 작업 실행 (ID: {job_id}) ===")
-                        print(f"실행 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                        
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        try:
-                            # 비동기 함수 실행을 create_task로 감싸서 실행
-                            task = loop.create_task(self.analyze_and_execute(job_id, schedule_next=True))
-                            loop.run_until_complete(task)
-                        except Exception as e:
-                            print(f"자동 재시작 작업 실행 중 오류: {str(e)}")
-                            import traceback
-                            traceback.print_exc()
-                        finally:
-                            loop.close()
-                    
                     # 스케줄러에 작업 등록
                     self.scheduler.add_job(
-                        async_job_wrapper,
+                        self._run_analysis_job,
                         'date',
                         run_date=next_analysis_time,
                         args=[new_job_id],
                         id=new_job_id,
-                        replace_existing=True
+                        replace_existing=True,
+                        priority=JOB_PRIORITY[JobType.ANALYSIS]
                     )
                     
                     # 활성 작업 목록에 추가
@@ -3591,11 +3728,9 @@ class TradingAssistant:
                     # 청산 메시지 웹소켓으로 전송
                     try:
                         if self.websocket_manager is not None:
-                            # 비동기 함수를 동기적으로 실행하기 위한 이벤트 루프 생성
-                            broadcast_loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(broadcast_loop)
+                            # 스케줄러 이벤트 루프에서 브로드캐스트 실행 (스레드마다 이벤트 루프를 만들지 않음)
                             try:
-                                broadcast_loop.run_until_complete(self.websocket_manager.broadcast({
+                                self.scheduler.run_sync(self.websocket_manager.broadcast({
                                     "type": "liquidation",
                                     "event_type": "LIQUIDATION",
                                     "data": {
@@ -3613,8 +3748,6 @@ class TradingAssistant:
                                 }))
                             except Exception as e:
                                 print(f"청산 메시지 전송 중 오류: {str(e)}")
-                            finally:
-                                broadcast_loop.close()
                     except Exception as e:
                         print(f"웹소켓 메시지 전송 중 오류: {str(e)}")
                             
@@ -3633,11 +3766,12 @@ class TradingAssistant:
             import traceback
             traceback.print_exc()
 
+    @pipeline_tracer.traced('execute_trade')
     async def _execute_trade(self, action, position_size=0.5, leverage=5, stop_loss_roe=None, take_profit_roe=None, expected_minutes=None):
         """거래 실행"""
         try:
             # 계좌 정보 조회
-            account_info = self.bitget.get_account_info()
+            account_info = await self.scheduler.run_blocking(self.bitget.get_account_info)
             print(f"계좌 정보 응답: {account_info}")
             
             if not account_info or 'data' not in account_info:
@@ -3650,11 +3784,11 @@ class TradingAssistant:
                 raise Exception(f"사용 가능한 USDT가 없습니다: {available_usdt}")
             
             # 현재 가격 조회
-            ticker = self.bitget.get_ticker()
+            ticker = await self.scheduler.run_blocking(self.bitget.get_ticker)
             if not ticker or 'data' not in ticker:
                 raise Exception("현재 가격 조회 실패")
             
-            print(f"티커 응답: {ticker}")
+            logger.debug("티커 응답: %s", ticker)
             
             # 현재 가격 추출
             current_price = float(ticker['data'][0]['lastPr']) if isinstance(ticker['data'], list) else float(ticker['data'].get('lastPr', 0))
@@ -3741,7 +3875,8 @@ class TradingAssistant:
             
             # 거래 실행 - AI의 가격 변동률을 그대로 전달
             if action == 'ENTER_LONG':
-                order_result = self.bitget.place_order(
+                order_result = await self.scheduler.run_blocking(
+                    self.bitget.place_order,
                     size=str(final_position_size/current_price),
                     side="buy",
                     expected_minutes=expected_minutes,
@@ -3750,7 +3885,8 @@ class TradingAssistant:
                     take_profit_roe=price_take_profit_pct  # 가격 변동률 그대로 전달
                 )
             elif action == 'ENTER_SHORT':
-                order_result = self.bitget.place_order(
+                order_result = await self.scheduler.run_blocking(
+                    self.bitget.place_order,
                     size=str(final_position_size/current_price),
                     side="sell",
                     expected_minutes=expected_minutes,
@@ -3805,54 +3941,15 @@ class TradingAssistant:
                 print(f"예약 시간: {expected_close_time}")
                 print(f"Job ID: {force_close_job_id}")
                 
-                # 비동기 함수를 실행하기 위한 래퍼 함수
-                def force_close_wrapper(job_id):
-                    """비동기 강제 청산 함수를 실행하기 위한 래퍼"""
-                    print(f"\n=== 강제 청산 래퍼 실행 (ID: {job_id}) ===")
-                    print(f"실행 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                    
-                    # 새로운 이벤트 루프 생성 및 설정
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    
-                    try:
-                        # 비동기 함수를 동기적으로 실행
-                        loop.run_until_complete(self._force_close_position(job_id))
-                    except Exception as e:
-                        print(f"강제 청산 실행 중 오류: {str(e)}")
-                        import traceback
-                        traceback.print_exc()
-                        
-                        # 오류 발생 시 30분 후 재분석 예약
-                        def schedule_retry():
-                            retry_loop = asyncio.new_event_loop()
-                            asyncio.set_event_loop(retry_loop)
-                            try:
-                                retry_loop.run_until_complete(
-                                    self._schedule_next_analysis_on_error(f"강제 청산 작업 {job_id} 실행 중 오류: {str(e)}")
-                                )
-                            except Exception as retry_error:
-                                print(f"재시도 예약 중 오류: {str(retry_error)}")
-                            finally:
-                                retry_loop.close()
-                        
-                        # 별도 스레드에서 재시도 예약 실행
-                        import threading
-                        retry_thread = threading.Thread(target=schedule_retry)
-                        retry_thread.daemon = True
-                        retry_thread.start()
-                    finally:
-                        # 이벤트 루프 종료
-                        loop.close()
-                
                 # 스케줄러에 강제 청산 작업 추가
                 self.scheduler.add_job(
-                    force_close_wrapper,
+                    self._run_force_close_job,
                     'date',
                     run_date=expected_close_time,
                     id=force_close_job_id,
                     args=[force_close_job_id],
-                    misfire_grace_time=300  # 5분의 유예 시간
+                    misfire_grace_time=300,  # 5분의 유예 시간
+                    priority=JOB_PRIORITY[JobType.FORCE_CLOSE]
                 )
                 
                 # 활성 작업 목록에 추가
@@ -3915,7 +4012,7 @@ class TradingAssistant:
         
         try:
             # 현재 포지션 확인
-            positions = self.bitget.get_positions()
+            positions = await self.scheduler.run_blocking(self.bitget.get_positions)
             has_position = False
             if positions and 'data' in positions:
                 has_position = any(float(pos.get('total', 0)) > 0 for pos in positions['data'])
@@ -3932,12 +4029,12 @@ class TradingAssistant:
             print(f"예상 종료 시간: {self._expected_close_time}")
             
             # 포지션 청산 실행
-            close_result = self.bitget.close_position(position_size=1.0)
+            close_result = await self.scheduler.run_blocking(self.bitget.close_position, position_size=1.0)
             print(f"청산 결과: {close_result}")
             
             if close_result and close_result.get('success'):
                 # 현재 가격 확인
-                ticker = self.bitget.get_ticker()
+                ticker = await self.scheduler.run_blocking(self.bitget.get_ticker)
                 current_price = 0
                 if ticker and 'data' in ticker:
                     current_price = float(ticker['data'][0]['lastPr']) if isinstance(ticker['data'], list) else float(ticker['data'].get('lastPr', 0))
@@ -3987,16 +4084,17 @@ class TradingAssistant:
                 
                 # 스케줄러에 작업 추가
                 self.scheduler.add_job(
-                    self._schedule_next_analysis,
+                    self._run_analysis_job,
                     'date',
                     run_date=next_analysis_time,
                     id=new_job_id,
                     args=[new_job_id],
-                    misfire_grace_time=300  # 5분의 유예 시간 추가
+                    misfire_grace_time=300,  # 5분의 유예 시간 추가
+                    priority=JOB_PRIORITY[JobType.ANALYSIS]
                 )
                 
                 self.active_jobs[new_job_id] = {
-                    "type": JobType.FORCE_CLOSE,
+                    "type": JobType.ANALYSIS,
                     "scheduled_time": next_analysis_time.isoformat(),
                     "expected_minutes": 120,
                     "analysis_result": liquidation_info
@@ -4024,45 +4122,6 @@ class TradingAssistant:
         import threading
         import time
         
-        def async_job_wrapper(job_id):
-            """비동기 함수를 실행하기 위한 래퍼 함수"""
-            print(f"\n=== Stop-loss 모니터링: 새로운 분석 작업 실행 (ID: {job_id}) ===")
-            print(f"실행 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-            
-            # 새로운 이벤트 루프 생성 및 설정
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-            
-            try:
-                # 비동기 함수를 동기적으로 실행 (create_task 대신 직접 run_until_complete 사용)
-                loop.run_until_complete(self.analyze_and_execute(job_id, schedule_next=True))
-            except Exception as e:
-                print(f"분석 작업 실행 중 오류: {str(e)}")
-                import traceback
-                traceback.print_exc()
-                
-                # 오류 발생 시 다른 스레드에서 30분 후 재분석 예약
-                def schedule_retry():
-                    retry_loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(retry_loop)
-                    try:
-                        retry_loop.run_until_complete(
-                            self._schedule_next_analysis_on_error(f"Stop-loss 모니터링 작업 {job_id} 실행 중 오류: {str(e)}")
-                        )
-                    except Exception as retry_error:
-                        print(f"재시도 예약 중 오류: {str(retry_error)}")
-                    finally:
-                        retry_loop.close()
-                
-                # 별도 스레드에서 재시도 예약 실행
-                import threading
-                retry_thread = threading.Thread(target=schedule_retry)
-                retry_thread.daemon = True
-                retry_thread.start()
-            finally:
-                # 이벤트 루프 종료
-                loop.close()
-        
         def monitor_position():
             initial_position = self.bitget.get_positions()
             while True:
@@ -4111,13 +4170,14 @@ class TradingAssistant:
                         try:
                             # 스케줄러에 래퍼 함수 등록 (misfire_grace_time 추가)
                             self.scheduler.add_job(
-                                func=async_job_wrapper,
+                                func=self._run_analysis_job,
                                 trigger='date',
                                 run_date=next_analysis_time,
                                 id=job_id,
                                 args=[job_id],
                                 replace_existing=True,
-                                misfire_grace_time=300  # 5분(300초)의 유예 시간 추가
+                                misfire_grace_time=300,  # 5분(300초)의 유예 시간 추가
+                                priority=JOB_PRIORITY[JobType.ANALYSIS]
                             )
                             print(f"새로운 분석 작업이 예약됨: {job_id}, 실행 시간: {next_analysis_time}, 유예 시간: 5분")
                             
@@ -4135,11 +4195,9 @@ class TradingAssistant:
                             # 청산 메시지 웹소켓으로 전송
                             try:
                                 if self.websocket_manager is not None:
-                                    # 비동기 함수를 동기적으로 실행하기 위한 이벤트 루프 생성
-                                    broadcast_loop = asyncio.new_event_loop()
-                                    asyncio.set_event_loop(broadcast_loop)
+                                    # 스케줄러 이벤트 루프에서 브로드캐스트 실행 (스레드마다 이벤트 루프를 만들지 않음)
                                     try:
-                                        broadcast_loop.run_until_complete(self.websocket_manager.broadcast({
+                                        self.scheduler.run_sync(self.websocket_manager.broadcast({
                                             "type": "liquidation",
                                             "event_type": "LIQUIDATION",
                                             "data": {
@@ -4159,8 +4217,6 @@ class TradingAssistant:
                                         }))
                                     except Exception as e:
                                         print(f"청산 메시지 전송 중 오류: {str(e)}")
-                                    finally:
-                                        broadcast_loop.close()
                             except Exception as e:
                                 print(f"청산 메시지 전송 중 오류: {str(e)}")
                                 traceback.print_exc()
@@ -4235,37 +4291,6 @@ class TradingAssistant:
             print(f"작업 목록 조회 중 오류: {str(e)}")
             return {}
 
-    async def _schedule_next_analysis_on_error(self, error_message):
-        """에러 발생 시 다음 분석 예약"""
-        try:
-            # 에러 메시지 브로드캐스트
-            error_data = {
-                "type": "ANALYSIS_ERROR",
-                "data": {
-                    "message": str(error_message),
-                    "timestamp": datetime.now().isoformat()
-                }
-            }
-            await self.websocket_manager.broadcast(error_data)
-            
-            # 설정된 시간 후 다음 분석 예약
-            reanalysis_minutes = self.settings.get('normal_reanalysis_minutes', 60)
-            next_analysis_time = datetime.now() + timedelta(minutes=reanalysis_minutes)
-            job_id = f"ANALYSIS_{int(time.time())}"
-            
-            # 새로운 분석 작업 예약
-            self.active_jobs[job_id] = {
-                "type": JobType.ANALYSIS,
-                "scheduled_time": next_analysis_time,
-                "status": "scheduled"
-            }
-            
-            print(f"에러로 인한 다음 분석 예약됨: {next_analysis_time}")
-            print(f"재분석 대기 시간: {reanalysis_minutes}분")
-            
-        except Exception as e:
-            print(f"다음 분석 예약 중 오류: {str(e)}")
-
     def get_trading_status(self):
         """현재 트레이딩 상태를 반환합니다."""
         try:
@@ -4371,26 +4396,15 @@ class TradingAssistant:
                 print(f"첫 번째 모니터링 예약: {first_monitoring_time.strftime('%Y-%m-%d %H:%M:%S')}")
                 print(f"모니터링 종료 예정: {self.monitoring_end_time.strftime('%Y-%m-%d %H:%M:%S')}")
                 
-                # 비동기 함수를 실행하기 위한 래퍼
-                def async_monitoring_wrapper(job_id, position_side, expected_minutes):
-                    """비동기 모니터링 함수를 실행하기 위한 래퍼"""
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        loop.run_until_complete(
-                            self._execute_monitoring_job(job_id, position_side, expected_minutes)
-                        )
-                    finally:
-                        loop.close()
-                
                 # 작업 스케줄링
                 self.scheduler.add_job(
-                    async_monitoring_wrapper,
+                    self._execute_monitoring_job,
                     'date',
                     run_date=first_monitoring_time,
                     id=job_id,
                     args=[job_id, position_side, expected_minutes],
-                    misfire_grace_time=300  # 5분 유예
+                    misfire_grace_time=300,  # 5분 유예
+                    priority=JOB_PRIORITY[JobType.MONITORING]
                 )
                 
                 # 활성 작업 목록에 추가
@@ -4411,8 +4425,10 @@ class TradingAssistant:
             import traceback
             traceback.print_exc()
     
+    @pipeline_tracer.traced('monitoring_cycle', root=True)
     async def _execute_monitoring_job(self, job_id, original_position_side, expected_minutes):
         """모니터링 작업 실행 (순차적 스케줄링 포함)"""
+        pipeline_tracer.set_attribute('job_id', job_id)
         try:
             print(f"\n{'='*50}")
             print(f"=== 4시간 모니터링 작업 실행 (Job ID: {job_id}) ===")
@@ -4421,7 +4437,7 @@ class TradingAssistant:
             print(f"Expected minutes: {expected_minutes}분")
             
             # 현재 포지션 확인
-            positions = self.bitget.get_positions()
+            positions = await self.scheduler.run_blocking(self.bitget.get_positions)
             if not positions or 'data' not in positions:
                 print("포지션 정보를 가져올 수 없음")
                 return
@@ -4440,6 +4456,7 @@ class TradingAssistant:
             if not has_position:
                 print("포지션이 이미 청산됨. 모니터링 종료")
                 self._cancel_monitoring_jobs()
+                self.monitoring_context.clear()
                 return
             
             # 시장 데이터 수집
@@ -4449,9 +4466,31 @@ class TradingAssistant:
                 print("시장 데이터 수집 실패")
                 return
             
-            # 동일한 AI 모델로 분석 (초기 분석과 동일한 프롬프트 사용)
-            print(f"\nAI 모델로 시장 재분석 중... (모델: {self.ai_service.get_current_model()})")
-            analysis_result = await self.ai_service.analyze_market_data(market_data)
+            # Step 0 횡보 체크 - 충족 시 AI 호출 없이 HOLD (포지션 유지)
+            gate_result = self.sideways_gate.evaluate(market_data)
+            cycle_start = time.time()
+            if gate_result['is_sideways']:
+                print(f"\n=== Step 0 횡보 감지: 모니터링 AI 분석 생략 ===\n{gate_result['reason']}")
+                analysis_result = self.sideways_gate.build_hold_decision(gate_result, self.monitoring_interval)
+                self.monitoring_context.record_cycle('gate', 0, time.time() - cycle_start)
+            else:
+                # 진입 이후 변경분만 담은 델타 프롬프트 (너무 크면 None → 전체 프롬프트)
+                delta_prompt = None
+                if MONITORING_DELTA_PROMPT_ENABLED:
+                    delta_prompt = self.monitoring_context.build_delta_prompt(market_data, self._get_position_info())
+                
+                prompt_mode = 'delta' if delta_prompt else 'full'
+                print(f"\nAI 모델로 시장 재분석 중... (모델: {self.ai_service.get_current_model()}, 프롬프트: {prompt_mode})")
+                analysis_result = await self.ai_service.analyze_market_data(market_data, prompt=delta_prompt, position_open=True)
+                
+                if analysis_result:
+                    self.monitoring_context.record_cycle(
+                        prompt_mode,
+                        analysis_result.get('prompt_chars', 0),
+                        time.time() - cycle_start,
+                        analysis_result.get('usage')
+                    )
+            self.monitoring_context.advance(market_data)
             
             if not analysis_result:
                 print("분석 실패")
@@ -4500,7 +4539,8 @@ class TradingAssistant:
                 
                 # TPSL 업데이트
                 if new_take_profit_roe and new_stop_loss_roe:
-                    update_result = self.bitget.update_position_tpsl(
+                    update_result = await self.scheduler.run_blocking(
+                        self.bitget.update_position_tpsl,
                         stop_loss_roe=new_stop_loss_roe,
                         take_profit_roe=new_take_profit_roe
                     )
@@ -4540,54 +4580,15 @@ class TradingAssistant:
                     print(f"새 강제청산 예약: {new_force_close_time.strftime('%Y-%m-%d %H:%M:%S')}")
                     print(f"Job ID: {force_close_job_id}")
                     
-                    # 비동기 함수를 실행하기 위한 래퍼 함수
-                    def force_close_wrapper(job_id):
-                        """비동기 강제 청산 함수를 실행하기 위한 래퍼"""
-                        print(f"\n=== 강제 청산 래퍼 실행 (ID: {job_id}) ===")
-                        print(f"실행 시간: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
-                        
-                        # 새로운 이벤트 루프 생성 및 설정
-                        loop = asyncio.new_event_loop()
-                        asyncio.set_event_loop(loop)
-                        
-                        try:
-                            # 비동기 함수를 동기적으로 실행
-                            loop.run_until_complete(self._force_close_position(job_id))
-                        except Exception as e:
-                            print(f"강제 청산 실행 중 오류: {str(e)}")
-                            import traceback
-                            traceback.print_exc()
-                            
-                            # 오류 발생 시 30분 후 재분석 예약
-                            def schedule_retry():
-                                retry_loop = asyncio.new_event_loop()
-                                asyncio.set_event_loop(retry_loop)
-                                try:
-                                    retry_loop.run_until_complete(
-                                        self._schedule_next_analysis_on_error(f"강제 청산 작업 {job_id} 실행 중 오류: {str(e)}")
-                                    )
-                                except Exception as retry_error:
-                                    print(f"재시도 예약 중 오류: {str(retry_error)}")
-                                finally:
-                                    retry_loop.close()
-                            
-                            # 별도 스레드에서 재시도 예약 실행
-                            import threading
-                            retry_thread = threading.Thread(target=schedule_retry)
-                            retry_thread.daemon = True
-                            retry_thread.start()
-                        finally:
-                            # 이벤트 루프 종료
-                            loop.close()
-                    
                     # 스케줄러에 강제 청산 작업 추가
                     self.scheduler.add_job(
-                        force_close_wrapper,
+                        self._run_force_close_job,
                         'date',
                         run_date=new_force_close_time,
                         id=force_close_job_id,
                         args=[force_close_job_id],
-                        misfire_grace_time=300  # 5분의 유예 시간
+                        misfire_grace_time=300,  # 5분의 유예 시간
+                        priority=JOB_PRIORITY[JobType.FORCE_CLOSE]
                     )
                     
                     # 활성 작업 목록에 추가
@@ -4634,7 +4635,7 @@ class TradingAssistant:
                 
                 # 1단계: 현재 포지션 청산
                 print("\n[1단계] 현재 포지션 청산 중...")
-                close_result = self.bitget.close_positions(hold_side=current_position_side)
+                close_result = await self.scheduler.run_blocking(self.bitget.close_positions, hold_side=current_position_side)
                 print(f"청산 결과: {close_result}")
                 
                 # 청산 성공 확인
@@ -4650,7 +4651,7 @@ class TradingAssistant:
                     await asyncio.sleep(2)
                     
                     # 청산 확인
-                    verification_positions = self.bitget.get_positions()
+                    verification_positions = await self.scheduler.run_blocking(self.bitget.get_positions)
                     current_position_size = 0
                     if verification_positions and 'data' in verification_positions:
                         for pos in verification_positions['data']:
@@ -4695,6 +4696,7 @@ class TradingAssistant:
                                 position_side = 'long' if action == 'ENTER_LONG' else 'short'
                                 self._entry_analysis_reason = analysis_result.get('reason', 'N/A')
                                 self._entry_analysis_time = datetime.now().isoformat()
+                                self.monitoring_context.start(market_data, analysis_result)
                                 
                                 print(f"\n=== 새 포지션 진입 분석 결과 저장 ===")
                                 print(f"진입 시간: {self._entry_analysis_time}")
@@ -4774,25 +4776,15 @@ class TradingAssistant:
                 print(f"다음 모니터링 예약: {next_monitoring_time.strftime('%Y-%m-%d %H:%M:%S')}")
                 print(f"Job ID: {next_job_id}")
                 
-                # 비동기 함수 래퍼
-                def async_next_monitoring_wrapper(job_id, position_side, expected_minutes):
-                    loop = asyncio.new_event_loop()
-                    asyncio.set_event_loop(loop)
-                    try:
-                        loop.run_until_complete(
-                            self._execute_monitoring_job(job_id, position_side, expected_minutes)
-                        )
-                    finally:
-                        loop.close()
-                
                 # 다음 모니터링 스케줄링
                 self.scheduler.add_job(
-                    async_next_monitoring_wrapper,
+                    self._execute_monitoring_job,
                     'date',
                     run_date=next_monitoring_time,
                     id=next_job_id,
                     args=[next_job_id, original_position_side, expected_minutes],
-                    misfire_grace_time=300
+                    misfire_grace_time=300,
+                    priority=JOB_PRIORITY[JobType.MONITORING]
                 )
                 
                 # 활성 작업 목록에 추가
@@ -0,0 +1,339 @@
+from collections import deque
+from datetime import datetime
+import asyncio
+import time
+import traceback
+
+from .metrics import WS_CLIENTS, WS_EVICTIONS_TOTAL, WS_SEND_LAG_SECONDS
+from .serialization import dumps_str, to_jsonable
+
+from config.settings import (
+    WS_SEND_QUEUE_SIZE, WS_MAX_LAG_SECONDS, WS_SEND_TIMEOUT_SECONDS, WS_SLOW_CONSUMER_POLICY
+)
+
+
+# 구독 가능한 토픽
+TOPICS = ('ticker', 'position', 'jobs', 'analysis', 'logs')
+
+# 브로드캐스트 메시지 type(소문자) → 토픽 (없는 type은 모든 클라이언트에 전송)
+EVENT_TOPICS = {
+    'force_close': 'position',
+    'liquidation': 'position',
+    'trading_status': 'position',
+    'scheduled_jobs': 'jobs',
+    'analysis_result': 'analysis',
+    'analysis_only_result': 'analysis',
+    'analysis_error': 'analysis',
+    'monitoring_result': 'analysis',
+    'log': 'logs',
+}
+
+
+def _escape_pointer(key):
+    return str(key).replace('~', '~0').replace('/', '~1')
+
+
+def make_patch(old, new, path=''):
+    """두 JSON 값의 차이를 JSON Patch(RFC 6902) 연산 목록으로 계산
+
+    dict는 키 단위로 재귀 비교하고, 리스트와 스칼라는 값이 다르면 통째로 replace합니다.
+    """
+    if old == new:
+        return []
+    if isinstance(old, dict) and isinstance(new, dict):
+        ops = []
+        for key in old:
+            if key not in new:
+                ops.append({'op': 'remove', 'path': f"{path}/{_escape_pointer(key)}"})
+        for key, value in new.items():
+            child = f"{path}/{_escape_pointer(key)}"
+            if key not in old:
+                ops.append({'op': 'add', 'path': child, 'value': value})
+            else:
+                ops.extend(make_patch(old[key], value, child))
+        return ops
+    return [{'op': 'replace', 'path': path, 'value': new}]
+
+
+class _ClientChannel:
+    """클라이언트별 송신 대기열과 전송 태스크"""
+
+    def __init__(self, websocket):
+        self.websocket = websocket
+        self.queue = deque()  # (key, queued_at, text)
+        self.ready = asyncio.Event()
+        self.task = None
+        self.topics = None  # None이면 구독 전 (기존 방식: 모든 이벤트 수신)
+        self.sent = 0
+        self.conflated = 0
+        self.connected_at = time.time()
+
+
+class WebSocketConnectionManager:
+    """WebSocket 연결 관리 및 브로드캐스트
+
+    메시지는 한 번만 직렬화하여 클라이언트별 제한된 대기열에 넣고, 각 클라이언트의 전송 태스크가
+    대기열을 비웁니다. 느린 탭 하나가 다른 클라이언트 전송을 지연시키지 않으며, 호출자는 전송
+    완료를 기다리지 않습니다.
+
+    대기열이 가득 차거나 가장 오래된 메시지가 max_lag_seconds보다 오래 대기하면 느린 소비자로 보고
+    정책에 따라 처리합니다.
+    - conflate: 대기열을 메시지 type별 최신 1건으로 압축 (이벤트 종류는 유지, 중간 업데이트만 생략)
+    - drop: 연결 해제
+
+    웹소켓은 서버(uvicorn) 이벤트 루프에 속하므로, 스케줄러 루프나 다른 스레드에서 호출된
+    broadcast는 call_soon_threadsafe로 서버 루프에 넘겨 대기열에 넣습니다.
+
+    토픽 구독: 클라이언트가 {"type": "subscribe", "topics": [...]}를 보내면 구독한 토픽의 이벤트만
+    받고, 토픽별 전체 스냅샷을 한 번 받은 뒤에는 publish_state()로 상태가 바뀔 때마다 JSON Patch
+    변경분만 받습니다. 구독하지 않은 클라이언트는 기존처럼 모든 이벤트를 받습니다.
+    """
+
+    POLICIES = ('conflate', 'drop')
+
+    def __init__(self, queue_size=WS_SEND_QUEUE_SIZE, max_lag_seconds=WS_MAX_LAG_SECONDS,
+                 send_timeout=WS_SEND_TIMEOUT_SECONDS, policy=WS_SLOW_CONSUMER_POLICY):
+        if policy not in self.POLICIES:
+            print(f"알 수 없는 느린 소비자 정책: {policy}, conflate 사용")
+            policy = 'conflate'
+        self.active_connections = {}  # websocket -> _ClientChannel
+        self.queue_size = max(int(queue_size), 1)
+        self.max_lag_seconds = max_lag_seconds
+        self.send_timeout = send_timeout
+        self.policy = policy
+        self.loop = None
+        self.state = {}  # topic -> 최신 상태 (JSON 값)
+        self.versions = {}  # topic -> 상태 버전 (patch마다 1 증가)
+        self.last_events = {}  # topic -> 마지막 이벤트 메시지
+        self.stats = {'broadcasts': 0, 'patches': 0, 'conflations': 0, 'evictions': 0, 'send_failures': 0}
+        print("WebSocketConnectionManager 초기화됨")
+
+    async def connect(self, websocket):
+        await websocket.accept()
+        self.loop = asyncio.get_running_loop()
+        channel = _ClientChannel(websocket)
+        channel.task = asyncio.create_task(self._sender(channel))
+        self.active_connections[websocket] = channel
+        WS_CLIENTS.set(len(self.active_connections))
+        print(f"새로운 WebSocket 연결 추가됨. 현재 연결 수: {len(self.active_connections)}")
+
+    def disconnect(self, websocket):
+        channel = self.active_connections.pop(websocket, None)
+        if channel is None:
+            return
+        if channel.task and channel.task is not asyncio.current_task() and not channel.task.done():
+            channel.task.cancel()
+        WS_CLIENTS.set(len(self.active_connections))
+        print(f"WebSocket 연결 해제됨. 현재 연결 수: {len(self.active_connections)}")
+
+    # ---- 직렬화 / 대기열 ----
+
+    @staticmethod
+    def _serialize(message):
+        if isinstance(message, dict):
+            return message.get('type'), dumps_str(message)
+        return None, message
+
+    def _dispatch(self, func, *args):
+        """서버 루프에서 func 실행 (다른 루프/스레드에서 호출된 경우 넘겨줌)"""
+        if self.loop is None or self.loop.is_closed():
+            # 아직 연결된 클라이언트가 없음 - 상태만 바로 반영
+            func(*args)
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        if running is self.loop:
+            func(*args)
+        else:
+            self.loop.call_soon_threadsafe(func, *args)
+
+    def _enqueue(self, channel, key, text):
+        now = time.monotonic()
+        channel.queue.append((key, now, text))
+        lagging = now - channel.queue[0][1] > self.max_lag_seconds
+        if len(channel.queue) > self.queue_size or lagging:
+            self._handle_slow_consumer(channel)
+        channel.ready.set()
+
+    def _fan_out(self, key, text, topic=None, message=None):
+        if topic is not None and message is not None:
+            self.last_events[topic] = message
+        for channel in list(self.active_connections.values()):
+            if topic is not None and channel.topics is not None and topic not in channel.topics:
+                continue
+            self._enqueue(channel, key, text)
+
+    def _snapshot_text(self, topic):
+        return dumps_str({
+            'type': 'snapshot',
+            'topic': topic,
+            'version': self.versions.get(topic, 0),
+            'data': self.state.get(topic),
+            'last_event': self.last_events.get(topic),
+        })
+
+    def _apply_state(self, topic, data):
+        ops = make_patch(self.state.get(topic), data)
+        if not ops:
+            return
+        self.state[topic] = data
+        self.versions[topic] = self.versions.get(topic, 0) + 1
+        self.stats['patches'] += 1
+        text = dumps_str({'type': 'patch', 'topic': topic, 'version': self.versions[topic], 'ops': ops})
+        for channel in list(self.active_connections.values()):
+            if channel.topics and topic in channel.topics:
+                self._enqueue(channel, ('state', topic), text)
+
+    def _handle_slow_consumer(self, channel):
+        if self.policy == 'drop':
+            print(f"느린 WebSocket 클라이언트 연결 해제: {id(channel.websocket)} (대기 {len(channel.queue)}건)")
+            self.stats['evictions'] += 1
+            WS_EVICTIONS_TOTAL.labels(policy='drop').inc()
+            self.disconnect(channel.websocket)
+            asyncio.ensure_future(self._close(channel.websocket))
+            return
+
+        # type별 최신 메시지만 남기고 순서 유지
+        latest = {}
+        counts = {}
+        for index, (key, _, _) in enumerate(channel.queue):
+            latest[key] = index
+            counts[key] = counts.get(key, 0) + 1
+        before = len(channel.queue)
+        queue = deque()
+        for index, (key, queued_at, text) in enumerate(channel.queue):
+            if latest[key] != index:
+                continue
+            # patch는 누적 변경분이므로 중간 patch를 버린 토픽은 현재 스냅샷으로 교체
+            if isinstance(key, tuple) and counts[key] > 1:
+                text = self._snapshot_text(key[1])
+            queue.append((key, queued_at, text))
+        channel.queue = queue
+        # 압축 후에도 가득 차 있으면 (type 종류가 너무 많음) 오래된 것부터 버림
+        while len(channel.queue) > self.queue_size:
+            channel.queue.popleft()
+        channel.conflated += before - len(channel.queue)
+        self.stats['conflations'] += 1
+        WS_EVICTIONS_TOTAL.labels(policy='conflate').inc()
+
+    @staticmethod
+    async def _close(websocket):
+        try:
+            await websocket.close()
+        except Exception:
+            pass
+
+    async def _sender(self, channel):
+        """클라이언트 전용 전송 태스크"""
+        try:
+            while True:
+                await channel.ready.wait()
+                while channel.queue:
+                    _, queued_at, text = channel.queue.popleft()
+                    await asyncio.wait_for(channel.websocket.send_text(text), timeout=self.send_timeout)
+                    WS_SEND_LAG_SECONDS.observe(time.monotonic() - queued_at)
+                    channel.sent += 1
+                channel.ready.clear()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            print(f"WebSocket 전송 실패, 연결 해제: {id(channel.websocket)} ({str(e) or type(e).__name__})")
+            self.stats['send_failures'] += 1
+            self.disconnect(channel.websocket)
+
+    # ---- 공개 API ----
+
+    async def broadcast(self, message):
+        """메시지를 모든 활성 연결(토픽 구독 시 해당 구독자)에 브로드캐스트 (대기열에 넣고 즉시 반환)"""
+        if not self.active_connections:
+            print("활성화된 WebSocket 연결이 없습니다.")
+            return
+
+        try:
+            key, text = self._serialize(message)
+            topic = EVENT_TOPICS.get(str(key).lower()) if key else None
+            self.stats['broadcasts'] += 1
+            print(f"WebSocket 브로드캐스트: type={key}, {len(text)} bytes, 연결 {len(self.active_connections)}개")
+            self._dispatch(self._fan_out, key, text, topic, message if isinstance(message, dict) else None)
+            # 연속 브로드캐스트 사이에 전송 태스크가 대기열을 비울 기회 제공
+            await asyncio.sleep(0)
+        except Exception as e:
+            print(f"브로드캐스트 중 예외 발생: {str(e)}")
+            traceback.print_exc()
+
+    async def send_personal(self, websocket, message):
+        """특정 클라이언트에게만 전송 (브로드캐스트와 같은 대기열 사용)"""
+        channel = self.active_connections.get(websocket)
+        if channel is None:
+            return
+        key, text = self._serialize(message)
+        self._dispatch(self._enqueue, channel, key, text)
+
+    def publish_state(self, topic, data):
+        """토픽 상태 갱신 - 바뀐 부분만 구독자에게 patch로 전송 (어느 스레드에서든 호출 가능)"""
+        try:
+            data = to_jsonable(data)
+            self._dispatch(self._apply_state, topic, data)
+        except Exception as e:
+            print(f"{topic} 상태 발행 중 오류: {str(e)}")
+
+    def has_state(self, topic):
+        return topic in self.state
+
+    def has_subscribers(self, *topics):
+        return any(
+            channel.topics and channel.topics.intersection(topics)
+            for channel in list(self.active_connections.values())
+        )
+
+    async def subscribe(self, websocket, topics):
+        """토픽 구독 후 토픽별 전체 스냅샷 전송"""
+        channel = self.active_connections.get(websocket)
+        if channel is None:
+            return
+        accepted = [topic for topic in topics if topic in TOPICS]
+        unknown = [topic for topic in topics if topic not in TOPICS]
+        if channel.topics is None:
+            channel.topics = set()
+        channel.topics.update(accepted)
+        await self.send_personal(websocket, {
+            'type': 'subscribed', 'topics': sorted(channel.topics), 'unknown': unknown
+        })
+        for topic in accepted:
+            self._enqueue(channel, ('state', topic), self._snapshot_text(topic))
+        print(f"WebSocket 토픽 구독: {id(websocket)} -> {sorted(channel.topics)}")
+
+    async def unsubscribe(self, websocket, topics):
+        channel = self.active_connections.get(websocket)
+        if channel is None or channel.topics is None:
+            return
+        channel.topics.difference_update(topics)
+        await self.send_personal(websocket, {'type': 'subscribed', 'topics': sorted(channel.topics), 'unknown': []})
+
+    def get_stats(self):
+        now = time.monotonic()
+        return {
+            'policy': self.policy,
+            'queue_size': self.queue_size,
+            'max_lag_seconds': self.max_lag_seconds,
+            'versions': dict(self.versions),
+            'connections': [
+                {
+                    'connection_id': id(websocket),
+                    'topics': sorted(channel.topics) if channel.topics is not None else None,
+                    'queued': len(channel.queue),
+                    'lag_seconds': round(now - channel.queue[0][1], 3) if channel.queue else 0,
+                    'sent': channel.sent,
+                    'conflated': channel.conflated,
+                    'connected_at': datetime.fromtimestamp(channel.connected_at).isoformat(),
+                }
+                for websocket, channel in list(self.active_connections.items())
+            ],
+            **self.stats,
+        }
+
+
+# 전역 웹소켓 연결 관리자 인스턴스
+websocket_manager = WebSocketConnectionManager()
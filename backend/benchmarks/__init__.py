@@ -0,0 +1,9 @@
+"""지표 계산, 프롬프트 생성, 응답 파싱 마이크로 벤치마크
+
+backend 디렉터리에서 실행합니다:
+
+    python -m benchmarks.run --save-baseline      # 현재 결과를 기준선으로 저장 (머신별로 먼저 1회)
+    python -m benchmarks.run                      # 합성 캔들로 측정, baseline.json과 비교 (회귀 시 종료 코드 1)
+    python -m benchmarks.fixtures --record        # 실제 BTCUSDT 캔들을 픽스처로 녹화
+    python -m benchmarks.run --source recorded    # 녹화된 캔들로 측정
+"""
@@ -0,0 +1,233 @@
+"""벤치마크용 BTCUSDT 캔들 픽스처
+
+- synthetic: 시드가 고정된 랜덤워크 캔들 (어느 환경에서나 같은 데이터)
+- recorded: --record로 Bitget에서 받아 저장해 둔 실제 캔들 (benchmarks/fixtures/*.json)
+  (녹화 파일은 저장소에 포함하지 않으므로 사용하려면 먼저 로컬에서 녹화해야 합니다)
+
+캔들 개수는 _collect_market_data와 같습니다 (15m 950, 1H 950, 4H 540, 12H 180, 1D 90).
+"""
+from contextlib import redirect_stdout
+from datetime import datetime, timezone
+import argparse
+import io
+import json
+import os
+import time
+import zlib
+
+import numpy as np
+
+
+FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+TIMEFRAMES = {
+    '15m': {'minutes': 15, 'limit': 950},
+    '1H': {'minutes': 60, 'limit': 950},
+    '4H': {'minutes': 240, 'limit': 540},
+    '12H': {'minutes': 720, 'limit': 180},
+    '1D': {'minutes': 1440, 'limit': 90},
+}
+
+# 합성 캔들의 마지막 캔들 시작 시각 (고정)
+SYNTHETIC_END = int(datetime(2026, 1, 1, tzinfo=timezone.utc).timestamp() * 1000)
+SYNTHETIC_END_PRICE = 95000.0
+
+
+def synthetic_rows(timeframe):
+    """시간봉별 고정 시드 랜덤워크 캔들 (Bitget get_kline 응답 data 형식, 오래된 순)"""
+    minutes = TIMEFRAMES[timeframe]['minutes']
+    count = TIMEFRAMES[timeframe]['limit']
+    rng = np.random.default_rng(zlib.crc32(timeframe.encode()))
+
+    # 15분봉 기준 변동성 0.25%를 시간봉 길이에 맞게 확대, 추세 구간이 생기도록 완만한 사인파 드리프트 추가
+    sigma = 0.0025 * np.sqrt(minutes / 15)
+    drift = 0.3 * sigma * np.sin(np.linspace(0, 6 * np.pi, count))
+    returns = drift + rng.standard_t(4, count) * sigma / np.sqrt(2)
+
+    # 마지막 종가가 SYNTHETIC_END_PRICE가 되도록 역산
+    closes = SYNTHETIC_END_PRICE * np.exp(np.cumsum(returns) - np.sum(returns))
+    opens = np.concatenate(([closes[0] / np.exp(returns[0])], closes[:-1]))
+    wick = np.abs(rng.normal(0, sigma * 0.6, (2, count)))
+    highs = np.maximum(opens, closes) * (1 + wick[0])
+    lows = np.minimum(opens, closes) * (1 - wick[1])
+    volumes = rng.lognormal(np.log(250 * minutes / 15), 0.5, count)
+
+    start = SYNTHETIC_END - (count - 1) * minutes * 60 * 1000
+    rows = []
+    for i in range(count):
+        rows.append([
+            str(start + i * minutes * 60 * 1000),
+            f"{opens[i]:.1f}", f"{highs[i]:.1f}", f"{lows[i]:.1f}", f"{closes[i]:.1f}",
+            f"{volumes[i]:.4f}", f"{volumes[i] * closes[i]:.2f}",
+        ])
+    return rows
+
+
+def fixture_path(timeframe):
+    return os.path.join(FIXTURE_DIR, f"btcusdt_{timeframe}.json")
+
+
+def recorded_rows(timeframe):
+    path = fixture_path(timeframe)
+    if not os.path.exists(path):
+        raise FileNotFoundError(
+            f"녹화된 픽스처가 없습니다: {path} (python -m benchmarks.fixtures --record 로 먼저 녹화하세요)"
+        )
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)['data']
+
+
+def load_rows(source='synthetic'):
+    """시간봉별 원본 캔들 행 {timeframe: [[ts, open, high, low, close, vol, quote_vol], ...]}"""
+    loader = recorded_rows if source == 'recorded' else synthetic_rows
+    return {timeframe: loader(timeframe) for timeframe in TIMEFRAMES}
+
+
+def record():
+    """Bitget에서 _collect_market_data와 같은 조건으로 캔들을 받아 픽스처로 저장"""
+    from app.services.bitget_service import BitgetService
+
+    bitget = BitgetService()
+    os.makedirs(FIXTURE_DIR, exist_ok=True)
+    current_time = int(time.time() * 1000)
+    max_query_range = 90 * 24 * 60 * 60 * 1000
+
+    for timeframe, info in TIMEFRAMES.items():
+        # 15m는 52일, 1H는 83일, 나머지는 90일 조회 범위 (_collect_market_data와 동일)
+        days = {'15m': 52, '1H': 83}.get(timeframe, 90)
+        kline_data = bitget.get_kline(
+            symbol="BTCUSDT",
+            productType="USDT-FUTURES",
+            granularity=timeframe,
+            startTime=str(current_time - min(days * 24 * 60 * 60 * 1000, max_query_range)),
+            endTime=str(current_time),
+            limit=str(info['limit'])
+        )
+        if not kline_data or not kline_data.get('data'):
+            raise RuntimeError(f"{timeframe} 캔들 데이터 수집 실패: {kline_data}")
+
+        with open(fixture_path(timeframe), 'w', encoding='utf-8') as f:
+            json.dump({
+                'symbol': 'BTCUSDT',
+                'granularity': timeframe,
+                'recorded_at': datetime.now().isoformat(),
+                'data': kline_data['data'],
+            }, f)
+        print(f"{timeframe}: {len(kline_data['data'])}개 저장 → {fixture_path(timeframe)}")
+
+
+def new_assistant():
+    """self 상태를 거의 쓰지 않는 분석 메서드 호출용 TradingAssistant (싱글톤/서비스 초기화 생략)"""
+    from app.services.trading_assistant import TradingAssistant
+    from app.services.diagonal_anchor_detector import DiagonalAnchorDetector
+    from app.services.diagonal_analytics import DiagonalAnalytics
+
+    assistant = object.__new__(TradingAssistant)
+    assistant.bitget = None
+    assistant.diagonal_anchor_detector = DiagonalAnchorDetector()
+    assistant.diagonal_analytics = DiagonalAnalytics()
+    assistant._diagonal_settings_cache = {}  # 수동 빗각 설정 없음 → 자동 탐지 기준점 사용
+    return assistant
+
+
+def build_market_data(rows, assistant=None):
+    """_collect_market_data와 같은 순서로 market_data 생성 (API/DB 호출 없음)"""
+    assistant = assistant or new_assistant()
+
+    with redirect_stdout(io.StringIO()):
+        candlesticks = {}
+        technical_indicators = {}
+        for timeframe in TIMEFRAMES:
+            candlesticks[timeframe] = assistant._format_kline_data({'data': rows[timeframe]})
+            technical_indicators[timeframe] = assistant.calculate_technical_indicators(candlesticks[timeframe])
+
+        last_day = candlesticks['15m'][-96:]
+        current_price = candlesticks['15m'][-1]['close']
+        market_data = {
+            'current_market': {
+                'price': current_price,
+                'timestamp': datetime.fromtimestamp(candlesticks['15m'][-1]['timestamp'] / 1000).isoformat(),
+                '24h_high': max(c['high'] for c in last_day),
+                '24h_low': min(c['low'] for c in last_day),
+                '24h_volume': round(sum(c['volume'] for c in last_day), 4),
+            },
+            'candlesticks': candlesticks,
+            'technical_indicators': technical_indicators,
+        }
+        market_data['candle_summaries'] = assistant._generate_candle_summary(candlesticks, current_price)
+        market_data['indicator_summaries'] = assistant._generate_indicator_summary(technical_indicators, current_price)
+        market_data['market_context'] = assistant._generate_market_context(candlesticks, technical_indicators, current_price)
+
+        candles_1h = candlesticks['1H']
+        assistant.diagonal_anchor_detector.update(candles_1h)
+        diagonal_settings = assistant._get_diagonal_settings()
+        diagonal_candles = assistant._extract_diagonal_candles(diagonal_settings, candles_1h)
+        market_data['diagonal_settings'] = {
+            **diagonal_settings,
+            'extracted_candles': diagonal_candles,
+            'analytics': assistant.diagonal_analytics.compute(
+                diagonal_candles, candlesticks, technical_indicators, current_price
+            ),
+        }
+    return market_data
+
+
+# AI 응답 파싱 벤치마크용 응답 (프롬프트가 요구하는 텍스트 형식)
+TEXT_RESPONSE = """### TRADING_DECISION
+ACTION: ENTER_LONG
+POSITION_SIZE: 0.5
+LEVERAGE: 15
+STOP_LOSS_ROE: 0.6
+TAKE_PROFIT_ROE: 1.8
+EXPECTED_MINUTES: 240
+
+### ANALYSIS_DETAILS
+**Step 0: 시장 국면 판단**
+- 4시간봉 EMA21 > EMA55, ADX 27로 추세 구간
+- 1시간봉 상승 빗각 지지 유지, 거래량 비율 1.3배
+
+**Step 1: 추세 방향**
+- 15분봉/1시간봉/4시간봉 모두 고점과 저점이 높아지는 구조
+- MACD 히스토그램 양수 전환, RSI 58로 과매수 아님
+
+**Step 2: 진입 근거**
+- 1시간봉 상승 빗각 재시험 후 양봉 마감
+- 볼린저 밴드 중심선 위에서 지지
+
+**Step 3: 리스크**
+- 직전 고점 저항까지 여유 1.2%
+- ATR 대비 손절폭 0.8배로 적정
+
+**Step 4: 포지션 관리**
+- 손절 ROE 0.6%, 익절 ROE 1.8%로 손익비 1:3
+- 예상 보유 시간 240분
+
+**최종 결론**
+추세 지속 가능성이 높아 롱 진입.
+"""
+
+STRUCTURED_RESPONSE = json.dumps({
+    'action': 'ENTER_LONG',
+    'position_size': 0.5,
+    'leverage': 15,
+    'stop_loss_roe': 0.6,
+    'take_profit_roe': 1.8,
+    'expected_minutes': 240,
+    'rationale': TEXT_RESPONSE.split('### ANALYSIS_DETAILS', 1)[1].strip(),
+}, ensure_ascii=False)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="벤치마크 캔들 픽스처")
+    parser.add_argument('--record', action='store_true', help="Bitget에서 실제 BTCUSDT 캔들을 받아 저장")
+    args = parser.parse_args()
+
+    if args.record:
+        record()
+    else:
+        for timeframe, rows in load_rows('synthetic').items():
+            print(f"{timeframe}: {len(rows)}개, 마지막 종가 {rows[-1][4]}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,262 @@
+"""마이크로 벤치마크 실행 및 기준선 비교
+
+케이스마다 실행 시간(반복 측정의 중앙값/최솟값)과 1회 호출의 최대 메모리 사용량(tracemalloc peak)을
+측정하고, 저장된 기준선(baseline.json)보다 임계값 이상 느려지거나 메모리를 더 쓰면 종료 코드 1로 끝납니다.
+
+    python -m benchmarks.run [--source synthetic|recorded] [--repeat 9] [--only prompt]
+                             [--threshold 0.25] [--memory-threshold 0.25] [--save-baseline]
+
+기준선은 측정한 머신/파이썬 버전에 종속되므로 같은 환경에서 저장한 값과 비교해야 합니다.
+저장소의 baseline.json은 합성 캔들로 측정한 참고값이므로, 다른 머신에서 검사로 사용할 때는 먼저
+--save-baseline으로 그 머신의 기준선을 저장하세요.
+
+종료 코드: 0 통과(또는 기준선 저장), 1 성능 회귀, 2 기준선 없음/해당 케이스 없음
+"""
+from contextlib import redirect_stdout
+from datetime import datetime
+import argparse
+import gc
+import io
+import json
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+from benchmarks.fixtures import (
+    TIMEFRAMES, TEXT_RESPONSE, STRUCTURED_RESPONSE, load_rows, new_assistant, build_market_data
+)
+
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# 아주 짧은 케이스의 측정 잡음으로 실패하지 않도록 하는 최소 차이
+MIN_TIME_DELTA_MS = 0.05
+MIN_MEMORY_DELTA_KB = 16
+
+
+class _NullWriter(io.TextIOBase):
+    """측정 중 print 출력 버림 (포맷 비용은 그대로 측정에 포함)"""
+
+    def write(self, text):
+        return len(text)
+
+
+def build_cases(source):
+    """{케이스 이름: 인자 없는 호출 객체}"""
+    from app.services.claude_service import ClaudeService
+    from app.services.deepseek_service import DeepSeekService
+    from app.services.openai_service import OpenAIService
+    from app.services.prompt_compiler import compile_prompt_ir, render_candlestick_section
+    from app.services.structured_decision import parse_structured_decision
+
+    rows = load_rows(source)
+    assistant = new_assistant()
+    market_data = build_market_data(rows, assistant)
+    candlesticks = market_data['candlesticks']
+    indicators = market_data['technical_indicators']
+    price = market_data['current_market']['price']
+
+    claude = ClaudeService()
+    # DeepSeek/OpenAI는 __init__에서 API 클라이언트를 만들므로 생성자를 거치지 않음 (파싱/포맷은 self 상태 미사용)
+    deepseek = object.__new__(DeepSeekService)
+    openai = object.__new__(OpenAIService)
+    ir = compile_prompt_ir(market_data)
+
+    cases = {}
+    for timeframe in TIMEFRAMES:
+        cases[f'indicators.{timeframe}'] = (
+            lambda candles=candlesticks[timeframe]: assistant.calculate_technical_indicators(candles)
+        )
+    cases.update({
+        'summary.candle': lambda: assistant._generate_candle_summary(candlesticks, price),
+        'summary.indicator': lambda: assistant._generate_indicator_summary(indicators, price),
+        'summary.market_context': lambda: assistant._generate_market_context(candlesticks, indicators, price),
+        # IR은 market_data 객체 단위로 메모이즈되므로 얕은 복사본으로 매번 새로 컴파일
+        'prompt.compile_ir': lambda: compile_prompt_ir(dict(market_data)),
+        # 기존 _format_all_candlestick_data는 render_candlestick_section으로 대체됨
+        'prompt.render_candlesticks': lambda: render_candlestick_section(ir),
+        'prompt.openai_format_candlesticks': lambda: openai._format_candlestick_data(candlesticks),
+        'prompt.claude_analysis_prompt': lambda: claude._create_analysis_prompt(dict(market_data)),
+        'prompt.claude_analysis_prompt_cached_ir': lambda: claude._create_analysis_prompt(market_data),
+        'parse.claude': lambda: claude._parse_ai_response(TEXT_RESPONSE),
+        'parse.deepseek': lambda: deepseek._parse_ai_response(TEXT_RESPONSE),
+        'parse.openai': lambda: openai._parse_ai_response(TEXT_RESPONSE),
+        'parse.structured_decision': lambda: parse_structured_decision(STRUCTURED_RESPONSE),
+    })
+    return cases
+
+
+def measure_time(func, repeat, min_time=0.05):
+    """1회 호출 시간(ms)의 중앙값/최솟값 (반복 1회가 min_time초 이상 되도록 호출 횟수 자동 조정)"""
+    func()  # 워밍업 (lazy import, 캐시 등)
+
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 10000:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(min_time / elapsed) + 1))
+
+    samples = [elapsed / number * 1000]
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat - 1):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            samples.append((time.perf_counter() - start) / number * 1000)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    return {
+        'median_ms': round(statistics.median(samples), 4),
+        'min_ms': round(min(samples), 4),
+        'calls_per_repeat': number,
+    }
+
+
+def measure_memory(func):
+    """1회 호출 중 추가로 할당된 최대 메모리 (KB)"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        before = tracemalloc.get_traced_memory()[0]
+        func()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return round((peak - before) / 1024, 1)
+
+
+def run(cases, repeat):
+    results = {}
+    with redirect_stdout(_NullWriter()):
+        for name, func in cases.items():
+            results[name] = measure_time(func, repeat)
+            results[name]['peak_kb'] = measure_memory(func)
+    return results
+
+
+def compare(results, baseline, threshold, memory_threshold):
+    """기준선 대비 회귀 목록 [(케이스, 항목, 기준값, 현재값, 변화율)]"""
+    regressions = []
+    for name, current in results.items():
+        base = baseline.get('cases', {}).get(name)
+        if not base:
+            continue
+        checks = (
+            ('median_ms', threshold, MIN_TIME_DELTA_MS),
+            ('peak_kb', memory_threshold, MIN_MEMORY_DELTA_KB),
+        )
+        for key, limit, min_delta in checks:
+            before, after = base.get(key), current.get(key)
+            if not before or after is None:
+                continue
+            if after > before * (1 + limit) and after - before > min_delta:
+                regressions.append((name, key, before, after, (after - before) / before))
+    return regressions
+
+
+def print_report(results, baseline):
+    base_cases = (baseline or {}).get('cases', {})
+    print(f"{'case':<42}{'median ms':>12}{'min ms':>12}{'peak KB':>12}{'Δ time':>10}{'Δ mem':>10}")
+    print('-' * 98)
+    for name, result in results.items():
+        base = base_cases.get(name) or {}
+
+        def delta(key):
+            if not base.get(key):
+                return '-'
+            return f"{(result[key] - base[key]) / base[key] * 100:+.1f}%"
+
+        print(f"{name:<42}{result['median_ms']:>12.3f}{result['min_ms']:>12.3f}{result['peak_kb']:>12.1f}"
+              f"{delta('median_ms'):>10}{delta('peak_kb'):>10}")
+
+
+def environment(source, repeat):
+    return {
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'source': source,
+        'repeat': repeat,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'machine': platform.machine(),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="지표/프롬프트/파싱 마이크로 벤치마크")
+    parser.add_argument('--source', choices=['synthetic', 'recorded'], default='synthetic',
+                        help="캔들 픽스처 (recorded는 python -m benchmarks.fixtures --record 필요)")
+    parser.add_argument('--repeat', type=int, default=9, help="케이스별 반복 측정 횟수")
+    parser.add_argument('--only', default=None, help="이름에 이 문자열이 포함된 케이스만 실행 (예: prompt, parse.)")
+    parser.add_argument('--baseline', default=DEFAULT_BASELINE, help="기준선 JSON 경로")
+    parser.add_argument('--save-baseline', action='store_true', help="이번 결과를 기준선으로 저장")
+    parser.add_argument('--threshold', type=float, default=0.25, help="허용 실행 시간 증가율 (0.25 = 25%%)")
+    parser.add_argument('--memory-threshold', type=float, default=0.25, help="허용 최대 메모리 증가율")
+    parser.add_argument('--output', default=None, help="이번 결과를 저장할 JSON 경로")
+    args = parser.parse_args(argv)
+
+    print(f"픽스처 준비 중 ({args.source})...")
+    with redirect_stdout(_NullWriter()):
+        cases = build_cases(args.source)
+    if args.only:
+        cases = {name: func for name, func in cases.items() if args.only in name}
+        if not cases:
+            print(f"'{args.only}'에 해당하는 케이스가 없습니다.")
+            return 2
+
+    baseline = None
+    if os.path.exists(args.baseline):
+        with open(args.baseline, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    print(f"{len(cases)}개 케이스 측정 중 (반복 {args.repeat}회)...\n")
+    results = run(cases, max(args.repeat, 1))
+    report = {'environment': environment(args.source, args.repeat), 'cases': results}
+    print_report(results, baseline)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+
+    if args.save_baseline:
+        # --only로 일부만 측정한 경우 나머지 케이스의 기존 기준선은 유지
+        merged = {**(baseline or {}).get('cases', {}), **results} if args.only else results
+        with open(args.baseline, 'w', encoding='utf-8') as f:
+            json.dump({**report, 'cases': merged}, f, indent=2, ensure_ascii=False)
+        print(f"\n기준선 저장: {args.baseline}")
+        return 0
+
+    if baseline is None:
+        # 비교 없이 통과하면 회귀 검사가 항상 성공하므로 실패로 처리
+        print(f"\n❌ 기준선이 없습니다 ({args.baseline}). --save-baseline으로 먼저 저장하세요.")
+        return 2
+
+    base_env = baseline.get('environment', {})
+    if (base_env.get('source'), base_env.get('python'), base_env.get('machine')) != \
+            (args.source, platform.python_version(), platform.machine()):
+        print(f"\n⚠️ 기준선 측정 환경이 다릅니다: {base_env.get('source')}, Python {base_env.get('python')}, "
+              f"{base_env.get('machine')} ({base_env.get('created_at')})")
+
+    regressions = compare(results, baseline, args.threshold, args.memory_threshold)
+    if regressions:
+        print(f"\n❌ 성능 회귀 {len(regressions)}건:")
+        for name, key, before, after, ratio in regressions:
+            print(f"  {name} {key}: {before} → {after} ({ratio * 100:+.1f}%)")
+        return 1
+
+    print(f"\n✅ 회귀 없음 (시간 허용 +{args.threshold * 100:.0f}%, 메모리 허용 +{args.memory_threshold * 100:.0f}%)")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
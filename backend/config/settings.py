@@ -9,6 +9,7 @@ ENV = os.getenv("ENV", "development")
 
 # SQLite 데이터베이스 설정
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///./bitcoin_trading.db') 
+DB_RESET_ON_STARTUP = os.getenv('DB_RESET_ON_STARTUP', 'false').lower() == 'true'  # true면 시작 시 모든 테이블 삭제 후 재생성
 
 # Bitget API 설정
 BITGET_API_KEY = os.getenv("BITGET_API_KEY")          # API 키
@@ -34,4 +35,112 @@ SENDER_PASSWORD = os.getenv("SENDER_PASSWORD")
 
 # 서버 설정
 HOST = os.getenv("HOST", "0.0.0.0")
-PORT = int(os.getenv("PORT", 8000)) 
\ No newline at end of file
+PORT = int(os.getenv("PORT", 8000)) 
+# Step 0 횡보 체크 (AI 호출 전 로컬 규칙 엔진)
+SIDEWAYS_GATE_ENABLED = os.getenv("SIDEWAYS_GATE_ENABLED", "true").lower() == "true"
+
+# AI 응답 캐시 (동일한 마감 캔들 스냅샷에 대한 중복 호출 방지)
+ANALYSIS_CACHE_ENABLED = os.getenv("ANALYSIS_CACHE_ENABLED", "true").lower() == "true"
+AI_PROMPT_VERSION = os.getenv("AI_PROMPT_VERSION", "1")
+
+# 모니터링 델타 컨텍스트 프롬프트 (진입 이후 변경분만 전달)
+MONITORING_DELTA_PROMPT_ENABLED = os.getenv("MONITORING_DELTA_PROMPT_ENABLED", "true").lower() == "true"
+
+# 구조화 출력 (Claude tool-use / DeepSeek·OpenAI JSON 모드)
+STRUCTURED_OUTPUT_ENABLED = os.getenv("STRUCTURED_OUTPUT_ENABLED", "true").lower() == "true"
+DECISION_RATIONALE_MAX_CHARS = int(os.getenv("DECISION_RATIONALE_MAX_CHARS", 4000))
+
+# Claude thinking/max_tokens 예산 정책 (시장 상태에 따라 fast/standard/deep 티어 선택)
+CLAUDE_BUDGET_POLICY = {
+    "enabled": os.getenv("CLAUDE_ADAPTIVE_BUDGET_ENABLED", "true").lower() == "true",
+    "default_tier": os.getenv("CLAUDE_BUDGET_DEFAULT_TIER", "standard"),
+    "tiers": {
+        "fast": {
+            "thinking_budget": int(os.getenv("CLAUDE_THINKING_BUDGET_FAST", 1024)),
+            "max_tokens": int(os.getenv("CLAUDE_MAX_TOKENS_FAST", 16000)),
+        },
+        "standard": {
+            "thinking_budget": int(os.getenv("CLAUDE_THINKING_BUDGET_STANDARD", 2000)),
+            "max_tokens": int(os.getenv("CLAUDE_MAX_TOKENS_STANDARD", 64000)),
+        },
+        "deep": {
+            "thinking_budget": int(os.getenv("CLAUDE_THINKING_BUDGET_DEEP", 8000)),
+            "max_tokens": int(os.getenv("CLAUDE_MAX_TOKENS_DEEP", 64000)),
+        },
+    },
+    "calm_atr_percent": float(os.getenv("CLAUDE_BUDGET_CALM_ATR_PERCENT", 0.4)),  # 1H ATR% 이하 → 조용한 시장
+    "volatile_atr_percent": float(os.getenv("CLAUDE_BUDGET_VOLATILE_ATR_PERCENT", 1.0)),  # 1H ATR% 이상 → 변동성 확대
+    "deadline_minutes": float(os.getenv("CLAUDE_BUDGET_DEADLINE_MINUTES", 3)),  # 15분봉 마감까지 남은 시간
+}
+
+# 모델 라우터 (지연 시간/오류율 기반 모델 선택과 폴백 체인)
+# 켜면 선택한 모델이 실패/지연될 때 체인의 다른 (유료) 공급자로 전환되므로 기본값은 꺼짐
+MODEL_ROUTER_ENABLED = os.getenv("MODEL_ROUTER_ENABLED", "false").lower() == "true"
+MODEL_FALLBACK_CHAIN = [m.strip() for m in os.getenv("MODEL_FALLBACK_CHAIN", "claude-sonnet-4.5,deepseek-chat").split(",") if m.strip()]
+MODEL_DEADLINE_SECONDS = float(os.getenv("MODEL_DEADLINE_SECONDS", 600))  # 분석 호출 마감 시간 (초, 라우터 꺼져 있어도 적용)
+MODEL_MAX_ERROR_RATE = float(os.getenv("MODEL_MAX_ERROR_RATE", 0.5))
+MODEL_MIN_ATTEMPT_SECONDS = float(os.getenv("MODEL_MIN_ATTEMPT_SECONDS", 60))
+
+# OpenAI Assistants 스트리밍 실행 및 스레드 수명 정책 (per_analysis / per_position / rolling)
+OPENAI_THREAD_POLICY = os.getenv("OPENAI_THREAD_POLICY", "per_analysis")  # 기본값은 기존 동작 (분석마다 새 스레드)
+OPENAI_THREAD_MAX_MESSAGES = int(os.getenv("OPENAI_THREAD_MAX_MESSAGES", 6))  # 초과 시 요약 후 새 스레드
+OPENAI_RUN_TIMEOUT_SECONDS = float(os.getenv("OPENAI_RUN_TIMEOUT_SECONDS", 300))
+OPENAI_RUN_MAX_RETRIES = int(os.getenv("OPENAI_RUN_MAX_RETRIES", 2))
+
+# 프롬프트 캔들 다운샘플링 (시간봉별 토큰 예산, 최근 구간은 전체 해상도 유지)
+PROMPT_CANDLE_DOWNSAMPLING_ENABLED = os.getenv("PROMPT_CANDLE_DOWNSAMPLING_ENABLED", "true").lower() == "true"
+PROMPT_CANDLE_TOKEN_BUDGET = {
+    "15m": int(os.getenv("PROMPT_CANDLE_TOKEN_BUDGET_15M", 12000)),
+    "1H": int(os.getenv("PROMPT_CANDLE_TOKEN_BUDGET_1H", 6000)),
+    "4H": int(os.getenv("PROMPT_CANDLE_TOKEN_BUDGET_4H", 3000)),
+}
+PROMPT_CANDLE_RECENT_FULL = {
+    "15m": int(os.getenv("PROMPT_CANDLE_RECENT_FULL_15M", 96)),  # 최근 24시간
+    "1H": int(os.getenv("PROMPT_CANDLE_RECENT_FULL_1H", 48)),    # 최근 2일
+    "4H": int(os.getenv("PROMPT_CANDLE_RECENT_FULL_4H", 30)),    # 최근 5일
+}
+
+# 투기적 사전 분석 (예약된 본분석보다 먼저 분석을 시작하고 예약 시간에 드리프트 확인)
+SPECULATIVE_ANALYSIS_ENABLED = os.getenv("SPECULATIVE_ANALYSIS_ENABLED", "true").lower() == "true"
+SPECULATIVE_LEAD_SECONDS = float(os.getenv("SPECULATIVE_LEAD_SECONDS", 150))
+SPECULATIVE_MAX_PRICE_DRIFT_PCT = float(os.getenv("SPECULATIVE_MAX_PRICE_DRIFT_PCT", 0.3))
+SPECULATIVE_MAX_NEW_15M_CANDLES = int(os.getenv("SPECULATIVE_MAX_NEW_15M_CANDLES", 1))
+SPECULATIVE_WAIT_SECONDS = float(os.getenv("SPECULATIVE_WAIT_SECONDS", 180))  # 예약 시간에 진행 중인 분석 대기 한도
+
+# 비동기 작업 스케줄러 (단일 이벤트 루프 + 블로킹 호출용 스레드 풀)
+SCHEDULER_MAX_CONCURRENT_JOBS = int(os.getenv("SCHEDULER_MAX_CONCURRENT_JOBS", 4))
+SCHEDULER_BLOCKING_WORKERS = int(os.getenv("SCHEDULER_BLOCKING_WORKERS", 8))  # Bitget HTTP 연결 풀 크기와 동일
+
+# WebSocket 브로드캐스트 (클라이언트별 송신 대기열, 느린 소비자 처리)
+WS_SEND_QUEUE_SIZE = int(os.getenv("WS_SEND_QUEUE_SIZE", 100))  # 클라이언트별 최대 대기 메시지 수
+WS_MAX_LAG_SECONDS = float(os.getenv("WS_MAX_LAG_SECONDS", 5))  # 가장 오래된 대기 메시지 허용 지연
+WS_SEND_TIMEOUT_SECONDS = float(os.getenv("WS_SEND_TIMEOUT_SECONDS", 10))  # 메시지 1건 전송 제한 시간
+WS_SLOW_CONSUMER_POLICY = os.getenv("WS_SLOW_CONSUMER_POLICY", "conflate")  # conflate: type별 최신만 유지, drop: 연결 해제
+
+# 대시보드 실시간 시세/손익 스트림 (Bitget 공개 WebSocket 피드 1개를 샘플링하여 ticker 토픽으로 발행)
+TICKER_STREAM_RATE_HZ = float(os.getenv("TICKER_STREAM_RATE_HZ", 4))  # 구독자에게 발행하는 최대 주기
+TICKER_STREAM_POSITION_REFRESH_SECONDS = float(os.getenv("TICKER_STREAM_POSITION_REFRESH_SECONDS", 5))  # 손익 계산용 포지션 캐시 갱신 주기
+TICKER_STREAM_REST_FALLBACK_SECONDS = float(os.getenv("TICKER_STREAM_REST_FALLBACK_SECONDS", 2))  # 피드 끊김 시 REST 시세 조회 간격
+
+# 트레이딩 상태 스냅샷 (/api/trading/status와 WebSocket position 토픽은 이 스냅샷에서 응답)
+STATUS_REFRESH_SECONDS = float(os.getenv("STATUS_REFRESH_SECONDS", 5))  # 백그라운드 갱신 주기
+
+# API 응답 크기 (gzip 압축, 캔들 캐시 페이지 조회)
+RESPONSE_GZIP_MIN_SIZE = int(os.getenv("RESPONSE_GZIP_MIN_SIZE", 1000))  # 이 크기(bytes) 이상 응답만 압축
+CANDLE_CACHE_MAX_PER_GRANULARITY = int(os.getenv("CANDLE_CACHE_MAX_PER_GRANULARITY", 5000))  # 시간봉별 캐시 캔들 수
+
+# 분석 파이프라인 트레이싱 (사이클별 단계 span을 SQLite에 저장, /api/trading/traces/{id})
+PIPELINE_TRACE_ENABLED = os.getenv("PIPELINE_TRACE_ENABLED", "true").lower() == "true"
+PIPELINE_TRACE_RETENTION = int(os.getenv("PIPELINE_TRACE_RETENTION", 500))  # 보관할 최근 트레이스 수
+PIPELINE_TRACE_MAX_SPANS = int(os.getenv("PIPELINE_TRACE_MAX_SPANS", 1000))  # 트레이스 1개당 최대 span 수
+
+# 로깅 (큐 기반 비동기 처리, 콘솔 + 회전 JSON-lines 파일, 기존 print 출력도 로그 레코드로 변환)
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()  # DEBUG로 설정하면 전체 응답/페이로드 덤프 출력
+LOG_MODULE_LEVELS = os.getenv("LOG_MODULE_LEVELS", "")  # 예: "app.services.bitget_service=WARNING,app.services.claude_service=DEBUG"
+LOG_FILE = os.getenv("LOG_FILE", "logs/trading.jsonl")  # 빈 값이면 파일 싱크 비활성화
+LOG_FILE_MAX_BYTES = int(os.getenv("LOG_FILE_MAX_BYTES", 10 * 1024 * 1024))
+LOG_FILE_BACKUP_COUNT = int(os.getenv("LOG_FILE_BACKUP_COUNT", 5))
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", 10000))  # 가득 차면 레코드를 버림 (호출 스레드를 막지 않음)
+LOG_RATE_LIMIT_WINDOW_SECONDS = float(os.getenv("LOG_RATE_LIMIT_WINDOW_SECONDS", 10))
+LOG_RATE_LIMIT_BURST = int(os.getenv("LOG_RATE_LIMIT_BURST", 20))  # 같은 위치 로그의 구간당 최대 건수 (0이면 제한 없음, ERROR 이상은 제한 없음)
+LOG_CAPTURE_PRINT = os.getenv("LOG_CAPTURE_PRINT", "true").lower() == "true"
@@ -0,0 +1,58 @@
+import os
+import subprocess
+import sys
+import textwrap
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _run(script, tmp_path):
+    env = {**os.environ, 'LOG_FILE': str(tmp_path / 'trading.jsonl'), 'LOG_CAPTURE_PRINT': 'true'}
+    return subprocess.run(
+        [sys.executable, '-c', textwrap.dedent(script)],
+        cwd=BACKEND_DIR, env=env, capture_output=True, text=True, timeout=60,
+    )
+
+
+def test_uncaught_exception_traceback_reaches_stderr(tmp_path):
+    """print 브리지가 설치된 상태에서도 최상위 미처리 예외의 traceback이 사라지지 않아야 함"""
+    result = _run("""
+        from app.services.structured_logging import setup_logging
+        setup_logging()
+        raise RuntimeError('boom')
+    """, tmp_path)
+
+    assert result.returncode == 1
+    assert 'Traceback (most recent call last)' in result.stderr
+    assert 'RuntimeError: boom' in result.stderr
+    assert 'lost sys.stderr' not in result.stderr
+
+
+def test_print_is_routed_to_log_file(tmp_path):
+    result = _run("""
+        from app.services.structured_logging import setup_logging, logging_subsystem
+        setup_logging()
+        print('hello from print')
+        logging_subsystem.shutdown()
+    """, tmp_path)
+
+    assert result.returncode == 0, result.stderr
+    assert 'hello from print' in result.stdout
+    assert 'hello from print' in (tmp_path / 'trading.jsonl').read_text(encoding='utf-8')
+
+
+def test_multiline_print_is_not_rate_limited(tmp_path):
+    """여러 줄 print 1회는 레코드 1개 - 줄 수가 반복 제한(burst)을 넘어도 잘리지 않아야 함"""
+    result = _run("""
+        from app.services.structured_logging import setup_logging, logging_subsystem
+        setup_logging(rate_burst=20)
+        print('\\n'.join(f'line {i}' for i in range(40)))
+        logging_subsystem.shutdown()
+    """, tmp_path)
+
+    assert result.returncode == 0, result.stderr
+    log_text = (tmp_path / 'trading.jsonl').read_text(encoding='utf-8')
+    for i in (0, 19, 20, 39):
+        assert f'line {i}\n' in result.stdout
+        assert f'line {i}' in log_text
+    assert '생략' not in result.stdout
@@ -1,6 +1,6 @@
 import React, { useState, useEffect } from 'react';
 import { Card, Badge, Row, Col } from 'react-bootstrap';
-import { fetchTradingStatus } from '../services/api';
+import { useTopic } from '../services/websocket';
 import { formatDateTime } from '../utils/dateUtils';
 
 const TradingStatus = () => {
@@ -10,43 +10,38 @@ const TradingStatus = () => {
   const [liquidationReason, setLiquidationReason] = useState(null);
   const [currentPrice, setCurrentPrice] = useState(0);
 
+  // 서버가 상태 변경분만 push하므로 REST 폴링 없이 토픽 상태 사용
+  const positionState = useTopic('position');
+  const tickerState = useTopic('ticker');
+
   useEffect(() => {
-    const fetchStatus = async () => {
-      try {
-        const response = await fetchTradingStatus();
-        console.log('TradingStatus 컴포넌트 응답:', response);
-        
-        if (response) {
-          setTradingStatus(response);
-          
-          // 포지션 정보 처리 개선
-          if (response.current_position && parseFloat(response.current_position.size) > 0) {
-            console.log('TradingStatus: 유효한 포지션 감지:', response.current_position);
-            setCurrentPosition(response.current_position);
-          } else {
-            console.log('TradingStatus: 포지션 없음 또는 크기가 0');
-            setCurrentPosition(null);
-          }
-          
-          // 청산 감지 정보 설정
-          setLiquidationDetected(response.liquidation_detected || false);
-          setLiquidationReason(response.liquidation_reason || null);
-          
-          // 현재 가격 설정
-          if (response.current_price) {
-            setCurrentPrice(response.current_price);
-          }
-        }
-      } catch (error) {
-        console.error('Error fetching trading status:', error);
-      }
-    };
+    if (!positionState) {
+      return;
+    }
+    setTradingStatus(positionState);
+
+    // 포지션 정보 처리 개선
+    const position = positionState.current_position;
+    if (position && parseFloat(position.size) > 0) {
+      setCurrentPosition(position);
+    } else {
+      setCurrentPosition(null);
+    }
+
+    // 청산 감지 정보 설정
+    setLiquidationDetected(positionState.liquidation_detected || false);
+    setLiquidationReason(positionState.liquidation_reason || null);
+  }, [positionState]);
 
-    fetchStatus();
-    const interval = setInterval(fetchStatus, 5000); // 5초마다 상태 업데이트
+  useEffect(() => {
+    // 현재 가격 설정
+    if (tickerState && tickerState.price) {
+      setCurrentPrice(tickerState.price);
+    }
+  }, [tickerState]);
 
-    return () => clearInterval(interval);
-  }, []);
+  // 시세 스트림이 마크 가격으로 계산한 실시간 손익 (없으면 포지션 조회 시점 값 사용)
+  const livePnl = tickerState && tickerState.position_pnl;
 
   const getStatusBadge = () => {
     if (tradingStatus.status === 'running') {
@@ -106,8 +101,13 @@ const TradingStatus = () => {
                   <strong>진입가:</strong> ${parseFloat(currentPosition.entry_price).toFixed(2)}
                 </div>
                 <div className="mb-2">
-                  <strong>현재 PNL:</strong> ${parseFloat(currentPosition.unrealized_pnl).toFixed(2)}
+                  <strong>현재 PNL:</strong> ${parseFloat(livePnl ? livePnl.unrealized_pnl : currentPosition.unrealized_pnl).toFixed(2)}
                 </div>
+                {livePnl && (
+                  <div className="mb-2">
+                    <strong>ROE:</strong> {parseFloat(livePnl.roe).toFixed(2)}%
+                  </div>
+                )}
               </>
             )}
             {currentPrice > 0 && (
@@ -162,7 +162,8 @@ export const cancelScheduledJobs = async () => {
 // AI 분석만 수행 (거래 없음)
 export const analyzeOnly = async () => {
   try {
-    const response = await api.post('/api/trading/analyze-only');
+    // 화면에 쓰는 요약 섹션만 요청 (전체 캔들/지표는 제외하여 응답 크기 축소)
+    const response = await api.post('/api/trading/analyze-only', null, { params: { include: 'summaries' } });
     console.log('Analyze only response:', response.data);
     return response.data;
   } catch (error) {
@@ -31,6 +31,11 @@ const BASE_RECONNECT_DELAY = 1000; // 1초
 const statusListeners = new Set();
 const messageListeners = new Map();
 
+// 토픽 구독 상태 (topic -> { data, version })
+const subscribedTopics = new Set();
+const topicStates = new Map();
+const topicListeners = new Map();
+
 // WebSocket 상태 관리
 let currentStatus = WS_STATUS.CLOSED;
 
@@ -54,11 +59,22 @@ export const connectWebSocket = () => {
       currentStatus = WS_STATUS.OPEN;
       reconnectAttempts = 0;
       notifyStatusChange();
+
+      // 재연결 시 기존 토픽 다시 구독 (서버가 스냅샷부터 다시 전송)
+      if (subscribedTopics.size > 0) {
+        sendWebSocketMessage({ type: 'subscribe', topics: Array.from(subscribedTopics) });
+      }
     };
 
     ws.onmessage = (event) => {
       try {
         const data = JSON.parse(event.data);
+
+        // 토픽 스냅샷/변경분은 상태에 반영 후 토픽 리스너에게만 전달
+        if (data.type === 'snapshot' || data.type === 'patch') {
+          handleTopicMessage(data);
+          return;
+        }
         console.log('WebSocket 메시지 수신:', data);
         
         // type 또는 event_type을 기준으로 리스너에게 알림
@@ -145,6 +161,105 @@ export const removeWebSocketListener = (eventType, callback) => {
   }
 };
 
+/**
+ * JSON Patch 경로를 키 배열로 변환
+ * @param {string} path - JSON Pointer (예: /current_position/size)
+ */
+const parsePointer = (path) => path.split('/').slice(1).map(key => key.replace(/~1/g, '/').replace(/~0/g, '~'));
+
+/**
+ * JSON Patch(add/replace/remove) 연산 적용 (원본은 변경하지 않음)
+ * @param {*} doc - 현재 상태
+ * @param {object[]} ops - 서버가 보낸 연산 목록
+ */
+export const applyPatch = (doc, ops) => {
+  let result = doc;
+  ops.forEach(({ op, path, value }) => {
+    if (path === '') {
+      result = op === 'remove' ? null : value;
+      return;
+    }
+    const keys = parsePointer(path);
+    const root = Array.isArray(result) ? [...result] : { ...(result || {}) };
+    let target = root;
+    keys.slice(0, -1).forEach(key => {
+      const child = target[key];
+      target[key] = Array.isArray(child) ? [...child] : { ...(child || {}) };
+      target = target[key];
+    });
+    const lastKey = keys[keys.length - 1];
+    if (op === 'remove') {
+      delete target[lastKey];
+    } else {
+      target[lastKey] = value;
+    }
+    result = root;
+  });
+  return result;
+};
+
+/**
+ * 토픽 스냅샷/변경분 처리
+ * @param {object} message - snapshot 또는 patch 메시지
+ */
+const handleTopicMessage = (message) => {
+  const { topic, version } = message;
+  const current = topicStates.get(topic);
+
+  if (message.type === 'snapshot') {
+    topicStates.set(topic, { data: message.data, version });
+  } else if (!current || version !== current.version + 1) {
+    // 변경분이 빠졌으면 다시 구독하여 스냅샷 요청
+    console.warn(`${topic} 토픽 버전 불일치 (현재: ${current ? current.version : '-'}, 수신: ${version}) - 재구독`);
+    sendWebSocketMessage({ type: 'subscribe', topics: [topic] });
+    return;
+  } else {
+    topicStates.set(topic, { data: applyPatch(current.data, message.ops), version });
+  }
+
+  const listeners = topicListeners.get(topic);
+  if (listeners) {
+    const { data } = topicStates.get(topic);
+    listeners.forEach(listener => {
+      try {
+        listener(data);
+      } catch (error) {
+        console.error(`토픽 리스너 실행 중 오류:`, error);
+      }
+    });
+  }
+};
+
+/**
+ * 토픽 구독 (ticker, position, jobs, analysis, logs)
+ * @param {string} topic - 토픽 이름
+ * @param {function} callback - 상태가 바뀔 때마다 전체 상태로 호출
+ * @returns {function} 구독 해제 함수
+ */
+export const subscribeTopic = (topic, callback) => {
+  if (!topicListeners.has(topic)) {
+    topicListeners.set(topic, new Set());
+  }
+  topicListeners.get(topic).add(callback);
+
+  if (!subscribedTopics.has(topic)) {
+    subscribedTopics.add(topic);
+    sendWebSocketMessage({ type: 'subscribe', topics: [topic] });
+  } else if (topicStates.has(topic)) {
+    callback(topicStates.get(topic).data);
+  }
+
+  return () => {
+    const listeners = topicListeners.get(topic);
+    listeners.delete(callback);
+    if (listeners.size === 0) {
+      subscribedTopics.delete(topic);
+      topicStates.delete(topic);
+      sendWebSocketMessage({ type: 'unsubscribe', topics: [topic] });
+    }
+  };
+};
+
 /**
  * WebSocket 상태 변경 알림
  */
@@ -202,6 +317,22 @@ export const sendWebSocketMessage = (data) => {
   return false;
 };
 
+/**
+ * 토픽 상태를 구독하는 React 훅 (스냅샷 + 변경분이 반영된 최신 상태 반환)
+ * @param {string} topic - 토픽 이름
+ * @returns {*} 토픽 상태 (수신 전에는 null)
+ */
+export const useTopic = (topic) => {
+  const [data, setData] = useState(() => (topicStates.has(topic) ? topicStates.get(topic).data : null));
+
+  useEffect(() => {
+    connectWebSocket();
+    return subscribeTopic(topic, setData);
+  }, [topic]);
+
+  return data;
+};
+
 /**
  * React 컴포넌트에서 WebSocket 사용을 위한 훅
  * @param {string[]} eventTypes - 구독할 이벤트 타입 배열